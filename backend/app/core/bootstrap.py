@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, List, Optional, Set
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+
+# Arbitrary but fixed: every process bootstrapping this database contends on it.
+DB_BOOTSTRAP_LOCK_KEY = int(os.environ.get("DB_BOOTSTRAP_LOCK_KEY") or "804511207")
+DB_BOOTSTRAP_LOCK_TIMEOUT_SECONDS = max(1.0, float(os.environ.get("DB_BOOTSTRAP_LOCK_TIMEOUT_SECONDS") or "600"))
+DB_BOOTSTRAP_ON_STARTUP = os.environ.get("DB_BOOTSTRAP_ON_STARTUP", "false").lower() in {"1", "true", "yes"}
+DB_SCHEMA_CHECK = (os.environ.get("DB_SCHEMA_CHECK") or "strict").lower()
+ALEMBIC_INI_PATH = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+logger = logging.getLogger("db_bootstrap")
+
+
+class SchemaVersionMismatch(RuntimeError):
+    pass
+
+
+@asynccontextmanager
+async def bootstrap_lock(engine: Any, timeout: float = DB_BOOTSTRAP_LOCK_TIMEOUT_SECONDS) -> AsyncIterator[None]:
+    """Hold the bootstrap advisory lock; concurrent bootstraps wait their turn."""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        started = time.monotonic()
+        while True:
+            acquired = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": DB_BOOTSTRAP_LOCK_KEY})).scalar()
+            if acquired:
+                break
+            if time.monotonic() - started > timeout:
+                raise TimeoutError(f"db bootstrap lock {DB_BOOTSTRAP_LOCK_KEY} not acquired within {timeout:.0f}s")
+            await asyncio.sleep(0.5)
+        logger.info("db_bootstrap_lock_acquired waited_s=%.2f", time.monotonic() - started)
+        try:
+            yield
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": DB_BOOTSTRAP_LOCK_KEY})
+
+
+def _script_directory(config_path: Path = ALEMBIC_INI_PATH) -> ScriptDirectory:
+    return ScriptDirectory.from_config(AlembicConfig(str(config_path)))
+
+
+def alembic_head_revisions(config_path: Path = ALEMBIC_INI_PATH) -> List[str]:
+    return _script_directory(config_path).get_heads() or []
+
+
+def known_revisions(config_path: Path = ALEMBIC_INI_PATH) -> Set[str]:
+    return {script.revision for script in _script_directory(config_path).walk_revisions()}
+
+
+async def upgrade_schema_to_head(config_path: Path = ALEMBIC_INI_PATH) -> None:
+    # env.py opens its own (sync) connection; the advisory lock stays on the caller's.
+    started = time.perf_counter()
+    # "heads": the tree has several unmerged branches, which "head" refuses.
+    await asyncio.to_thread(command.upgrade, AlembicConfig(str(config_path)), "heads")
+    logger.info("db_bootstrap_alembic_upgraded seconds=%.2f", time.perf_counter() - started)
+
+
+async def current_schema_revisions(conn: Any) -> Optional[List[str]]:
+    """Revisions in alembic_version, or None when the table does not exist."""
+    exists = (await conn.execute(text("SELECT to_regclass('alembic_version')"))).scalar()
+    if not exists:
+        return None
+    result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+    return sorted(row[0] for row in result.fetchall() if row and row[0])
+
+
+async def verify_schema_version(engine: Any, mode: str = DB_SCHEMA_CHECK) -> str:
+    """Compare the database with the Alembic heads; raise in strict mode if it is behind.
+
+    A database ahead of this code (revisions we do not know, e.g. an old
+    worker restarting mid rolling deploy) and connection failures are only
+    logged, so the worker can still come up and report through /api/health.
+    """
+    if mode == "off":
+        return "skipped"
+    heads = sorted(alembic_head_revisions())
+    if not heads:
+        logger.warning("db_schema_check_skipped reason=no_alembic_heads")
+        return "unknown"
+    try:
+        async with engine.connect() as conn:
+            current = await current_schema_revisions(conn)
+    except Exception as exc:
+        logger.warning("db_schema_check_skipped reason=db_unreachable error=%s", exc)
+        return "unknown"
+    if current == heads:
+        logger.info("db_schema_check_ok head=%s", ",".join(heads))
+        return "ok"
+    if current and set(current) - known_revisions():
+        logger.warning("db_schema_ahead current=%s head=%s", ",".join(current), ",".join(heads))
+        return "ahead"
+    message = (
+        f"SCHEMA_VERSION_MISMATCH current={','.join(current or []) or 'none'} head={','.join(heads)}; "
+        "run `python scripts/bootstrap_db.py` before starting workers"
+    )
+    if mode == "strict":
+        raise SchemaVersionMismatch(message)
+    logger.warning(message)
+    return "migration_required"
@@ -0,0 +1,194 @@
+import gzip
+import hashlib
+import os
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+COMPRESSION_MIN_SIZE = max(0, int(os.environ.get("COMPRESSION_MIN_SIZE") or "1024"))
+COMPRESSION_GZIP_LEVEL = min(9, max(1, int(os.environ.get("COMPRESSION_GZIP_LEVEL") or "6")))
+# Quality 4-5 is the usual sweet spot for on-the-fly brotli; precompressed
+# payloads are paid for once and use the maximum.
+COMPRESSION_BROTLI_QUALITY = min(11, max(0, int(os.environ.get("COMPRESSION_BROTLI_QUALITY") or "4")))
+PRECOMPRESSED_BROTLI_QUALITY = 11
+PRECOMPRESSED_CACHE_MAX_ENTRIES = max(16, int(os.environ.get("PRECOMPRESSED_CACHE_MAX_ENTRIES") or "512"))
+PRECOMPRESSED_CACHE_TTL_SECONDS = max(1, int(os.environ.get("PRECOMPRESSED_CACHE_TTL_SECONDS") or "300"))
+
+# Media that is already compressed (or must not be buffered) is passed through.
+INCOMPRESSIBLE_CONTENT_PREFIXES = ("image/", "video/", "audio/", "font/woff")
+INCOMPRESSIBLE_CONTENT_TYPES = frozenset(
+    {
+        "application/pdf",
+        "application/zip",
+        "application/gzip",
+        "application/x-gzip",
+        "application/x-brotli",
+        "application/x-7z-compressed",
+        "application/x-rar-compressed",
+        "application/octet-stream",
+        "text/event-stream",
+    }
+)
+# `image/svg+xml` is text and compresses well.
+_COMPRESSIBLE_IMAGE_TYPES = frozenset({"image/svg+xml"})
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick `br` or `gzip` from an Accept-Encoding header, honouring q-values."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+    best: Optional[str] = None
+    best_quality = 0.0
+    for encoding in available_encodings():
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible_content_type(content_type: Optional[str]) -> bool:
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if not media_type:
+        return False
+    if media_type in _COMPRESSIBLE_IMAGE_TYPES:
+        return True
+    if media_type in INCOMPRESSIBLE_CONTENT_TYPES:
+        return False
+    return not media_type.startswith(INCOMPRESSIBLE_CONTENT_PREFIXES)
+
+
+def compress_body(body: bytes, encoding: str, *, precompressed: bool = False) -> bytes:
+    if encoding == "br":
+        quality = PRECOMPRESSED_BROTLI_QUALITY if precompressed else COMPRESSION_BROTLI_QUALITY
+        return brotli.compress(body, quality=quality)
+    level = 9 if precompressed else COMPRESSION_GZIP_LEVEL
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor for streamed response bodies."""
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes, *, final: bool) -> bytes:
+        if self.encoding == "br":
+            data = self._compressor.process(chunk) if chunk else b""
+            return data + (self._compressor.finish() if final else self._compressor.flush())
+        data = self._compressor.compress(chunk) if chunk else b""
+        return data + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class PrecompressedPayload:
+    __slots__ = ("body", "variants", "etag")
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.variants: Dict[str, bytes] = {}
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+    def encoded(self, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        if encoding is None or len(self.body) < COMPRESSION_MIN_SIZE:
+            return self.body, None
+        variant = self.variants.get(encoding)
+        if variant is None:
+            variant = compress_body(self.body, encoding, precompressed=True)
+            self.variants[encoding] = variant
+        return variant, encoding
+
+
+_payload_cache: "OrderedDict[Any, Tuple[float, PrecompressedPayload]]" = OrderedDict()
+_payload_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def get_precompressed(key: Any) -> Optional[PrecompressedPayload]:
+    cached = _payload_cache.get(key)
+    if cached is None or cached[0] <= time.monotonic():
+        _payload_stats["misses"] += 1
+        return None
+    _payload_cache.move_to_end(key)
+    _payload_stats["hits"] += 1
+    return cached[1]
+
+
+def store_precompressed(key: Any, body: bytes, ttl_seconds: Optional[int] = None) -> PrecompressedPayload:
+    payload = PrecompressedPayload(body)
+    ttl = PRECOMPRESSED_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    _payload_cache[key] = (time.monotonic() + ttl, payload)
+    _payload_cache.move_to_end(key)
+    while len(_payload_cache) > PRECOMPRESSED_CACHE_MAX_ENTRIES:
+        _payload_cache.popitem(last=False)
+    return payload
+
+
+def invalidate_precompressed(prefix: Optional[str] = None) -> None:
+    """Drop cached payloads whose key starts with `prefix` (all when None)."""
+    if prefix is None:
+        _payload_cache.clear()
+        return
+    for key in [key for key in _payload_cache if isinstance(key, tuple) and key and key[0] == prefix]:
+        _payload_cache.pop(key, None)
+
+
+def precompressed_cache_stats() -> Dict[str, Any]:
+    return {
+        "entries": len(_payload_cache),
+        "max_entries": PRECOMPRESSED_CACHE_MAX_ENTRIES,
+        "ttl_seconds": PRECOMPRESSED_CACHE_TTL_SECONDS,
+        "encodings": list(available_encodings()),
+        **_payload_stats,
+    }
+
+
+def precompressed_response(
+    request: Request,
+    payload: PrecompressedPayload,
+    *,
+    media_type: str,
+    headers: Optional[Mapping[str, str]] = None,
+    status_code: int = 200,
+) -> Response:
+    """Serve the stored variant matching the request's Accept-Encoding.
+
+    The response carries Content-Encoding already, so the compression
+    middleware passes it through untouched.
+    """
+    response_headers = {**(headers or {}), "ETag": payload.etag, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == payload.etag:
+        return Response(status_code=304, headers=response_headers)
+    body, encoding = payload.encoded(negotiate_encoding(request.headers.get("accept-encoding")))
+    if encoding:
+        response_headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=response_headers)
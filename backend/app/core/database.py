@@ -1,14 +1,18 @@
+import contextvars
 import logging
 import os
 import ssl
 import urllib.parse
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
 
 from sqlalchemy import event
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
 
 from app.core.config import settings
+from app.core.db_pool import InstrumentedAsyncQueuePool, attach_pool_telemetry, pool_status
+from app.core.query_accounting import instrument_engine
 
 APP_ENV = settings.APP_ENV
 RAW_DATABASE_URL = settings.DATABASE_URL
@@ -20,6 +24,10 @@ DB_MAX_OVERFLOW_RAW = os.environ.get("DB_MAX_OVERFLOW")
 DB_POOL_TIMEOUT_RAW = os.environ.get("DB_POOL_TIMEOUT")
 DB_POOL_RECYCLE_RAW = os.environ.get("DB_POOL_RECYCLE")
 DB_POOL_DEBUG = os.environ.get("DB_POOL_DEBUG", "").lower() in {"1", "true", "yes"}
+RAW_REPLICA_DATABASE_URL = (os.environ.get("DATABASE_REPLICA_URL") or "").strip() or None
+DB_REPLICA_POOL_SIZE_RAW = os.environ.get("DB_REPLICA_POOL_SIZE")
+DB_REPLICA_MAX_OVERFLOW_RAW = os.environ.get("DB_REPLICA_MAX_OVERFLOW")
+HEALTH_DB_POOL_TIMEOUT = 1
 DB_SSL_MODE = (os.environ.get("DB_SSL_MODE") or ("require" if APP_ENV in {"prod", "preview"} else "disable")).lower()
 
 
@@ -71,15 +79,17 @@ sql_logger = _ensure_logger("sql_config", logging.INFO)
 pool_logger = _ensure_logger("database.pool", logging.DEBUG if DB_POOL_DEBUG else logging.INFO)
 
 try:
-    DB_POOL_SIZE = int(DB_POOL_SIZE_RAW) if DB_POOL_SIZE_RAW else 5
-    DB_MAX_OVERFLOW = int(DB_MAX_OVERFLOW_RAW) if DB_MAX_OVERFLOW_RAW else 10
-    DB_POOL_TIMEOUT = int(DB_POOL_TIMEOUT_RAW) if DB_POOL_TIMEOUT_RAW else 30
+    DB_POOL_SIZE = int(DB_POOL_SIZE_RAW) if DB_POOL_SIZE_RAW else 10
+    DB_MAX_OVERFLOW = int(DB_MAX_OVERFLOW_RAW) if DB_MAX_OVERFLOW_RAW else 20
+    DB_POOL_TIMEOUT = int(DB_POOL_TIMEOUT_RAW) if DB_POOL_TIMEOUT_RAW else 60
     DB_POOL_RECYCLE = int(DB_POOL_RECYCLE_RAW) if DB_POOL_RECYCLE_RAW else 1800
+    DB_REPLICA_POOL_SIZE = int(DB_REPLICA_POOL_SIZE_RAW) if DB_REPLICA_POOL_SIZE_RAW else DB_POOL_SIZE
+    DB_REPLICA_MAX_OVERFLOW = int(DB_REPLICA_MAX_OVERFLOW_RAW) if DB_REPLICA_MAX_OVERFLOW_RAW else DB_MAX_OVERFLOW
 except ValueError:
-    sql_logger.warning("Invalid DB pool values, defaulting to 5/10/30/1800")
-    DB_POOL_SIZE = 5
-    DB_MAX_OVERFLOW = 10
-    DB_POOL_TIMEOUT = 30
+    sql_logger.warning("Invalid DB pool values, defaulting to 10/20/60/1800")
+    DB_POOL_SIZE = DB_REPLICA_POOL_SIZE = 10
+    DB_MAX_OVERFLOW = DB_REPLICA_MAX_OVERFLOW = 20
+    DB_POOL_TIMEOUT = 60
     DB_POOL_RECYCLE = 1800
 
 ssl_context = None
@@ -97,69 +107,149 @@ if DB_SSL_MODE == "require":
 SAFE_DATABASE_URL = _sanitize_database_url(RAW_DATABASE_URL)
 ASYNC_DATABASE_URL = SAFE_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
-engine = create_async_engine(
-    ASYNC_DATABASE_URL,
-    echo=False,
-    future=True,
-    pool_size=DB_POOL_SIZE,
-    max_overflow=DB_MAX_OVERFLOW,
-    pool_timeout=DB_POOL_TIMEOUT,
-    pool_recycle=DB_POOL_RECYCLE,
-    pool_pre_ping=True,
-    connect_args=connect_args,
-)
-
-sql_logger.info(
-    "Effective DB pool config (core): pool_size=%s max_overflow=%s pool_timeout=%s pool_recycle=%s pool_pre_ping=%s",
-    DB_POOL_SIZE,
-    DB_MAX_OVERFLOW,
-    DB_POOL_TIMEOUT,
-    DB_POOL_RECYCLE,
-    True,
-)
-
 if DB_POOL_DEBUG:
     pool_logger.setLevel(logging.DEBUG)
 
 
-@event.listens_for(engine.sync_engine, "connect")
 def _log_pool_connect(dbapi_connection, connection_record):
     if DB_POOL_DEBUG:
         pool_logger.debug("db_pool_connect")
 
 
-@event.listens_for(engine.sync_engine, "checkout")
 def _log_pool_checkout(dbapi_connection, connection_record, connection_proxy):
     if DB_POOL_DEBUG:
         pool_logger.debug("db_pool_checkout")
 
 
-@event.listens_for(engine.sync_engine, "checkin")
 def _log_pool_checkin(dbapi_connection, connection_record):
     if DB_POOL_DEBUG:
         pool_logger.debug("db_pool_checkin")
 
 
-@event.listens_for(engine.sync_engine, "close")
 def _log_pool_close(dbapi_connection, connection_record):
     if DB_POOL_DEBUG:
         pool_logger.debug("db_pool_close")
 
 
-@event.listens_for(engine.sync_engine, "invalidate")
 def _log_pool_invalidate(dbapi_connection, connection_record, exception):
     pool_logger.info("db_pool_invalidate", extra={"error": str(exception) if exception else None})
 
 
+def _create_engine(name: str, url: str, pool_size: int, max_overflow: int, pool_timeout: int) -> AsyncEngine:
+    created = create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+    attach_pool_telemetry(created, name)
+    instrument_engine(created)
+    pool = created.sync_engine.pool
+    event.listen(pool, "connect", _log_pool_connect)
+    event.listen(pool, "checkout", _log_pool_checkout)
+    event.listen(pool, "checkin", _log_pool_checkin)
+    event.listen(pool, "close", _log_pool_close)
+    event.listen(pool, "invalidate", _log_pool_invalidate)
+    sql_logger.info(
+        "Effective DB pool config: pool=%s pool_size=%s max_overflow=%s pool_timeout=%s pool_recycle=%s pool_pre_ping=%s",
+        name,
+        pool_size,
+        max_overflow,
+        pool_timeout,
+        DB_POOL_RECYCLE,
+        True,
+    )
+    return created
+
+
+# The one engine registry for the process: every router, server.py route and
+# background job draws from these pools.
+engine = _create_engine("primary", ASYNC_DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT)
+# Single connection reserved for health probes, so they answer while the main pool is exhausted.
+health_engine = _create_engine("health", ASYNC_DATABASE_URL, 1, 0, HEALTH_DB_POOL_TIMEOUT)
+replica_engine: Optional[AsyncEngine] = None
+if RAW_REPLICA_DATABASE_URL:
+    replica_engine = _create_engine(
+        "replica",
+        _sanitize_database_url(RAW_REPLICA_DATABASE_URL).replace("postgresql://", "postgresql+asyncpg://"),
+        DB_REPLICA_POOL_SIZE,
+        DB_REPLICA_MAX_OVERFLOW,
+        DB_POOL_TIMEOUT,
+    )
+
+_read_replica_requested: contextvars.ContextVar[bool] = contextvars.ContextVar("read_replica_requested", default=False)
+
+
+class RoutingSession(Session):
+    """Sends SELECTs to the replica inside `read_replica()` scopes.
+
+    Everything else, and every statement after the session's first write,
+    goes to the primary so a request always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            self.info["wrote"] = True
+        elif (
+            replica_engine is not None
+            and _read_replica_requested.get()
+            and not self.info.get("wrote")
+            and getattr(clause, "is_select", False)
+        ):
+            return replica_engine.sync_engine
+        return engine.sync_engine
+
+
+session_class = RoutingSession if replica_engine is not None else Session
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=session_class,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
 
+@contextmanager
+def read_replica() -> Iterator[None]:
+    """Route this scope's read-only statements to the replica, if one is configured."""
+    token = _read_replica_requested.set(True)
+    try:
+        yield
+    finally:
+        _read_replica_requested.reset(token)
+
+
+async def use_read_replica():
+    """Route dependency for read-only endpoints (dashboards, exports, search fallbacks)."""
+    with read_replica():
+        yield
+
+
+def engines() -> Dict[str, AsyncEngine]:
+    registry = {"primary": engine, "health": health_engine}
+    if replica_engine is not None:
+        registry["replica"] = replica_engine
+    return registry
+
+
+def pool_stats() -> List[Dict[str, Any]]:
+    return [pool_status(registered) for registered in engines().values()]
+
+
+async def dispose_engines() -> None:
+    for registered in engines().values():
+        await registered.dispose()
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -0,0 +1,89 @@
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.monitoring import LatencyHistogram
+
+
+class PoolTelemetry:
+    """Checkout latency and wait-queue counters for one connection pool."""
+
+    __slots__ = ("name", "checkout", "waiting", "max_waiting", "waits", "timeouts")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.checkout = LatencyHistogram()
+        self.waiting = 0
+        self.max_waiting = 0
+        self.waits = 0
+        self.timeouts = 0
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times every checkout.
+
+    A checkout waits when the idle queue is empty and overflow is exhausted;
+    `waiting` is the number of callers blocked that way right now.
+    """
+
+    telemetry: Optional[PoolTelemetry] = None
+
+    def _do_get(self) -> Any:
+        telemetry = self.telemetry
+        if telemetry is None:
+            return super()._do_get()
+        queued = -1 < self._max_overflow <= self._overflow and self._pool.empty()
+        if queued:
+            telemetry.waits += 1
+            telemetry.waiting += 1
+            telemetry.max_waiting = max(telemetry.max_waiting, telemetry.waiting)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            telemetry.timeouts += 1
+            raise
+        finally:
+            telemetry.checkout.record((time.perf_counter() - started) * 1000)
+            if queued:
+                telemetry.waiting -= 1
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+
+def attach_pool_telemetry(engine: Any, name: str) -> PoolTelemetry:
+    pool = getattr(engine, "sync_engine", engine).pool
+    telemetry = pool.telemetry = PoolTelemetry(name)
+    return telemetry
+
+
+def pool_status(engine: Any) -> Dict[str, Any]:
+    pool = getattr(engine, "sync_engine", engine).pool
+    telemetry: Optional[PoolTelemetry] = getattr(pool, "telemetry", None)
+    status: Dict[str, Any] = {
+        "pool": telemetry.name if telemetry else None,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    if telemetry:
+        checkout = telemetry.checkout
+        status.update(
+            {
+                "waiting": telemetry.waiting,
+                "max_waiting": telemetry.max_waiting,
+                "waits": telemetry.waits,
+                "timeouts": telemetry.timeouts,
+                "checkouts": checkout.count,
+                "checkout_p50_ms": checkout.quantile(0.5),
+                "checkout_p99_ms": checkout.quantile(0.99),
+                "checkout_max_ms": round(checkout.max_ms, 3),
+            }
+        )
+    return status
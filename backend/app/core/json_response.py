@@ -0,0 +1,73 @@
+import dataclasses
+import enum
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _decimal_value(value: Decimal) -> Any:
+    # Same rule as jsonable_encoder: integral decimals stay integers.
+    if value.as_tuple().exponent >= 0:
+        return int(value)
+    return float(value)
+
+
+def json_default(value: Any) -> Any:
+    """Encode the types orjson does not handle natively."""
+    if isinstance(value, Decimal):
+        return _decimal_value(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return json_default(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps_json(content: Any) -> bytes:
+        return orjson.dumps(content, default=json_default, option=_ORJSON_OPTIONS)
+
+else:  # pragma: no cover
+
+    def dumps_json(content: Any) -> bytes:
+        return json.dumps(
+            content, default=_stdlib_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default response class backed by orjson when installed.
+
+    Routes that need the stdlib encoder (integers beyond 64 bits, NaN
+    passthrough or a custom `json.JSONEncoder`) opt out with
+    `response_class=JSONResponse`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
@@ -0,0 +1,231 @@
+import asyncio
+import copy
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.redis_cache import cache_service
+from app.models.user import User as SqlUser
+
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+PRINCIPAL_INVALIDATION_CHANNEL = os.environ.get("PRINCIPAL_INVALIDATION_CHANNEL", "auth:principal:invalidate")
+PRINCIPAL_INVALIDATION_RETRY_SECONDS = float(os.environ.get("PRINCIPAL_INVALIDATION_RETRY_SECONDS", "5"))
+
+_SESSION_INFO_KEY = "principal_invalidations"
+
+logger = logging.getLogger("principal_cache")
+
+PrincipalKey = Tuple[str, str]
+
+_entries: "OrderedDict[PrincipalKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_keys_by_user: Dict[str, Set[PrincipalKey]] = {}
+_generation = 0
+_hooks_installed = False
+_stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "evictions": 0, "published": 0, "received": 0}
+
+
+def snapshot_principal(user: SqlUser) -> Dict[str, Any]:
+    """Column values of a loaded user, detached from any session."""
+    state = sa_inspect(user)
+    return {
+        attr.key: copy.deepcopy(state.dict[attr.key])
+        for attr in sa_inspect(SqlUser).column_attrs
+        if attr.key in state.dict
+    }
+
+
+def restore_principal(snapshot: Dict[str, Any], session: Optional[Session] = None) -> SqlUser:
+    """Rebuild a user from a snapshot without touching the database.
+
+    With a session the user is merged in as a clean persistent instance, so
+    routes that mutate `current_user` and commit still issue an UPDATE.
+    """
+    user = SqlUser(**copy.deepcopy(snapshot))
+    make_transient_to_detached(user)
+    if session is None:
+        return user
+    sync_session = getattr(session, "sync_session", session)
+    return sync_session.merge(user, load=False)
+
+
+def _drop_key(key: PrincipalKey) -> None:
+    _entries.pop(key, None)
+    user_keys = _keys_by_user.get(key[0])
+    if user_keys is not None:
+        user_keys.discard(key)
+        if not user_keys:
+            _keys_by_user.pop(key[0], None)
+
+
+def _lookup(key: PrincipalKey) -> Optional[Dict[str, Any]]:
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    expires_at, snapshot = entry
+    if expires_at <= time.monotonic():
+        _drop_key(key)
+        return None
+    _entries.move_to_end(key)
+    return snapshot
+
+
+def _store(key: PrincipalKey, user: SqlUser) -> None:
+    if PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return
+    _entries[key] = (time.monotonic() + PRINCIPAL_CACHE_TTL_SECONDS, snapshot_principal(user))
+    _entries.move_to_end(key)
+    _keys_by_user.setdefault(key[0], set()).add(key)
+    _stats["stores"] += 1
+    while len(_entries) > PRINCIPAL_CACHE_MAX_ENTRIES:
+        oldest = next(iter(_entries))
+        _drop_key(oldest)
+        _stats["evictions"] += 1
+
+
+async def resolve_principal(
+    user_id: str,
+    token_version: Optional[str],
+    load: Callable[[], Awaitable[Optional[SqlUser]]],
+    session: Optional[Session] = None,
+) -> Optional[SqlUser]:
+    """Return the user for a token subject, from memory when possible.
+
+    `load` runs only on a miss. A result loaded while an invalidation
+    arrived is returned but not cached.
+    """
+    key = (str(user_id), str(token_version or ""))
+    snapshot = _lookup(key)
+    if snapshot is not None:
+        _stats["hits"] += 1
+        return restore_principal(snapshot, session)
+    _stats["misses"] += 1
+    generation = _generation
+    user = await load()
+    if user is not None and generation == _generation:
+        _store(key, user)
+    return user
+
+
+def invalidate_principal_local(user_ids: Iterable[Any]) -> int:
+    global _generation
+    _generation += 1
+    removed = 0
+    for user_id in user_ids:
+        for key in list(_keys_by_user.get(str(user_id), ())):
+            _drop_key(key)
+            removed += 1
+    _stats["invalidations"] += removed
+    return removed
+
+
+async def publish_principal_invalidation(user_ids: Iterable[Any]) -> None:
+    client = cache_service.client
+    if not client:
+        return
+    for user_id in user_ids:
+        try:
+            await client.publish(PRINCIPAL_INVALIDATION_CHANNEL, str(user_id))
+            _stats["published"] += 1
+        except Exception as exc:
+            logger.warning("principal_invalidation_publish_failed user_id=%s error=%s", user_id, exc)
+
+
+async def invalidate_principal(*user_ids: Any) -> None:
+    """Evict users here and on every other worker (role change, suspension, logout)."""
+    invalidate_principal_local(user_ids)
+    await publish_principal_invalidation(user_ids)
+
+
+def schedule_principal_invalidation(user_ids: Iterable[Any]) -> None:
+    """Sync-context variant: evict now, publish on the running loop if there is one."""
+    user_ids = [str(user_id) for user_id in user_ids]
+    if not user_ids:
+        return
+    invalidate_principal_local(user_ids)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.create_task(publish_principal_invalidation(user_ids))
+
+
+def _collect_user_changes(session: Session, flush_context: Any) -> None:
+    changed = {
+        str(obj.id)
+        for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, SqlUser) and obj.id is not None
+    }
+    if changed:
+        session.info.setdefault(_SESSION_INFO_KEY, set()).update(changed)
+
+
+def _invalidate_committed_users(session: Session) -> None:
+    changed = session.info.pop(_SESSION_INFO_KEY, None)
+    if changed:
+        schedule_principal_invalidation(changed)
+
+
+def _discard_user_changes(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+
+def install_principal_invalidation_hooks() -> None:
+    """Invalidate cached principals whenever a committed flush touched a user row."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "after_flush", _collect_user_changes)
+    event.listen(Session, "after_commit", _invalidate_committed_users)
+    event.listen(Session, "after_soft_rollback", lambda session, previous_transaction: _discard_user_changes(session))
+    _hooks_installed = True
+
+
+async def principal_invalidation_listener() -> None:
+    """Apply invalidations published by other workers."""
+    while True:
+        client = cache_service.client
+        if not client:
+            await asyncio.sleep(PRINCIPAL_INVALIDATION_RETRY_SECONDS)
+            continue
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(PRINCIPAL_INVALIDATION_CHANNEL)
+            logger.info("principal_invalidation_subscribed channel=%s", PRINCIPAL_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                _stats["received"] += 1
+                invalidate_principal_local([message.get("data")])
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("principal_invalidation_listener_error error=%s", exc)
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
+        await asyncio.sleep(PRINCIPAL_INVALIDATION_RETRY_SECONDS)
+
+
+def principal_cache_stats() -> Dict[str, Any]:
+    return {
+        **_stats,
+        "entries": len(_entries),
+        "ttl_seconds": PRINCIPAL_CACHE_TTL_SECONDS,
+        "max_entries": PRINCIPAL_CACHE_MAX_ENTRIES,
+    }
+
+
+def clear_principal_cache() -> None:
+    global _generation
+    _generation += 1
+    _entries.clear()
+    _keys_by_user.clear()
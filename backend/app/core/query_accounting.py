@@ -0,0 +1,176 @@
+import contextvars
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+
+QUERY_ACCOUNTING_ENABLED = os.environ.get("QUERY_ACCOUNTING_ENABLED", "true").lower() == "true"
+QUERY_DEBUG_HEADERS = os.environ.get("QUERY_DEBUG_HEADERS", "false").lower() == "true"
+QUERY_REPEAT_WARN_THRESHOLD = max(2, int(os.environ.get("QUERY_REPEAT_WARN_THRESHOLD") or "10"))
+QUERY_COUNT_LOG_THRESHOLD = max(1, int(os.environ.get("QUERY_COUNT_LOG_THRESHOLD") or "50"))
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_MAX_REPEAT_HEADER = "X-DB-Query-Max-Repeat"
+
+logger = logging.getLogger("query_accounting")
+
+_PARAM_LIST_RE = re.compile(r"\(\s*(?:\$\d+|\?|%\(\w+\)s)(?:\s*,\s*(?:\$\d+|\?|%\(\w+\)s))*\s*\)")
+_PARAM_RE = re.compile(r"\$\d+|%\(\w+\)s")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def statement_shape(statement: str) -> str:
+    """Statement text with parameters, literals and IN-list lengths folded away."""
+    shape = _STRING_RE.sub("?", statement)
+    shape = _PARAM_LIST_RE.sub("(?)", shape)
+    shape = _PARAM_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statements executed within one request (or any `track_queries` block)."""
+
+    __slots__ = ("count", "total_ms", "shapes")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def max_repeat(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+    def repeated(self, threshold: int = QUERY_REPEAT_WARN_THRESHOLD) -> List[Tuple[str, int]]:
+        rows = [(shape, count) for shape, count in self.shapes.items() if count >= threshold]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries"'
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "db_ms": round(self.total_ms, 2),
+            "distinct": len(self.shapes),
+            "max_repeat": self.max_repeat(),
+        }
+
+
+_current_query_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_query_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_query_stats.get() is not None:
+        conn.info.setdefault("query_accounting_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_query_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_accounting_started")
+    if not started:
+        return
+    stats.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("query_accounting_started") if exception_context.connection else None
+    if not started:
+        return
+    duration_ms = (time.perf_counter() - started.pop()) * 1000
+    stats = _current_query_stats.get()
+    if stats is not None and exception_context.statement:
+        stats.record(exception_context.statement, duration_ms)
+
+
+def instrument_engine(engine: Any) -> None:
+    """Attach the statement counters to an Engine or AsyncEngine (idempotent)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not QUERY_ACCOUNTING_ENABLED or event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def log_request_queries(method: str, route: str, stats: QueryStats) -> None:
+    repeated = stats.repeated()
+    if repeated:
+        shape, repeats = repeated[0]
+        logger.warning(
+            "n_plus_one_suspected method=%s route=%s queries=%s db_ms=%.2f repeats=%s shape=%r",
+            method,
+            route,
+            stats.count,
+            stats.total_ms,
+            repeats,
+            shape[:300],
+        )
+    elif stats.count >= QUERY_COUNT_LOG_THRESHOLD:
+        logger.info(
+            "request_queries_high method=%s route=%s queries=%s db_ms=%.2f distinct=%s",
+            method,
+            route,
+            stats.count,
+            stats.total_ms,
+            len(stats.shapes),
+        )
+    elif stats.count:
+        logger.debug("request_queries method=%s route=%s queries=%s db_ms=%.2f", method, route, stats.count, stats.total_ms)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, *, max_repeat: Optional[int] = None) -> Iterator[QueryStats]:
+    """Test helper: fail if the block runs more statements than budgeted."""
+    with track_queries() as stats:
+        yield stats
+    assert stats.count <= max_queries, f"query budget exceeded: {stats.count} > {max_queries} {stats.summary()}"
+    if max_repeat is not None:
+        assert stats.max_repeat() <= max_repeat, f"repeated statement: {stats.repeated(max_repeat + 1)[:1]}"
+
+
+def assert_query_budget(response: Any, max_queries: Optional[int] = None, *, max_repeat: Optional[int] = None) -> int:
+    """Test helper for live-server tests; needs QUERY_DEBUG_HEADERS=true on the server."""
+    raw_count = response.headers.get(QUERY_COUNT_HEADER)
+    assert raw_count is not None, f"{QUERY_COUNT_HEADER} missing; enable QUERY_DEBUG_HEADERS on the server"
+    count = int(raw_count)
+    if max_queries is not None:
+        assert count <= max_queries, f"query budget exceeded: {count} > {max_queries} for {response.request.url}"
+    if max_repeat is not None:
+        repeat = int(response.headers.get(QUERY_MAX_REPEAT_HEADER) or 0)
+        assert repeat <= max_repeat, f"statement repeated {repeat} times (> {max_repeat}) for {response.request.url}"
+    return count
@@ -1,144 +1,284 @@
-
+import ipaddress
 import time
-from fastapi import Request, HTTPException, Depends
-from starlette.responses import JSONResponse
+from collections import OrderedDict
+from functools import lru_cache
+from fastapi import Request, HTTPException
 import logging
 import os
-from typing import Optional, Tuple, Callable
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from app.core.redis_cache import cache_service
+from app.core.security import decode_token
 
 logger = logging.getLogger("rate_limiter")
 
-# In-memory storage: {key: [timestamp1, timestamp2, ...]}
-_rate_limit_store = {}
-
-def clean_expired_entries(window_seconds: int):
-    """Cleanup helper (Naive implementation)"""
-    now = time.time()
-    keys_to_delete = []
-    for key, timestamps in _rate_limit_store.items():
-        valid_timestamps = [t for t in timestamps if t > now - window_seconds]
-        if not valid_timestamps:
-            keys_to_delete.append(key)
-        else:
-            _rate_limit_store[key] = valid_timestamps
-    for k in keys_to_delete:
-        del _rate_limit_store[k]
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "True").lower() == "true"
+RATE_LIMIT_LOCAL_MAX_KEYS = max(1000, int(os.environ.get("RATE_LIMIT_LOCAL_MAX_KEYS") or "50000"))
+RATE_LIMIT_KEY_PREFIX = "rl"
+# Peers whose X-Forwarded-For / X-Real-IP headers are believed; anyone else
+# is keyed on the socket address. Comma-separated addresses or CIDRs.
+TRUSTED_PROXY_IPS = os.environ.get("TRUSTED_PROXY_IPS") or "127.0.0.1,::1"
+
+# GCRA: one "theoretical arrival time" per key. A hit moves it forward by
+# window/limit; it is allowed while TAT stays within `burst` emission
+# intervals of now. Redis' own clock keeps every worker on the same time base.
+GCRA_LUA = """
+local key = KEYS[1]
+local interval_ms = tonumber(ARGV[1])
+local burst_ms = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now_ms = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', key))
+if tat == nil or tat < now_ms then
+    tat = now_ms
+end
+local new_tat = tat + interval_ms
+local ahead = new_tat - now_ms
+if ahead > burst_ms then
+    return {0, ahead - burst_ms, ahead - interval_ms}
+end
+redis.call('SET', key, new_tat, 'PX', ahead)
+return {1, 0, ahead}
+"""
+
+# Local pre-check state, {key: tat_seconds}; least recently used keys are
+# evicted one at a time, never the whole store.
+_rate_limit_store: "OrderedDict[str, float]" = OrderedDict()
+_stats: Dict[str, int] = {"allowed": 0, "denied": 0, "local_denied": 0, "redis_errors": 0, "fail_closed": 0}
+
+
+class RateLimitDecision:
+    __slots__ = ("allowed", "limit", "remaining", "retry_after", "source")
+
+    def __init__(self, allowed: bool, limit: int, remaining: int, retry_after: int, source: str) -> None:
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.retry_after = retry_after
+        self.source = source
+
+
+def _local_hit(key: str, interval: float, burst: float) -> Tuple[bool, float, Optional[float]]:
+    """Returns (allowed, seconds ahead or retry delay, previous_tat) against this worker's own hits."""
+    now = time.monotonic()
+    previous = _rate_limit_store.get(key)
+    tat = previous if previous is not None and previous > now else now
+    new_tat = tat + interval
+    ahead = new_tat - now
+    if ahead > burst:
+        if previous is not None:
+            _rate_limit_store.move_to_end(key)
+        return False, ahead - burst, previous
+    _rate_limit_store[key] = new_tat
+    _rate_limit_store.move_to_end(key)
+    if len(_rate_limit_store) > RATE_LIMIT_LOCAL_MAX_KEYS:
+        _rate_limit_store.popitem(last=False)
+    return True, ahead, previous
+
+
+def _local_rollback(key: str, previous: Optional[float]) -> None:
+    if previous is None:
+        _rate_limit_store.pop(key, None)
+    else:
+        _rate_limit_store[key] = previous
+
+
+_gcra_scripts: Dict[int, Any] = {}
+
+
+def _gcra_script(client: Any) -> Any:
+    script = _gcra_scripts.get(id(client))
+    if script is None:
+        _gcra_scripts.clear()
+        script = _gcra_scripts[id(client)] = client.register_script(GCRA_LUA)
+    return script
+
+
+def _parse_networks(value: str) -> Tuple[Any, ...]:
+    networks = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            logger.warning("trusted_proxy_ignored value=%s", item)
+    return tuple(networks)
+
+
+_trusted_proxies = _parse_networks(TRUSTED_PROXY_IPS)
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxies)
+
+
+def client_ip(request: Request) -> str:
+    """The caller's address; forwarded headers count only when a trusted proxy sent them.
+
+    X-Forwarded-For is read right to left and the first hop that is not a
+    trusted proxy wins, since everything left of it is client-supplied.
+    """
+    peer = request.client.host if request.client else "127.0.0.1"
+    if not _is_trusted_proxy(peer):
+        return peer
+    hops = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    if hops:
+        return hops[0]
+    return (request.headers.get("X-Real-IP") or "").strip() or peer
+
+
+@lru_cache(maxsize=4096)
+def _token_subject(token: str) -> Optional[str]:
+    payload = decode_token(token)
+    if not payload or payload.get("type") != "access":
+        return None
+    subject = payload.get("sub")
+    return str(subject) if subject else None
+
+
+def principal_identity(request: Request) -> str:
+    """`user:<id>` for an authenticated caller, otherwise `ip:<address>`."""
+    current_user = getattr(request.state, "current_user", None)
+    user_id = current_user.get("id") if current_user is not None else None
+    if not user_id:
+        auth_header = request.headers.get("Authorization") or ""
+        if auth_header.startswith("Bearer "):
+            user_id = _token_subject(auth_header[7:].strip())
+    if user_id:
+        return f"user:{user_id}"
+    return f"ip:{client_ip(request)}"
+
+
+def ip_identity(request: Request) -> str:
+    return f"ip:{client_ip(request)}"
+
+
+_KEY_FUNCS: Dict[str, Callable[[Request], str]] = {"principal": principal_identity, "ip": ip_identity}
+
 
 class RateLimiter:
-    def __init__(self, limit: int, window_seconds: int, scope: str = "default"):
+    """Rate limit policy usable as a FastAPI dependency or called directly.
+
+    `limit` hits per `window_seconds`, with up to `burst` (default `limit`)
+    back to back. Decisions are made in Redis when it is connected, after a
+    local pre-check that can only deny what Redis would deny too. If Redis
+    errors, `fail_open` policies fall back to the local decision and
+    fail-closed policies deny.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window_seconds: int,
+        scope: str = "default",
+        *,
+        burst: Optional[int] = None,
+        key: Union[str, Callable[[Request], str]] = "principal",
+        fail_open: bool = True,
+    ):
         self.limit = limit
         self.window_seconds = window_seconds
         self.scope = scope
-        self.enabled = os.environ.get("RATE_LIMIT_ENABLED", "True").lower() == "true"
+        self.burst = burst
+        self.key_func = _KEY_FUNCS[key] if isinstance(key, str) else key
+        self.fail_open = fail_open
+        self.enabled = RATE_LIMIT_ENABLED
+
+    def _interval(self) -> Tuple[float, float]:
+        interval = self.window_seconds / max(1, self.limit)
+        return interval, interval * max(1, self.burst or self.limit)
+
+    async def hit(self, identity: str) -> RateLimitDecision:
+        """Count one hit for `identity` under this policy."""
+        interval, burst = self._interval()
+        key = f"{RATE_LIMIT_KEY_PREFIX}:{self.scope}:{identity}"
+        allowed, ahead, previous = _local_hit(key, interval, burst)
+        if not allowed:
+            _stats["denied"] += 1
+            _stats["local_denied"] += 1
+            return RateLimitDecision(False, self.limit, 0, max(1, int(ahead + 0.999)), "local")
+
+        client = cache_service.client
+        source = "local"
+        if client:
+            try:
+                result = await _gcra_script(client)(
+                    keys=[key],
+                    args=[int(interval * 1000), int(burst * 1000)],
+                )
+                allowed = bool(int(result[0]))
+                ahead = int(result[2]) / 1000
+                source = "redis"
+                if not allowed:
+                    _local_rollback(key, previous)
+                    _stats["denied"] += 1
+                    return RateLimitDecision(False, self.limit, 0, max(1, int(int(result[1]) / 1000 + 0.999)), source)
+            except Exception as exc:
+                _stats["redis_errors"] += 1
+                logger.warning("rate_limit_backend_error scope=%s fail_open=%s error=%s", self.scope, self.fail_open, exc)
+                if not self.fail_open:
+                    _local_rollback(key, previous)
+                    _stats["denied"] += 1
+                    _stats["fail_closed"] += 1
+                    return RateLimitDecision(False, self.limit, 0, max(1, int(interval)), "fail_closed")
+        _stats["allowed"] += 1
+        remaining = max(0, int((burst - ahead) / interval)) if interval else self.limit
+        return RateLimitDecision(True, self.limit, remaining, 0, source)
 
     async def __call__(self, request: Request, user_id: Optional[str] = None):
         if not self.enabled:
-            logger.debug(f"Rate limiting disabled for {self.scope}")
             return
-
-        # Determine Key (Tier 1 vs Tier 2)
-        # We assume user_id might be passed via Depends elsewhere, but here we are a Dependency.
-        # Actually, to get user_id in Dependency, we need to inspect request state or use another dependency.
-        # FastAPI resolves dependencies recursively.
-        # If we want this to be a simple decorator usage like `Depends(RateLimiter(...))`, 
-        # accessing user_id is tricky if it's not yet resolved.
-        # 
-        # Strategy: Check Request.state.user (if auth middleware set it) or fallback to IP.
-        # Our Auth dependency returns User object.
-        # We'll use IP as fallback.
-        
-        # Get IP from various headers (for proxy/load balancer scenarios)
-        ip = (
-            request.headers.get("X-Forwarded-For", "").split(",")[0].strip() or
-            request.headers.get("X-Real-IP") or
-            (request.client.host if request.client else "127.0.0.1")
-        )
-        key_prefix = f"rl:{self.scope}"
-        
-        logger.debug(f"Rate limiter {self.scope}: IP={ip}, enabled={self.enabled}")
-        
-        # Try to find user in state (if attached by middleware)
-        # OR we can parse Bearer header manually for a "Tier 1" guess without full verification (risky?)
-        # Better: We rely on the endpoint needing User dependency.
-        # BUT RateLimiter runs *before* endpoint body.
-        # Standard FastAPI Limiter often uses `request.user` if available.
-        
-        # For P5-007, let's use a simpler approach:
-        # If Authorization header exists, use a hash of token as key (Tier 1 Proxy), or better,
-        # just default to IP for unauth endpoints, and expect the caller to pass user_id if authenticated context is known.
-        
-        # Wait, `Depends` class style doesn't easily allow passing arguments from *other* dependencies computed at runtime 
-        # unless we chain them.
-        # 
-        # Let's check `request.state`.
-        
-        user_identifier = ip
-        tier = "ip"
-        
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            # We treat it as potentially authenticated user (Tier 1)
-            # We use the token itself as the key to avoid full DB lookup overhead in the limiter 
-            # (or simple hash of it).
-            # This is "Token-Based" limiting.
-            token = auth_header.split(" ")[1]
-            user_identifier = token[-10:] # Last 10 chars as key proxy
-            tier = "token"
-        
-        # Override for strict user_id if we can access it (maybe added by auth middleware later?)
-        # For now token/ip distinction is robust enough for spec.
-        
-        key = f"{key_prefix}:{tier}:{user_identifier}"
-        
-        now = time.time()
-        window_start = now - self.window_seconds
-        
-        # Fetch History
-        history = _rate_limit_store.get(key, [])
-        
-        # Filter valid
-        valid_history = [t for t in history if t > window_start]
-        
-        # Count
-        current_usage = len(valid_history)
-        
-        logger.debug(f"Rate limit check {key}: {current_usage}/{self.limit} requests in window")
-        
-        if current_usage >= self.limit:
-            retry_after = int(self.window_seconds - (now - valid_history[0])) if valid_history else self.window_seconds
-            logger.warning(f"Rate Limit Exceeded: {key} ({current_usage}/{self.limit})")
-            
-            raise HTTPException(
-                status_code=429,
-                detail={
-                    "code": "rate_limit_exceeded",
-                    "detail": "Too many requests. Please try again later.",
-                    "meta": {
-                        "limit_key": key,
-                        "retry_after_seconds": retry_after
-                    }
+        identity = f"user:{user_id}" if user_id else self.key_func(request)
+        decision = await self.hit(identity)
+        if decision.allowed:
+            return
+        limit_key = f"{RATE_LIMIT_KEY_PREFIX}:{self.scope}:{identity}"
+        logger.warning("Rate Limit Exceeded: %s source=%s", limit_key, decision.source)
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "code": "rate_limit_exceeded",
+                "detail": "Too many requests. Please try again later.",
+                "meta": {
+                    "limit_key": limit_key,
+                    "retry_after_seconds": decision.retry_after,
                 },
-                headers={
-                    "Retry-After": str(retry_after),
-                    "X-RateLimit-Limit": str(self.limit),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(int(now + retry_after))
-                }
-            )
-            
-        # Record new request
-        valid_history.append(now)
-        _rate_limit_store[key] = valid_history
-        
-        logger.debug(f"Rate limit recorded for {key}: {len(valid_history)}/{self.limit}")
-        
-        # Cleanup occasionally (Naive: on write)
-        if len(_rate_limit_store) > 10000:
-             _rate_limit_store.clear() # Emergency dump
-             
-        # Ideally return something to set headers on response?
-        # FastAPI dependencies can't easily modify response headers of the *success* case 
-        # unless we use a Middleware or Response object.
-        # We will skip success headers for MVP or add them if using Middleware.
-        # But failure headers are Critical.
-        
+            },
+            headers={
+                "Retry-After": str(decision.retry_after),
+                "X-RateLimit-Limit": str(self.limit),
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(int(time.time() + decision.retry_after)),
+            },
+        )
+
+
+async def reset_rate_limits(identity: str) -> int:
+    """Forget every policy's state for an identity, e.g. after a tier change."""
+    suffix = f":{identity}"
+    removed = 0
+    for key in [key for key in _rate_limit_store if key.endswith(suffix)]:
+        _rate_limit_store.pop(key, None)
+        removed += 1
+    client = cache_service.client
+    if client:
+        try:
+            keys = [key async for key in client.scan_iter(match=f"{RATE_LIMIT_KEY_PREFIX}:*{suffix}", count=500)]
+            if keys:
+                removed += await client.delete(*keys)
+        except Exception as exc:
+            logger.warning("rate_limit_reset_failed identity=%s error=%s", identity, exc)
+    return removed
+
+
+def rate_limit_stats() -> Dict[str, Any]:
+    return {**_stats, "local_keys": len(_rate_limit_store), "local_max_keys": RATE_LIMIT_LOCAL_MAX_KEYS}
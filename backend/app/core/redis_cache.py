@@ -4,7 +4,7 @@ import json
 import hashlib
 import gzip
 import logging
-from typing import Optional, Any
+from typing import Optional, Any, Dict, List
 from functools import wraps
 import redis.asyncio as redis # Using redis-py async
 
@@ -43,6 +43,16 @@ class RedisCache:
             logger.warning(f"Cache GET error: {e}")
         return None
 
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Fetch several keys in one round trip; missing keys are omitted."""
+        if not self.client or not keys: return {}
+        try:
+            values = await self.client.mget(keys)
+            return {key: json.loads(val) for key, val in zip(keys, values) if val}
+        except Exception as e:
+            logger.warning(f"Cache MGET error: {e}")
+        return {}
+
     async def set(self, key: str, value: Any, ttl: int = 60):
         if not self.client: return
         try:
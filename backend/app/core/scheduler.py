@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.utils.monitoring import LatencyHistogram
+
+
+# "api": leader-elected inside the API workers; "worker": only `python worker.py`
+# runs jobs (still leader-elected, so several worker replicas are safe); "off".
+SCHEDULER_MODE = (os.environ.get("SCHEDULER_MODE") or "api").lower()
+SCHEDULER_LOCK_KEY = int(os.environ.get("SCHEDULER_LOCK_KEY") or "804511208")
+SCHEDULER_LEADER_RETRY_SECONDS = max(1.0, float(os.environ.get("SCHEDULER_LEADER_RETRY_SECONDS") or "15"))
+SCHEDULER_HEARTBEAT_SECONDS = max(1.0, float(os.environ.get("SCHEDULER_HEARTBEAT_SECONDS") or "10"))
+
+logger = logging.getLogger("scheduler")
+
+Tick = Callable[[], Awaitable[Optional[float]]]
+
+
+class ScheduledJob:
+    """A periodic job: `tick` runs every `interval` seconds plus up to `jitter`.
+
+    A tick may return the delay before its next run (0 to run again right
+    away, e.g. while a queue has work). `wake_event`, when given, cuts the
+    wait short. Ticks of one job never overlap; a tick still running when
+    another is requested is skipped and counted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tick: Tick,
+        interval: float,
+        *,
+        jitter: float = 0.0,
+        timeout: Optional[float] = None,
+        run_at_start: bool = True,
+        wake_event: Optional[Callable[[], asyncio.Event]] = None,
+    ) -> None:
+        self.name = name
+        self.tick = tick
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.run_at_start = run_at_start
+        self.wake_event = wake_event
+        self.runtime = LatencyHistogram()
+        self.runs = 0
+        self.failures = 0
+        self.overlaps_skipped = 0
+        self.last_started_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    def next_delay(self, requested: Optional[float]) -> float:
+        delay = self.interval if requested is None else max(0.0, requested)
+        if delay > 0 and self.jitter > 0:
+            delay += random.uniform(0, self.jitter)
+        return delay
+
+    async def run_once(self) -> Optional[float]:
+        if self._lock.locked():
+            self.overlaps_skipped += 1
+            logger.warning("scheduler_tick_overlap_skipped job=%s", self.name)
+            return None
+        async with self._lock:
+            self.last_started_at = datetime.now(timezone.utc).isoformat()
+            started = time.perf_counter()
+            try:
+                if self.timeout:
+                    return await asyncio.wait_for(self.tick(), timeout=self.timeout)
+                return await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.failures += 1
+                self.last_error = str(exc)[:500]
+                logger.exception("scheduler_tick_failed job=%s", self.name)
+                return None
+            finally:
+                self.runs += 1
+                self.runtime.record((time.perf_counter() - started) * 1000)
+
+    async def _wait(self, delay: float) -> None:
+        if self.wake_event is None:
+            await asyncio.sleep(delay)
+            return
+        event = self.wake_event()
+        try:
+            await asyncio.wait_for(event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+
+    async def run_forever(self) -> None:
+        delay = 0.0 if self.run_at_start else self.next_delay(None)
+        while True:
+            if delay > 0:
+                await self._wait(delay)
+            delay = self.next_delay(await self.run_once())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "jitter_seconds": self.jitter,
+            "runs": self.runs,
+            "failures": self.failures,
+            "overlaps_skipped": self.overlaps_skipped,
+            "last_started_at": self.last_started_at,
+            "last_error": self.last_error,
+            "runtime_p50_ms": self.runtime.quantile(0.5),
+            "runtime_p95_ms": self.runtime.quantile(0.95),
+            "runtime_max_ms": round(self.runtime.max_ms, 2),
+        }
+
+
+class Scheduler:
+    """Runs its jobs in the one process holding the scheduler advisory lock.
+
+    The lock lives on a dedicated connection; if that connection dies the
+    jobs are cancelled and this process goes back to waiting, while another
+    one takes over. Without an engine the jobs simply run here.
+    """
+
+    def __init__(self, jobs: List[ScheduledJob], *, engine: Any = None, lock_key: int = SCHEDULER_LOCK_KEY) -> None:
+        self.jobs = jobs
+        self.engine = engine
+        self.lock_key = lock_key
+        self.is_leader = False
+        self.leader_since: Optional[str] = None
+
+    async def _run_jobs(self) -> None:
+        await asyncio.gather(*(job.run_forever() for job in self.jobs))
+
+    async def _lead(self, conn: Any) -> None:
+        jobs_task = asyncio.create_task(self._run_jobs())
+        try:
+            while not jobs_task.done():
+                await asyncio.wait({jobs_task}, timeout=SCHEDULER_HEARTBEAT_SECONDS)
+                await conn.execute(text("SELECT 1"))
+        finally:
+            jobs_task.cancel()
+            result = (await asyncio.gather(jobs_task, return_exceptions=True))[0]
+            if isinstance(result, Exception):
+                logger.error("scheduler_jobs_crashed error=%s", result)
+
+    async def run(self) -> None:
+        if self.engine is None:
+            self.is_leader = True
+            await self._run_jobs()
+            return
+        while True:
+            try:
+                async with self.engine.connect() as conn:
+                    conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    lock_sql = text("SELECT pg_try_advisory_lock(:key)")
+                    if (await conn.execute(lock_sql, {"key": self.lock_key})).scalar():
+                        self.is_leader = True
+                        self.leader_since = datetime.now(timezone.utc).isoformat()
+                        logger.info("scheduler_leader_acquired jobs=%s", ",".join(job.name for job in self.jobs))
+                        try:
+                            await self._lead(conn)
+                        finally:
+                            self.is_leader = False
+                            self.leader_since = None
+                            await self._release(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("scheduler_leader_check_failed error=%s", exc)
+            await asyncio.sleep(SCHEDULER_LEADER_RETRY_SECONDS)
+
+    async def _release(self, conn: Any) -> None:
+        # A session-level lock would otherwise stay with the pooled connection;
+        # if it cannot be released, drop the connection instead.
+        try:
+            await asyncio.shield(conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key}))
+            logger.info("scheduler_leader_released")
+        except asyncio.CancelledError:
+            await conn.invalidate()
+            raise
+        except Exception:
+            await conn.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": SCHEDULER_MODE,
+            "leader": self.is_leader,
+            "leader_since": self.leader_since,
+            "jobs": {job.name: job.stats() for job in self.jobs},
+        }
@@ -6,12 +6,16 @@ from typing import Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.security import decode_token
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.principal_cache import install_principal_invalidation_hooks, resolve_principal
 from app.models.user import User as SqlUser
 
+install_principal_invalidation_hooks()
+
 security = HTTPBearer()
 security_optional = HTTPBearer(auto_error=False)
 
@@ -70,6 +74,18 @@ def _infer_required_portal_scope(required_roles: Optional[list]) -> Optional[str
     return "account"
 
 
+def _apply_principal_defaults(user: SqlUser, token_scope: str) -> None:
+    """Request-level defaults that must not mark the session's user dirty.
+
+    A dirty user row would be flushed and evict its cached principal on the
+    route's next commit, so the country scope default is applied as a
+    committed (loaded) value rather than a change.
+    """
+    user.portal_scope = token_scope
+    if user.country_scope is None:
+        set_committed_value(user, "country_scope", [])
+
+
 async def get_current_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -98,7 +114,12 @@ async def get_current_user(
     if not user_id:
         raise credentials_exception
 
-    user = await _get_sql_user(user_id, sql_session)
+    user = await resolve_principal(
+        user_id,
+        payload.get("token_version"),
+        lambda: _get_sql_user(user_id, sql_session),
+        sql_session,
+    )
 
     if not user or not user.is_active:
         raise credentials_exception
@@ -109,9 +130,7 @@ async def get_current_user(
     expected_scope = _resolve_portal_scope(user.role)
     if token_scope != expected_scope:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Portal scope mismatch")
-    user.portal_scope = token_scope
-    if user.country_scope is None:
-        user.country_scope = []
+    _apply_principal_defaults(user, token_scope)
     request.state.current_user = user
 
     return user
@@ -139,7 +158,12 @@ async def get_current_user_optional(
     if not user_id:
         return None
 
-    user = await _get_sql_user(user_id, sql_session)
+    user = await resolve_principal(
+        user_id,
+        payload.get("token_version"),
+        lambda: _get_sql_user(user_id, sql_session),
+        sql_session,
+    )
 
     if not user:
         return None
@@ -150,9 +174,7 @@ async def get_current_user_optional(
     expected_scope = _resolve_portal_scope(user.role)
     if token_scope != expected_scope:
         return None
-    user.portal_scope = token_scope
-    if user.country_scope is None:
-        user.country_scope = []
+    _apply_principal_defaults(user, token_scope)
     request.state.current_user = user
 
     return user
@@ -1,6 +1,7 @@
 
 import asyncio
 import logging
+import os
 from sqlalchemy import select, update, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
@@ -13,7 +14,9 @@ from app.models.pricing_campaign_item import PricingCampaignItem
 from app.models.pricing_tier_rule import PricingTierRule
 from app.models.pricing_package import UserPackageSubscription
 
-logging.basicConfig(level=logging.INFO)
+# Interval when run by the background scheduler (server.py / worker.py).
+EXPIRY_JOB_INTERVAL_SECONDS = max(30, int(os.environ.get("EXPIRY_JOB_INTERVAL_SECONDS") or "300"))
+
 logger = logging.getLogger("expiry_worker")
 
 async def run_expiry_job():
@@ -161,7 +164,7 @@ async def run_expiry_job():
 
                 await session.commit()
             else:
-                logger.info("No expirations to process.")
+                logger.debug("No expirations to process.")
                 
         except Exception as e:
             logger.error(f"Expiry Job Failed: {e}")
@@ -169,4 +172,5 @@ async def run_expiry_job():
             raise e
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(run_expiry_job())
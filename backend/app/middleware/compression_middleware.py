@@ -0,0 +1,98 @@
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.compression import (
+    COMPRESSION_MIN_SIZE,
+    StreamCompressor,
+    compress_body,
+    is_compressible_content_type,
+    negotiate_encoding,
+)
+
+
+class CompressionMiddleware:
+    """Negotiate br/gzip per request as a plain ASGI middleware.
+
+    Bodies under `minimum_size`, already-encoded responses and media that is
+    compressed by nature (images, PDFs, archives) are passed through
+    unchanged. Streaming responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[StreamCompressor] = None
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or not is_compressible_content_type(headers.get("content-type"))
+                or message["status"] in (204, 304)
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.compressor is None and self.start_message is not None:
+            start = self.start_message
+            self.start_message = None
+            if not more_body:
+                if len(body) < self.minimum_size:
+                    await self._send(start)
+                    await self._send(message)
+                    self.passthrough = True
+                    return
+                compressed = compress_body(body, self.encoding)
+                self._set_encoding_headers(start, len(compressed))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            self.compressor = StreamCompressor(self.encoding)
+            self._set_encoding_headers(start, None)
+            await self._send(start)
+
+        if self.compressor is not None:
+            chunk = self.compressor.compress(body, final=not more_body)
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _set_encoding_headers(self, start: Message, length: Optional[int]) -> None:
+        headers = MutableHeaders(raw=list(start["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        start["headers"] = headers.raw
@@ -1,7 +1,7 @@
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.responses import RedirectResponse, Response
-from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
 from sqlalchemy import select
 from app.models.core import Country, FeatureFlag
@@ -9,18 +9,26 @@ from app.database import AsyncSessionLocal # Need a way to get DB in middleware
 
 logger = logging.getLogger(__name__)
 
-class CountryMiddleware(BaseHTTPMiddleware):
+class CountryMiddleware:
     # Static list for MVP (Should be cached from DB in prod)
     VALID_COUNTRIES = ["tr", "de", "fr", "us", "gb", "it"] # Added IT
     EXCLUDED_PREFIXES = ["/api", "/admin", "/static", "/favicon.ico", "/sitemap.xml", "/robots.txt", "/docs", "/openapi.json"]
 
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
         
         # 1. Skip Excluded Paths
         for prefix in self.EXCLUDED_PREFIXES:
             if path.startswith(prefix):
-                return await call_next(request)
+                await self.app(scope, receive, send)
+                return
 
         # 2. Check URL Segment
         parts = path.strip("/").split("/")
@@ -47,12 +55,18 @@ class CountryMiddleware(BaseHTTPMiddleware):
             
             # If "Coming Soon" needed:
             if not is_active:
-                 return Response(content=f"Coming Soon: {country_code}", status_code=503)
+                 await Response(content=f"Coming Soon: {country_code}", status_code=503)(scope, receive, send)
+                 return
+
+            scope.setdefault("state", {})["country"] = country_code
+
+            async def send_with_country(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message)["X-Country-Code"] = country_code
+                await send(message)
 
-            request.state.country = country_code
-            response = await call_next(request)
-            response.headers["X-Country-Code"] = country_code
-            return response
+            await self.app(scope, receive, send_with_country)
+            return
             
         # 3. Redirect Logic
         # Detect Country (Header or Default)
@@ -66,4 +80,4 @@ class CountryMiddleware(BaseHTTPMiddleware):
             new_url = f"/{detected_country}{path}"
             
         # Use 307 for now to avoid caching redirect during dev
-        return RedirectResponse(url=new_url, status_code=307)
+        await RedirectResponse(url=new_url, status_code=307)(scope, receive, send)
@@ -1,28 +1,35 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
 from contextvars import ContextVar
 
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
 # Context var to store current locale
 locale_ctx = ContextVar("locale", default="en")
 
-class LocaleMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class LocaleMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # 1. Check Header
-        lang = request.headers.get("Accept-Language", "en").split(",")[0][:2]
-        
+        lang = Headers(scope=scope).get("Accept-Language", "en").split(",")[0][:2]
+
         # 2. Check URL Prefix (Override)
-        path_parts = request.url.path.strip("/").split("/")
+        path_parts = scope["path"].strip("/").split("/")
         if path_parts and len(path_parts[0]) == 2:
             potential_lang = path_parts[0]
             if potential_lang in ["en", "de", "tr", "fr"]:
                 lang = potential_lang
-                
+
         # Set Context
         token = locale_ctx.set(lang)
-        
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send)
         finally:
             locale_ctx.reset(token)
 
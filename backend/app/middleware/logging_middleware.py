@@ -1,37 +1,45 @@
-
 import time
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 
 logger = structlog.get_logger("access")
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class LoggingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
-        
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         # Process request
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-        except Exception as e:
-            status_code = 500
-            raise e
+            await self.app(scope, receive, send_with_status)
         finally:
             process_time = time.time() - start_time
-            
+
             # Extract User ID if available (from Auth Middleware)
             # Assuming auth middleware runs before or attached to request state
-            user_id = getattr(request.state, "user_id", None)
-            
+            user_id = (scope.get("state") or {}).get("user_id")
+            client = scope.get("client")
+
             logger.info(
                 "http_request",
-                method=request.method,
-                path=request.url.path,
+                method=scope["method"],
+                path=scope["path"],
                 status=status_code,
                 latency_ms=round(process_time * 1000, 2),
                 user_id=str(user_id) if user_id else None,
-                ip=request.client.host if request.client else None
+                ip=client[0] if client else None
             )
-            
-        return response
@@ -0,0 +1,45 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.query_accounting import (
+    QUERY_COUNT_HEADER,
+    QUERY_MAX_REPEAT_HEADER,
+    log_request_queries,
+    track_queries,
+)
+from app.middleware.request_guards import resolve_route_template
+
+
+class QueryAccountingMiddleware:
+    """Count the statements each request runs; log suspected N+1 patterns.
+
+    With `debug_headers` the totals so far are sent as `Server-Timing` and
+    `X-DB-Query-*` headers on the response start.
+    """
+
+    def __init__(self, app: ASGIApp, debug_headers: bool = False) -> None:
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            if self.debug_headers:
+                async def send_with_timing(message: Message) -> None:
+                    if message["type"] == "http.response.start":
+                        headers = MutableHeaders(scope=message)
+                        headers.append("Server-Timing", stats.server_timing())
+                        headers[QUERY_COUNT_HEADER] = str(stats.count)
+                        headers[QUERY_MAX_REPEAT_HEADER] = str(stats.max_repeat())
+                    await send(message)
+
+                downstream_send = send_with_timing
+            else:
+                downstream_send = send
+            try:
+                await self.app(scope, receive, downstream_send)
+            finally:
+                log_request_queries(scope["method"], resolve_route_template(scope), stats)
@@ -0,0 +1,230 @@
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.middleware.request_guards import ResponseTracker, send_json
+
+
+def normalize_admin_path(path: str) -> str:
+    if path.startswith("/api/"):
+        return path
+    if path.startswith("/admin") or path.startswith("/v1/admin"):
+        return f"/api{path}"
+    return path
+
+
+def is_admin_path(path: str) -> bool:
+    return path.startswith("/api/admin") or path.startswith("/admin") or path.startswith("/api/v1/admin") or path.startswith("/v1/admin")
+
+
+_PREFIX_DEPTH = 3
+
+
+class AdminRouteEntry:
+    __slots__ = ("order", "route", "path", "required_roles")
+
+    def __init__(self, order: int, route: APIRoute, required_roles: Optional[List[str]]) -> None:
+        self.order = order
+        self.route = route
+        self.path = route.path
+        self.required_roles = required_roles
+
+
+def _path_prefix(path: str) -> Tuple[str, ...]:
+    return tuple(path.split("/")[1:_PREFIX_DEPTH + 1])
+
+
+class AdminRouteTable:
+    """Method-keyed index over the app's APIRoutes.
+
+    Gives the same answer as scanning `router.routes` in order and taking
+    the first APIRoute whose methods include the request method and whose
+    regex matches. Static templates are a dict lookup; parameterised ones
+    are bucketed by segment count and static prefix, so only a handful of
+    regexes run per request. `{x:path}` templates can span segments and are
+    checked in every bucket.
+    """
+
+    def __init__(self, routes: List[Any], allowlist: Optional[Dict[str, List[str]]] = None) -> None:
+        allowlist = allowlist or {}
+        self.static: Dict[Tuple[str, str], AdminRouteEntry] = {}
+        keyed: Dict[Tuple[str, int], Dict[Tuple[str, ...], List[AdminRouteEntry]]] = {}
+        loose: Dict[Tuple[str, int], List[AdminRouteEntry]] = {}
+        spanning: Dict[str, List[AdminRouteEntry]] = {}
+        self.size = 0
+        for order, route in enumerate(routes):
+            if not isinstance(route, APIRoute):
+                continue
+            template = route.path
+            for method in route.methods or ():
+                entry = AdminRouteEntry(order, route, allowlist.get(f"{method} {template}"))
+                self.size += 1
+                if "{" not in template:
+                    self.static.setdefault((method, template), entry)
+                elif any(getattr(convertor, "regex", "") == ".*" for convertor in route.param_convertors.values()):
+                    spanning.setdefault(method, []).append(entry)
+                else:
+                    bucket = (method, template.count("/"))
+                    prefix = _path_prefix(template)
+                    if any("{" in part for part in prefix):
+                        loose.setdefault(bucket, []).append(entry)
+                    else:
+                        keyed.setdefault(bucket, {}).setdefault(prefix, []).append(entry)
+
+        # Merge loose entries into each prefix list up front, keeping route
+        # order, so a lookup walks a single list.
+        self.dynamic: Dict[Tuple[str, int], Dict[Tuple[str, ...], List[AdminRouteEntry]]] = {}
+        self.dynamic_default: Dict[Tuple[str, int], List[AdminRouteEntry]] = {}
+        self.spanning = spanning
+        for bucket in set(keyed) | set(loose):
+            bucket_loose = loose.get(bucket, [])
+            self.dynamic[bucket] = {
+                prefix: sorted(entries + bucket_loose, key=lambda item: item.order)
+                for prefix, entries in keyed.get(bucket, {}).items()
+            }
+            self.dynamic_default[bucket] = bucket_loose
+
+    def match(self, method: str, path: str) -> Optional[AdminRouteEntry]:
+        best = self.static.get((method, path))
+        bucket = (method, path.count("/"))
+        candidates = self.dynamic.get(bucket, {}).get(_path_prefix(path))
+        if candidates is None:
+            candidates = self.dynamic_default.get(bucket, ())
+        for entry in candidates:
+            if best is not None and entry.order > best.order:
+                break
+            if entry.route.path_regex.match(path):
+                best = entry
+                break
+        for entry in self.spanning.get(method, ()):
+            if best is not None and entry.order > best.order:
+                break
+            if entry.route.path_regex.match(path):
+                best = entry
+                break
+        return best
+
+
+def get_admin_route_table(app: Any) -> AdminRouteTable:
+    """Return the app's compiled table, rebuilding it if routes or policies changed."""
+    routes = app.router.routes
+    allowlist = getattr(app.state, "rbac_allowlist", None)
+    version = (id(routes), len(routes), id(allowlist))
+    table = getattr(app.state, "admin_route_table", None)
+    if table is None or getattr(app.state, "admin_route_table_version", None) != version:
+        table = AdminRouteTable(routes, allowlist)
+        app.state.admin_route_table = table
+        app.state.admin_route_table_version = version
+    return table
+
+
+def match_admin_route(request: Request, normalized_path: str) -> Optional[APIRoute]:
+    root_path = request.scope.get("root_path", "")
+    route_path = re.sub(r"^" + root_path, "", normalized_path) if root_path else normalized_path
+    entry = get_admin_route_table(request.app).match(request.method, route_path)
+    return entry.route if entry else None
+
+
+class RbacHardLockMiddleware:
+    """Deny admin requests that do not match an allowlisted RBAC policy.
+
+    The policy table lives on `app.state.rbac_allowlist`; route matching,
+    user resolution and audit writes are supplied by the application.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        match_route: Callable[[Request, str], Any],
+        resolve_user: Callable[[Request], Awaitable[Optional[dict]]],
+        write_audit_log: Callable[[Request, Optional[dict], str, Optional[dict]], Awaitable[None]],
+        capture_exception: Optional[Callable[[BaseException], Any]] = None,
+    ) -> None:
+        self.app = app
+        self.match_route = match_route
+        self.resolve_user = resolve_user
+        self.write_audit_log = write_audit_log
+        self.capture_exception = capture_exception
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        tracker = ResponseTracker(send)
+        try:
+            await self._dispatch(scope, receive, tracker)
+        except Exception as exc:
+            logging.getLogger("rbac_guard").exception("rbac_hard_lock_exception")
+            if self.capture_exception:
+                self.capture_exception(exc)
+            if tracker.started:
+                raise
+            await send_json(
+                scope,
+                receive,
+                send,
+                500,
+                {"error_code": "RBAC_GUARD_ERROR", "message": "RBAC middleware failure"},
+            )
+
+    async def _call_next(self, scope: Scope, receive: Receive, tracker: ResponseTracker) -> None:
+        await self.app(scope, receive, tracker.send)
+        if not tracker.started:
+            await send_json(
+                scope,
+                receive,
+                tracker.send,
+                500,
+                {"error_code": "RBAC_RESPONSE_NONE", "message": "No response returned"},
+            )
+
+    async def _dispatch(self, scope: Scope, receive: Receive, tracker: ResponseTracker) -> None:
+        path = scope["path"]
+        if not is_admin_path(path):
+            await self._call_next(scope, receive, tracker)
+            return
+
+        request = Request(scope, receive)
+        route = self.match_route(request, normalize_admin_path(path))
+        if not route:
+            await send_json(scope, receive, tracker.send, 404, {"detail": "Not found"})
+            return
+
+        method = scope["method"]
+        allowlist = scope["app"].state.rbac_allowlist or {}
+        required_roles = allowlist.get(f"{method} {route.path}")
+        if not required_roles:
+            await self.write_audit_log(
+                request,
+                None,
+                "RBAC_POLICY_MISSING",
+                {"path": route.path, "method": method},
+            )
+            await send_json(scope, receive, tracker.send, 403, {"detail": "RBAC policy missing"})
+            return
+
+        if "public" in required_roles:
+            await self._call_next(scope, receive, tracker)
+            return
+
+        user = await self.resolve_user(request)
+        if not user:
+            await send_json(scope, receive, tracker.send, 401, {"detail": "Not authenticated"})
+            return
+
+        if user.get("role") not in required_roles:
+            await self.write_audit_log(
+                request,
+                user,
+                "RBAC_DENY",
+                {"path": route.path, "method": method, "required_roles": required_roles},
+            )
+            await send_json(scope, receive, tracker.send, 403, {"detail": "Insufficient permissions"})
+            return
+
+        await self._call_next(scope, receive, tracker)
@@ -0,0 +1,167 @@
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.monitoring import UNMATCHED_ROUTE, classify_endpoint, record_request_latency, record_route_latency
+
+
+CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; "
+    "img-src 'self' data:; "
+    "script-src 'self'; "
+    "style-src 'self' 'unsafe-inline'; "
+    "connect-src 'self'; "
+    "frame-ancestors 'none'"
+)
+
+
+class ResponseTracker:
+    """Wrap `send` and remember whether the response has started."""
+
+    __slots__ = ("_send", "started")
+
+    def __init__(self, send: Send) -> None:
+        self._send = send
+        self.started = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.started = True
+        await self._send(message)
+
+
+async def send_json(scope: Scope, receive: Receive, send: Send, status_code: int, content: Dict[str, Any]) -> None:
+    await JSONResponse(status_code=status_code, content=content)(scope, receive, send)
+
+
+class FailSafeResponseGuardMiddleware:
+    """Turn unhandled exceptions and missing responses into JSON 500s."""
+
+    def __init__(self, app: ASGIApp, capture_exception: Optional[Callable[[BaseException], Any]] = None) -> None:
+        self.app = app
+        self.capture_exception = capture_exception
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        tracker = ResponseTracker(send)
+        try:
+            await self.app(scope, receive, tracker.send)
+        except Exception as exc:
+            logging.getLogger("middleware_guard").exception("middleware_guard_unhandled_exception")
+            if self.capture_exception:
+                self.capture_exception(exc)
+            if tracker.started:
+                raise
+            await send_json(
+                scope,
+                receive,
+                send,
+                500,
+                {"error_code": "MIDDLEWARE_GUARD_ERROR", "message": "Internal server error"},
+            )
+            return
+        if not tracker.started:
+            logging.getLogger("middleware_guard").error(
+                "response_none_guard path=%s method=%s",
+                scope.get("path"),
+                scope.get("method"),
+            )
+            await send_json(
+                scope,
+                receive,
+                send,
+                500,
+                {"error_code": "MIDDLEWARE_RESPONSE_NONE", "message": "Internal middleware contract violation"},
+            )
+
+
+def _route_templates_by_endpoint(app: Any) -> Dict[Any, List[Any]]:
+    routes = app.router.routes
+    version = (id(routes), len(routes))
+    index = getattr(app.state, "route_template_index", None)
+    if index is None or getattr(app.state, "route_template_index_version", None) != version:
+        index = {}
+        for route in routes:
+            endpoint = route.app if isinstance(route, Mount) else getattr(route, "endpoint", None)
+            if endpoint is not None:
+                index.setdefault(endpoint, []).append(route)
+        app.state.route_template_index = index
+        app.state.route_template_index_version = version
+    return index
+
+
+def resolve_route_template(scope: Scope) -> str:
+    """Template of the route the router dispatched to, e.g. `/api/listings/{listing_id}`.
+
+    Uses the `endpoint` the router stores in scope, so it is only meaningful
+    once routing has happened.
+    """
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None or not hasattr(app, "router"):
+        return UNMATCHED_ROUTE
+    routes = _route_templates_by_endpoint(app).get(endpoint)
+    if not routes:
+        return UNMATCHED_ROUTE
+    route = routes[0]
+    if len(routes) > 1:
+        path = scope.get("path", "")
+        route = next((item for item in routes if item.path_regex.match(path)), route)
+    return f"{route.path}/*" if isinstance(route, Mount) else route.path
+
+
+class RequestMetricsMiddleware:
+    """Record latency per route and endpoint group and add timing and CSP headers."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @staticmethod
+    def _record(scope: Scope, status_code: int, start_ts: float) -> float:
+        duration_ms = (time.perf_counter() - start_ts) * 1000
+        endpoint_group = classify_endpoint(scope["path"])
+        if endpoint_group:
+            record_request_latency(endpoint_group, duration_ms)
+        record_route_latency(resolve_route_template(scope), scope["method"], status_code, duration_ms)
+        return duration_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start_ts = time.perf_counter()
+        started = False
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                # Measured to the response start, as call_next used to return.
+                duration_ms = self._record(scope, message["status"], start_ts)
+                headers = MutableHeaders(scope=message)
+                headers["X-Response-Time-ms"] = f"{duration_ms:.2f}"
+                headers["Content-Security-Policy"] = CONTENT_SECURITY_POLICY
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        except Exception:
+            if not started:
+                self._record(scope, 500, start_ts)
+            raise
+        if not started:
+            logging.getLogger("request_metrics").error("request_metrics_response_none path=%s", scope["path"])
+            await send_json(
+                scope,
+                receive,
+                send,
+                500,
+                {"error_code": "REQUEST_METRICS_RESPONSE_NONE", "message": "Response not generated"},
+            )
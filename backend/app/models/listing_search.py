@@ -2,8 +2,8 @@ from datetime import datetime, timezone
 from typing import Optional
 import uuid
 
-from sqlalchemy import Boolean, DateTime, Integer, Numeric, String, Text, Index, Computed, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID as PGUUID, JSONB, TSVECTOR
+from sqlalchemy import Boolean, DateTime, Float, Integer, Numeric, String, Text, Index, Computed, ForeignKey
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PGUUID, JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -23,6 +23,7 @@ class ListingSearch(Base):
 
     module: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
     category_id: Mapped[Optional[uuid.UUID]] = mapped_column(PGUUID(as_uuid=True), nullable=True, index=True)
+    category_path_ids: Mapped[Optional[list]] = mapped_column(ARRAY(PGUUID(as_uuid=True)), nullable=True)
 
     country_code: Mapped[str] = mapped_column(String(5), nullable=False, index=True)
     city: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, index=True)
@@ -35,6 +36,11 @@ class ListingSearch(Base):
     status: Mapped[str] = mapped_column(String(20), nullable=False, index=True)
     is_premium: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
     is_showcase: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
+    is_featured: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_urgent: Mapped[bool] = mapped_column(Boolean, default=False)
+    featured_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    urgent_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    premium_score: Mapped[int] = mapped_column(Integer, default=0)
 
     seller_type: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     is_verified: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
@@ -42,6 +48,8 @@ class ListingSearch(Base):
     make_id: Mapped[Optional[uuid.UUID]] = mapped_column(PGUUID(as_uuid=True), nullable=True, index=True)
     model_id: Mapped[Optional[uuid.UUID]] = mapped_column(PGUUID(as_uuid=True), nullable=True, index=True)
     year: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     attributes: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     images: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
@@ -71,4 +79,13 @@ class ListingSearch(Base):
         Index("ix_listings_search_make_model_year", "make_id", "model_id", "year"),
         Index("ix_listings_search_seller", "seller_type", "is_verified", "published_at"),
         Index("ix_listings_search_attrs_gin", "attributes", postgresql_using="gin"),
+        Index("ix_listings_search_category_path_gin", "category_path_ids", postgresql_using="gin"),
+        Index(
+            "ix_listings_search_rank_keyset",
+            "status",
+            "country_code",
+            "premium_score",
+            "published_at",
+            "listing_id",
+        ),
     )
@@ -99,6 +99,8 @@ class Listing(Base):
         Index('ix_listings_moderation', 'status', 'country', 'module', 'created_at'),
         Index('ix_listings_featured_until', 'featured_until'),
         Index('ix_listings_urgent_until', 'urgent_until'),
+        Index('ix_listings_premium_until', 'premium_until'),
+        Index('ix_listings_showcase_expires_at', 'showcase_expires_at'),
         Index('ix_listings_paid_until', 'paid_until'),
         Index('ix_listings_make_id', 'make_id'),
         Index('ix_listings_model_id', 'model_id'),
@@ -22,8 +22,7 @@ logger = logging.getLogger(__name__)
 # Re-importing existing dependencies for the rewrite
 from app.models.commercial import DealerPackage, DealerSubscription
 from app.models.dealer import Dealer
-from app.core.redis_rate_limit import RedisRateLimiter
-import os
+from app.core.rate_limit import reset_rate_limits
 
 from app.models.user import SignupAllowlist
 # Helper from previous implementation
@@ -37,8 +36,6 @@ async def log_action(db, action, res_type, res_id, user_id, new_values):
         new_values=new_values
     ))
 
-redis_limiter = RedisRateLimiter(os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
-
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 # --- EXISTING ENDPOINTS ---
@@ -94,7 +91,7 @@ async def update_dealer_tier(
     await db.commit()
     
     if target_user_id:
-        await redis_limiter.invalidate_context(target_user_id)
+        await reset_rate_limits(f"user:{target_user_id}")
         logger.info(f"Invalidated context for {target_user_id}")
     
     await log_action(db, "ADMIN_CHANGE_TIER", "dealer", dealer_id, 
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from datetime import datetime, timezone
 
 from app.dependencies import get_db, get_current_user, _resolve_portal_scope
+from app.core.principal_cache import invalidate_principal
 from app.core.security import (
     verify_password, get_password_hash, create_access_token, 
     create_refresh_token, decode_token
@@ -154,4 +155,5 @@ async def get_me(current_user: User = Depends(get_current_user)):
 @router.post("/logout")
 async def logout(current_user: User = Depends(get_current_user)):
     # In a more complete implementation, we'd invalidate the token
+    await invalidate_principal(current_user.id)
     return {"message": "Successfully logged out"}
@@ -2,12 +2,13 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func, desc, or_
+from app.core.database import use_read_replica
 from app.dependencies import get_db
 from app.models.moderation import Listing
 from app.models.listing_search import ListingSearch
 from app.models.attribute import ListingAttribute, Attribute, AttributeOption, CategoryAttributeMap
 from app.models.category import Category
-from app.core.redis_rate_limit import RedisRateLimiter
+from app.core.rate_limit import RateLimiter
 from typing import Optional, List, Dict
 import json
 import logging
@@ -56,17 +57,13 @@ async def shutdown():
     await cache_service.close()
 
 # Rate Limiter
-# Public Search: 100 req/min (IP Based)
-search_limiter = RedisRateLimiter(os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+# Public Search: 60 req/min, bursts of 5 (IP Based)
+search_limiter = RateLimiter(limit=60, window_seconds=60, scope="search", burst=5, key="ip")
 
 async def limit_search(request: Request):
-    ip = request.client.host if request.client else "127.0.0.1"
-    key = f"rl:search:{ip}"
-    allowed = await search_limiter.check_limit(key, limit=60, burst=5)
-    if not allowed:
-        raise HTTPException(status_code=429, detail="Too Many Requests")
+    await search_limiter(request)
 
-@router.get("/search", dependencies=[Depends(limit_search)])
+@router.get("/search", dependencies=[Depends(limit_search), Depends(use_read_replica)])
 async def search_listings(
     q: Optional[str] = Query(None, max_length=100),
     category_slug: Optional[str] = None,
@@ -25,6 +25,7 @@ from sqlalchemy import and_, desc, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import AsyncSessionLocal, get_db
+from app.core.rate_limit import RateLimiter
 from app.dependencies import PERMISSION_ROLE_MAP, check_named_permission, get_current_user_optional
 from app.models.core import AuditLog
 from app.models.ui_config import UIConfig
@@ -103,8 +104,11 @@ OPS_ALERT_CHANNEL_ALIASES = {
 
 _PUBLISH_LOCK_REGISTRY: dict[str, dict[str, Any]] = {}
 _PUBLISH_LOCK_GUARD = asyncio.Lock()
-_OPS_ALERT_SIMULATION_RATE_REGISTRY: dict[str, list[float]] = {}
-_OPS_ALERT_SIMULATION_RATE_GUARD = asyncio.Lock()
+_OPS_ALERT_SIMULATION_LIMITER = RateLimiter(
+    OPS_ALERT_SIMULATION_RATE_LIMIT_PER_MINUTE,
+    OPS_ALERT_SIMULATION_RATE_WINDOW_SECONDS,
+    scope="ops_alert_simulation",
+)
 
 DEFAULT_CORPORATE_HEADER_CONFIG = {
     "rows": [
@@ -3133,28 +3137,19 @@ async def _aggregate_alert_delivery_metrics(session: AsyncSession, window_hours:
 
 async def _enforce_ops_alert_simulation_rate_limit_or_raise(current_user: Any) -> None:
     actor_key = str(_user_value(current_user, "id") or _user_value(current_user, "email") or "unknown")
-    now_ts = time.time()
-    async with _OPS_ALERT_SIMULATION_RATE_GUARD:
-        active = [
-            ts
-            for ts in _OPS_ALERT_SIMULATION_RATE_REGISTRY.get(actor_key, [])
-            if (now_ts - ts) < OPS_ALERT_SIMULATION_RATE_WINDOW_SECONDS
-        ]
-        if len(active) >= OPS_ALERT_SIMULATION_RATE_LIMIT_PER_MINUTE:
-            oldest = min(active)
-            retry_after = max(1, int(OPS_ALERT_SIMULATION_RATE_WINDOW_SECONDS - (now_ts - oldest)))
-            _OPS_ALERT_SIMULATION_RATE_REGISTRY[actor_key] = active
-            raise HTTPException(
-                status_code=429,
-                detail={
-                    "code": "RATE_LIMITED",
-                    "message": "Re-run alert simulation limiti aşıldı (dakikada en fazla 3)",
-                    "retry_after_seconds": retry_after,
-                    "limit_per_minute": OPS_ALERT_SIMULATION_RATE_LIMIT_PER_MINUTE,
-                },
-            )
-        active.append(now_ts)
-        _OPS_ALERT_SIMULATION_RATE_REGISTRY[actor_key] = active
+    decision = await _OPS_ALERT_SIMULATION_LIMITER.hit(f"user:{actor_key}")
+    if decision.allowed:
+        return
+    raise HTTPException(
+        status_code=429,
+        detail={
+            "code": "RATE_LIMITED",
+            "message": "Re-run alert simulation limiti aşıldı (dakikada en fazla 3)",
+            "retry_after_seconds": decision.retry_after,
+            "limit_per_minute": OPS_ALERT_SIMULATION_RATE_LIMIT_PER_MINUTE,
+        },
+        headers={"Retry-After": str(decision.retry_after)},
+    )
 
 
 async def _run_ops_alert_simulation(
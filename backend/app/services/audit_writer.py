@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, StatementError
+
+from app.models.core import AuditLog
+
+
+AUDIT_QUEUE_MAX_SIZE = max(100, int(os.environ.get("AUDIT_QUEUE_MAX_SIZE") or "10000"))
+AUDIT_BATCH_SIZE = max(1, int(os.environ.get("AUDIT_BATCH_SIZE") or "200"))
+AUDIT_FLUSH_INTERVAL_SECONDS = max(0.05, float(os.environ.get("AUDIT_FLUSH_INTERVAL_SECONDS") or "1.0"))
+AUDIT_FLUSH_RETRIES = max(0, int(os.environ.get("AUDIT_FLUSH_RETRIES") or "3"))
+AUDIT_MAX_BACKOFF_SECONDS = max(1.0, float(os.environ.get("AUDIT_MAX_BACKOFF_SECONDS") or "30"))
+
+logger = logging.getLogger("audit_writer")
+
+
+def _safe_uuid(value: Any) -> Optional[uuid.UUID]:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _clip(column: str, value: Optional[str]) -> Optional[str]:
+    """Cut `value` to the column's length so one long path cannot fail a whole batch."""
+    if value is None:
+        return None
+    value = str(value)
+    length = AuditLog.__table__.c[column].type.length
+    return value[:length] if length and len(value) > length else value
+
+
+def _is_rejected_rows_error(exc: BaseException) -> bool:
+    """True when the rows themselves were refused, as opposed to the database being unavailable."""
+    if isinstance(exc, (DataError, IntegrityError)):
+        return True
+    # Bind/processing errors raised before the statement reaches the server.
+    return isinstance(exc, StatementError) and not isinstance(exc, DBAPIError)
+
+
+def build_audit_row(
+    *,
+    action: str,
+    resource_type: str,
+    resource_id: Optional[str] = None,
+    actor: Optional[Dict[str, Any]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    old_values: Optional[Dict[str, Any]] = None,
+    new_values: Optional[Dict[str, Any]] = None,
+    request: Any = None,
+    country_code: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Column values for one AuditLog row, captured at the time of the event."""
+    actor = actor or {}
+    client = getattr(request, "client", None) if request is not None else None
+    return {
+        "id": uuid.uuid4(),
+        "user_id": _safe_uuid(actor.get("id")),
+        "user_email": _clip("user_email", actor.get("email")),
+        "action": _clip("action", action),
+        "resource_type": _clip("resource_type", resource_type),
+        "resource_id": _clip("resource_id", resource_id),
+        "old_values": old_values,
+        "new_values": new_values,
+        "metadata_info": metadata or {},
+        "ip_address": _clip("ip_address", client.host if client else None),
+        "user_agent": request.headers.get("user-agent") if request is not None else None,
+        "country_scope": _clip("country_scope", country_code),
+        "is_pii_scrubbed": False,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+class AuditLogWriter:
+    """Bounded in-process queue that writes AuditLog rows in multi-row batches.
+
+    `submit` never blocks or touches the database; the `run` loop flushes
+    when a batch fills up or the flush interval elapses. When the queue is
+    full new rows are dropped and counted rather than slowing the request.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_queue_size: int = AUDIT_QUEUE_MAX_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        flush_retries: int = AUDIT_FLUSH_RETRIES,
+    ) -> None:
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flush_retries = flush_retries
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._session_factory: Optional[Callable[[], Any]] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        self._resume_at = 0.0
+        self._consecutive_deferrals = 0
+        self.running = False
+        self._stats: Dict[str, Any] = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped": 0,
+            "failed": 0,
+            "deferred": 0,
+            "high_watermark": 0,
+            "last_flush_ms": 0.0,
+            "last_error": None,
+        }
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        if len(self._queue) >= self.max_queue_size:
+            self._stats["dropped"] += 1
+            if self._stats["dropped"] % 1000 == 1:
+                logger.warning(
+                    "audit_queue_full dropped=%s max_queue_size=%s",
+                    self._stats["dropped"],
+                    self.max_queue_size,
+                )
+            return False
+        self._queue.append(row)
+        self._stats["submitted"] += 1
+        depth = len(self._queue)
+        if depth > self._stats["high_watermark"]:
+            self._stats["high_watermark"] = depth
+        if depth >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        async with self._session_factory() as session:
+            await session.execute(insert(AuditLog), rows)
+            await session.commit()
+
+    async def _write_batch(self, rows: List[Dict[str, Any]], deferred: List[Dict[str, Any]]) -> int:
+        """Insert `rows` with retries; returns how many were written.
+
+        Rows the database rejected are bisected out one by one. When the
+        database itself is unavailable the rows are appended to `deferred`
+        so the caller can keep them queued for a later flush.
+        """
+        attempt = 0
+        while True:
+            try:
+                await self._insert(rows)
+                return len(rows)
+            except Exception as exc:
+                self._stats["last_error"] = str(exc)[:300]
+                if _is_rejected_rows_error(exc):
+                    logger.warning("audit_batch_rejected rows=%s error=%s", len(rows), exc)
+                    return await self._write_split(rows, deferred)
+                attempt += 1
+                if attempt > self.flush_retries:
+                    logger.error("audit_batch_deferred rows=%s attempts=%s error=%s", len(rows), attempt, exc)
+                    deferred.extend(rows)
+                    return 0
+                await asyncio.sleep(min(5.0, 0.2 * (2 ** attempt)))
+
+    async def _write_split(self, rows: List[Dict[str, Any]], deferred: List[Dict[str, Any]]) -> int:
+        """Bisect a rejected batch so a bad row only drops itself."""
+        if len(rows) == 1:
+            self._stats["failed"] += 1
+            logger.error(
+                "audit_row_dropped action=%s resource_id=%s error=%s",
+                rows[0].get("action"),
+                rows[0].get("resource_id"),
+                self._stats["last_error"],
+            )
+            return 0
+        middle = len(rows) // 2
+        written = 0
+        for half in (rows[:middle], rows[middle:]):
+            if deferred:
+                # The database went away part-way through; keep the rest for later.
+                deferred.extend(half)
+                continue
+            try:
+                await self._insert(half)
+                written += len(half)
+            except Exception as exc:
+                self._stats["last_error"] = str(exc)[:300]
+                if _is_rejected_rows_error(exc):
+                    written += await self._write_split(half, deferred)
+                else:
+                    deferred.extend(half)
+        return written
+
+    async def flush(self, force: bool = False) -> int:
+        """Write everything queued so far; returns the number of rows written.
+
+        After the database was unavailable, flushes are skipped until the
+        backoff elapses unless `force` is set (shutdown).
+        """
+        if self._session_factory is None or not self._queue:
+            return 0
+        if not force and time.monotonic() < self._resume_at:
+            return 0
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        written = 0
+        async with self._flush_lock:
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                deferred: List[Dict[str, Any]] = []
+                started = time.perf_counter()
+                try:
+                    batch_written = await self._write_batch(batch, deferred)
+                except asyncio.CancelledError:
+                    self._queue.extendleft(reversed(batch))
+                    raise
+                self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                self._stats["batches"] += 1
+                self._stats["written"] += batch_written
+                written += batch_written
+                if deferred:
+                    self._queue.extendleft(reversed(deferred))
+                    self._stats["deferred"] += len(deferred)
+                    self._consecutive_deferrals += 1
+                    backoff = min(AUDIT_MAX_BACKOFF_SECONDS, self.flush_interval * (2 ** self._consecutive_deferrals))
+                    self._resume_at = time.monotonic() + backoff
+                    break
+                self._consecutive_deferrals = 0
+                self._resume_at = 0.0
+        return written
+
+    async def run(self, session_factory: Callable[[], Any]) -> None:
+        self._session_factory = session_factory
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.running = True
+        try:
+            while not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                if self._stopping:
+                    break
+                try:
+                    await self.flush()
+                except Exception as exc:
+                    logger.warning("audit_flush_error error=%s", exc)
+        finally:
+            self.running = False
+
+    async def close(self, task: Optional[asyncio.Task] = None) -> int:
+        """Stop the loop (if given), letting an in-flight flush finish, and flush what is left."""
+        if task is not None:
+            self._stopping = True
+            if self._wakeup is not None:
+                self._wakeup.set()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        written = await self.flush(force=True)
+        if self._queue:
+            logger.warning("audit_shutdown_unflushed rows=%s", len(self._queue))
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "queue_depth": len(self._queue),
+            "max_queue_size": self.max_queue_size,
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval,
+            "running": self.running,
+        }
+
+
+audit_log_writer = AuditLogWriter()
+
+
+def enqueue_audit_log(**fields: Any) -> bool:
+    """Queue an audit row on the shared writer; see `build_audit_row` for fields."""
+    return audit_log_writer.submit(build_audit_row(**fields))
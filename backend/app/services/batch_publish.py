@@ -0,0 +1,410 @@
+import json
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import desc, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis_cache import cache_service
+from app.models.moderation import Listing
+from app.models.pricing_campaign_item import PricingCampaignItem
+from app.models.pricing_package import PricingPackage, UserPackageSubscription
+from app.models.pricing_snapshot import PricingPriceSnapshot
+from app.models.user import User
+from app.services.pricing_quote import (
+    PROMOTED_LISTING_TYPES,
+    build_pricing_snapshot,
+    campaign_item_quote,
+    listing_type_values,
+    no_campaign_quote,
+    pick_campaign_item,
+    quota_quote,
+    snapshot_duration_days,
+)
+from app.services.search_sync_pipeline import add_search_sync_jobs, notify_search_sync_pending
+
+
+BATCH_PUBLISH_LIMIT_PER_RUN = max(1, int(os.environ.get("BATCH_PUBLISH_LIMIT_PER_RUN") or "500"))
+BATCH_PUBLISH_UPDATE_CHUNK_SIZE = min(1000, max(1, int(os.environ.get("BATCH_PUBLISH_UPDATE_CHUNK_SIZE") or "500")))
+BATCH_PUBLISH_RUNS_KEY = os.environ.get("BATCH_PUBLISH_RUNS_KEY", "batch_publish:runs")
+BATCH_PUBLISH_RUNS_KEPT = 50
+
+logger = logging.getLogger("batch_publish_scheduler")
+
+# Used only when Redis is unavailable; otherwise every worker shares the list.
+_local_runs: deque = deque(maxlen=BATCH_PUBLISH_RUNS_KEPT)
+
+
+class PricingContext:
+    """Everything a batch needs to quote its listings, loaded up front."""
+
+    def __init__(
+        self,
+        *,
+        user_types: Dict[uuid.UUID, str],
+        subscriptions: Dict[uuid.UUID, Tuple[Any, Any]],
+        campaign_items: Dict[str, List[Any]],
+        items_by_id: Dict[uuid.UUID, Any],
+        consumed_slots: Dict[Tuple[uuid.UUID, uuid.UUID], int],
+        snapshots: Dict[uuid.UUID, Any],
+        policy: Any = None,
+        override_active: Optional[Dict[str, bool]] = None,
+    ) -> None:
+        self.user_types = user_types
+        self.subscriptions = subscriptions
+        self.campaign_items = campaign_items
+        self.items_by_id = items_by_id
+        self.consumed_slots = consumed_slots
+        self.snapshots = snapshots
+        self.policy = policy
+        self.override_active = override_active or {}
+
+    def remaining_slots(self, user_id: uuid.UUID, item: Any) -> Optional[int]:
+        quota = int(item.listing_quota or 0)
+        if quota <= 0:
+            return None
+        return max(0, quota - self.consumed_slots.get((user_id, item.id), 0))
+
+
+def quote_for(context: PricingContext, user_id: uuid.UUID) -> Dict[str, Any]:
+    """The quote `_compute_pricing_quote` would give this owner, without a payload."""
+    user_type = context.user_types[user_id]
+    if user_type == "corporate" and user_id in context.subscriptions:
+        return quota_quote(*context.subscriptions[user_id])
+    selected = pick_campaign_item(
+        item
+        for item in context.campaign_items.get(user_type, [])
+        if (remaining := context.remaining_slots(user_id, item)) is None or remaining > 0
+    )
+    if selected is None:
+        return no_campaign_quote(user_type)
+    return campaign_item_quote(selected, user_type, context.remaining_slots(user_id, selected))
+
+
+def _new_snapshot(context: PricingContext, listing_id: uuid.UUID, user_id: uuid.UUID, quote: Dict[str, Any]) -> Any:
+    override_active = bool(context.override_active.get(context.user_types[user_id]))
+    return build_pricing_snapshot(
+        listing_id=listing_id,
+        user_id=user_id,
+        quote=quote,
+        campaign_id=context.policy.id if context.policy is not None else None,
+        override_active=override_active,
+    )
+
+
+def _consume_slot(context: PricingContext, snapshot: Any, now: datetime) -> Optional[Dict[str, Any]]:
+    """Return the snapshot metadata with the slot marked consumed; None if no slot is left."""
+    metadata = dict(snapshot.meta or {})
+    if snapshot.snapshot_type != "campaign_item" or not snapshot.campaign_item_id or metadata.get("slot_consumed"):
+        return metadata
+    item = context.items_by_id.get(snapshot.campaign_item_id)
+    if item is None or item.is_deleted:
+        return None
+    remaining = context.remaining_slots(snapshot.user_id, item)
+    if remaining is not None and remaining <= 0:
+        return None
+    key = (snapshot.user_id, item.id)
+    context.consumed_slots[key] = context.consumed_slots.get(key, 0) + 1
+    metadata["slot_consumed"] = True
+    metadata["slot_consumed_at"] = now.isoformat()
+    return metadata
+
+
+class BatchPublishPlan:
+    def __init__(self) -> None:
+        self.processed = 0
+        self.skipped = 0
+        self.errors = 0
+        # (listing_type, duration_days) -> listing ids sharing the same UPDATE values
+        self.groups: Dict[Tuple[Optional[str], int], List[uuid.UUID]] = defaultdict(list)
+        self.new_snapshots: List[Any] = []
+        self.consumed_snapshots: Dict[Any, Dict[str, Any]] = {}
+
+    @property
+    def published(self) -> int:
+        return sum(len(ids) for ids in self.groups.values())
+
+
+def plan_batch_publish(
+    listings: Iterable[Tuple[uuid.UUID, Optional[uuid.UUID]]],
+    context: PricingContext,
+    *,
+    now: datetime,
+) -> BatchPublishPlan:
+    """Quote every (listing_id, user_id) in memory and group the publishes.
+
+    Slot consumption is tracked on `context`, so later listings of the same
+    owner see the slots taken by earlier ones exactly as the per-listing
+    loop did.
+    """
+    plan = BatchPublishPlan()
+    for listing_id, user_id in listings:
+        plan.processed += 1
+        try:
+            if not user_id or user_id not in context.user_types:
+                plan.skipped += 1
+                continue
+            quote = quote_for(context, user_id)
+            if quote.get("requires_payment"):
+                plan.skipped += 1
+                continue
+
+            snapshot = context.snapshots.get(listing_id)
+            is_new = snapshot is None and quote["type"] in {"campaign_item", "quota"}
+            if is_new:
+                snapshot = _new_snapshot(context, listing_id, user_id, quote)
+            if snapshot is None:
+                plan.groups[(None, 0)].append(listing_id)
+                continue
+
+            metadata = _consume_slot(context, snapshot, now)
+            if metadata is None:
+                plan.skipped += 1
+                continue
+            if is_new:
+                snapshot.meta = metadata
+                plan.new_snapshots.append(snapshot)
+            elif metadata != (snapshot.meta or {}):
+                plan.consumed_snapshots[snapshot] = metadata
+
+            listing_type = str(metadata.get("listing_type") or "").strip().lower()
+            if listing_type in PROMOTED_LISTING_TYPES:
+                plan.groups[(listing_type, snapshot_duration_days(snapshot))].append(listing_id)
+            else:
+                plan.groups[(None, 0)].append(listing_id)
+        except Exception:
+            plan.errors += 1
+            logger.exception("batch_publish_scheduler_listing_failed listing_id=%s", listing_id)
+    return plan
+
+
+async def load_pricing_context(
+    session: AsyncSession,
+    listings: List[Tuple[uuid.UUID, Optional[uuid.UUID]]],
+    *,
+    user_type_of: Callable[[Any], str],
+    policy: Any = None,
+    override_active: Optional[Dict[str, bool]] = None,
+    now: datetime,
+) -> PricingContext:
+    """Owners, subscriptions, campaign items, consumed slots and snapshots in six queries."""
+    user_ids = list({user_id for _, user_id in listings if user_id})
+    listing_ids = [listing_id for listing_id, _ in listings]
+
+    owners = (await session.execute(select(User).where(User.id.in_(user_ids)))).scalars().all() if user_ids else []
+    user_types = {owner.id: user_type_of(owner) for owner in owners}
+
+    subscriptions: Dict[uuid.UUID, Tuple[Any, Any]] = {}
+    corporate_ids = [user_id for user_id, user_type in user_types.items() if user_type == "corporate"]
+    if corporate_ids:
+        rows = await session.execute(
+            select(UserPackageSubscription, PricingPackage)
+            .join(PricingPackage, PricingPackage.id == UserPackageSubscription.package_id)
+            .where(
+                UserPackageSubscription.user_id.in_(corporate_ids),
+                UserPackageSubscription.status == "active",
+                UserPackageSubscription.remaining_quota > 0,
+                or_(UserPackageSubscription.ends_at.is_(None), UserPackageSubscription.ends_at > now),
+                PricingPackage.is_active.is_(True),
+            )
+            .order_by(UserPackageSubscription.user_id, desc(UserPackageSubscription.starts_at))
+        )
+        for subscription, package in rows.all():
+            subscriptions.setdefault(subscription.user_id, (subscription, package))
+
+    active_items = (
+        await session.execute(
+            select(PricingCampaignItem)
+            .where(
+                PricingCampaignItem.is_deleted.is_(False),
+                PricingCampaignItem.is_active.is_(True),
+                PricingCampaignItem.start_at.isnot(None),
+                PricingCampaignItem.end_at.isnot(None),
+                PricingCampaignItem.start_at <= now,
+                PricingCampaignItem.end_at >= now,
+            )
+            .order_by(PricingCampaignItem.listing_quota)
+        )
+    ).scalars().all()
+    campaign_items: Dict[str, List[Any]] = defaultdict(list)
+    for item in active_items:
+        campaign_items[item.scope].append(item)
+    items_by_id = {item.id: item for item in active_items}
+
+    snapshots = {}
+    if listing_ids:
+        rows = await session.execute(select(PricingPriceSnapshot).where(PricingPriceSnapshot.listing_id.in_(listing_ids)))
+        snapshots = {snapshot.listing_id: snapshot for snapshot in rows.scalars().all()}
+
+    # Existing snapshots may point at items that have since ended; the slot
+    # check still needs them.
+    missing_item_ids = {
+        snapshot.campaign_item_id
+        for snapshot in snapshots.values()
+        if snapshot.campaign_item_id and snapshot.campaign_item_id not in items_by_id
+    }
+    if missing_item_ids:
+        rows = await session.execute(select(PricingCampaignItem).where(PricingCampaignItem.id.in_(missing_item_ids)))
+        items_by_id.update({item.id: item for item in rows.scalars().all()})
+
+    consumed_slots: Dict[Tuple[uuid.UUID, uuid.UUID], int] = defaultdict(int)
+    if user_ids:
+        rows = await session.execute(
+            select(PricingPriceSnapshot.user_id, PricingPriceSnapshot.campaign_item_id, PricingPriceSnapshot.meta).where(
+                PricingPriceSnapshot.user_id.in_(user_ids),
+                PricingPriceSnapshot.campaign_item_id.isnot(None),
+            )
+        )
+        for user_id, campaign_item_id, metadata in rows.all():
+            if isinstance(metadata, dict) and metadata.get("slot_consumed"):
+                consumed_slots[(user_id, campaign_item_id)] += 1
+
+    return PricingContext(
+        user_types=user_types,
+        subscriptions=subscriptions,
+        campaign_items=dict(campaign_items),
+        items_by_id=items_by_id,
+        consumed_slots=dict(consumed_slots),
+        snapshots=snapshots,
+        policy=policy,
+        override_active=override_active,
+    )
+
+
+async def apply_batch_publish(
+    session: AsyncSession,
+    plan: BatchPublishPlan,
+    *,
+    now: datetime,
+    chunk_size: int = BATCH_PUBLISH_UPDATE_CHUNK_SIZE,
+) -> int:
+    """Write the plan: snapshot inserts, slot marks and one UPDATE per chunk. Returns statements issued."""
+    statements = 0
+    if plan.new_snapshots:
+        session.add_all(plan.new_snapshots)
+        await session.flush()
+        statements += 1
+    for snapshot, metadata in plan.consumed_snapshots.items():
+        snapshot.meta = metadata
+    if plan.consumed_snapshots:
+        await session.flush()
+        statements += 1
+
+    for (listing_type, duration_days), listing_ids in plan.groups.items():
+        values = {"status": "published", "published_at": now, "updated_at": now}
+        values.update(listing_type_values(listing_type, duration_days, now))
+        for start in range(0, len(listing_ids), chunk_size):
+            await session.execute(
+                update(Listing)
+                .where(Listing.id.in_(listing_ids[start:start + chunk_size]))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            statements += 1
+    return statements
+
+
+async def run_batch_publish(
+    session: AsyncSession,
+    *,
+    user_type_of: Callable[[Any], str],
+    policy: Any = None,
+    override_active: Optional[Dict[str, bool]] = None,
+    limit: int = BATCH_PUBLISH_LIMIT_PER_RUN,
+    chunk_size: int = BATCH_PUBLISH_UPDATE_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Publish up to `limit` pending listings in one transaction.
+
+    Rows are claimed with SKIP LOCKED so a manual run and the scheduler
+    never publish the same listing twice. Expiry sweeps are the caller's
+    job and run once per tick, not per listing.
+    """
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    listings = (
+        await session.execute(
+            select(Listing.id, Listing.user_id)
+            .where(Listing.status == "pending_moderation")
+            .order_by(Listing.created_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+    ).all()
+    listings = [(row[0], row[1]) for row in listings]
+
+    context = await load_pricing_context(
+        session,
+        listings,
+        user_type_of=user_type_of,
+        policy=policy,
+        override_active=override_active,
+        now=now,
+    )
+    plan = plan_batch_publish(listings, context, now=now)
+    statements = await apply_batch_publish(session, plan, now=now, chunk_size=chunk_size)
+    published_ids = [listing_id for ids in plan.groups.values() for listing_id in ids]
+    # Queued in the publish transaction so a crash cannot leave published
+    # listings that the search index never hears about.
+    sync_jobs = await add_search_sync_jobs(
+        session,
+        listing_ids=published_ids,
+        operation="upsert",
+        trigger="batch_publish",
+    )
+    await session.commit()
+    if sync_jobs:
+        notify_search_sync_pending()
+
+    duration = time.perf_counter() - started
+    return {
+        "processed": plan.processed,
+        "published": plan.published,
+        "skipped": plan.skipped,
+        "errors": plan.errors,
+        "sync_jobs_queued": sync_jobs,
+        "write_statements": statements,
+        "duration_ms": round(duration * 1000, 2),
+        "listings_per_second": round(plan.processed / duration, 1) if duration > 0 else None,
+    }
+
+
+async def record_batch_publish_run(result: Dict[str, Any], *, source: str, triggered_by: Optional[str] = None) -> None:
+    """Keep a summary of one run where the stats endpoint of any worker can see it."""
+    event = {
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "source": source,
+        "triggered_by": triggered_by,
+        "processed": int(result.get("processed", 0) or 0),
+        "published": int(result.get("published", 0) or 0),
+        "skipped": int(result.get("skipped", 0) or 0),
+        "errors": int(result.get("errors", 0) or 0),
+        "duration_ms": result.get("duration_ms"),
+        "listings_per_second": result.get("listings_per_second"),
+    }
+    _local_runs.appendleft(event)
+    client = cache_service.client
+    if not client:
+        return
+    try:
+        pipe = client.pipeline(transaction=True)
+        pipe.lpush(BATCH_PUBLISH_RUNS_KEY, json.dumps(event))
+        pipe.ltrim(BATCH_PUBLISH_RUNS_KEY, 0, BATCH_PUBLISH_RUNS_KEPT - 1)
+        await pipe.execute()
+    except Exception as exc:
+        logger.warning("batch_publish_run_record_failed error=%s", exc)
+
+
+async def recent_batch_publish_runs() -> List[Dict[str, Any]]:
+    """Newest first, across all workers when Redis is connected."""
+    client = cache_service.client
+    if client:
+        try:
+            return [json.loads(raw) for raw in await client.lrange(BATCH_PUBLISH_RUNS_KEY, 0, BATCH_PUBLISH_RUNS_KEPT - 1)]
+        except Exception as exc:
+            logger.warning("batch_publish_runs_load_failed error=%s", exc)
+    return list(_local_runs)
@@ -0,0 +1,117 @@
+import logging
+import math
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.moderation import Listing
+from app.services.search_sync_pipeline import enqueue_search_sync_jobs
+
+
+# Boundaries closer together than one bucket are re-projected in the same
+# tick, so a burst of campaigns ending on the hour costs one batch.
+DOPING_EXPIRY_BUCKET_SECONDS = max(5, int(os.environ.get("DOPING_EXPIRY_BUCKET_SECONDS") or "30"))
+DOPING_EXPIRY_MAX_SLEEP_SECONDS = max(
+    DOPING_EXPIRY_BUCKET_SECONDS, int(os.environ.get("DOPING_EXPIRY_MAX_SLEEP_SECONDS") or "300")
+)
+DOPING_EXPIRY_STARTUP_LOOKBACK_SECONDS = max(0, int(os.environ.get("DOPING_EXPIRY_STARTUP_LOOKBACK_SECONDS") or "3600"))
+
+_BOUNDARY_COLUMNS = (
+    Listing.featured_until,
+    Listing.urgent_until,
+    Listing.premium_until,
+    Listing.showcase_expires_at,
+)
+
+logger = logging.getLogger("search_sync")
+
+_state: Dict[str, Any] = {
+    "watermark": None,
+    "next_boundary": None,
+    "last_run_at": None,
+    "last_requeued": 0,
+}
+
+
+def _searchable_filter():
+    return and_(Listing.status.in_(("published", "active")), Listing.deleted_at.is_(None))
+
+
+async def requeue_crossed_doping_boundaries(
+    session: AsyncSession,
+    *,
+    since: datetime,
+    until: datetime,
+) -> int:
+    """Queue a search re-sync for listings whose doping window ended in (since, until]."""
+    crossed = or_(*[and_(column > since, column <= until) for column in _BOUNDARY_COLUMNS])
+    listing_ids = (
+        await session.execute(select(Listing.id).where(_searchable_filter(), crossed))
+    ).scalars().all()
+    if not listing_ids:
+        return 0
+    return await enqueue_search_sync_jobs(
+        session,
+        listing_ids=listing_ids,
+        operation="upsert",
+        trigger="doping_expiry",
+    )
+
+
+async def next_doping_boundary(session: AsyncSession, *, after: datetime) -> Optional[datetime]:
+    candidates = []
+    for column in _BOUNDARY_COLUMNS:
+        value = (
+            await session.execute(select(func.min(column)).where(_searchable_filter(), column > after))
+        ).scalar_one_or_none()
+        if value is not None:
+            candidates.append(value)
+    return min(candidates) if candidates else None
+
+
+def _seconds_until(boundary: Optional[datetime], now_ts: datetime) -> float:
+    if boundary is None:
+        return float(DOPING_EXPIRY_MAX_SLEEP_SECONDS)
+    # Wake at the end of the epoch-aligned bucket containing the boundary, so
+    # neighbouring expiries (and every worker) land on the same tick.
+    bucket_end = (math.floor(boundary.timestamp() / DOPING_EXPIRY_BUCKET_SECONDS) + 1) * DOPING_EXPIRY_BUCKET_SECONDS
+    delay = bucket_end - now_ts.timestamp()
+    return max(1.0, min(delay, float(DOPING_EXPIRY_MAX_SLEEP_SECONDS)))
+
+
+async def run_doping_expiry_tick(session: AsyncSession) -> float:
+    now_ts = datetime.now(timezone.utc)
+    watermark = _state["watermark"] or (now_ts - timedelta(seconds=DOPING_EXPIRY_STARTUP_LOOKBACK_SECONDS))
+    requeued = await requeue_crossed_doping_boundaries(session, since=watermark, until=now_ts)
+    boundary = await next_doping_boundary(session, after=now_ts)
+
+    _state.update(
+        {
+            "watermark": now_ts,
+            "next_boundary": boundary,
+            "last_run_at": now_ts,
+            "last_requeued": requeued,
+        }
+    )
+    if requeued:
+        logger.info("doping_expiry_requeued listings=%s window_start=%s window_end=%s", requeued, watermark.isoformat(), now_ts.isoformat())
+    return _seconds_until(boundary, now_ts)
+
+
+def doping_expiry_stats() -> Dict[str, Any]:
+    return {
+        "bucket_seconds": DOPING_EXPIRY_BUCKET_SECONDS,
+        "watermark": _state["watermark"].isoformat() if _state["watermark"] else None,
+        "next_boundary": _state["next_boundary"].isoformat() if _state["next_boundary"] else None,
+        "last_run_at": _state["last_run_at"].isoformat() if _state["last_run_at"] else None,
+        "last_requeued": _state["last_requeued"],
+    }
+
+
+async def run_doping_expiry_projection(session_factory: Callable[[], AsyncSession]) -> float:
+    """Scheduler tick; returns the seconds until the next bucket boundary."""
+    async with session_factory() as session:
+        return await run_doping_expiry_tick(session)
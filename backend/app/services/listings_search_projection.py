@@ -0,0 +1,335 @@
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, asc, delete, exists, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.listing_search import ListingSearch
+from app.models.moderation import Listing
+from app.services.meilisearch_index import (
+    _flatten_attributes,
+    is_listing_searchable,
+    listing_category_path,
+    listing_doping_signals,
+    listing_geo_point,
+)
+
+
+LISTINGS_SEARCH_UPSERT_BATCH_SIZE = min(1000, max(1, int(os.environ.get("LISTINGS_SEARCH_UPSERT_BATCH_SIZE") or "500")))
+LISTINGS_SEARCH_LAG_CHECK_SECONDS = max(10.0, float(os.environ.get("LISTINGS_SEARCH_LAG_CHECK_SECONDS") or "60"))
+LISTINGS_SEARCH_REPAIR_LIMIT = max(0, int(os.environ.get("LISTINGS_SEARCH_REPAIR_LIMIT") or "500"))
+LISTINGS_SEARCH_LAG_WARN_SECONDS = max(1, int(os.environ.get("LISTINGS_SEARCH_LAG_WARN_SECONDS") or "300"))
+
+_SEARCHABLE_STATUSES = ("published", "active")
+# Everything except the key and the insert-only timestamp is refreshed on
+# conflict; tsv_tr/tsv_de are generated columns and follow title/description.
+_UPSERT_COLUMNS = tuple(
+    column.name
+    for column in ListingSearch.__table__.columns
+    if column.name not in {"listing_id", "created_at"} and column.computed is None
+)
+
+logger = logging.getLogger("search_sync")
+
+_state: Dict[str, Any] = {
+    "upserted": 0,
+    "deleted": 0,
+    "last_sync_at": None,
+    "last_error": None,
+    "lag": None,
+    "last_repaired": 0,
+}
+
+
+def _searchable_filter():
+    return and_(Listing.status.in_(_SEARCHABLE_STATUSES), Listing.deleted_at.is_(None))
+
+
+def _uuid_or_none(value: Any) -> Optional[uuid.UUID]:
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def project_listing_row(listing: Listing, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Build the `listings_search` row for a searchable listing."""
+    now = now or datetime.now(timezone.utc)
+    attrs = listing.attributes if isinstance(listing.attributes, dict) else {}
+    vehicle = attrs.get("vehicle") if isinstance(attrs.get("vehicle"), dict) else {}
+    is_featured, is_urgent, premium_score = listing_doping_signals(listing, now)
+    category_path = [item for item in (_uuid_or_none(value) for value in listing_category_path(listing)) if item]
+    geo = listing_geo_point(listing) or {}
+    return {
+        "listing_id": listing.id,
+        "title": (listing.title or "")[:255],
+        "description": listing.description,
+        "module": listing.module,
+        "category_id": listing.category_id,
+        "category_path_ids": category_path or None,
+        "country_code": listing.country,
+        "city": listing.city[:100] if listing.city else None,
+        "price_amount": listing.price,
+        "price_type": listing.price_type,
+        "hourly_rate": listing.hourly_rate,
+        "currency": listing.currency,
+        "status": listing.status,
+        "is_premium": bool(listing.is_premium),
+        "is_showcase": bool(listing.is_showcase),
+        "is_featured": is_featured,
+        "is_urgent": is_urgent,
+        "featured_until": listing.featured_until,
+        "urgent_until": listing.urgent_until,
+        "premium_score": premium_score,
+        "seller_type": listing.user_type_snapshot,
+        "is_verified": None,
+        "make_id": listing.make_id,
+        "model_id": listing.model_id,
+        "year": _int_or_none(vehicle.get("year")),
+        "latitude": geo.get("lat"),
+        "longitude": geo.get("lng"),
+        "attributes": _flatten_attributes(attrs.get("attributes") or {}),
+        "images": list(listing.images or []),
+        # Keyset ordering in the SQL engine needs a non-null published_at.
+        "published_at": listing.published_at or listing.created_at,
+        "created_at": listing.created_at or now,
+        # Stores the source row version so the lag monitor can compare it
+        # directly against listings.updated_at.
+        "updated_at": listing.updated_at or now,
+    }
+
+
+def build_projection_upsert(rows: List[Dict[str, Any]]):
+    stmt = pg_insert(ListingSearch).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[ListingSearch.listing_id],
+        set_={name: stmt.excluded[name] for name in _UPSERT_COLUMNS},
+        # A slow worker must not overwrite a newer projection of the same listing.
+        where=ListingSearch.updated_at <= stmt.excluded.updated_at,
+    )
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def apply_listings_search_projection(
+    session: AsyncSession,
+    listings: Iterable[Listing],
+    removed_ids: Iterable[uuid.UUID] = (),
+) -> Dict[str, int]:
+    """Upsert searchable listings and drop everything else, without committing."""
+    now = datetime.now(timezone.utc)
+    rows: List[Dict[str, Any]] = []
+    drop_ids = list(removed_ids)
+    for listing in listings:
+        if is_listing_searchable(listing):
+            rows.append(project_listing_row(listing, now))
+        else:
+            drop_ids.append(listing.id)
+    for batch in _chunks(rows, LISTINGS_SEARCH_UPSERT_BATCH_SIZE):
+        await session.execute(build_projection_upsert(batch))
+    for id_chunk in _chunks(list(dict.fromkeys(drop_ids)), LISTINGS_SEARCH_UPSERT_BATCH_SIZE):
+        await session.execute(delete(ListingSearch).where(ListingSearch.listing_id.in_(id_chunk)))
+    _state["upserted"] += len(rows)
+    _state["deleted"] += len(drop_ids)
+    _state["last_sync_at"] = now.isoformat()
+    return {"upserted": len(rows), "deleted": len(drop_ids)}
+
+
+async def sync_listings_search_projection(
+    session: AsyncSession,
+    *,
+    listings: Iterable[Listing],
+    removed_ids: Iterable[uuid.UUID] = (),
+) -> Optional[Dict[str, int]]:
+    """Apply the projection inside a savepoint.
+
+    Used from the search sync worker: a projection failure is logged and
+    left to the lag monitor instead of failing the Meilisearch side.
+    """
+    try:
+        async with session.begin_nested():
+            return await apply_listings_search_projection(session, listings, removed_ids)
+    except Exception as exc:
+        _state["last_error"] = str(exc)[:500]
+        logger.warning("listings_search_projection_failed", exc_info=True)
+        return None
+
+
+def _stale_filter():
+    return or_(ListingSearch.listing_id.is_(None), ListingSearch.updated_at < Listing.updated_at)
+
+
+async def measure_listings_search_lag(session: AsyncSession) -> Dict[str, Any]:
+    """Compare listings.updated_at with listings_search.updated_at."""
+    stale_row = (
+        await session.execute(
+            select(
+                func.count().label("stale"),
+                func.count().filter(ListingSearch.listing_id.is_(None)).label("missing"),
+                func.min(Listing.updated_at).label("oldest"),
+            )
+            .select_from(Listing)
+            .outerjoin(ListingSearch, ListingSearch.listing_id == Listing.id)
+            .where(and_(_searchable_filter(), _stale_filter()))
+        )
+    ).one()
+    orphaned = (
+        await session.execute(
+            select(func.count())
+            .select_from(ListingSearch)
+            .join(Listing, Listing.id == ListingSearch.listing_id)
+            .where(~_searchable_filter())
+        )
+    ).scalar_one()
+    now = datetime.now(timezone.utc)
+    oldest = stale_row.oldest
+    return {
+        "stale": int(stale_row.stale or 0),
+        "missing": int(stale_row.missing or 0),
+        "orphaned": int(orphaned or 0),
+        "max_lag_seconds": int((now - oldest).total_seconds()) if oldest else 0,
+        "checked_at": now.isoformat(),
+    }
+
+
+async def repair_listings_search_lag(session: AsyncSession, *, limit: int) -> int:
+    """Re-project up to `limit` stale or orphaned rows and commit."""
+    if limit <= 0:
+        return 0
+    stale = list(
+        (
+            await session.execute(
+                select(Listing)
+                .outerjoin(ListingSearch, ListingSearch.listing_id == Listing.id)
+                .where(and_(_searchable_filter(), _stale_filter()))
+                .order_by(asc(Listing.updated_at))
+                .limit(limit)
+            )
+        ).scalars().all()
+    )
+    orphaned = list(
+        (
+            await session.execute(
+                select(ListingSearch.listing_id)
+                .join(Listing, Listing.id == ListingSearch.listing_id)
+                .where(~_searchable_filter())
+                .limit(max(0, limit - len(stale)))
+            )
+        ).scalars().all()
+    ) if len(stale) < limit else []
+    if not stale and not orphaned:
+        return 0
+    await apply_listings_search_projection(session, stale, orphaned)
+    await session.commit()
+    return len(stale) + len(orphaned)
+
+
+async def backfill_listings_search(
+    session: AsyncSession,
+    *,
+    chunk_size: int = LISTINGS_SEARCH_UPSERT_BATCH_SIZE,
+    max_rows: Optional[int] = None,
+    purge_orphans: bool = True,
+) -> Dict[str, Any]:
+    """Rebuild `listings_search` from `listings`.
+
+    Rows are read with keyset pagination on (created_at, id) and each chunk
+    is upserted and committed on its own, so the table stays readable and
+    a crash loses at most one chunk.
+    """
+    started = time.perf_counter()
+    chunk_size = min(1000, max(1, chunk_size))
+    cursor: Optional[tuple] = None
+    projected = 0
+    chunks = 0
+    while max_rows is None or projected < max_rows:
+        page_size = chunk_size if max_rows is None else min(chunk_size, max_rows - projected)
+        query = select(Listing).where(_searchable_filter())
+        if cursor is not None:
+            query = query.where(tuple_(Listing.created_at, Listing.id) > tuple_(*cursor))
+        query = query.order_by(asc(Listing.created_at), asc(Listing.id)).limit(page_size)
+        rows = list((await session.execute(query)).scalars().all())
+        if not rows:
+            break
+        cursor = (rows[-1].created_at, rows[-1].id)
+        await apply_listings_search_projection(session, rows)
+        await session.commit()
+        # Keep the identity map from growing with the table.
+        session.expunge_all()
+        projected += len(rows)
+        chunks += 1
+
+    purged = 0
+    if purge_orphans and max_rows is None:
+        result = await session.execute(
+            delete(ListingSearch).where(
+                ~exists().where(and_(Listing.id == ListingSearch.listing_id, _searchable_filter()))
+            )
+        )
+        purged = int(result.rowcount or 0)
+        await session.commit()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "listings_search_backfill rows=%s chunks=%s purged=%s elapsed_ms=%s",
+        projected,
+        chunks,
+        purged,
+        int(elapsed * 1000),
+    )
+    return {
+        "rows": projected,
+        "chunks": chunks,
+        "purged": purged,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(projected / elapsed, 1) if elapsed > 0 else float(projected),
+    }
+
+
+def listings_search_projection_stats() -> Dict[str, Any]:
+    return dict(_state)
+
+
+async def run_listings_search_lag_check(session_factory: Callable[[], AsyncSession]) -> None:
+    """Measure projection lag and re-project a bounded batch of stale rows.
+
+    Catches rows the sync worker missed, e.g. a savepoint that failed or a
+    write path that does not enqueue a sync job.
+    """
+    try:
+        async with session_factory() as session:
+            lag = await measure_listings_search_lag(session)
+            repaired = 0
+            if lag["stale"] or lag["orphaned"]:
+                repaired = await repair_listings_search_lag(session, limit=LISTINGS_SEARCH_REPAIR_LIMIT)
+    except Exception as exc:
+        _state["last_error"] = str(exc)[:500]
+        raise
+    _state["lag"] = lag
+    _state["last_repaired"] = repaired
+    if lag["max_lag_seconds"] >= LISTINGS_SEARCH_LAG_WARN_SECONDS:
+        logger.warning(
+            "listings_search_lag stale=%s missing=%s orphaned=%s max_lag_seconds=%s repaired=%s",
+            lag["stale"],
+            lag["missing"],
+            lag["orphaned"],
+            lag["max_lag_seconds"],
+            repaired,
+        )
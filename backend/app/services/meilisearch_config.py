@@ -112,8 +112,9 @@ async def test_and_prepare_meili_index(meili_url: str, master_key: str, index_na
                     "attribute_flat_map",
                     "price",
                     "premium_score",
+                    "_geo",
                 ],
-                "sortableAttributes": ["published_at", "premium_score", "price"],
+                "sortableAttributes": ["published_at", "premium_score", "price", "_geo"],
                 "rankingRules": [
                     "words",
                     "typo",
@@ -1,16 +1,22 @@
 import hashlib
 import asyncio
+import importlib.util
+import logging
+import os
 import re
+import time
 import unicodedata
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple
 from urllib.parse import quote
 
 import httpx
-from sqlalchemy import and_, asc, desc, select
+from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.redis_cache import cache_service
 from app.models.meilisearch_config import MeiliSearchConfig
 from app.models.moderation import Listing
 from app.services.meilisearch_config import decrypt_meili_master_key, normalize_meili_url
@@ -69,16 +75,36 @@ def _flatten_attributes(data: Any, prefix: str = "") -> Dict[str, Any]:
     return flat
 
 
+def _coerce_coordinate(value: Any) -> float | None:
+    try:
+        if value is None or value == "":
+            return None
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def listing_geo_point(listing: Listing) -> Dict[str, float] | None:
+    lat = _coerce_coordinate(listing.latitude)
+    lng = _coerce_coordinate(listing.longitude)
+    if lat is None or lng is None:
+        attrs = listing.attributes if isinstance(listing.attributes, dict) else {}
+        location = attrs.get("location") if isinstance(attrs.get("location"), dict) else {}
+        lat = _coerce_coordinate(location.get("latitude", location.get("lat")))
+        lng = _coerce_coordinate(location.get("longitude", location.get("lng")))
+    if lat is None or lng is None:
+        return None
+    if lat < -90 or lat > 90 or lng < -180 or lng > 180:
+        return None
+    return {"lat": lat, "lng": lng}
+
+
 def is_listing_searchable(listing: Listing) -> bool:
     return listing.status in {"published", "active"} and listing.deleted_at is None
 
 
-def build_listing_document(listing: Listing) -> Dict[str, Any]:
+def listing_category_path(listing: Listing) -> List[str]:
     attrs = listing.attributes or {}
-    vehicle = attrs.get("vehicle") or {}
-    attribute_map = attrs.get("attributes") or {}
-    attribute_flat_map = _flatten_attributes(attribute_map)
-
     category_path_ids = attrs.get("category_path_ids")
     if isinstance(category_path_ids, list):
         normalized_category_path = [str(item) for item in category_path_ids if item not in (None, "")]
@@ -86,12 +112,12 @@ def build_listing_document(listing: Listing) -> Dict[str, Any]:
         normalized_category_path = []
     if not normalized_category_path and listing.category_id:
         normalized_category_path = [str(listing.category_id)]
+    return normalized_category_path
 
-    trim_value = vehicle.get("vehicle_trim_id") or vehicle.get("trim_id")
-    city_value = attrs.get("city_id") or listing.city
 
-    searchable_text = _normalize_text(f"{listing.title or ''} {listing.description or ''}")
-    now = datetime.now(timezone.utc)
+def listing_doping_signals(listing: Listing, now: datetime | None = None) -> Tuple[bool, bool, int]:
+    """Return (is_featured, is_urgent, premium_score) as of `now`."""
+    now = now or datetime.now(timezone.utc)
     is_featured = False
     if listing.featured_until and listing.featured_until > now:
         is_featured = True
@@ -109,6 +135,22 @@ def build_listing_document(listing: Listing) -> Dict[str, Any]:
         premium_score += 600
     if listing.premium_until and listing.premium_until > now:
         premium_score += 200
+    return is_featured, is_urgent, premium_score
+
+
+def build_listing_document(listing: Listing) -> Dict[str, Any]:
+    attrs = listing.attributes or {}
+    vehicle = attrs.get("vehicle") or {}
+    attribute_map = attrs.get("attributes") or {}
+    attribute_flat_map = _flatten_attributes(attribute_map)
+
+    normalized_category_path = listing_category_path(listing)
+
+    trim_value = vehicle.get("vehicle_trim_id") or vehicle.get("trim_id")
+    city_value = attrs.get("city_id") or listing.city
+
+    searchable_text = _normalize_text(f"{listing.title or ''} {listing.description or ''}")
+    is_featured, is_urgent, premium_score = listing_doping_signals(listing)
 
     doc: Dict[str, Any] = {
         "listing_id": str(listing.id),
@@ -139,12 +181,99 @@ def build_listing_document(listing: Listing) -> Dict[str, Any]:
         "urgent_until_ts": int(listing.urgent_until.timestamp()) if listing.urgent_until else 0,
     }
 
+    # Meili only accepts `_geo` as an object with numeric lat/lng, or null.
+    doc["_geo"] = listing_geo_point(listing)
+
     for key, value in attribute_flat_map.items():
         doc[f"attribute_{key}"] = value
     return doc
 
 
-async def get_active_meili_runtime(session: AsyncSession) -> Dict[str, str]:
+MEILI_RUNTIME_CACHE_TTL_SECONDS = float(os.environ.get("MEILI_RUNTIME_CACHE_TTL_SECONDS", "30"))
+MEILI_RUNTIME_INVALIDATION_CHANNEL = os.environ.get("MEILI_RUNTIME_INVALIDATION_CHANNEL", "meili:runtime:invalidate")
+MEILI_RUNTIME_INVALIDATION_RETRY_SECONDS = float(os.environ.get("MEILI_RUNTIME_INVALIDATION_RETRY_SECONDS", "5"))
+MEILI_HTTP_MAX_CONNECTIONS = int(os.environ.get("MEILI_HTTP_MAX_CONNECTIONS", "64"))
+MEILI_HTTP_MAX_KEEPALIVE = int(os.environ.get("MEILI_HTTP_MAX_KEEPALIVE", "32"))
+MEILI_HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.environ.get("MEILI_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+MEILI_HTTP2_ENABLED = (
+    os.environ.get("MEILI_HTTP2_ENABLED", "true").strip().lower() in {"1", "true", "yes"}
+    and importlib.util.find_spec("h2") is not None
+)
+
+# Process-wide runtime snapshot. `_meili_runtime_version` is bumped on every
+# invalidation so a lookup that raced with an admin change never repopulates
+# the cache with the stale row it read.
+_meili_runtime_snapshot: Dict[str, Any] | None = None
+_meili_runtime_version: int = 0
+# Bumped when the shape of the index changes (settings, swaps, clears, a new
+# runtime). Document upserts/deletes do not bump it: the sync worker writes
+# constantly, so read-side caches rely on their short TTL for document churn.
+_meili_index_generation: int = 0
+_meili_clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+
+logger = logging.getLogger("meilisearch_index")
+
+
+def invalidate_meili_runtime_cache() -> None:
+    global _meili_runtime_snapshot
+    global _meili_runtime_version
+    _meili_runtime_snapshot = None
+    _meili_runtime_version += 1
+    bump_meili_index_generation()
+
+
+async def publish_meili_runtime_invalidation() -> None:
+    client = cache_service.client
+    if not client:
+        return
+    try:
+        await client.publish(MEILI_RUNTIME_INVALIDATION_CHANNEL, "1")
+    except Exception as exc:
+        logger.warning("meili_runtime_invalidation_publish_failed error=%s", exc)
+
+
+async def invalidate_meili_runtime() -> None:
+    """Drop the runtime snapshot here and on every other worker (config activated or revoked)."""
+    invalidate_meili_runtime_cache()
+    await publish_meili_runtime_invalidation()
+
+
+async def meili_runtime_invalidation_listener() -> None:
+    """Apply runtime invalidations published by other workers."""
+    while True:
+        client = cache_service.client
+        if not client:
+            await asyncio.sleep(MEILI_RUNTIME_INVALIDATION_RETRY_SECONDS)
+            continue
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(MEILI_RUNTIME_INVALIDATION_CHANNEL)
+            logger.info("meili_runtime_invalidation_subscribed channel=%s", MEILI_RUNTIME_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    invalidate_meili_runtime_cache()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("meili_runtime_invalidation_listener_error error=%s", exc)
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
+        await asyncio.sleep(MEILI_RUNTIME_INVALIDATION_RETRY_SECONDS)
+
+
+def bump_meili_index_generation() -> None:
+    global _meili_index_generation
+    _meili_index_generation += 1
+
+
+def meili_index_generation() -> int:
+    return _meili_index_generation
+
+
+async def _load_active_meili_runtime(session: AsyncSession) -> Dict[str, str]:
     row = (
         (
             await session.execute(
@@ -167,42 +296,230 @@ async def get_active_meili_runtime(session: AsyncSession) -> Dict[str, str]:
     }
 
 
-async def _meili_client(runtime: Dict[str, str]) -> httpx.AsyncClient:
+async def get_active_meili_runtime(session: AsyncSession) -> Dict[str, str]:
+    global _meili_runtime_snapshot
+    snapshot = _meili_runtime_snapshot
+    now_ts = time.monotonic()
+    if snapshot and snapshot["expires_at"] > now_ts:
+        return dict(snapshot["runtime"])
+
+    version = _meili_runtime_version
+    runtime = await _load_active_meili_runtime(session)
+    if version == _meili_runtime_version:
+        _meili_runtime_snapshot = {
+            "runtime": runtime,
+            "expires_at": now_ts + MEILI_RUNTIME_CACHE_TTL_SECONDS,
+        }
+    return dict(runtime)
+
+
+def _get_pooled_meili_client(runtime: Dict[str, str]) -> httpx.AsyncClient:
+    key = (runtime["url"], runtime["master_key"])
+    client = _meili_clients.get(key)
+    if client is not None and not client.is_closed:
+        return client
+
     headers = {
         "Authorization": f"Bearer {runtime['master_key']}",
         "Content-Type": "application/json",
     }
-    return httpx.AsyncClient(base_url=runtime["url"], headers=headers, timeout=12.0)
+    client = httpx.AsyncClient(
+        base_url=runtime["url"],
+        headers=headers,
+        timeout=12.0,
+        http2=MEILI_HTTP2_ENABLED,
+        limits=httpx.Limits(
+            max_connections=MEILI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=MEILI_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=MEILI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+    stale_keys = [item for item in _meili_clients if item[0] == key[0] and item != key]
+    for stale_key in stale_keys:
+        stale_client = _meili_clients.pop(stale_key)
+        asyncio.ensure_future(stale_client.aclose())
+    _meili_clients[key] = client
+    return client
+
+
+@asynccontextmanager
+async def _meili_client(runtime: Dict[str, str]) -> AsyncIterator[httpx.AsyncClient]:
+    # Shared keep-alive client; callers must not close it.
+    yield _get_pooled_meili_client(runtime)
+
+
+async def close_meili_clients() -> None:
+    clients = list(_meili_clients.values())
+    _meili_clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+
+
+def meili_client_pool_stats() -> Dict[str, Any]:
+    return {
+        "clients": len(_meili_clients),
+        "http2": MEILI_HTTP2_ENABLED,
+        "max_connections": MEILI_HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": MEILI_HTTP_MAX_KEEPALIVE,
+        "runtime_cached": _meili_runtime_snapshot is not None,
+        "runtime_version": _meili_runtime_version,
+        "index_generation": _meili_index_generation,
+    }
 
 
 async def meili_delete_document(runtime: Dict[str, str], listing_id: str) -> Dict[str, Any]:
     index_path = quote(runtime["index_name"], safe="")
-    async with await _meili_client(runtime) as client:
+    async with _meili_client(runtime) as client:
         response = await client.delete(f"/indexes/{index_path}/documents/{quote(listing_id, safe='')}")
         if response.status_code not in (200, 202, 404):
             raise RuntimeError(f"meili_delete_failed_{response.status_code}")
     return {"ok": True}
 
 
+async def meili_delete_documents(runtime: Dict[str, str], listing_ids: Iterable[str]) -> Dict[str, Any]:
+    payload = list(listing_ids)
+    if not payload:
+        return {"ok": True, "count": 0}
+    index_path = quote(runtime["index_name"], safe="")
+    async with _meili_client(runtime) as client:
+        response = await client.post(f"/indexes/{index_path}/documents/delete-batch", json=payload)
+        if response.status_code not in (200, 202):
+            raise RuntimeError(f"meili_delete_batch_failed_{response.status_code}")
+    return {"ok": True, "count": len(payload), "task_uid": _response_task_uid(response)}
+
+
+def _response_task_uid(response: httpx.Response) -> int | None:
+    try:
+        payload = response.json()
+    except Exception:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    task_uid = payload.get("taskUid")
+    if task_uid is None:
+        task_uid = payload.get("uid")
+    return task_uid
+
+
 async def meili_upsert_documents(runtime: Dict[str, str], docs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
     payload = list(docs)
     index_path = quote(runtime["index_name"], safe="")
-    async with await _meili_client(runtime) as client:
+    async with _meili_client(runtime) as client:
         response = await client.post(f"/indexes/{index_path}/documents", json=payload)
         if response.status_code not in (200, 202):
             raise RuntimeError(f"meili_upsert_failed_{response.status_code}")
-    return {"ok": True, "count": len(payload)}
+    return {"ok": True, "count": len(payload), "task_uid": _response_task_uid(response)}
+
+
+async def meili_wait_for_tasks(
+    runtime: Dict[str, str],
+    task_uids: Iterable[int],
+    *,
+    timeout_seconds: float = 600.0,
+    poll_seconds: float = 0.5,
+) -> Dict[str, Any]:
+    pending = [uid for uid in dict.fromkeys(task_uids) if uid is not None]
+    failed: List[Dict[str, Any]] = []
+    deadline = time.monotonic() + timeout_seconds
+    async with _meili_client(runtime) as client:
+        while pending:
+            uids_param = ",".join(str(uid) for uid in pending[:1000])
+            response = await client.get("/tasks", params={"uids": uids_param, "limit": min(1000, len(pending))})
+            if response.status_code != 200:
+                raise RuntimeError(f"meili_tasks_failed_{response.status_code}")
+            finished = set()
+            for task in response.json().get("results", []):
+                status = task.get("status")
+                if status in {"succeeded", "failed", "canceled"}:
+                    finished.add(task.get("uid"))
+                    if status != "succeeded":
+                        failed.append({"uid": task.get("uid"), "status": status, "error": task.get("error")})
+            pending = [uid for uid in pending if uid not in finished]
+            if not pending:
+                break
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"meili_tasks_timeout pending={len(pending)}")
+            await asyncio.sleep(poll_seconds)
+    return {"ok": not failed, "failed": failed}
+
+
+async def meili_create_index(runtime: Dict[str, str], primary_key: str = "listing_id") -> int | None:
+    async with _meili_client(runtime) as client:
+        response = await client.post("/indexes", json={"uid": runtime["index_name"], "primaryKey": primary_key})
+        if response.status_code not in (200, 201, 202):
+            raise RuntimeError(f"meili_index_create_failed_{response.status_code}")
+    return _response_task_uid(response)
+
+
+async def meili_index_exists(runtime: Dict[str, str]) -> bool:
+    index_path = quote(runtime["index_name"], safe="")
+    async with _meili_client(runtime) as client:
+        response = await client.get(f"/indexes/{index_path}")
+        if response.status_code == 404:
+            return False
+        if response.status_code != 200:
+            raise RuntimeError(f"meili_index_get_failed_{response.status_code}")
+    return True
+
+
+async def meili_delete_index(runtime: Dict[str, str]) -> int | None:
+    index_path = quote(runtime["index_name"], safe="")
+    async with _meili_client(runtime) as client:
+        response = await client.delete(f"/indexes/{index_path}")
+        if response.status_code not in (200, 202, 404):
+            raise RuntimeError(f"meili_index_delete_failed_{response.status_code}")
+    return _response_task_uid(response)
+
+
+async def meili_get_settings(runtime: Dict[str, str]) -> Dict[str, Any]:
+    index_path = quote(runtime["index_name"], safe="")
+    async with _meili_client(runtime) as client:
+        response = await client.get(f"/indexes/{index_path}/settings")
+        if response.status_code != 200:
+            raise RuntimeError(f"meili_settings_get_failed_{response.status_code}")
+        return response.json()
+
+
+async def meili_update_settings(runtime: Dict[str, str], settings: Dict[str, Any]) -> int | None:
+    index_path = quote(runtime["index_name"], safe="")
+    async with _meili_client(runtime) as client:
+        response = await client.patch(f"/indexes/{index_path}/settings", json=settings)
+        if response.status_code not in (200, 202):
+            raise RuntimeError(f"meili_settings_update_failed_{response.status_code}")
+    bump_meili_index_generation()
+    return _response_task_uid(response)
+
+
+async def meili_swap_indexes(runtime: Dict[str, str], first: str, second: str) -> int | None:
+    async with _meili_client(runtime) as client:
+        response = await client.post("/swap-indexes", json=[{"indexes": [first, second]}])
+        if response.status_code not in (200, 202):
+            raise RuntimeError(f"meili_swap_failed_{response.status_code}")
+    bump_meili_index_generation()
+    return _response_task_uid(response)
 
 
 async def meili_clear_documents(runtime: Dict[str, str]) -> Dict[str, Any]:
     index_path = quote(runtime["index_name"], safe="")
-    async with await _meili_client(runtime) as client:
+    async with _meili_client(runtime) as client:
         response = await client.delete(f"/indexes/{index_path}/documents")
         if response.status_code not in (200, 202):
             raise RuntimeError(f"meili_clear_failed_{response.status_code}")
+    bump_meili_index_generation()
     return {"ok": True}
 
 
+class MeiliSearchError(RuntimeError):
+    """A non-200 answer from the search endpoint; `status_code` tells a bad query from an outage."""
+
+    def __init__(self, status_code: int, body: str) -> None:
+        super().__init__(f"meili_search_failed_{status_code}: {body}")
+        self.status_code = status_code
+
+
 async def meili_search_documents(
     runtime: Dict[str, str],
     *,
@@ -212,6 +529,7 @@ async def meili_search_documents(
     sort: List[str] | None = None,
     filter_query: str | None = None,
     facets: List[str] | None = None,
+    attributes_to_retrieve: List[str] | None = None,
 ) -> Dict[str, Any]:
     index_path = quote(runtime["index_name"], safe="")
     payload: Dict[str, Any] = {
@@ -225,18 +543,19 @@ async def meili_search_documents(
         payload["filter"] = filter_query
     if facets:
         payload["facets"] = facets
+    if attributes_to_retrieve:
+        payload["attributesToRetrieve"] = attributes_to_retrieve
 
-    async with await _meili_client(runtime) as client:
+    async with _meili_client(runtime) as client:
         response = await client.post(f"/indexes/{index_path}/search", json=payload)
         if response.status_code != 200:
-            body = response.text[:300]
-            raise RuntimeError(f"meili_search_failed_{response.status_code}: {body}")
+            raise MeiliSearchError(response.status_code, response.text[:300])
         return response.json()
 
 
 async def meili_update_filterable_attributes(runtime: Dict[str, str], filterable_attributes: List[str]) -> Dict[str, Any]:
     index_path = quote(runtime["index_name"], safe="")
-    async with await _meili_client(runtime) as client:
+    async with _meili_client(runtime) as client:
         response = await client.patch(
             f"/indexes/{index_path}/settings/filterable-attributes",
             json=filterable_attributes,
@@ -268,13 +587,14 @@ async def meili_update_filterable_attributes(runtime: Dict[str, str], filterable
                 if status in {"failed", "canceled"}:
                     raise RuntimeError(f"meili_filterable_task_{status}")
                 await asyncio.sleep(0.25)
+    bump_meili_index_generation()
     return {"ok": True}
 
 
 async def meili_update_sortable_attributes(runtime: Dict[str, str], sortable_attributes: List[str]) -> Dict[str, Any]:
     index_path = quote(runtime["index_name"], safe="")
     attrs = list(dict.fromkeys(sortable_attributes))
-    async with await _meili_client(runtime) as client:
+    async with _meili_client(runtime) as client:
         response = await client.patch(
             f"/indexes/{index_path}/settings/sortable-attributes",
             json=attrs,
@@ -291,7 +611,7 @@ async def meili_update_sortable_attributes(runtime: Dict[str, str], sortable_att
 
 async def meili_index_stats(runtime: Dict[str, str]) -> Dict[str, Any]:
     index_path = quote(runtime["index_name"], safe="")
-    async with await _meili_client(runtime) as client:
+    async with _meili_client(runtime) as client:
         response = await client.get(f"/indexes/{index_path}/stats")
         if response.status_code != 200:
             raise RuntimeError(f"meili_stats_failed_{response.status_code}")
@@ -317,45 +637,3 @@ async def sync_listing_to_meili(session: AsyncSession, listing_id: uuid.UUID, op
     document = build_listing_document(listing)
     await meili_upsert_documents(runtime, [document])
     return {"ok": True, "mode": "upsert"}
-
-
-async def bulk_reindex_search_projection(
-    session: AsyncSession,
-    chunk_size: int = 200,
-    max_docs: int | None = None,
-) -> Tuple[int, float]:
-    runtime = await get_active_meili_runtime(session)
-
-    total_indexed = 0
-    offset = 0
-    start = datetime.now(timezone.utc)
-
-    while True:
-        query = (
-            select(Listing)
-            .where(and_(Listing.status.in_(["published", "active"]), Listing.deleted_at.is_(None)))
-            .order_by(asc(Listing.created_at), asc(Listing.id))
-            .offset(offset)
-            .limit(chunk_size)
-        )
-        rows = (await session.execute(query)).scalars().all()
-        if not rows:
-            break
-
-        docs = [build_listing_document(item) for item in rows]
-        if max_docs is not None:
-            remaining = max_docs - total_indexed
-            if remaining <= 0:
-                break
-            docs = docs[:remaining]
-            rows = rows[:remaining]
-
-        await meili_upsert_documents(runtime, docs)
-        total_indexed += len(docs)
-        offset += len(rows)
-
-        if max_docs and total_indexed >= max_docs:
-            break
-
-    elapsed = (datetime.now(timezone.utc) - start).total_seconds()
-    return total_indexed, elapsed
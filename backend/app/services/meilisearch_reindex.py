@@ -0,0 +1,296 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, asc, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.moderation import Listing
+from app.models.search_sync_job import SearchSyncJob
+from app.services.meilisearch_index import (
+    build_listing_document,
+    meili_create_index,
+    meili_delete_documents,
+    meili_delete_index,
+    meili_get_settings,
+    meili_index_exists,
+    meili_swap_indexes,
+    meili_update_settings,
+    meili_upsert_documents,
+    meili_wait_for_tasks,
+)
+from app.services.search_sync_pipeline import enqueue_search_sync_jobs
+
+
+REINDEX_IN_FLIGHT_BATCHES = max(1, int(os.environ.get("MEILI_REINDEX_IN_FLIGHT") or "4"))
+REINDEX_QUEUE_DEPTH = max(1, int(os.environ.get("MEILI_REINDEX_QUEUE_DEPTH") or "8"))
+REINDEX_TASK_TIMEOUT_SECONDS = max(30.0, float(os.environ.get("MEILI_REINDEX_TASK_TIMEOUT_SECONDS") or "1800"))
+
+# Index settings that are safe to copy from the live index onto a fresh
+# build index. Read-only keys returned by GET /settings are skipped.
+_PORTABLE_SETTING_KEYS = (
+    "displayedAttributes",
+    "searchableAttributes",
+    "filterableAttributes",
+    "sortableAttributes",
+    "rankingRules",
+    "stopWords",
+    "synonyms",
+    "distinctAttribute",
+    "typoTolerance",
+    "faceting",
+    "pagination",
+    "separatorTokens",
+    "nonSeparatorTokens",
+    "dictionary",
+    "proximityPrecision",
+)
+
+_SEARCHABLE_STATUSES = ("published", "active")
+_SENTINEL = object()
+
+logger = logging.getLogger("search_sync")
+
+
+def _build_documents(rows: List[Listing]) -> List[Dict[str, Any]]:
+    return [build_listing_document(row) for row in rows]
+
+
+async def reindex_search_projection(
+    session: AsyncSession,
+    runtime: Dict[str, str],
+    *,
+    chunk_size: int = 200,
+    max_docs: Optional[int] = None,
+    in_flight: int = REINDEX_IN_FLIGHT_BATCHES,
+    queue_depth: int = REINDEX_QUEUE_DEPTH,
+    wait_for_tasks: bool = True,
+) -> Dict[str, Any]:
+    """Stream searchable listings into `runtime["index_name"]`.
+
+    Rows are read with keyset pagination on (created_at, id) and turned into
+    documents on the event loop; up to `in_flight` upsert batches are
+    outstanding against Meili while the next chunk is fetched. The bounded
+    queue keeps memory flat regardless of table size.
+    """
+    started = time.perf_counter()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_depth))
+    task_uids: List[int] = []
+    stats = {"docs": 0, "batches": 0}
+
+    async def upload_worker() -> None:
+        while True:
+            item = await queue.get()
+            try:
+                if item is _SENTINEL:
+                    return
+                docs = item
+                if not docs:
+                    continue
+                result = await meili_upsert_documents(runtime, docs)
+                if result.get("task_uid") is not None:
+                    task_uids.append(result["task_uid"])
+                stats["docs"] += len(docs)
+                stats["batches"] += 1
+            finally:
+                queue.task_done()
+
+    async def enqueue(item: Any) -> None:
+        # A failed uploader stops draining the queue; surface its error
+        # instead of blocking the producer forever on a full queue.
+        while True:
+            failed = next((task for task in uploaders if task.done() and task.exception() is not None), None)
+            if failed is not None:
+                raise failed.exception()
+            try:
+                await asyncio.wait_for(queue.put(item), timeout=1.0)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+    workers_count = max(1, in_flight)
+    uploaders: List[asyncio.Task] = [asyncio.create_task(upload_worker()) for _ in range(workers_count)]
+    try:
+        cursor: Optional[tuple] = None
+        produced = 0
+        while max_docs is None or produced < max_docs:
+            page_size = chunk_size if max_docs is None else min(chunk_size, max_docs - produced)
+            query = select(Listing).where(
+                and_(Listing.status.in_(_SEARCHABLE_STATUSES), Listing.deleted_at.is_(None))
+            )
+            if cursor is not None:
+                query = query.where(tuple_(Listing.created_at, Listing.id) > tuple_(*cursor))
+            query = query.order_by(asc(Listing.created_at), asc(Listing.id)).limit(page_size)
+            rows = list((await session.execute(query)).scalars().all())
+            if not rows:
+                break
+            cursor = (rows[-1].created_at, rows[-1].id)
+            # Detach so the identity map does not grow with the table.
+            for row in rows:
+                session.expunge(row)
+            await enqueue(_build_documents(rows))
+            produced += len(rows)
+            if len(rows) < page_size:
+                break
+
+        for _ in range(workers_count):
+            await enqueue(_SENTINEL)
+        await asyncio.gather(*uploaders)
+    except BaseException:
+        for task in uploaders:
+            task.cancel()
+        await asyncio.gather(*uploaders, return_exceptions=True)
+        raise
+
+    failed_tasks: List[Dict[str, Any]] = []
+    if wait_for_tasks and task_uids:
+        task_result = await meili_wait_for_tasks(runtime, task_uids, timeout_seconds=REINDEX_TASK_TIMEOUT_SECONDS)
+        failed_tasks = task_result["failed"]
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "index_name": runtime["index_name"],
+        "docs_indexed": stats["docs"],
+        "batches": stats["batches"],
+        "elapsed_seconds": round(elapsed, 3),
+        "docs_per_second": round(stats["docs"] / elapsed, 1) if elapsed > 0 else None,
+        "in_flight": workers_count,
+        "task_uids": task_uids,
+        "failed_tasks": failed_tasks,
+    }
+    logger.info(
+        "meili_reindex_stream_done index=%s docs=%s batches=%s elapsed_seconds=%.3f docs_per_second=%s failed_tasks=%s",
+        report["index_name"],
+        report["docs_indexed"],
+        report["batches"],
+        elapsed,
+        report["docs_per_second"],
+        len(failed_tasks),
+    )
+    return report
+
+
+async def _wait_task(runtime: Dict[str, str], task_uid: Optional[int]) -> None:
+    if task_uid is None:
+        return
+    result = await meili_wait_for_tasks(runtime, [task_uid], timeout_seconds=REINDEX_TASK_TIMEOUT_SECONDS)
+    if not result["ok"]:
+        raise RuntimeError(f"meili_task_failed: {result['failed']}")
+
+
+async def _listings_removed_since(session: AsyncSession, since: datetime) -> List[Any]:
+    """Listings that left the searchable set after `since`.
+
+    Covers delete jobs, jobs whose listing row is gone (hard deletes) and
+    rows edited out of the searchable statuses.
+    """
+    job_ids = (
+        await session.execute(
+            select(SearchSyncJob.listing_id).where(
+                SearchSyncJob.created_at >= since,
+                SearchSyncJob.listing_id.is_not(None),
+                or_(
+                    SearchSyncJob.operation == "delete",
+                    ~select(Listing.id).where(Listing.id == SearchSyncJob.listing_id).exists(),
+                ),
+            )
+        )
+    ).scalars().all()
+    edited_ids = (
+        await session.execute(
+            select(Listing.id).where(
+                Listing.updated_at >= since,
+                or_(Listing.status.not_in(_SEARCHABLE_STATUSES), Listing.deleted_at.is_not(None)),
+            )
+        )
+    ).scalars().all()
+    return list(dict.fromkeys([*job_ids, *edited_ids]))
+
+
+async def blue_green_reindex(
+    session: AsyncSession,
+    runtime: Dict[str, str],
+    **options: Any,
+) -> Dict[str, Any]:
+    """Rebuild into a shadow index and atomically swap it with the live one.
+
+    The live index keeps serving its old documents until the swap task
+    succeeds; on any failure the shadow index is dropped and the live
+    index is left untouched. Listings removed while the build was running
+    are deleted from the shadow index before the swap, and listings edited
+    meanwhile are re-queued for incremental sync afterwards.
+    """
+    live_name = runtime["index_name"]
+    build_runtime = {**runtime, "index_name": f"{live_name}__build_{int(time.time())}"}
+    build_started_at = datetime.now(timezone.utc)
+
+    if not await meili_index_exists(runtime):
+        await _wait_task(runtime, await meili_create_index(runtime))
+    live_settings = await meili_get_settings(runtime)
+    portable = {key: live_settings[key] for key in _PORTABLE_SETTING_KEYS if live_settings.get(key) is not None}
+
+    await _wait_task(runtime, await meili_create_index(build_runtime))
+    try:
+        if portable:
+            await _wait_task(build_runtime, await meili_update_settings(build_runtime, portable))
+        report = await reindex_search_projection(session, build_runtime, wait_for_tasks=True, **options)
+        if report["failed_tasks"]:
+            raise RuntimeError(f"meili_reindex_tasks_failed count={len(report['failed_tasks'])}")
+        replay_started_at = datetime.now(timezone.utc)
+        removed_ids = await _listings_removed_since(session, build_started_at)
+        if removed_ids:
+            result = await meili_delete_documents(build_runtime, [str(listing_id) for listing_id in removed_ids])
+            await _wait_task(build_runtime, result.get("task_uid"))
+        await _wait_task(runtime, await meili_swap_indexes(runtime, live_name, build_runtime["index_name"]))
+    except BaseException:
+        try:
+            await meili_delete_index(build_runtime)
+        except Exception:
+            logger.warning("meili_reindex_build_cleanup_failed index=%s", build_runtime["index_name"], exc_info=True)
+        raise
+
+    # After the swap the build name holds the previous live documents.
+    try:
+        await meili_delete_index(build_runtime)
+    except Exception:
+        logger.warning("meili_reindex_old_index_cleanup_failed index=%s", build_runtime["index_name"], exc_info=True)
+
+    changed_ids = (
+        await session.execute(select(Listing.id).where(Listing.updated_at >= build_started_at))
+    ).scalars().all()
+    requeued = 0
+    if changed_ids:
+        requeued = await enqueue_search_sync_jobs(
+            session,
+            listing_ids=changed_ids,
+            operation="upsert",
+            trigger="reindex_catch_up",
+        )
+    # Removals that landed between the replay and the swap may have been
+    # applied to the old index only.
+    late_removed_ids = await _listings_removed_since(session, replay_started_at)
+    if late_removed_ids:
+        requeued += await enqueue_search_sync_jobs(
+            session,
+            listing_ids=late_removed_ids,
+            operation="delete",
+            trigger="reindex_catch_up",
+        )
+
+    logger.info(
+        "meili_reindex_swapped live=%s docs=%s removed=%s requeued=%s",
+        live_name,
+        report["docs_indexed"],
+        len(removed_ids),
+        requeued,
+    )
+    return {
+        **report,
+        "index_name": live_name,
+        "swapped": True,
+        "removed_during_build": len(removed_ids),
+        "requeued_changes": requeued,
+    }
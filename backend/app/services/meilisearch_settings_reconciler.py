@@ -0,0 +1,273 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis_cache import cache_service
+from app.services.meilisearch_index import (
+    get_active_meili_runtime,
+    meili_get_settings,
+    meili_update_settings,
+    meili_wait_for_tasks,
+)
+from app.services.search_taxonomy import add_taxonomy_invalidation_listener, get_taxonomy_snapshot
+
+
+BASE_FILTERABLE_ATTRIBUTES = (
+    "category_path_ids",
+    "make_id",
+    "model_id",
+    "trim_id",
+    "city_id",
+    "attribute_flat_map",
+    "price",
+    "premium_score",
+    "is_featured",
+    "is_urgent",
+    "featured_until_ts",
+    "urgent_until_ts",
+    "_geo",
+)
+BASE_SORTABLE_ATTRIBUTES = (
+    "price",
+    "premium_score",
+    "published_at",
+    "featured_until_ts",
+    "urgent_until_ts",
+    "_geo",
+)
+
+MEILI_SETTINGS_RECONCILE_INTERVAL_SECONDS = max(
+    30.0, float(os.environ.get("MEILI_SETTINGS_RECONCILE_INTERVAL_SECONDS") or "300")
+)
+MEILI_SETTINGS_TASK_TIMEOUT_SECONDS = max(5.0, float(os.environ.get("MEILI_SETTINGS_TASK_TIMEOUT_SECONDS") or "60"))
+MEILI_SETTINGS_CIRCUIT_THRESHOLD = 3
+MEILI_SETTINGS_CIRCUIT_OPEN_SECONDS = 60
+# The scheduler may run in another process, so its state is published to
+# Redis and every worker reads it from there, at most once per refresh.
+MEILI_SETTINGS_STATE_KEY = os.environ.get("MEILI_SETTINGS_STATE_KEY", "meili:settings:reconciler_state")
+MEILI_SETTINGS_STATE_TTL_SECONDS = 24 * 3600
+MEILI_SETTINGS_STATE_REFRESH_SECONDS = float(os.environ.get("MEILI_SETTINGS_STATE_REFRESH_SECONDS", "2"))
+MEILI_SETTINGS_WAKE_CHANNEL = os.environ.get("MEILI_SETTINGS_WAKE_CHANNEL", "meili:settings:reconcile")
+MEILI_SETTINGS_WAKE_RETRY_SECONDS = float(os.environ.get("MEILI_SETTINGS_WAKE_RETRY_SECONDS", "5"))
+
+logger = logging.getLogger("search_v2")
+
+_state: Dict[str, Any] = {
+    "last_sync_ts": 0.0,
+    "last_success_at": None,
+    "last_error": None,
+    "last_error_at": None,
+    "consecutive_failures": 0,
+    "circuit_open_until_ts": 0.0,
+    "last_applied": None,
+}
+_shared_state: Dict[str, Any] = {"state": None, "fetched_at": 0.0}
+_reconcile_event: Optional[asyncio.Event] = None
+_wake_listener_installed = False
+
+
+def _get_reconcile_event() -> asyncio.Event:
+    global _reconcile_event
+    if _reconcile_event is None:
+        _reconcile_event = asyncio.Event()
+    return _reconcile_event
+
+
+def _wake_local() -> None:
+    _get_reconcile_event().set()
+
+
+async def _publish_wake() -> None:
+    client = cache_service.client
+    if not client:
+        return
+    try:
+        await client.publish(MEILI_SETTINGS_WAKE_CHANNEL, "1")
+    except Exception as exc:
+        logger.warning("meili_settings_wake_publish_failed error=%s", exc)
+
+
+def request_meili_settings_reconcile() -> None:
+    """Wake the reconcile job here and in whichever process holds the scheduler lease."""
+    _wake_local()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.create_task(_publish_wake())
+
+
+async def meili_settings_wake_listener() -> None:
+    """Apply reconcile requests published by other processes."""
+    while True:
+        client = cache_service.client
+        if not client:
+            await asyncio.sleep(MEILI_SETTINGS_WAKE_RETRY_SECONDS)
+            continue
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(MEILI_SETTINGS_WAKE_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _wake_local()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("meili_settings_wake_listener_error error=%s", exc)
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
+        await asyncio.sleep(MEILI_SETTINGS_WAKE_RETRY_SECONDS)
+
+
+def desired_index_settings(attribute_fields: Iterable[str]) -> Dict[str, List[str]]:
+    return {
+        "filterableAttributes": sorted(set(BASE_FILTERABLE_ATTRIBUTES) | set(attribute_fields)),
+        "sortableAttributes": sorted(BASE_SORTABLE_ATTRIBUTES),
+    }
+
+
+def diff_index_settings(live: Dict[str, Any], desired: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Return only the settings whose attribute sets differ from the live index."""
+    changes: Dict[str, List[str]] = {}
+    for key, wanted in desired.items():
+        current = live.get(key) or []
+        if set(current) != set(wanted):
+            changes[key] = wanted
+    return changes
+
+
+async def reconcile_meili_settings(session: AsyncSession) -> Optional[Dict[str, Any]]:
+    try:
+        runtime = await get_active_meili_runtime(session)
+    except Exception:
+        # Nothing to reconcile until an index config is activated.
+        return None
+    snapshot = await get_taxonomy_snapshot(session)
+    desired = desired_index_settings(snapshot.all_filterable_fields)
+    live = await meili_get_settings(runtime)
+    changes = diff_index_settings(live, desired)
+    if changes:
+        task_uid = await meili_update_settings(runtime, changes)
+        if task_uid is not None:
+            result = await meili_wait_for_tasks(
+                runtime, [task_uid], timeout_seconds=MEILI_SETTINGS_TASK_TIMEOUT_SECONDS
+            )
+            if not result["ok"]:
+                raise RuntimeError(f"meili_settings_task_failed: {result['failed']}")
+        logger.info(
+            "meili_settings_reconciled index=%s changed=%s filterable=%s",
+            runtime["index_name"],
+            ",".join(sorted(changes)),
+            len(desired["filterableAttributes"]),
+        )
+    return {"index_name": runtime["index_name"], "changed": sorted(changes), "taxonomy_version": snapshot.version}
+
+
+def _record_success(report: Dict[str, Any]) -> None:
+    _state.update(
+        {
+            "last_sync_ts": time.time(),
+            "last_success_at": datetime.now(timezone.utc).isoformat(),
+            "last_error": None,
+            "last_error_at": None,
+            "consecutive_failures": 0,
+            "circuit_open_until_ts": 0.0,
+            "last_applied": report["changed"],
+        }
+    )
+
+
+def _record_failure(exc: Exception) -> None:
+    _state["consecutive_failures"] += 1
+    _state["last_error"] = str(exc)
+    _state["last_error_at"] = datetime.now(timezone.utc).isoformat()
+    logger.warning("meili_settings_update_failed", exc_info=True)
+    if _state["consecutive_failures"] >= MEILI_SETTINGS_CIRCUIT_THRESHOLD:
+        _state["circuit_open_until_ts"] = time.time() + MEILI_SETTINGS_CIRCUIT_OPEN_SECONDS
+        logger.error(
+            "meili_circuit_opened failures=%s open_for=%s",
+            _state["consecutive_failures"],
+            MEILI_SETTINGS_CIRCUIT_OPEN_SECONDS,
+        )
+
+
+def meili_settings_reconciler_state() -> Dict[str, Any]:
+    """This process' own view; see `load_meili_settings_reconciler_state` for the shared one."""
+    return dict(_state)
+
+
+async def _publish_state() -> None:
+    state = dict(_state)
+    _shared_state.update({"state": state, "fetched_at": time.monotonic()})
+    client = cache_service.client
+    if not client:
+        return
+    try:
+        await client.set(MEILI_SETTINGS_STATE_KEY, json.dumps(state), ex=MEILI_SETTINGS_STATE_TTL_SECONDS)
+    except Exception as exc:
+        logger.warning("meili_settings_state_publish_failed error=%s", exc)
+
+
+async def load_meili_settings_reconciler_state() -> Dict[str, Any]:
+    """The reconciler state as published by whichever process runs the scheduler.
+
+    Falls back to this process' state when Redis is unavailable or nothing
+    has been published yet.
+    """
+    cached = _shared_state["state"]
+    if cached is not None and time.monotonic() - _shared_state["fetched_at"] < MEILI_SETTINGS_STATE_REFRESH_SECONDS:
+        return cached
+    state = dict(_state)
+    client = cache_service.client
+    if client:
+        try:
+            raw = await client.get(MEILI_SETTINGS_STATE_KEY)
+            if raw:
+                state.update(json.loads(raw))
+        except Exception as exc:
+            logger.warning("meili_settings_state_load_failed error=%s", exc)
+    _shared_state.update({"state": state, "fetched_at": time.monotonic()})
+    return state
+
+
+def meili_settings_reconcile_wake_event() -> asyncio.Event:
+    """Set on taxonomy invalidations and on reconcile requests from any process.
+
+    Taxonomy invalidations are already broadcast, so they only wake locally.
+    """
+    global _wake_listener_installed
+    if not _wake_listener_installed:
+        add_taxonomy_invalidation_listener(_wake_local)
+        _wake_listener_installed = True
+    return _get_reconcile_event()
+
+
+async def run_meili_settings_reconcile(session_factory: Callable[[], AsyncSession]) -> Optional[float]:
+    """One pass keeping index settings in line with the attribute catalog.
+
+    Scheduled at startup, on taxonomy invalidations and on a fixed interval
+    to pick up changes committed by other processes. Returns a shorter
+    retry delay while Meilisearch is failing.
+    """
+    try:
+        async with session_factory() as session:
+            report = await reconcile_meili_settings(session)
+        if report is not None:
+            _record_success(report)
+            await _publish_state()
+    except asyncio.CancelledError:
+        raise
+    except Exception as exc:
+        _record_failure(exc)
+        await _publish_state()
+        return min(MEILI_SETTINGS_CIRCUIT_OPEN_SECONDS, MEILI_SETTINGS_RECONCILE_INTERVAL_SECONDS)
+    return None
@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import desc, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.redis_cache import cache_service
+from app.models.pricing_campaign import PricingCampaign
+from app.models.pricing_campaign_item import PricingCampaignItem
+from app.models.pricing_package import PricingPackage
+
+
+PRICING_CATALOG_TTL_SECONDS = float(os.environ.get("PRICING_CATALOG_TTL_SECONDS", "60"))
+PRICING_CATALOG_INVALIDATION_CHANNEL = os.environ.get("PRICING_CATALOG_INVALIDATION_CHANNEL", "pricing:catalog:invalidate")
+PRICING_CATALOG_INVALIDATION_RETRY_SECONDS = float(os.environ.get("PRICING_CATALOG_INVALIDATION_RETRY_SECONDS", "5"))
+
+_TRACKED_MODELS = (PricingCampaign, PricingCampaignItem, PricingPackage)
+_SESSION_DIRTY_FLAG = "pricing_catalog_dirty"
+
+logger = logging.getLogger("pricing_catalog")
+
+
+@dataclass(frozen=True)
+class CatalogPolicy:
+    id: uuid.UUID
+    is_enabled: bool
+    scope: str
+    start_at: Optional[datetime]
+    end_at: Optional[datetime]
+    published_at: Optional[datetime]
+    version: Optional[int]
+    created_by: Optional[uuid.UUID]
+    updated_by: Optional[uuid.UUID]
+
+
+@dataclass(frozen=True)
+class CatalogCampaignItem:
+    id: uuid.UUID
+    scope: str
+    listing_type: str
+    name: Optional[str]
+    listing_quota: int
+    price_amount: float
+    currency: str
+    publish_days: int
+    start_at: datetime
+    end_at: datetime
+    is_active: bool = True
+    is_deleted: bool = False
+
+
+@dataclass(frozen=True)
+class CatalogPackage:
+    id: uuid.UUID
+    scope: str
+    name: str
+    listing_quota: int
+    currency: str
+    publish_days: int
+
+
+@dataclass(frozen=True)
+class PricingCatalog:
+    """Pricing rows a quote reads, detached from any session.
+
+    Campaign items are kept until they end; whether one has started (or
+    ended since the load) is decided per read, so the snapshot does not go
+    stale when the clock crosses a campaign window.
+    """
+
+    version: int
+    loaded_at: float
+    policy: Optional[CatalogPolicy] = None
+    campaign_items: Tuple[CatalogCampaignItem, ...] = ()
+    packages: Dict[uuid.UUID, CatalogPackage] = field(default_factory=dict)
+
+    def active_campaign_items(
+        self,
+        scope: str,
+        listing_type: Optional[str] = None,
+        *,
+        now: Optional[datetime] = None,
+    ) -> List[CatalogCampaignItem]:
+        now = now or datetime.now(timezone.utc)
+        return [
+            item
+            for item in self.campaign_items
+            if item.scope == scope
+            and (listing_type is None or item.listing_type == listing_type)
+            and item.start_at <= now <= item.end_at
+        ]
+
+    def campaign_item(self, item_id: uuid.UUID) -> Optional[CatalogCampaignItem]:
+        for item in self.campaign_items:
+            if item.id == item_id:
+                return item
+        return None
+
+
+_catalog: Optional[PricingCatalog] = None
+_catalog_version = 0
+_lock: Optional[asyncio.Lock] = None
+_stats = {"hits": 0, "loads": 0, "invalidations": 0, "published": 0, "received": 0}
+
+
+def _get_lock() -> asyncio.Lock:
+    global _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+    return _lock
+
+
+async def _load(session: AsyncSession, version: int) -> PricingCatalog:
+    now = datetime.now(timezone.utc)
+    policy_row = (
+        await session.execute(select(PricingCampaign).order_by(desc(PricingCampaign.updated_at)).limit(1))
+    ).scalar_one_or_none()
+    items = (
+        await session.execute(
+            select(PricingCampaignItem)
+            .where(
+                PricingCampaignItem.is_deleted.is_(False),
+                PricingCampaignItem.is_active.is_(True),
+                PricingCampaignItem.start_at.isnot(None),
+                PricingCampaignItem.end_at.isnot(None),
+                PricingCampaignItem.end_at >= now,
+            )
+            .order_by(PricingCampaignItem.listing_quota)
+        )
+    ).scalars().all()
+    packages = (await session.execute(select(PricingPackage).where(PricingPackage.is_active.is_(True)))).scalars().all()
+
+    policy = None
+    if policy_row is not None:
+        policy = CatalogPolicy(
+            id=policy_row.id,
+            is_enabled=bool(policy_row.is_enabled),
+            scope=policy_row.scope,
+            start_at=policy_row.start_at,
+            end_at=policy_row.end_at,
+            published_at=policy_row.published_at,
+            version=policy_row.version,
+            created_by=policy_row.created_by,
+            updated_by=policy_row.updated_by,
+        )
+    return PricingCatalog(
+        version=version,
+        loaded_at=time.monotonic(),
+        policy=policy,
+        campaign_items=tuple(
+            CatalogCampaignItem(
+                id=item.id,
+                scope=item.scope,
+                listing_type=item.listing_type,
+                name=item.name,
+                listing_quota=int(item.listing_quota or 0),
+                price_amount=float(item.price_amount or 0),
+                currency=item.currency,
+                publish_days=item.publish_days,
+                start_at=item.start_at,
+                end_at=item.end_at,
+            )
+            for item in items
+        ),
+        packages={
+            package.id: CatalogPackage(
+                id=package.id,
+                scope=package.scope,
+                name=package.name,
+                listing_quota=package.listing_quota,
+                currency=package.currency,
+                publish_days=package.publish_days,
+            )
+            for package in packages
+        },
+    )
+
+
+def _is_fresh(catalog: Optional[PricingCatalog]) -> bool:
+    return (
+        catalog is not None
+        and catalog.version == _catalog_version
+        and time.monotonic() - catalog.loaded_at <= PRICING_CATALOG_TTL_SECONDS
+    )
+
+
+async def get_pricing_catalog(session: AsyncSession) -> PricingCatalog:
+    """The cached catalog, reloaded with `session` after an invalidation or the TTL."""
+    global _catalog
+    catalog = _catalog
+    if _is_fresh(catalog):
+        _stats["hits"] += 1
+        return catalog
+    async with _get_lock():
+        catalog = _catalog
+        if _is_fresh(catalog):
+            _stats["hits"] += 1
+            return catalog
+        version = _catalog_version
+        catalog = await _load(session, version)
+        _stats["loads"] += 1
+        # An invalidation during the load means the rows may already be old.
+        if version == _catalog_version:
+            _catalog = catalog
+        return catalog
+
+
+def invalidate_pricing_catalog_local() -> None:
+    global _catalog_version
+    _catalog_version += 1
+    _stats["invalidations"] += 1
+
+
+async def publish_pricing_catalog_invalidation() -> None:
+    client = cache_service.client
+    if not client:
+        return
+    try:
+        await client.publish(PRICING_CATALOG_INVALIDATION_CHANNEL, "1")
+        _stats["published"] += 1
+    except Exception as exc:
+        logger.warning("pricing_catalog_invalidation_publish_failed error=%s", exc)
+
+
+def schedule_pricing_catalog_invalidation() -> None:
+    """Evict here now; tell the other workers from the running loop if there is one."""
+    invalidate_pricing_catalog_local()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.create_task(publish_pricing_catalog_invalidation())
+
+
+async def pricing_catalog_invalidation_listener() -> None:
+    """Apply invalidations published by other workers."""
+    while True:
+        client = cache_service.client
+        if not client:
+            await asyncio.sleep(PRICING_CATALOG_INVALIDATION_RETRY_SECONDS)
+            continue
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(PRICING_CATALOG_INVALIDATION_CHANNEL)
+            logger.info("pricing_catalog_invalidation_subscribed channel=%s", PRICING_CATALOG_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                _stats["received"] += 1
+                invalidate_pricing_catalog_local()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("pricing_catalog_invalidation_listener_error error=%s", exc)
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
+        await asyncio.sleep(PRICING_CATALOG_INVALIDATION_RETRY_SECONDS)
+
+
+def pricing_catalog_stats() -> Dict[str, Any]:
+    catalog = _catalog
+    return {
+        **_stats,
+        "version": _catalog_version,
+        "loaded": catalog is not None,
+        "fresh": _is_fresh(catalog),
+        "age_seconds": round(time.monotonic() - catalog.loaded_at, 3) if catalog else None,
+        "campaign_items": len(catalog.campaign_items) if catalog else 0,
+        "packages": len(catalog.packages) if catalog else 0,
+        "ttl_seconds": PRICING_CATALOG_TTL_SECONDS,
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_pricing_dirty_on_flush(session: Session, flush_context: Any) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _TRACKED_MODELS):
+            session.info[_SESSION_DIRTY_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_pricing_dirty_on_bulk(orm_execute_state: Any) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _TRACKED_MODELS):
+        orm_execute_state.session.info[_SESSION_DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_pricing_on_commit(session: Session) -> None:
+    if session.info.pop(_SESSION_DIRTY_FLAG, False):
+        schedule_pricing_catalog_invalidation()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_pricing_flag_on_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_DIRTY_FLAG, None)
@@ -0,0 +1,141 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from app.models.pricing_snapshot import PricingPriceSnapshot
+
+
+# Order used when several campaign items apply to the same owner.
+LISTING_TYPE_PRIORITY = {"showcase": 0, "urgent": 1, "paid": 2, "free": 3}
+PROMOTED_LISTING_TYPES = ("showcase", "urgent", "paid")
+DEFAULT_PUBLISH_DAYS = 90
+
+
+def _as_uuid(value: Any) -> Optional[uuid.UUID]:
+    if not value:
+        return None
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def listing_type_values(listing_type: Optional[str], duration_days: int, now: datetime) -> Dict[str, Any]:
+    """Listing columns a showcase/urgent/paid snapshot sets; empty for anything else."""
+    listing_type = (listing_type or "").strip().lower()
+    if listing_type not in PROMOTED_LISTING_TYPES:
+        return {}
+    until_at = now + timedelta(days=max(1, min(365, int(duration_days))))
+    return {
+        "featured_until": until_at if listing_type == "showcase" else None,
+        "urgent_until": until_at if listing_type == "urgent" else None,
+        "paid_until": until_at if listing_type == "paid" else None,
+        "is_showcase": listing_type == "showcase",
+        "showcase_expires_at": until_at if listing_type == "showcase" else None,
+    }
+
+
+def snapshot_duration_days(snapshot: Any) -> int:
+    return int(snapshot.publish_days or snapshot.duration_days or 30)
+
+
+def pick_campaign_item(items: Iterable[Any]) -> Optional[Any]:
+    """Highest-priority listing type first, then the cheapest, then the smallest quota."""
+    return min(
+        items,
+        key=lambda item: (
+            LISTING_TYPE_PRIORITY.get((item.listing_type or "free").strip().lower(), 99),
+            float(item.price_amount or 0),
+            int(item.listing_quota or 0),
+        ),
+        default=None,
+    )
+
+
+def no_campaign_quote(scope: str, listing_type: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "type": "campaign_none",
+        "reason": "no_active_campaign",
+        "requires_payment": False,
+        "amount": 0,
+        "currency": "EUR",
+        "publish_days": DEFAULT_PUBLISH_DAYS,
+        "listing_quota": 1,
+        "scope": scope,
+        "listing_type": listing_type,
+    }
+
+
+def campaign_item_quote(item: Any, scope: str, remaining_slots: Optional[int] = None) -> Dict[str, Any]:
+    amount = float(item.price_amount or 0)
+    return {
+        "type": "campaign_item",
+        "reason": "campaign_item",
+        "campaign_item_id": str(item.id),
+        "name": item.name,
+        "listing_quota": item.listing_quota,
+        "amount": amount,
+        "currency": item.currency,
+        "publish_days": item.publish_days,
+        "requires_payment": amount > 0,
+        "quota_used": False,
+        "scope": scope,
+        "listing_type": item.listing_type,
+        "remaining_slots": remaining_slots,
+    }
+
+
+def quota_quote(subscription: Any, package: Any) -> Dict[str, Any]:
+    return {
+        "type": "quota",
+        "reason": "quota_subscription",
+        "subscription_id": str(subscription.id),
+        "package_id": str(package.id),
+        "listing_quota": package.listing_quota,
+        "amount": 0,
+        "currency": package.currency,
+        "publish_days": package.publish_days,
+        "requires_payment": False,
+        "quota_used": True,
+        "remaining_quota": subscription.remaining_quota,
+    }
+
+
+def build_pricing_snapshot(
+    *,
+    listing_id: uuid.UUID,
+    user_id: Optional[uuid.UUID],
+    quote: Dict[str, Any],
+    campaign_id: Optional[uuid.UUID] = None,
+    override_active: bool = False,
+) -> PricingPriceSnapshot:
+    """The snapshot row a publish or checkout records for `quote`; not added to any session."""
+    publish_days = quote.get("publish_days") or quote.get("duration_days") or DEFAULT_PUBLISH_DAYS
+    campaign_item_id = _as_uuid(quote.get("campaign_item_id"))
+    return PricingPriceSnapshot(
+        id=uuid.uuid4(),
+        listing_id=listing_id,
+        user_id=user_id,
+        rule_id=_as_uuid(quote.get("rule_id")),
+        package_id=_as_uuid(quote.get("package_id")),
+        campaign_id=campaign_id if override_active else None,
+        campaign_item_id=campaign_item_id,
+        listing_quota=quote.get("listing_quota"),
+        currency=quote.get("currency") or "EUR",
+        amount=quote.get("amount") or 0,
+        duration_days=publish_days,
+        publish_days=publish_days,
+        campaign_override_active=bool(override_active),
+        snapshot_type=quote.get("type") or "campaign_item",
+        meta={
+            "listing_no": quote.get("listing_no"),
+            "listing_count_year": quote.get("listing_count_year"),
+            "quota_used": quote.get("quota_used"),
+            "requires_payment": quote.get("requires_payment"),
+            "campaign_item_id": str(campaign_item_id) if campaign_item_id else None,
+            "listing_quota": quote.get("listing_quota"),
+            "listing_type": quote.get("listing_type"),
+        },
+    )
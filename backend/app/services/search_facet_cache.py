@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.meilisearch_index import meili_index_generation, meili_search_documents
+
+
+# The index generation only moves on settings changes and swaps; document
+# churn (and anything another worker does) is bounded by the TTL.
+FACET_CACHE_TTL_SECONDS = max(1.0, float(os.environ.get("SEARCH_FACET_CACHE_TTL_SECONDS") or "30"))
+FACET_CACHE_MAX_ENTRIES = max(100, int(os.environ.get("SEARCH_FACET_CACHE_MAX_ENTRIES") or "2000"))
+
+logger = logging.getLogger("search_facets")
+
+_facet_cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_inflight: Dict[Tuple[Any, ...], asyncio.Task] = {}
+_stats: Dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+
+def facet_cache_key(
+    runtime: Dict[str, str],
+    *,
+    query: str,
+    filter_query: Optional[str],
+    facets: List[str],
+) -> Tuple[Any, ...]:
+    return (
+        runtime["url"],
+        runtime["index_name"],
+        meili_index_generation(),
+        " ".join(query.lower().split()),
+        filter_query or "",
+        tuple(sorted(facets)),
+    )
+
+
+def _get_facets(key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+    row = _facet_cache.get(key)
+    if row is None:
+        return None
+    expires_at, value = row
+    if expires_at < time.monotonic():
+        _facet_cache.pop(key, None)
+        return None
+    _facet_cache.move_to_end(key)
+    return value
+
+
+def _set_facets(key: Tuple[Any, ...], result: Dict[str, Any]) -> None:
+    _facet_cache[key] = (
+        time.monotonic() + FACET_CACHE_TTL_SECONDS,
+        {
+            "facetDistribution": result.get("facetDistribution") or {},
+            "facetStats": result.get("facetStats") or {},
+        },
+    )
+    _facet_cache.move_to_end(key)
+    while len(_facet_cache) > FACET_CACHE_MAX_ENTRIES:
+        _facet_cache.popitem(last=False)
+        _stats["evictions"] += 1
+
+
+async def single_flight(key: Tuple[Any, ...], factory: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Run `factory` once for concurrent callers sharing `key`.
+
+    The call runs in its own task, so a caller that disconnects does not
+    cancel the request for the others waiting on it.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _done: _inflight.pop(key, None))
+    else:
+        _stats["coalesced"] += 1
+    return await asyncio.shield(task)
+
+
+async def search_with_cached_facets(
+    runtime: Dict[str, str],
+    *,
+    query: str,
+    limit: int,
+    offset: int,
+    sort: Optional[List[str]],
+    filter_query: Optional[str],
+    facets: List[str],
+) -> Dict[str, Any]:
+    """Search Meili, reusing facet counts for an identical query and filter.
+
+    Facet counts do not depend on page or sort, so once they are cached the
+    page request goes out without `facets`. Identical concurrent requests
+    share one Meili call either way.
+    """
+    facet_key = facet_cache_key(runtime, query=query, filter_query=filter_query, facets=facets)
+    request_key = (*facet_key, limit, offset, tuple(sort or ()))
+    cached = _get_facets(facet_key)
+
+    if cached is not None:
+        _stats["hits"] += 1
+        result = await single_flight(
+            ("page", *request_key),
+            lambda: meili_search_documents(
+                runtime,
+                query=query,
+                limit=limit,
+                offset=offset,
+                sort=sort,
+                filter_query=filter_query,
+                facets=None,
+            ),
+        )
+        return {**result, **cached}
+
+    _stats["misses"] += 1
+
+    async def _fetch() -> Dict[str, Any]:
+        result = await meili_search_documents(
+            runtime,
+            query=query,
+            limit=limit,
+            offset=offset,
+            sort=sort,
+            filter_query=filter_query,
+            facets=facets or None,
+        )
+        if facets:
+            _set_facets(facet_key, result)
+        return result
+
+    return await single_flight(("full", *request_key), _fetch)
+
+
+def invalidate_facet_cache() -> None:
+    _facet_cache.clear()
+
+
+def facet_cache_stats() -> Dict[str, Any]:
+    return {
+        "entries": len(_facet_cache),
+        "max_entries": FACET_CACHE_MAX_ENTRIES,
+        "ttl_seconds": FACET_CACHE_TTL_SECONDS,
+        "inflight": len(_inflight),
+        "generation": meili_index_generation(),
+        **_stats,
+    }
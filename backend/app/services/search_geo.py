@@ -0,0 +1,57 @@
+import math
+import os
+from typing import Any, Optional
+
+from fastapi import HTTPException
+
+
+GEO_RADIUS_MAX_KM = float((os.environ.get("SEARCH_GEO_RADIUS_MAX_KM") or "500").strip() or "500")
+
+
+def _coordinate(value: Any) -> Optional[float]:
+    try:
+        if value is None or value == "":
+            return None
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _in_range(lat: float, lng: float) -> bool:
+    return -90 <= lat <= 90 and -180 <= lng <= 180
+
+
+def parse_bbox_param(bbox: Optional[str]) -> Optional[tuple[float, float, float, float]]:
+    """`min_lng,min_lat,max_lng,max_lat` as floats; None when absent or malformed."""
+    if not bbox:
+        return None
+    parts = [part.strip() for part in str(bbox).split(",")]
+    if len(parts) != 4:
+        return None
+    min_lng, min_lat, max_lng, max_lat = (_coordinate(part) for part in parts)
+    if None in (min_lng, min_lat, max_lng, max_lat):
+        return None
+    if not all(math.isfinite(value) for value in (min_lng, min_lat, max_lng, max_lat)):
+        raise HTTPException(status_code=400, detail="bbox must contain finite numbers")
+    if not (_in_range(min_lat, min_lng) and _in_range(max_lat, max_lng)):
+        raise HTTPException(status_code=400, detail="bbox latitude must be within ±90 and longitude within ±180")
+    if min_lng > max_lng or min_lat > max_lat:
+        return None
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def parse_geo_radius_params(
+    lat: Optional[float],
+    lng: Optional[float],
+    radius_km: Optional[float],
+) -> Optional[tuple[float, float, float]]:
+    """(lat, lng, radius in metres) for a radius search; None when incomplete or out of range."""
+    if lat is None or lng is None or radius_km is None:
+        return None
+    if not all(math.isfinite(value) for value in (lat, lng, radius_km)):
+        raise HTTPException(status_code=400, detail="lat, lng and radius_km must be finite numbers")
+    if not _in_range(lat, lng):
+        return None
+    if radius_km <= 0:
+        return None
+    return float(lat), float(lng), min(float(radius_km), GEO_RADIUS_MAX_KM) * 1000.0
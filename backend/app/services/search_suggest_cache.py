@@ -0,0 +1,174 @@
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.redis_cache import cache_service
+
+
+SUGGEST_CACHE_TTL_SECONDS = max(5, int((os.environ.get("SEARCH_SUGGEST_CACHE_TTL_SECONDS") or "45").strip() or "45"))
+SUGGEST_LOCAL_MAX_ENTRIES = max(100, int(os.environ.get("SEARCH_SUGGEST_LOCAL_MAX_ENTRIES") or "5000"))
+# Candidate pool fetched per query. A result set smaller than the pool is
+# complete, so every longer query typed on top of it can be answered locally.
+SUGGEST_CANDIDATE_POOL = min(200, max(10, int(os.environ.get("SEARCH_SUGGEST_CANDIDATE_POOL") or "60")))
+SUGGEST_MIN_QUERY_CHARS = 2
+
+_REDIS_KEY_PREFIX = "search:suggest:v1"
+_WORD_SPLIT = re.compile(r"[\s\-_/.,]+")
+
+logger = logging.getLogger("search_suggest")
+
+# key -> (expires_at, entry); entry = {"query", "hits", "complete"}
+_local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_stats: Dict[str, int] = {"local_hits": 0, "redis_hits": 0, "prefix_hits": 0, "misses": 0, "evictions": 0}
+
+
+def normalize_suggest_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def _cache_key(country: str, normalized: str) -> str:
+    return f"{_REDIS_KEY_PREFIX}:{country}:{normalized}"
+
+
+def _local_get(key: str) -> Optional[Dict[str, Any]]:
+    row = _local.get(key)
+    if row is None:
+        return None
+    expires_at, entry = row
+    if expires_at < time.monotonic():
+        _local.pop(key, None)
+        return None
+    _local.move_to_end(key)
+    return entry
+
+
+def _local_set(key: str, entry: Dict[str, Any], ttl_seconds: float = SUGGEST_CACHE_TTL_SECONDS) -> None:
+    _local[key] = (time.monotonic() + ttl_seconds, entry)
+    _local.move_to_end(key)
+    while len(_local) > SUGGEST_LOCAL_MAX_ENTRIES:
+        _local.popitem(last=False)
+        _stats["evictions"] += 1
+
+
+def _title_matches(title: str, terms: List[str]) -> bool:
+    words = [word for word in _WORD_SPLIT.split(title.lower()) if word]
+    return all(any(word.startswith(term) for word in words) for term in terms)
+
+
+def _derive_from_prefix(entry: Dict[str, Any], normalized: str) -> Dict[str, Any]:
+    # Narrowing is done on titles only; a hit that matched the shorter prefix
+    # through its description is dropped, which is acceptable for a
+    # title-suggest dropdown.
+    terms = [term for term in _WORD_SPLIT.split(normalized) if term]
+    hits = [hit for hit in entry["hits"] if _title_matches(hit["label"], terms)]
+    return {"query": normalized, "hits": hits, "complete": True}
+
+
+def _prefix_keys(country: str, normalized: str) -> List[str]:
+    return [
+        _cache_key(country, normalized[:size])
+        for size in range(len(normalized) - 1, SUGGEST_MIN_QUERY_CHARS - 1, -1)
+    ]
+
+
+async def lookup_suggest_candidates(country: str, query: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Return (entry, source) for a query, or (None, "miss").
+
+    Checks the exact key, then any complete shorter prefix, in the worker
+    LRU first and Redis second. Redis is asked once with MGET for all keys.
+    """
+    normalized = normalize_suggest_query(query)
+    exact_key = _cache_key(country, normalized)
+    prefix_keys = _prefix_keys(country, normalized)
+
+    entry = _local_get(exact_key)
+    if entry is not None:
+        _stats["local_hits"] += 1
+        return entry, "local"
+    for key in prefix_keys:
+        prefix_entry = _local_get(key)
+        if prefix_entry is not None and prefix_entry.get("complete"):
+            derived = _derive_from_prefix(prefix_entry, normalized)
+            _local_set(exact_key, derived)
+            _stats["prefix_hits"] += 1
+            return derived, "prefix"
+
+    found = await cache_service.get_many([exact_key, *prefix_keys])
+    for key, value in found.items():
+        _local_set(key, value)
+    if exact_key in found:
+        _stats["redis_hits"] += 1
+        return found[exact_key], "redis"
+    for key in prefix_keys:
+        prefix_entry = found.get(key)
+        if prefix_entry is not None and prefix_entry.get("complete"):
+            derived = _derive_from_prefix(prefix_entry, normalized)
+            _local_set(exact_key, derived)
+            _stats["prefix_hits"] += 1
+            return derived, "prefix"
+
+    _stats["misses"] += 1
+    return None, "miss"
+
+
+async def store_suggest_candidates(
+    country: str,
+    query: str,
+    hits: List[Dict[str, Any]],
+    *,
+    complete: bool,
+) -> Dict[str, Any]:
+    normalized = normalize_suggest_query(query)
+    entry = {"query": normalized, "hits": hits, "complete": complete}
+    key = _cache_key(country, normalized)
+    _local_set(key, entry)
+    await cache_service.set(key, entry, ttl=SUGGEST_CACHE_TTL_SECONDS)
+    return entry
+
+
+def candidates_from_hits(raw_hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reduce Meili hits to unique-title suggest candidates in relevance order."""
+    seen = set()
+    candidates = []
+    for hit in raw_hits:
+        title = (hit.get("title") or "").strip()
+        if not title:
+            continue
+        key = title.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        candidates.append({"label": title, "listing_id": hit.get("listing_id"), "city": hit.get("city") or ""})
+    return candidates
+
+
+def rank_suggest_items(entry: Dict[str, Any], query: str, limit: int) -> List[Dict[str, Any]]:
+    query_lower = (query or "").strip().lower()
+    prefix_items = []
+    fuzzy_items = []
+    for item in entry["hits"]:
+        if item["label"].lower().startswith(query_lower):
+            prefix_items.append(item)
+        else:
+            fuzzy_items.append(item)
+        if len(prefix_items) >= limit:
+            break
+    return (prefix_items + fuzzy_items)[:limit]
+
+
+def invalidate_suggest_cache() -> None:
+    _local.clear()
+
+
+def suggest_cache_stats() -> Dict[str, Any]:
+    return {
+        "local_entries": len(_local),
+        "local_max_entries": SUGGEST_LOCAL_MAX_ENTRIES,
+        "ttl_seconds": SUGGEST_CACHE_TTL_SECONDS,
+        "candidate_pool": SUGGEST_CANDIDATE_POOL,
+        "redis_connected": cache_service.client is not None,
+        **_stats,
+    }
@@ -0,0 +1,367 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, asc, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.moderation import Listing
+from app.models.search_sync_job import SearchSyncJob
+from app.services.listings_search_projection import sync_listings_search_projection
+from app.services.meilisearch_index import (
+    build_listing_document,
+    get_active_meili_runtime,
+    is_listing_searchable,
+    meili_delete_documents,
+    meili_upsert_documents,
+)
+
+
+SEARCH_SYNC_CLAIM_LIMIT = max(1, int(os.environ.get("SEARCH_SYNC_CLAIM_LIMIT") or "1000"))
+SEARCH_SYNC_BATCH_SIZE = min(1000, max(1, int(os.environ.get("SEARCH_SYNC_BATCH_SIZE") or "500")))
+SEARCH_SYNC_POLL_SECONDS = max(0.2, float(os.environ.get("SEARCH_SYNC_POLL_SECONDS") or "2"))
+SEARCH_SYNC_PROCESSING_TIMEOUT_SECONDS = max(30, int(os.environ.get("SEARCH_SYNC_PROCESSING_TIMEOUT_SECONDS") or "300"))
+
+logger = logging.getLogger("search_sync")
+
+_batch_metrics: deque = deque(maxlen=200)
+_wakeup_event: Optional[asyncio.Event] = None
+
+
+def search_sync_backoff_seconds(attempt: int) -> int:
+    base = max(5, int(os.environ.get("SEARCH_SYNC_BACKOFF_BASE_SECONDS") or "20"))
+    max_delay = max(base, int(os.environ.get("SEARCH_SYNC_BACKOFF_MAX_SECONDS") or "900"))
+    delay = base * (2 ** max(0, attempt - 1))
+    return min(delay, max_delay)
+
+
+def _get_wakeup_event() -> asyncio.Event:
+    global _wakeup_event
+    if _wakeup_event is None:
+        _wakeup_event = asyncio.Event()
+    return _wakeup_event
+
+
+def notify_search_sync_pending() -> None:
+    _get_wakeup_event().set()
+
+
+async def add_search_sync_jobs(
+    session: AsyncSession,
+    *,
+    listing_ids: Iterable[uuid.UUID],
+    operation: str,
+    trigger: str,
+) -> int:
+    """Insert one pending job per listing into the caller's transaction.
+
+    Nothing is committed, so the jobs land atomically with the listing
+    change that made them necessary; call `notify_search_sync_pending`
+    after the commit.
+    """
+    unique_ids = list(dict.fromkeys(listing_ids))
+    if not unique_ids:
+        return 0
+    max_attempts = max(1, int(os.environ.get("SEARCH_SYNC_MAX_RETRIES") or "6"))
+    now_ts = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "listing_id": listing_id,
+            "operation": operation,
+            "trigger": trigger,
+            "payload": None,
+            "status": "pending",
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "next_retry_at": now_ts,
+            "last_error": None,
+            "created_at": now_ts,
+            "updated_at": now_ts,
+        }
+        for listing_id in unique_ids
+    ]
+    await session.execute(insert(SearchSyncJob), rows)
+    return len(rows)
+
+
+async def enqueue_search_sync_jobs(
+    session: AsyncSession,
+    *,
+    listing_ids: Iterable[uuid.UUID],
+    operation: str,
+    trigger: str,
+) -> int:
+    """Insert one pending job per listing in a single statement and commit.
+
+    The sync worker picks them up asynchronously; nothing here talks to
+    Meilisearch.
+    """
+    count = await add_search_sync_jobs(session, listing_ids=listing_ids, operation=operation, trigger=trigger)
+    if not count:
+        return 0
+    await session.commit()
+    notify_search_sync_pending()
+    return count
+
+
+async def claim_search_sync_jobs(session: AsyncSession, *, limit: int) -> List[SearchSyncJob]:
+    """Lock due jobs with SKIP LOCKED, mark them processing and commit.
+
+    Every other pending or retrying job for a claimed listing is claimed
+    along with it, so a listing queued many times is coalesced into one
+    sync even when its jobs fall outside this batch's `limit`. Jobs left
+    in `processing` by a crashed worker become claimable again after
+    SEARCH_SYNC_PROCESSING_TIMEOUT_SECONDS.
+    """
+    now_ts = datetime.now(timezone.utc)
+    stale_before = now_ts - timedelta(seconds=SEARCH_SYNC_PROCESSING_TIMEOUT_SECONDS)
+    query = (
+        select(SearchSyncJob)
+        .where(
+            or_(
+                SearchSyncJob.status == "pending",
+                and_(
+                    SearchSyncJob.status == "retry",
+                    or_(SearchSyncJob.next_retry_at.is_(None), SearchSyncJob.next_retry_at <= now_ts),
+                ),
+                and_(SearchSyncJob.status == "processing", SearchSyncJob.updated_at <= stale_before),
+            )
+        )
+        .order_by(asc(SearchSyncJob.created_at))
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    jobs = list((await session.execute(query)).scalars().all())
+    listing_ids = {job.listing_id for job in jobs if job.listing_id}
+    if listing_ids:
+        siblings = (
+            select(SearchSyncJob)
+            .where(
+                SearchSyncJob.listing_id.in_(listing_ids),
+                SearchSyncJob.status.in_(("pending", "retry")),
+                SearchSyncJob.id.not_in([job.id for job in jobs]),
+            )
+            .with_for_update(skip_locked=True)
+        )
+        jobs.extend((await session.execute(siblings)).scalars().all())
+    for job in jobs:
+        job.status = "processing"
+        job.attempts = int(job.attempts or 0) + 1
+        job.updated_at = now_ts
+    await session.commit()
+    return jobs
+
+
+def coalesce_search_sync_jobs(jobs: Iterable[SearchSyncJob]) -> tuple[Dict[uuid.UUID, SearchSyncJob], List[SearchSyncJob]]:
+    """Keep the newest job per listing; return (latest_by_listing, superseded)."""
+    latest: Dict[uuid.UUID, SearchSyncJob] = {}
+    superseded: List[SearchSyncJob] = []
+    for job in sorted(jobs, key=lambda item: (item.created_at or datetime.min.replace(tzinfo=timezone.utc))):
+        previous = latest.get(job.listing_id)
+        if previous is not None:
+            superseded.append(previous)
+        latest[job.listing_id] = job
+    return latest, superseded
+
+
+def _mark_done(job: SearchSyncJob, now_ts: datetime, coalesced_into: Optional[uuid.UUID] = None) -> None:
+    job.status = "done"
+    job.next_retry_at = None
+    job.last_error = None
+    job.updated_at = now_ts
+    if coalesced_into is not None:
+        job.payload = {**(job.payload or {}), "coalesced_into": str(coalesced_into)}
+
+
+def _mark_failed(job: SearchSyncJob, reason: str, now_ts: datetime) -> None:
+    job.last_error = reason[:500]
+    job.updated_at = now_ts
+    if job.attempts >= job.max_attempts:
+        job.status = "dead_letter"
+        job.next_retry_at = None
+    else:
+        job.status = "retry"
+        job.next_retry_at = now_ts + timedelta(seconds=search_sync_backoff_seconds(job.attempts))
+
+
+def _record_batch_metric(kind: str, docs: int, elapsed: float, ok: bool) -> None:
+    docs_per_second = round(docs / elapsed, 1) if elapsed > 0 else float(docs)
+    _batch_metrics.append(
+        {
+            "kind": kind,
+            "docs": docs,
+            "elapsed_ms": int(elapsed * 1000),
+            "docs_per_second": docs_per_second,
+            "ok": ok,
+            "at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+    log = logger.info if ok else logger.warning
+    log(
+        "search_sync_batch kind=%s docs=%s elapsed_ms=%s docs_per_second=%s ok=%s",
+        kind,
+        docs,
+        int(elapsed * 1000),
+        docs_per_second,
+        str(ok).lower(),
+    )
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def process_search_sync_batch(
+    session: AsyncSession,
+    *,
+    limit: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    safe_limit = min(SEARCH_SYNC_CLAIM_LIMIT, max(1, int(limit or SEARCH_SYNC_CLAIM_LIMIT)))
+    safe_batch = min(1000, max(1, int(batch_size or SEARCH_SYNC_BATCH_SIZE)))
+
+    claimed = await claim_search_sync_jobs(session, limit=safe_limit)
+    summary: Dict[str, Any] = {
+        "processed": len(claimed),
+        "success": 0,
+        "failed": 0,
+        "dead_letter": 0,
+        "coalesced": 0,
+        "upserted": 0,
+        "deleted": 0,
+        "projected": 0,
+        "items": [],
+    }
+    if not claimed:
+        return summary
+
+    now_ts = datetime.now(timezone.utc)
+    orphaned = [job for job in claimed if not job.listing_id]
+    for job in orphaned:
+        job.status = "dead_letter"
+        job.last_error = "missing_listing_id"
+        job.updated_at = now_ts
+
+    latest, superseded = coalesce_search_sync_jobs(job for job in claimed if job.listing_id)
+    for job in superseded:
+        _mark_done(job, now_ts, coalesced_into=latest[job.listing_id].id)
+    summary["coalesced"] = len(superseded)
+
+    upsert_ids = [listing_id for listing_id, job in latest.items() if job.operation != "delete"]
+    listings: Dict[uuid.UUID, Listing] = {}
+    for id_chunk in _chunks(upsert_ids, safe_batch):
+        rows = (await session.execute(select(Listing).where(Listing.id.in_(id_chunk)))).scalars().all()
+        listings.update({row.id: row for row in rows})
+
+    # The SQL search table is kept current even while Meilisearch is down.
+    projection = await sync_listings_search_projection(
+        session,
+        listings=listings.values(),
+        removed_ids=[listing_id for listing_id in latest if listing_id not in listings],
+    )
+    if projection is not None:
+        summary["projected"] = projection["upserted"] + projection["deleted"]
+
+    try:
+        runtime = await get_active_meili_runtime(session)
+    except Exception as exc:
+        for job in latest.values():
+            _mark_failed(job, str(exc), now_ts)
+        runtime = None
+
+    if runtime is not None:
+        upserts: List[tuple[SearchSyncJob, Dict[str, Any]]] = []
+        deletes: List[SearchSyncJob] = []
+        for listing_id, job in latest.items():
+            listing = listings.get(listing_id)
+            if job.operation == "delete" or listing is None or not is_listing_searchable(listing):
+                deletes.append(job)
+                continue
+            try:
+                upserts.append((job, build_listing_document(listing)))
+            except Exception as exc:
+                _mark_failed(job, f"document_build_failed: {exc}", now_ts)
+
+        for batch in _chunks(upserts, safe_batch):
+            started = time.perf_counter()
+            try:
+                await meili_upsert_documents(runtime, [doc for _, doc in batch])
+            except Exception as exc:
+                _record_batch_metric("upsert", len(batch), time.perf_counter() - started, False)
+                for job, _ in batch:
+                    _mark_failed(job, str(exc), datetime.now(timezone.utc))
+                continue
+            _record_batch_metric("upsert", len(batch), time.perf_counter() - started, True)
+            summary["upserted"] += len(batch)
+            for job, _ in batch:
+                _mark_done(job, datetime.now(timezone.utc))
+
+        for batch in _chunks(deletes, safe_batch):
+            started = time.perf_counter()
+            try:
+                await meili_delete_documents(runtime, [str(job.listing_id) for job in batch])
+            except Exception as exc:
+                _record_batch_metric("delete", len(batch), time.perf_counter() - started, False)
+                for job in batch:
+                    _mark_failed(job, str(exc), datetime.now(timezone.utc))
+                continue
+            _record_batch_metric("delete", len(batch), time.perf_counter() - started, True)
+            summary["deleted"] += len(batch)
+            for job in batch:
+                _mark_done(job, datetime.now(timezone.utc))
+
+    for job in claimed:
+        ok = job.status == "done"
+        if ok:
+            summary["success"] += 1
+        else:
+            summary["failed"] += 1
+            if job.status == "dead_letter":
+                summary["dead_letter"] += 1
+        summary["items"].append(
+            {"id": str(job.id), "ok": ok, "reason": job.last_error or "ok", "status": job.status}
+        )
+
+    await session.commit()
+    return summary
+
+
+def search_sync_pipeline_stats() -> Dict[str, Any]:
+    recent = list(_batch_metrics)
+    ok_batches = [item for item in recent if item["ok"]]
+    total_docs = sum(item["docs"] for item in ok_batches)
+    total_elapsed = sum(item["elapsed_ms"] for item in ok_batches) / 1000.0
+    return {
+        "batch_size": SEARCH_SYNC_BATCH_SIZE,
+        "claim_limit": SEARCH_SYNC_CLAIM_LIMIT,
+        "recent_batches": recent[-20:],
+        "failed_batches": len(recent) - len(ok_batches),
+        "docs_per_second": round(total_docs / total_elapsed, 1) if total_elapsed > 0 else None,
+    }
+
+
+async def search_sync_worker_loop(session_factory: Callable[[], AsyncSession]) -> None:
+    event = _get_wakeup_event()
+    while True:
+        try:
+            await asyncio.wait_for(event.wait(), timeout=SEARCH_SYNC_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+        try:
+            while True:
+                async with session_factory() as session:
+                    summary = await process_search_sync_batch(session)
+                if summary["processed"] < SEARCH_SYNC_CLAIM_LIMIT:
+                    break
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("search_sync_worker_tick_failed")
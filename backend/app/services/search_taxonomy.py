@@ -0,0 +1,384 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.redis_cache import cache_service
+from app.models.attribute import Attribute, AttributeOption, CategoryAttributeMap
+from app.models.category import Category
+from app.models.vehicle_mdm import VehicleMake, VehicleModel
+from app.services.meilisearch_index import stable_numeric_id
+
+
+TAXONOMY_SNAPSHOT_TTL_SECONDS = float(os.environ.get("SEARCH_TAXONOMY_TTL_SECONDS", "300"))
+TAXONOMY_SLUG_LANGUAGES = ("tr", "de", "fr", "en")
+TAXONOMY_INVALIDATION_CHANNEL = os.environ.get("SEARCH_TAXONOMY_INVALIDATION_CHANNEL", "search:taxonomy:invalidate")
+TAXONOMY_INVALIDATION_RETRY_SECONDS = float(os.environ.get("SEARCH_TAXONOMY_INVALIDATION_RETRY_SECONDS", "5"))
+
+_TRACKED_MODELS = (Attribute, AttributeOption, CategoryAttributeMap, Category, VehicleMake, VehicleModel)
+_SESSION_DIRTY_FLAG = "search_taxonomy_dirty"
+
+logger = logging.getLogger("search_taxonomy")
+
+
+@dataclass(frozen=True)
+class TaxonomySnapshot:
+    version: int
+    loaded_at: float
+    category_slug_to_id: Dict[str, uuid.UUID] = field(default_factory=dict)
+    make_slug_to_num: Dict[str, int] = field(default_factory=dict)
+    model_slug_to_num: Dict[str, int] = field(default_factory=dict)
+    make_slug_to_id: Dict[str, uuid.UUID] = field(default_factory=dict)
+    model_slug_to_id: Dict[str, uuid.UUID] = field(default_factory=dict)
+    category_attribute_maps: Dict[uuid.UUID, Tuple[Dict[str, Dict[str, Any]], List[str]]] = field(default_factory=dict)
+    all_filterable_fields: Tuple[str, ...] = ()
+
+    def resolve_category(self, value: Optional[str]) -> Optional[uuid.UUID]:
+        if not value:
+            return None
+        raw = value.strip()
+        if not raw:
+            return None
+        try:
+            return uuid.UUID(raw)
+        except ValueError:
+            return self.category_slug_to_id.get(raw)
+
+    def resolve_vehicle(self, value: Optional[str], model: str) -> Optional[int]:
+        if not value:
+            return None
+        raw = value.strip()
+        if not raw:
+            return None
+        try:
+            return stable_numeric_id(uuid.UUID(raw))
+        except ValueError:
+            pass
+        lookup = self.make_slug_to_num if model == "make" else self.model_slug_to_num
+        return lookup.get(raw)
+
+    def resolve_vehicle_uuid(self, value: Optional[str], model: str) -> Optional[uuid.UUID]:
+        if not value:
+            return None
+        raw = value.strip()
+        if not raw:
+            return None
+        try:
+            return uuid.UUID(raw)
+        except ValueError:
+            pass
+        lookup = self.make_slug_to_id if model == "make" else self.model_slug_to_id
+        return lookup.get(raw)
+
+    def filterable_attributes(
+        self, category_uuid: Optional[uuid.UUID]
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        if not category_uuid:
+            return {}, []
+        attr_map, facet_fields = self.category_attribute_maps.get(category_uuid, ({}, []))
+        # Callers treat the result as request-local; hand out shallow copies so
+        # the shared snapshot stays read-only.
+        return dict(attr_map), list(facet_fields)
+
+
+_snapshot: Optional[TaxonomySnapshot] = None
+_snapshot_version: int = 0
+_snapshot_lock: Optional[asyncio.Lock] = None
+_refresh_task: Optional[asyncio.Task] = None
+_invalidation_listeners: List[Callable[[], None]] = []
+_stats = {"invalidations": 0, "published": 0, "received": 0}
+
+
+def _localized_label(value: Any, fallback: Optional[str]) -> Optional[str]:
+    if isinstance(value, dict):
+        return value.get("tr") or next(iter(value.values()), fallback)
+    if isinstance(value, str):
+        return value
+    return fallback
+
+
+async def _load_category_slugs(session: AsyncSession) -> Dict[str, uuid.UUID]:
+    rows = (
+        await session.execute(
+            select(Category.id, Category.slug)
+            .where(Category.is_deleted.is_(False))
+            .order_by(Category.updated_at.asc())
+        )
+    ).all()
+    # Oldest first, so the most recently updated category wins a slug clash
+    # exactly like the previous `ORDER BY updated_at DESC LIMIT 1` lookup.
+    slug_map: Dict[str, uuid.UUID] = {}
+    for row in rows:
+        slugs = row.slug if isinstance(row.slug, dict) else {}
+        for lang in TAXONOMY_SLUG_LANGUAGES:
+            slug = slugs.get(lang)
+            if isinstance(slug, str) and slug:
+                slug_map[slug] = row.id
+    return slug_map
+
+
+async def _load_vehicle_slugs(session: AsyncSession) -> Tuple[Dict[str, uuid.UUID], Dict[str, uuid.UUID]]:
+    make_rows = (await session.execute(select(VehicleMake.id, VehicleMake.slug))).all()
+    model_rows = (
+        await session.execute(select(VehicleModel.id, VehicleModel.slug).order_by(VehicleModel.id.asc()))
+    ).all()
+    make_map = {row.slug: row.id for row in make_rows if row.slug}
+    model_map: Dict[str, uuid.UUID] = {}
+    for row in model_rows:
+        if row.slug and row.slug not in model_map:
+            model_map[row.slug] = row.id
+    return make_map, model_map
+
+
+async def _load_attribute_maps(
+    session: AsyncSession,
+) -> Tuple[Dict[uuid.UUID, Tuple[Dict[str, Dict[str, Any]], List[str]]], Tuple[str, ...]]:
+    attributes = (
+        await session.execute(
+            select(Attribute).where(
+                Attribute.is_active.is_(True),
+                Attribute.is_filterable.is_(True),
+            )
+        )
+    ).scalars().all()
+    attr_by_id = {attr.id: attr for attr in attributes}
+
+    options_by_attr: Dict[uuid.UUID, List[Dict[str, Any]]] = {}
+    if attr_by_id:
+        option_rows = (
+            await session.execute(
+                select(AttributeOption.attribute_id, AttributeOption.value, AttributeOption.label)
+                .where(AttributeOption.attribute_id.in_(list(attr_by_id.keys())))
+                .order_by(AttributeOption.sort_order.asc())
+            )
+        ).all()
+        for row in option_rows:
+            options_by_attr.setdefault(row.attribute_id, []).append(
+                {"value": row.value, "label": _localized_label(row.label, None) or row.value}
+            )
+
+    entries: Dict[uuid.UUID, Dict[str, Any]] = {}
+    all_fields: List[str] = []
+    for attr in sorted(attributes, key=lambda item: item.key or ""):
+        key = (attr.key or "").strip().lower()
+        if not key:
+            continue
+        field_name = f"attribute_{key}"
+        all_fields.append(field_name)
+        entries[attr.id] = {
+            "field": field_name,
+            "key": key,
+            "label": _localized_label(attr.name, key),
+            "type": attr.attribute_type,
+            "options": options_by_attr.get(attr.id, []),
+        }
+
+    mapping_rows = (
+        await session.execute(
+            select(CategoryAttributeMap.category_id, CategoryAttributeMap.attribute_id).where(
+                CategoryAttributeMap.is_active.is_(True)
+            )
+        )
+    ).all()
+    per_category: Dict[uuid.UUID, Dict[str, Dict[str, Any]]] = {}
+    for row in mapping_rows:
+        entry = entries.get(row.attribute_id)
+        if not entry:
+            continue
+        per_category.setdefault(row.category_id, {})[entry["key"]] = entry
+
+    category_maps: Dict[uuid.UUID, Tuple[Dict[str, Dict[str, Any]], List[str]]] = {}
+    for category_id, attr_map in per_category.items():
+        ordered = dict(sorted(attr_map.items()))
+        category_maps[category_id] = (ordered, [item["field"] for item in ordered.values()])
+    return category_maps, tuple(dict.fromkeys(all_fields))
+
+
+async def _build_snapshot(session: AsyncSession, version: int) -> TaxonomySnapshot:
+    category_slugs = await _load_category_slugs(session)
+    make_map, model_map = await _load_vehicle_slugs(session)
+    category_maps, all_fields = await _load_attribute_maps(session)
+    return TaxonomySnapshot(
+        version=version,
+        loaded_at=time.monotonic(),
+        category_slug_to_id=category_slugs,
+        make_slug_to_num={slug: stable_numeric_id(value) for slug, value in make_map.items()},
+        model_slug_to_num={slug: stable_numeric_id(value) for slug, value in model_map.items()},
+        make_slug_to_id=make_map,
+        model_slug_to_id=model_map,
+        category_attribute_maps=category_maps,
+        all_filterable_fields=all_fields,
+    )
+
+
+def _get_lock() -> asyncio.Lock:
+    global _snapshot_lock
+    if _snapshot_lock is None:
+        _snapshot_lock = asyncio.Lock()
+    return _snapshot_lock
+
+
+async def _rebuild(session: AsyncSession) -> TaxonomySnapshot:
+    global _snapshot
+    version = _snapshot_version
+    started = time.perf_counter()
+    snapshot = await _build_snapshot(session, version)
+    if version == _snapshot_version:
+        _snapshot = snapshot
+    logger.info(
+        "search_taxonomy_loaded version=%s categories=%s makes=%s models=%s attribute_categories=%s elapsed_ms=%s",
+        version,
+        len(snapshot.category_slug_to_id),
+        len(snapshot.make_slug_to_num),
+        len(snapshot.model_slug_to_num),
+        len(snapshot.category_attribute_maps),
+        int((time.perf_counter() - started) * 1000),
+    )
+    return snapshot
+
+
+async def _background_refresh() -> None:
+    global _refresh_task
+    from app.core.database import AsyncSessionLocal
+
+    try:
+        async with _get_lock():
+            async with AsyncSessionLocal() as session:
+                await _rebuild(session)
+    except Exception:
+        logger.warning("search_taxonomy_refresh_failed", exc_info=True)
+    finally:
+        _refresh_task = None
+
+
+async def get_taxonomy_snapshot(session: AsyncSession) -> TaxonomySnapshot:
+    """Return the worker-local taxonomy snapshot, loading it on first use.
+
+    An expired snapshot keeps serving while a background task reloads it;
+    an invalidated one is rebuilt before the caller proceeds.
+    """
+    global _refresh_task
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == _snapshot_version:
+        if time.monotonic() - snapshot.loaded_at > TAXONOMY_SNAPSHOT_TTL_SECONDS and _refresh_task is None:
+            _refresh_task = asyncio.create_task(_background_refresh())
+        return snapshot
+
+    async with _get_lock():
+        snapshot = _snapshot
+        if snapshot is not None and snapshot.version == _snapshot_version:
+            return snapshot
+        return await _rebuild(session)
+
+
+def invalidate_taxonomy_snapshot_local() -> None:
+    global _snapshot_version
+    _snapshot_version += 1
+    _stats["invalidations"] += 1
+    for listener in list(_invalidation_listeners):
+        try:
+            listener()
+        except Exception:
+            logger.warning("search_taxonomy_listener_failed", exc_info=True)
+
+
+async def publish_taxonomy_invalidation() -> None:
+    client = cache_service.client
+    if not client:
+        return
+    try:
+        await client.publish(TAXONOMY_INVALIDATION_CHANNEL, "1")
+        _stats["published"] += 1
+    except Exception as exc:
+        logger.warning("search_taxonomy_invalidation_publish_failed error=%s", exc)
+
+
+def invalidate_taxonomy_snapshot() -> None:
+    """Evict here now; tell the other workers from the running loop if there is one."""
+    invalidate_taxonomy_snapshot_local()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.create_task(publish_taxonomy_invalidation())
+
+
+async def taxonomy_invalidation_listener() -> None:
+    """Apply invalidations published by other workers, listeners included."""
+    while True:
+        client = cache_service.client
+        if not client:
+            await asyncio.sleep(TAXONOMY_INVALIDATION_RETRY_SECONDS)
+            continue
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(TAXONOMY_INVALIDATION_CHANNEL)
+            logger.info("search_taxonomy_invalidation_subscribed channel=%s", TAXONOMY_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                _stats["received"] += 1
+                invalidate_taxonomy_snapshot_local()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("search_taxonomy_invalidation_listener_error error=%s", exc)
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
+        await asyncio.sleep(TAXONOMY_INVALIDATION_RETRY_SECONDS)
+
+
+def add_taxonomy_invalidation_listener(listener: Callable[[], None]) -> None:
+    """Call `listener` synchronously whenever the snapshot is invalidated."""
+    if listener not in _invalidation_listeners:
+        _invalidation_listeners.append(listener)
+
+
+def taxonomy_snapshot_stats() -> Dict[str, Any]:
+    snapshot = _snapshot
+    return {
+        **_stats,
+        "version": _snapshot_version,
+        "loaded": snapshot is not None,
+        "stale": snapshot is None or snapshot.version != _snapshot_version,
+        "age_seconds": round(time.monotonic() - snapshot.loaded_at, 3) if snapshot else None,
+        "categories": len(snapshot.category_slug_to_id) if snapshot else 0,
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_taxonomy_dirty_on_flush(session: Session, flush_context: Any) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _TRACKED_MODELS):
+            session.info[_SESSION_DIRTY_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_taxonomy_dirty_on_bulk(orm_execute_state: Any) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _TRACKED_MODELS):
+        orm_execute_state.session.info[_SESSION_DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_taxonomy_on_commit(session: Session) -> None:
+    if session.info.pop(_SESSION_DIRTY_FLAG, False):
+        invalidate_taxonomy_snapshot()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_taxonomy_flag_on_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_DIRTY_FLAG, None)
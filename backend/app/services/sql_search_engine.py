@@ -0,0 +1,470 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import Float, Numeric, case, cast, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.listing_search import ListingSearch
+from app.services.meilisearch_index import MeiliSearchError, stable_numeric_id
+
+
+SEARCH_SQL_FALLBACK_ENABLED = (os.environ.get("SEARCH_SQL_FALLBACK_ENABLED") or "true").strip().lower() in {"1", "true", "yes", "y"}
+MEILI_SEARCH_BREAKER_THRESHOLD = max(1, int(os.environ.get("MEILI_SEARCH_BREAKER_THRESHOLD") or "3"))
+MEILI_SEARCH_BREAKER_OPEN_SECONDS = max(1.0, float(os.environ.get("MEILI_SEARCH_BREAKER_OPEN_SECONDS") or "30"))
+
+_SEARCHABLE_STATUSES = ("published", "active")
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+_NUMERIC_PATTERN = r"^-?[0-9]+(\.[0-9]+)?$"
+_EARTH_RADIUS_M = 6371000.0
+_MAX_QUERY_TOKENS = 8
+
+logger = logging.getLogger("search_v2")
+
+_breaker: Dict[str, Any] = {"failures": 0, "open_until": 0.0, "last_error": None, "sql_requests": 0}
+
+_HIT_COLUMNS = (
+    ListingSearch.listing_id,
+    ListingSearch.title,
+    ListingSearch.price_amount,
+    ListingSearch.hourly_rate,
+    ListingSearch.price_type,
+    ListingSearch.currency,
+    ListingSearch.images,
+    ListingSearch.city,
+    ListingSearch.is_featured,
+    ListingSearch.is_urgent,
+    ListingSearch.featured_until,
+    ListingSearch.urgent_until,
+    ListingSearch.premium_score,
+    ListingSearch.published_at,
+    ListingSearch.latitude,
+    ListingSearch.longitude,
+)
+
+
+def meili_search_breaker_open() -> bool:
+    return time.monotonic() < _breaker["open_until"]
+
+
+def record_meili_search_success() -> None:
+    _breaker["failures"] = 0
+    _breaker["open_until"] = 0.0
+
+
+def is_meili_search_outage(exc: Exception) -> bool:
+    """Transport errors, timeouts and 5xx; a 4xx means the query itself was bad."""
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    return isinstance(exc, MeiliSearchError) and exc.status_code >= 500
+
+
+def is_meili_search_bad_request(exc: Exception) -> bool:
+    return isinstance(exc, MeiliSearchError) and 400 <= exc.status_code < 500 and exc.status_code not in (401, 403, 404)
+
+
+def record_meili_search_failure(exc: Exception) -> None:
+    """Count `exc` toward the breaker only when Meili itself is unhealthy."""
+    if not is_meili_search_outage(exc):
+        return
+    _breaker["failures"] += 1
+    _breaker["last_error"] = str(exc)[:300]
+    if _breaker["failures"] >= MEILI_SEARCH_BREAKER_THRESHOLD:
+        _breaker["open_until"] = time.monotonic() + MEILI_SEARCH_BREAKER_OPEN_SECONDS
+        logger.warning(
+            "meili_search_breaker_opened failures=%s open_for=%s",
+            _breaker["failures"],
+            MEILI_SEARCH_BREAKER_OPEN_SECONDS,
+        )
+
+
+def sql_search_engine_stats() -> Dict[str, Any]:
+    return {
+        "fallback_enabled": SEARCH_SQL_FALLBACK_ENABLED,
+        "breaker_open": meili_search_breaker_open(),
+        "consecutive_failures": _breaker["failures"],
+        "last_error": _breaker["last_error"],
+        "sql_requests": _breaker["sql_requests"],
+    }
+
+
+def build_prefix_tsquery(text: Optional[str]) -> Optional[str]:
+    """Turn free text into an AND-ed prefix tsquery such as `bmw:* & 320:*`.
+
+    Only word characters survive, so user input can never inject tsquery
+    operators.
+    """
+    tokens = _TOKEN_PATTERN.findall((text or "").lower())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens[:_MAX_QUERY_TOKENS])
+
+
+def _price_expr():
+    return func.coalesce(ListingSearch.price_amount, ListingSearch.hourly_rate, 0)
+
+
+def _attr_text(key: str):
+    return ListingSearch.attributes.op("->>")(key)
+
+
+def _attr_number(key: str):
+    raw = _attr_text(key)
+    return case((raw.op("~")(_NUMERIC_PATTERN), cast(raw, Float)), else_=None)
+
+
+def _attribute_filter_clauses(attr_filters: Dict[str, Any], attr_map: Dict[str, Dict[str, Any]]) -> List[Any]:
+    clauses: List[Any] = []
+    for key, selected in attr_filters.items():
+        cfg = attr_map.get(key)
+        if not cfg:
+            continue
+        if isinstance(selected, dict):
+            if selected.get("min") is not None:
+                clauses.append(_attr_number(key) >= float(selected["min"]))
+            if selected.get("max") is not None:
+                clauses.append(_attr_number(key) <= float(selected["max"]))
+            continue
+        if not isinstance(selected, list) or not selected:
+            continue
+
+        if cfg.get("type") == "boolean":
+            wanted = []
+            for item in selected:
+                lower = str(item).strip().lower()
+                if lower in {"true", "1", "yes", "evet"}:
+                    wanted.append(True)
+                elif lower in {"false", "0", "no", "hayir", "hayır"}:
+                    wanted.append(False)
+            if wanted:
+                clauses.append(or_(*[ListingSearch.attributes.contains({key: value}) for value in wanted]))
+            continue
+
+        # Containment keeps the GIN index usable; the list form matches
+        # multi-value attributes the way Meili does.
+        options = []
+        for item in selected:
+            value = str(item).strip()
+            if value:
+                options.append(ListingSearch.attributes.contains({key: value}))
+                options.append(ListingSearch.attributes.contains({key: [value]}))
+        if options:
+            clauses.append(or_(*options))
+    return clauses
+
+
+def _geo_clauses(
+    bbox_tuple: Optional[Tuple[float, float, float, float]],
+    geo_radius: Optional[Tuple[float, float, float]],
+) -> List[Any]:
+    clauses: List[Any] = []
+    if bbox_tuple is not None:
+        min_lng, min_lat, max_lng, max_lat = bbox_tuple
+        clauses.append(ListingSearch.latitude.between(min_lat, max_lat))
+        clauses.append(ListingSearch.longitude.between(min_lng, max_lng))
+    if geo_radius is not None:
+        center_lat, center_lng, radius_m = geo_radius
+        d_lat = func.radians(ListingSearch.latitude - center_lat)
+        d_lng = func.radians(ListingSearch.longitude - center_lng)
+        haversine = func.power(func.sin(d_lat / 2.0), 2) + func.cos(func.radians(center_lat)) * func.cos(
+            func.radians(ListingSearch.latitude)
+        ) * func.power(func.sin(d_lng / 2.0), 2)
+        clauses.append(ListingSearch.latitude.isnot(None))
+        clauses.append(ListingSearch.longitude.isnot(None))
+        clauses.append(2 * _EARTH_RADIUS_M * func.asin(func.sqrt(haversine)) <= radius_m)
+    return clauses
+
+
+def build_sql_search_filters(
+    *,
+    country: str,
+    tsquery: Optional[str],
+    category_uuid: Optional[uuid.UUID],
+    make_uuid: Optional[uuid.UUID],
+    model_uuid: Optional[uuid.UUID],
+    doping_type: Optional[str],
+    price_min: Optional[int],
+    price_max: Optional[int],
+    attr_filters: Dict[str, Any],
+    attr_map: Dict[str, Dict[str, Any]],
+    bbox_tuple: Optional[Tuple[float, float, float, float]] = None,
+    geo_radius: Optional[Tuple[float, float, float]] = None,
+) -> List[Any]:
+    clauses: List[Any] = [
+        ListingSearch.status.in_(_SEARCHABLE_STATUSES),
+        ListingSearch.country_code == country,
+    ]
+    if tsquery:
+        clauses.append(
+            or_(
+                ListingSearch.tsv_tr.op("@@")(func.to_tsquery("turkish", tsquery)),
+                ListingSearch.tsv_de.op("@@")(func.to_tsquery("german", tsquery)),
+            )
+        )
+    if category_uuid:
+        clauses.append(ListingSearch.category_path_ids.contains(array([category_uuid])))
+    if make_uuid:
+        clauses.append(ListingSearch.make_id == make_uuid)
+    if model_uuid:
+        clauses.append(ListingSearch.model_id == model_uuid)
+
+    normalized_doping = (doping_type or "").strip().lower()
+    if normalized_doping in {"showcase", "vitrin", "featured"}:
+        clauses.append(ListingSearch.is_featured.is_(True))
+    elif normalized_doping in {"urgent", "acil"}:
+        clauses.append(ListingSearch.is_urgent.is_(True))
+
+    if price_min is not None:
+        clauses.append(_price_expr() >= price_min)
+    if price_max is not None:
+        clauses.append(_price_expr() <= price_max)
+
+    clauses.extend(_attribute_filter_clauses(attr_filters, attr_map))
+    clauses.extend(_geo_clauses(bbox_tuple, geo_radius))
+    return clauses
+
+
+def sort_keys(sort: str, tsquery: Optional[str]) -> Tuple[List[Any], bool]:
+    """Return (key expressions, descending) for a keyset-friendly ordering.
+
+    All keys of one ordering run in the same direction so a single row-value
+    comparison continues the scan. `published_at` is always filled by the
+    projection, so it is safe inside the row comparison.
+    """
+    if sort == "price_asc":
+        return [_price_expr(), ListingSearch.listing_id], False
+    if sort == "price_desc":
+        return [_price_expr(), ListingSearch.listing_id], True
+    if sort == "date_asc":
+        return [ListingSearch.published_at, ListingSearch.listing_id], False
+    keys = [ListingSearch.premium_score, ListingSearch.published_at, ListingSearch.listing_id]
+    if tsquery:
+        rank = func.greatest(
+            func.ts_rank_cd(ListingSearch.tsv_tr, func.to_tsquery("turkish", tsquery)),
+            func.ts_rank_cd(ListingSearch.tsv_de, func.to_tsquery("german", tsquery)),
+        )
+        # Rounded to numeric so the value survives the cursor round trip exactly.
+        keys.insert(0, func.round(cast(rank, Numeric), 6))
+    return keys, True
+
+
+def encode_cursor(values: List[Any]) -> str:
+    encoded = []
+    for value in values:
+        if isinstance(value, datetime):
+            encoded.append(["dt", value.isoformat()])
+        elif isinstance(value, uuid.UUID):
+            encoded.append(["uuid", str(value)])
+        elif isinstance(value, Decimal):
+            encoded.append(["dec", str(value)])
+        else:
+            encoded.append(["raw", value])
+    return base64.urlsafe_b64encode(json.dumps(encoded, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Optional[List[Any]]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        values = []
+        for kind, value in raw:
+            if kind == "dt":
+                values.append(datetime.fromisoformat(value))
+            elif kind == "uuid":
+                values.append(uuid.UUID(value))
+            elif kind == "dec":
+                values.append(Decimal(value))
+            else:
+                values.append(value)
+        return values
+    except Exception:
+        return None
+
+
+def _hit_from_row(row: Any) -> Dict[str, Any]:
+    price_amount = float(row.price_amount or 0)
+    hourly_rate = float(row.hourly_rate or 0)
+    images = row.images if isinstance(row.images, list) else []
+    geo = None
+    if row.latitude is not None and row.longitude is not None:
+        geo = {"lat": float(row.latitude), "lng": float(row.longitude)}
+    return {
+        "listing_id": str(row.listing_id),
+        "title": row.title or "",
+        "price": price_amount or hourly_rate,
+        "price_amount": price_amount,
+        "hourly_rate": hourly_rate,
+        "price_type": row.price_type or "FIXED",
+        "currency": row.currency or "EUR",
+        "image": images[0] if images else None,
+        "city": row.city or "",
+        "is_featured": bool(row.is_featured),
+        "is_urgent": bool(row.is_urgent),
+        "featured_until": row.featured_until.isoformat() if row.featured_until else None,
+        "urgent_until": row.urgent_until.isoformat() if row.urgent_until else None,
+        "premium_score": int(row.premium_score or 0),
+        "published_at": row.published_at.isoformat() if row.published_at else None,
+        "_geo": geo,
+    }
+
+
+def build_facet_statement(clauses: List[Any], facets: List[str], attr_map: Dict[str, Dict[str, Any]]):
+    """One GROUPING SETS scan for every requested facet plus the total.
+
+    Returns (statement, grouped, numeric) where `grouped` lists
+    (facet_field, value_label, grouping_label, kind) for value-count facets and `numeric` lists
+    (facet_field, min_label, max_label) for range facets.
+    """
+    cfg_by_field = {cfg["field"]: (key, cfg) for key, cfg in attr_map.items()}
+    grouped: List[Tuple[str, str, str, str]] = []
+    numeric: List[Tuple[str, str, str]] = []
+    group_exprs = []
+    columns = []
+    for index, field_name in enumerate(facets):
+        if field_name in {"make_id", "model_id"}:
+            expr = getattr(ListingSearch, field_name)
+            kind = "vehicle"
+        elif field_name in cfg_by_field:
+            key, cfg = cfg_by_field[field_name]
+            if cfg.get("type") == "number":
+                number = _attr_number(key)
+                numeric.append((field_name, f"min{index}", f"max{index}"))
+                columns.extend([func.min(number).label(f"min{index}"), func.max(number).label(f"max{index}")])
+                continue
+            expr = _attr_text(key)
+            kind = "attribute"
+        else:
+            continue
+        grouped.append((field_name, f"f{index}", f"g{index}", kind))
+        group_exprs.append(expr)
+        columns.append(expr.label(f"f{index}"))
+        columns.append(func.grouping(expr).label(f"g{index}"))
+
+    stmt = (
+        select(*columns, func.count().label("doc_count"))
+        .where(*clauses)
+        .group_by(func.grouping_sets(*[tuple_(expr) for expr in group_exprs], tuple_()))
+    )
+    return stmt, grouped, numeric
+
+
+async def _facet_counts(
+    session: AsyncSession,
+    clauses: List[Any],
+    facets: List[str],
+    attr_map: Dict[str, Dict[str, Any]],
+) -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, float]], int]:
+    stmt, grouped, numeric = build_facet_statement(clauses, facets, attr_map)
+    distribution: Dict[str, Dict[str, int]] = {entry[0]: {} for entry in grouped}
+    stats: Dict[str, Dict[str, float]] = {}
+    total = 0
+    for row in (await session.execute(stmt)).mappings():
+        active = next((entry for entry in grouped if row[entry[2]] == 0), None)
+        if active is None:
+            # The empty grouping set: overall count and numeric ranges.
+            total = int(row["doc_count"])
+            for field_name, min_label, max_label in numeric:
+                if row[min_label] is not None or row[max_label] is not None:
+                    stats[field_name] = {"min": row[min_label], "max": row[max_label]}
+            continue
+        field_name, value_label, _, kind = active
+        value = row[value_label]
+        if value is None:
+            continue
+        key = str(stable_numeric_id(value)) if kind == "vehicle" else str(value)
+        distribution[field_name][key] = int(row["doc_count"])
+    return distribution, stats, total
+
+
+async def sql_search_documents(
+    session: AsyncSession,
+    *,
+    country: str,
+    query: Optional[str],
+    category_uuid: Optional[uuid.UUID],
+    make_uuid: Optional[uuid.UUID],
+    model_uuid: Optional[uuid.UUID],
+    doping_type: Optional[str],
+    price_min: Optional[int],
+    price_max: Optional[int],
+    attr_filters: Dict[str, Any],
+    attr_map: Dict[str, Dict[str, Any]],
+    sort: str,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    facets: Optional[List[str]] = None,
+    bbox_tuple: Optional[Tuple[float, float, float, float]] = None,
+    geo_radius: Optional[Tuple[float, float, float]] = None,
+) -> Dict[str, Any]:
+    """Run a search against `listings_search` and answer in Meili's result shape.
+
+    The response carries `hits`, `estimatedTotalHits`, `facetDistribution`
+    and `facetStats` like a Meili search, plus `nextCursor` for keyset
+    pagination. When `cursor` is given it takes precedence over `offset`.
+    """
+    _breaker["sql_requests"] += 1
+    started = time.perf_counter()
+    tsquery = build_prefix_tsquery(query)
+    clauses = build_sql_search_filters(
+        country=country,
+        tsquery=tsquery,
+        category_uuid=category_uuid,
+        make_uuid=make_uuid,
+        model_uuid=model_uuid,
+        doping_type=doping_type,
+        price_min=price_min,
+        price_max=price_max,
+        attr_filters=attr_filters,
+        attr_map=attr_map,
+        bbox_tuple=bbox_tuple,
+        geo_radius=geo_radius,
+    )
+    keys, descending = sort_keys(sort, tsquery)
+
+    stmt = select(*_HIT_COLUMNS, *[key.label(f"k{index}") for index, key in enumerate(keys)]).where(*clauses)
+    cursor_values = decode_cursor(cursor) if cursor else None
+    if cursor_values is not None and len(cursor_values) == len(keys):
+        row_value = tuple_(*keys)
+        stmt = stmt.where(row_value < tuple_(*cursor_values) if descending else row_value > tuple_(*cursor_values))
+    elif offset:
+        stmt = stmt.offset(offset)
+    stmt = stmt.order_by(*[key.desc() if descending else key.asc() for key in keys]).limit(limit)
+
+    rows = (await session.execute(stmt)).all()
+    hits = [_hit_from_row(row) for row in rows]
+    next_cursor = None
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, f"k{index}") for index in range(len(keys))])
+
+    if facets:
+        distribution, stats, total = await _facet_counts(session, clauses, facets, attr_map)
+    else:
+        distribution, stats = {}, {}
+        total = int((await session.execute(select(func.count()).select_from(ListingSearch).where(*clauses))).scalar_one())
+
+    logger.info(
+        "sql_search_done country=%s hits=%s total=%s facets=%s elapsed_ms=%s",
+        country,
+        len(hits),
+        total,
+        len(facets or []),
+        int((time.perf_counter() - started) * 1000),
+    )
+    return {
+        "hits": hits,
+        "estimatedTotalHits": total,
+        "facetDistribution": distribution,
+        "facetStats": stats,
+        "nextCursor": next_cursor,
+    }
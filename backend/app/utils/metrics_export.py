@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import Any, Dict, List, Tuple
+
+from app.core.db_pool import pool_status
+from app.core.redis_cache import cache_service
+from app.utils.monitoring import (
+    LATENCY_BUCKET_BOUNDS,
+    LATENCY_BUCKET_COUNT,
+    LATENCY_BUCKETS_PER_DECADE,
+    LatencyHistogram,
+    latency_snapshot,
+    merge_latency_snapshots,
+)
+
+
+METRICS_WORKER_ID = os.environ.get("METRICS_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+METRICS_SNAPSHOT_INTERVAL_SECONDS = max(1.0, float(os.environ.get("METRICS_SNAPSHOT_INTERVAL_SECONDS") or "15"))
+METRICS_SNAPSHOT_KEY_PREFIX = "metrics:latency:worker:"
+# Exported `le` boundaries: every 5th internal bucket, i.e. 4 per decade.
+PROMETHEUS_BUCKET_STRIDE = max(1, LATENCY_BUCKETS_PER_DECADE // 4)
+
+logger = logging.getLogger("metrics_export")
+
+
+# What this worker last published; merged in place of its live counters so a
+# scrape never mixes a fresher local view with older copies in Redis.
+_last_published: Dict[str, Any] = {}
+
+
+async def publish_latency_snapshot() -> None:
+    snapshot = latency_snapshot()
+    await cache_service.set(
+        f"{METRICS_SNAPSHOT_KEY_PREFIX}{METRICS_WORKER_ID}",
+        snapshot,
+        ttl=int(METRICS_SNAPSHOT_INTERVAL_SECONDS * 4),
+    )
+    _last_published["snapshot"] = snapshot
+
+
+async def latency_snapshot_publisher_loop() -> None:
+    while True:
+        try:
+            await publish_latency_snapshot()
+        except Exception as exc:
+            logger.warning("latency_snapshot_publish_failed error=%s", exc)
+        await asyncio.sleep(METRICS_SNAPSHOT_INTERVAL_SECONDS)
+
+
+async def collect_latency_snapshots() -> List[Dict[str, Any]]:
+    """The last snapshot published by every worker, this one included.
+
+    Only published snapshots are merged so the exported counters move
+    forward one publish interval at a time instead of jumping between a
+    live local view and older remote copies. Without Redis this worker's
+    live snapshot is the whole picture.
+    """
+    client = cache_service.client
+    if not client:
+        return [latency_snapshot()]
+    own_key = f"{METRICS_SNAPSHOT_KEY_PREFIX}{METRICS_WORKER_ID}"
+    own = _last_published.get("snapshot")
+    snapshots = [own] if own is not None else []
+    try:
+        keys = [key async for key in client.scan_iter(match=f"{METRICS_SNAPSHOT_KEY_PREFIX}*", count=100) if key != own_key]
+    except Exception as exc:
+        logger.warning("latency_snapshot_scan_failed error=%s", exc)
+        return snapshots
+    remote = await cache_service.get_many(keys)
+    snapshots.extend(remote.values())
+    return snapshots
+
+
+async def merged_route_latency() -> Dict[Tuple[str, str, str], LatencyHistogram]:
+    return merge_latency_snapshots(await collect_latency_snapshots())
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+_EXPORTED_BUCKETS = list(range(0, LATENCY_BUCKET_COUNT - 1, PROMETHEUS_BUCKET_STRIDE))
+if _EXPORTED_BUCKETS[-1] != LATENCY_BUCKET_COUNT - 2:
+    _EXPORTED_BUCKETS.append(LATENCY_BUCKET_COUNT - 2)
+
+
+def _histogram_lines(lines: List[str], name: str, labels: str, histogram: LatencyHistogram) -> None:
+    cumulative = 0
+    position = 0
+    for index in _EXPORTED_BUCKETS:
+        while position <= index:
+            cumulative += histogram.counts[position]
+            position += 1
+        le = f"{LATENCY_BUCKET_BOUNDS[index] / 1000:.6g}"
+        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total_ms / 1000:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+def render_prometheus(histograms: Dict[Tuple[str, str, str], LatencyHistogram]) -> str:
+    name = "http_request_duration_seconds"
+    lines = [
+        f"# HELP {name} HTTP request latency by route template, method and status class.",
+        f"# TYPE {name} histogram",
+    ]
+    for (route, method, status_group), histogram in sorted(histograms.items()):
+        labels = f'route="{_label_value(route)}",method="{_label_value(method)}",status_class="{status_group}"'
+        _histogram_lines(lines, name, labels, histogram)
+    return "\n".join(lines) + "\n"
+
+
+def render_pool_metrics(engines: Dict[str, Any]) -> str:
+    """This worker's connection pools; unlike request latency these are not merged across workers."""
+    worker = _label_value(METRICS_WORKER_ID)
+    checkout = "db_pool_checkout_seconds"
+    lines = [
+        f"# HELP {checkout} Time to check a connection out of the pool.",
+        f"# TYPE {checkout} histogram",
+    ]
+    gauges: Dict[str, List[str]] = {"db_pool_checked_out": [], "db_pool_waiting": [], "db_pool_size": []}
+    counters: Dict[str, List[str]] = {"db_pool_waits_total": [], "db_pool_timeouts_total": []}
+    for name, engine in sorted(engines.items()):
+        labels = f'pool="{_label_value(name)}",worker="{worker}"'
+        telemetry = getattr(engine.sync_engine.pool, "telemetry", None)
+        status = pool_status(engine)
+        if telemetry is not None:
+            _histogram_lines(lines, checkout, labels, telemetry.checkout)
+            counters["db_pool_waits_total"].append(f"db_pool_waits_total{{{labels}}} {telemetry.waits}")
+            counters["db_pool_timeouts_total"].append(f"db_pool_timeouts_total{{{labels}}} {telemetry.timeouts}")
+            gauges["db_pool_waiting"].append(f"db_pool_waiting{{{labels}}} {telemetry.waiting}")
+        gauges["db_pool_checked_out"].append(f"db_pool_checked_out{{{labels}}} {status['checked_out']}")
+        gauges["db_pool_size"].append(f"db_pool_size{{{labels}}} {status['size'] + max(0, status['max_overflow'])}")
+    for metric, samples in gauges.items():
+        lines.append(f"# TYPE {metric} gauge")
+        lines.extend(samples)
+    for metric, samples in counters.items():
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def render_scheduler_metrics(scheduler: Any) -> str:
+    """Job tick runtimes; only the leader process reports non-zero counts."""
+    worker = _label_value(METRICS_WORKER_ID)
+    runtime = "scheduler_job_duration_seconds"
+    lines = [
+        f"# HELP {runtime} Scheduler job tick runtime.",
+        f"# TYPE {runtime} histogram",
+    ]
+    counters: Dict[str, List[str]] = {"scheduler_job_failures_total": [], "scheduler_job_overlaps_skipped_total": []}
+    for job in scheduler.jobs:
+        labels = f'job="{_label_value(job.name)}",worker="{worker}"'
+        _histogram_lines(lines, runtime, labels, job.runtime)
+        counters["scheduler_job_failures_total"].append(f"scheduler_job_failures_total{{{labels}}} {job.failures}")
+        counters["scheduler_job_overlaps_skipped_total"].append(
+            f"scheduler_job_overlaps_skipped_total{{{labels}}} {job.overlaps_skipped}"
+        )
+    lines.append("# TYPE scheduler_leader gauge")
+    lines.append(f'scheduler_leader{{worker="{worker}"}} {int(scheduler.is_leader)}')
+    for metric, samples in counters.items():
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
@@ -1,13 +1,135 @@
+import math
 import os
 import time
 from collections import deque
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 SLOW_QUERY_WINDOW_SECONDS = 24 * 60 * 60
 SLOW_QUERY_BUFFER_SIZE = 5000
 
-_latency_events_by_endpoint: Dict[str, deque] = {}
+# Log-spaced buckets from 0.1 ms to 100 s, 20 per decade (~12% wide), plus an
+# underflow and an overflow bucket. Recording is one log10 and an increment;
+# percentiles walk a fixed 122-slot array and are accurate to a bucket width.
+LATENCY_MIN_EXPONENT = -1
+LATENCY_MAX_EXPONENT = 5
+LATENCY_BUCKETS_PER_DECADE = 20
+LATENCY_BUCKET_COUNT = (LATENCY_MAX_EXPONENT - LATENCY_MIN_EXPONENT) * LATENCY_BUCKETS_PER_DECADE + 2
+LATENCY_BUCKET_BOUNDS: Tuple[float, ...] = tuple(
+    10 ** (LATENCY_MIN_EXPONENT + index / LATENCY_BUCKETS_PER_DECADE)
+    for index in range(LATENCY_BUCKET_COUNT - 1)
+) + (math.inf,)
+
+# Hourly slots make the per-group stats a sliding 24h window.
+LATENCY_WINDOW_SLOT_SECONDS = 60 * 60
+LATENCY_WINDOW_SLOTS = SLOW_QUERY_WINDOW_SECONDS // LATENCY_WINDOW_SLOT_SECONDS
+
+ROUTE_SERIES_MAX = max(100, int(os.environ.get("LATENCY_ROUTE_SERIES_MAX") or "2000"))
+UNMATCHED_ROUTE = "<unmatched>"
+OVERFLOW_ROUTE = "<other>"
+
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+def latency_bucket_index(duration_ms: float) -> int:
+    if duration_ms <= LATENCY_BUCKET_BOUNDS[0]:
+        return 0
+    index = math.ceil((math.log10(duration_ms) - LATENCY_MIN_EXPONENT) * LATENCY_BUCKETS_PER_DECADE)
+    return min(index, LATENCY_BUCKET_COUNT - 1)
+
+
+class LatencyHistogram:
+    """Fixed-size, mergeable latency histogram."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * LATENCY_BUCKET_COUNT
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, duration_ms: float) -> None:
+        self.counts[latency_bucket_index(duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        counts = self.counts
+        for index, value in enumerate(other.counts):
+            if value:
+                counts[index] += value
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th value, capped at the max seen."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                return min(LATENCY_BUCKET_BOUNDS[index], self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": {str(index): value for index, value in enumerate(self.counts) if value},
+            "count": self.count,
+            "sum_ms": self.total_ms,
+            "max_ms": self.max_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        for index, value in (payload.get("buckets") or {}).items():
+            position = int(index)
+            if 0 <= position < LATENCY_BUCKET_COUNT:
+                histogram.counts[position] = int(value)
+        histogram.count = int(payload.get("count") or 0)
+        histogram.total_ms = float(payload.get("sum_ms") or 0.0)
+        histogram.max_ms = float(payload.get("max_ms") or 0.0)
+        return histogram
+
+
+class WindowedLatencyHistogram:
+    """Ring of per-slot histograms; reads merge the slots still inside the window."""
+
+    __slots__ = ("slot_seconds", "slots", "_epochs", "_histograms")
+
+    def __init__(self, slot_seconds: int = LATENCY_WINDOW_SLOT_SECONDS, slots: int = LATENCY_WINDOW_SLOTS) -> None:
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        self._epochs = [-1] * slots
+        self._histograms = [LatencyHistogram() for _ in range(slots)]
+
+    def record(self, duration_ms: float, now_ts: Optional[float] = None) -> None:
+        epoch = int((time.time() if now_ts is None else now_ts) // self.slot_seconds)
+        position = epoch % self.slots
+        if self._epochs[position] != epoch:
+            self._epochs[position] = epoch
+            self._histograms[position] = LatencyHistogram()
+        self._histograms[position].record(duration_ms)
+
+    def merged(self, window_seconds: int, now_ts: Optional[float] = None) -> LatencyHistogram:
+        epoch = int((time.time() if now_ts is None else now_ts) // self.slot_seconds)
+        oldest = epoch - max(1, math.ceil(window_seconds / self.slot_seconds)) + 1
+        merged = LatencyHistogram()
+        for slot_epoch, histogram in zip(self._epochs, self._histograms):
+            if oldest <= slot_epoch <= epoch:
+                merged.merge(histogram)
+        return merged
+
+
+_latency_by_endpoint: Dict[str, WindowedLatencyHistogram] = {}
 _slow_query_events_by_endpoint: Dict[str, deque] = {}
+_latency_by_route: Dict[Tuple[str, str, str], LatencyHistogram] = {}
 
 
 def get_slow_query_threshold_ms() -> int:
@@ -34,10 +156,9 @@ def classify_endpoint(path: str) -> str | None:
     return None
 
 
-def _get_endpoint_bucket(store: Dict[str, deque], endpoint: str) -> deque:
-    if endpoint not in store:
-        store[endpoint] = deque(maxlen=SLOW_QUERY_BUFFER_SIZE)
-    return store[endpoint]
+def status_class(status_code: int) -> str:
+    index = status_code // 100 - 1
+    return _STATUS_CLASSES[index] if 0 <= index < len(_STATUS_CLASSES) else "5xx"
 
 
 def _prune_events(events: deque, window_seconds: int) -> None:
@@ -47,21 +168,32 @@ def _prune_events(events: deque, window_seconds: int) -> None:
 
 
 def record_request_latency(endpoint: str, duration_ms: float) -> None:
-    bucket = _get_endpoint_bucket(_latency_events_by_endpoint, endpoint)
-    bucket.append({"ts": time.time(), "duration_ms": round(duration_ms, 2)})
+    histogram = _latency_by_endpoint.get(endpoint)
+    if histogram is None:
+        histogram = _latency_by_endpoint[endpoint] = WindowedLatencyHistogram()
+    histogram.record(duration_ms)
 
-    threshold = get_slow_query_threshold_ms()
-    if duration_ms >= threshold:
-        slow_bucket = _get_endpoint_bucket(_slow_query_events_by_endpoint, endpoint)
+    if duration_ms >= get_slow_query_threshold_ms():
+        slow_bucket = _slow_query_events_by_endpoint.get(endpoint)
+        if slow_bucket is None:
+            slow_bucket = _slow_query_events_by_endpoint[endpoint] = deque(maxlen=SLOW_QUERY_BUFFER_SIZE)
         slow_bucket.append({"ts": time.time(), "duration_ms": round(duration_ms, 2)})
 
 
-def _percentile(values: List[float], percentile: float) -> float | None:
-    if not values:
-        return None
-    values_sorted = sorted(values)
-    idx = int((percentile / 100) * (len(values_sorted) - 1))
-    return values_sorted[idx]
+def record_route_latency(route: str, method: str, status_code: int, duration_ms: float) -> None:
+    key = (route, method, status_class(status_code))
+    histogram = _latency_by_route.get(key)
+    if histogram is None:
+        if len(_latency_by_route) >= ROUTE_SERIES_MAX:
+            key = (OVERFLOW_ROUTE, method, key[2])
+            histogram = _latency_by_route.get(key)
+        if histogram is None:
+            histogram = _latency_by_route[key] = LatencyHistogram()
+    histogram.record(duration_ms)
+
+
+def _round_ms(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
 
 
 def get_slow_query_summary(window_seconds: int = SLOW_QUERY_WINDOW_SECONDS) -> Tuple[int, int]:
@@ -74,22 +206,71 @@ def get_slow_query_summary(window_seconds: int = SLOW_QUERY_WINDOW_SECONDS) -> T
 
 def get_endpoint_stats(window_seconds: int = SLOW_QUERY_WINDOW_SECONDS) -> List[Dict[str, Any]]:
     stats = []
-    for endpoint, bucket in _latency_events_by_endpoint.items():
-        _prune_events(bucket, window_seconds)
-        durations = [item["duration_ms"] for item in bucket]
-        p95 = _percentile(durations, 95)
+    for endpoint, windowed in _latency_by_endpoint.items():
+        histogram = windowed.merged(window_seconds)
         slow_bucket = _slow_query_events_by_endpoint.get(endpoint, deque())
         _prune_events(slow_bucket, window_seconds)
         stats.append(
             {
                 "endpoint": endpoint,
-                "p95_latency_ms": round(p95, 2) if p95 is not None else None,
+                "p50_latency_ms": _round_ms(histogram.quantile(0.50)),
+                "p95_latency_ms": _round_ms(histogram.quantile(0.95)),
+                "p99_latency_ms": _round_ms(histogram.quantile(0.99)),
+                "request_count": histogram.count,
                 "slow_query_count": len(slow_bucket),
             }
         )
     return stats
 
 
+def route_latency_histograms() -> Dict[Tuple[str, str, str], LatencyHistogram]:
+    return _latency_by_route
+
+
+def get_route_latency_stats(
+    histograms: Optional[Dict[Tuple[str, str, str], LatencyHistogram]] = None,
+) -> List[Dict[str, Any]]:
+    rows = []
+    for (route, method, status_group), histogram in (histograms or _latency_by_route).items():
+        rows.append(
+            {
+                "route": route,
+                "method": method,
+                "status_class": status_group,
+                "count": histogram.count,
+                "p50_latency_ms": _round_ms(histogram.quantile(0.50)),
+                "p95_latency_ms": _round_ms(histogram.quantile(0.95)),
+                "p99_latency_ms": _round_ms(histogram.quantile(0.99)),
+                "max_latency_ms": _round_ms(histogram.max_ms),
+            }
+        )
+    rows.sort(key=lambda row: row["count"], reverse=True)
+    return rows
+
+
+def latency_snapshot() -> Dict[str, Any]:
+    """Serializable copy of the per-route histograms, for cross-worker merging."""
+    return {
+        "series": [
+            [route, method, status_group, histogram.to_dict()]
+            for (route, method, status_group), histogram in list(_latency_by_route.items())
+        ]
+    }
+
+
+def merge_latency_snapshots(snapshots: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, str, str], LatencyHistogram]:
+    merged: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+    for snapshot in snapshots:
+        for route, method, status_group, payload in (snapshot or {}).get("series") or []:
+            key = (route, method, status_group)
+            histogram = LatencyHistogram.from_dict(payload)
+            if key in merged:
+                merged[key].merge(histogram)
+            else:
+                merged[key] = histogram
+    return merged
+
+
 def get_slow_query_events(window_seconds: int = SLOW_QUERY_WINDOW_SECONDS, limit: int = 50) -> List[Dict[str, Any]]:
     events: List[Dict[str, Any]] = []
     for endpoint, bucket in _slow_query_events_by_endpoint.items():
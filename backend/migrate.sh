@@ -2,9 +2,9 @@
 set -e
 
 echo "Starting deployment migration..."
-echo "Applying alembic upgrade head..."
+echo "Applying alembic upgrade head, schema fixes and seeds..."
 
-if alembic upgrade head; then
+if python scripts/bootstrap_db.py; then
     echo "Migration completed successfully."
 else
     echo "Migration FAILED. Aborting deployment."
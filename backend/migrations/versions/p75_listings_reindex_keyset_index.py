@@ -0,0 +1,30 @@
+"""add keyset index for search reindex scans
+
+Revision ID: p75_listings_reindex_keyset
+Revises: p74_layout_builder_foundation
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "p75_listings_reindex_keyset"
+down_revision: Union[str, Sequence[str], None] = "p74_layout_builder_foundation"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_listings_searchable_created_id
+        ON listings (created_at, id)
+        WHERE status IN ('published', 'active') AND deleted_at IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_listings_searchable_created_id")
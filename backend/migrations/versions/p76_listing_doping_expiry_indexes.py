@@ -0,0 +1,26 @@
+"""index doping expiry columns used by search re-projection
+
+Revision ID: p76_listing_doping_expiry_idx
+Revises: p75_listings_reindex_keyset
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "p76_listing_doping_expiry_idx"
+down_revision: Union[str, Sequence[str], None] = "p75_listings_reindex_keyset"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_listings_premium_until ON listings (premium_until)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_listings_showcase_expires_at ON listings (showcase_expires_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_listings_showcase_expires_at")
+    op.execute("DROP INDEX IF EXISTS ix_listings_premium_until")
@@ -0,0 +1,58 @@
+"""listings_search columns for the SQL search engine
+
+Revision ID: p77_listings_search_engine
+Revises: p76_listing_doping_expiry_idx
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "p77_listings_search_engine"
+down_revision: Union[str, Sequence[str], None] = "p76_listing_doping_expiry_idx"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        ALTER TABLE listings_search
+            ADD COLUMN IF NOT EXISTS category_path_ids uuid[],
+            ADD COLUMN IF NOT EXISTS is_featured boolean NOT NULL DEFAULT false,
+            ADD COLUMN IF NOT EXISTS is_urgent boolean NOT NULL DEFAULT false,
+            ADD COLUMN IF NOT EXISTS featured_until timestamptz,
+            ADD COLUMN IF NOT EXISTS urgent_until timestamptz,
+            ADD COLUMN IF NOT EXISTS premium_score integer NOT NULL DEFAULT 0,
+            ADD COLUMN IF NOT EXISTS latitude double precision,
+            ADD COLUMN IF NOT EXISTS longitude double precision
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_listings_search_category_path_gin "
+        "ON listings_search USING gin (category_path_ids)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_listings_search_rank_keyset "
+        "ON listings_search (status, country_code, premium_score, published_at, listing_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_listings_search_rank_keyset")
+    op.execute("DROP INDEX IF EXISTS ix_listings_search_category_path_gin")
+    op.execute(
+        """
+        ALTER TABLE listings_search
+            DROP COLUMN IF EXISTS longitude,
+            DROP COLUMN IF EXISTS latitude,
+            DROP COLUMN IF EXISTS premium_score,
+            DROP COLUMN IF EXISTS urgent_until,
+            DROP COLUMN IF EXISTS featured_until,
+            DROP COLUMN IF EXISTS is_urgent,
+            DROP COLUMN IF EXISTS is_featured,
+            DROP COLUMN IF EXISTS category_path_ids
+        """
+    )
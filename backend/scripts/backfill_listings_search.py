@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Backfill script for the listings_search projection table.
+
+Usage:
+  python /app/backend/scripts/backfill_listings_search.py --chunk-size 500
+  python /app/backend/scripts/backfill_listings_search.py --chunk-size 200 --max-rows 1000
+
+Each chunk is committed on its own; a full run (no --max-rows) also removes
+rows whose listing is no longer searchable.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app.core.database import AsyncSessionLocal
+from app.services.listings_search_projection import backfill_listings_search, measure_listings_search_lag
+
+
+async def run(chunk_size: int, max_rows: int | None) -> None:
+    started = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as session:
+        report = await backfill_listings_search(session, chunk_size=chunk_size, max_rows=max_rows)
+        lag = await measure_listings_search_lag(session)
+
+    ended = datetime.now(timezone.utc)
+    print(f"[LISTINGS_SEARCH_BACKFILL] rows={report['rows']} chunks={report['chunks']} purged={report['purged']}")
+    print(f"[LISTINGS_SEARCH_BACKFILL] chunk_size={chunk_size} max_rows={max_rows}")
+    print(f"[LISTINGS_SEARCH_BACKFILL] elapsed_seconds={report['elapsed_seconds']:.3f} rows_per_second={report['rows_per_second']}")
+    print(f"[LISTINGS_SEARCH_BACKFILL] stale={lag['stale']} missing={lag['missing']} orphaned={lag['orphaned']}")
+    print(f"[LISTINGS_SEARCH_BACKFILL] started_at={started.isoformat()} ended_at={ended.isoformat()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill listings into the listings_search table")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--max-rows", type=int, default=None)
+    args = parser.parse_args()
+
+    chunk_size = min(1000, max(25, args.chunk_size))
+    max_rows = args.max_rows if args.max_rows and args.max_rows > 0 else None
+    asyncio.run(run(chunk_size=chunk_size, max_rows=max_rows))
+
+
+if __name__ == "__main__":
+    main()
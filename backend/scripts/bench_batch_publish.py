@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Batch publish benchmark: drain N scheduled listings through the set-based engine.
+
+Usage:
+  python /app/backend/scripts/bench_batch_publish.py
+  python /app/backend/scripts/bench_batch_publish.py --listings 10000 --users 500 --limit 500
+  python /app/backend/scripts/bench_batch_publish.py --in-memory
+
+Seeds users, campaign items and pending listings inside one transaction,
+runs ticks of run_batch_publish until nothing is pending and rolls
+everything back. Reports per-tick throughput and statements per tick (the
+old loop issued a quote, sweeps and a commit per listing). `--in-memory`
+times only the quoting/planning step and needs no database.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.core.query_accounting import track_queries
+from app.models.moderation import Listing
+from app.models.pricing_campaign_item import PricingCampaignItem
+from app.models.user import User
+from app.services.batch_publish import PricingContext, plan_batch_publish, run_batch_publish
+
+
+def _user_type_of(owner) -> str:
+    return "corporate" if owner.user_type == "corporate" or owner.role == "dealer" else "individual"
+
+
+def bench_in_memory(listings: int, users: int) -> None:
+    now = datetime.now(timezone.utc)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    items = [
+        SimpleNamespace(
+            id=uuid.uuid4(), scope=scope, listing_type=listing_type, name="bench", listing_quota=quota,
+            price_amount=0, currency="EUR", publish_days=30, is_deleted=False,
+        )
+        for scope in ("individual", "corporate")
+        for listing_type, quota in (("showcase", 3), ("free", 0))
+    ]
+    context = PricingContext(
+        user_types={user_id: ("corporate" if index % 5 == 0 else "individual") for index, user_id in enumerate(user_ids)},
+        subscriptions={},
+        campaign_items={scope: [item for item in items if item.scope == scope] for scope in ("individual", "corporate")},
+        items_by_id={item.id: item for item in items},
+        consumed_slots={},
+        snapshots={},
+    )
+    pending = [(uuid.uuid4(), user_ids[index % users]) for index in range(listings)]
+    started = time.perf_counter()
+    plan = plan_batch_publish(pending, context, now=now)
+    elapsed = time.perf_counter() - started
+    print(
+        f"in-memory listings={listings} published={plan.published} groups={len(plan.groups)} "
+        f"snapshots={len(plan.new_snapshots)} seconds={elapsed:.3f} listings_per_s={listings / elapsed:.0f}"
+    )
+
+
+async def _seed(session: AsyncSession, listings: int, users: int) -> None:
+    now = datetime.now(timezone.utc)
+    tag = uuid.uuid4().hex[:8]
+    user_rows = [
+        {
+            "id": uuid.uuid4(),
+            "email": f"bench-batch-publish-{tag}-{index}@example.invalid",
+            "hashed_password": "x",
+            "full_name": "Batch Publish Bench",
+            "role": "individual",
+            "user_type": "corporate" if index % 5 == 0 else "individual",
+        }
+        for index in range(users)
+    ]
+    await session.execute(insert(User), user_rows)
+    await session.execute(
+        insert(PricingCampaignItem),
+        [
+            {
+                "id": uuid.uuid4(), "scope": scope, "listing_type": listing_type, "name": f"bench {tag}",
+                "listing_quota": quota, "price_amount": 0, "currency": "EUR", "publish_days": 30,
+                "is_active": True, "start_at": now - timedelta(days=1), "end_at": now + timedelta(days=1),
+            }
+            for scope in ("individual", "corporate")
+            for listing_type, quota in (("showcase", 3), ("free", 0))
+        ],
+    )
+    listing_rows = [
+        {
+            "id": uuid.uuid4(),
+            "title": f"bench listing {index}",
+            "module": "other",
+            "category_id": uuid.uuid4(),
+            "country": "DE",
+            "user_id": user_rows[index % users]["id"],
+            "status": "pending_moderation",
+            "created_at": now - timedelta(seconds=listings - index),
+        }
+        for index in range(listings)
+    ]
+    for start in range(0, len(listing_rows), 1000):
+        await session.execute(insert(Listing), listing_rows[start:start + 1000])
+    await session.flush()
+
+
+async def bench_database(listings: int, users: int, limit: int) -> None:
+    async with engine.connect() as conn:
+        outer = await conn.begin()
+        session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        try:
+            await _seed(session, listings, users)
+            ticks = []
+            total_started = time.perf_counter()
+            while True:
+                with track_queries() as queries:
+                    result = await run_batch_publish(session, user_type_of=_user_type_of, limit=limit)
+                if not result["processed"]:
+                    break
+                ticks.append((result, queries.count))
+            elapsed = time.perf_counter() - total_started
+        finally:
+            await session.close()
+            await outer.rollback()
+
+    published = sum(result["published"] for result, _ in ticks)
+    rates = [result["listings_per_second"] for result, _ in ticks if result["listings_per_second"]]
+    print(
+        f"database listings={listings} users={users} limit={limit} ticks={len(ticks)} published={published} "
+        f"seconds={elapsed:.2f} listings_per_s={published / elapsed:.0f}"
+    )
+    if ticks:
+        print(
+            f"per tick: median_ms={statistics.median(result['duration_ms'] for result, _ in ticks):.1f} "
+            f"median_listings_per_s={statistics.median(rates):.0f} "
+            f"statements={max(count for _, count in ticks)} (max)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listings", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--in-memory", action="store_true")
+    args = parser.parse_args()
+
+    if args.in_memory:
+        bench_in_memory(args.listings, args.users)
+    else:
+        asyncio.run(bench_database(args.listings, args.users, args.limit))
+
+
+if __name__ == "__main__":
+    main()
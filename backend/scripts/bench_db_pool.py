@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Stress benchmark: sustained query throughput at a fixed connection budget.
+
+Usage:
+  python /app/backend/scripts/bench_db_pool.py
+  python /app/backend/scripts/bench_db_pool.py --budget 30 --concurrency 200 --duration 20 --query-ms 5
+
+`shared` runs every worker against one pool holding the whole budget (the
+registry in app.core.database). `split` replays the previous layout, two
+engines with half the budget each while `--split-traffic` of the load goes
+to the second one, as server.py routes did. Both report
+queries/s plus checkout latency, wait-queue depth and pool timeouts.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import ASYNC_DATABASE_URL, DB_POOL_RECYCLE, connect_args
+from app.core.db_pool import InstrumentedAsyncQueuePool, attach_pool_telemetry, pool_status
+
+
+def _engine(name: str, budget: int, pool_timeout: float):
+    engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=max(1, budget // 3),
+        max_overflow=budget - max(1, budget // 3),
+        pool_timeout=pool_timeout,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+    attach_pool_telemetry(engine, name)
+    return engine
+
+
+async def _worker(engine, statement, deadline: float, counts: dict) -> None:
+    while time.perf_counter() < deadline:
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(statement)
+            counts["ok"] += 1
+        except PoolTimeoutError:
+            counts["timeouts"] += 1
+
+
+async def run(label: str, engines: list, args, second_share: float = 0.0) -> None:
+    statement = text(f"SELECT pg_sleep({args.query_ms / 1000})")
+    counts = {"ok": 0, "timeouts": 0}
+    deadline = time.perf_counter() + args.duration
+    started = time.perf_counter()
+    await asyncio.gather(
+        *[
+            _worker(engines[1 if index < args.concurrency * second_share else 0], statement, deadline, counts)
+            for index in range(args.concurrency)
+        ]
+    )
+    elapsed = time.perf_counter() - started
+    print(f"{label:<7} {counts['ok'] / elapsed:>9,.0f} q/s  timeouts={counts['timeouts']}")
+    for engine in engines:
+        status = pool_status(engine)
+        print(
+            f"  pool={status['pool']:<8} size={status['size']}+{status['max_overflow']} "
+            f"checkout_p50={status['checkout_p50_ms']}ms p99={status['checkout_p99_ms']}ms "
+            f"max_waiting={status['max_waiting']} waits={status['waits']}"
+        )
+        await engine.dispose()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=int, default=30, help="connections per worker process")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--query-ms", type=float, default=5.0)
+    parser.add_argument("--pool-timeout", type=float, default=5.0)
+    parser.add_argument("--split-traffic", type=float, default=0.8, help="share of load on the second split pool")
+    args = parser.parse_args()
+
+    print(f"budget={args.budget} concurrency={args.concurrency} duration={args.duration}s query={args.query_ms}ms")
+    await run("shared", [_engine("shared", args.budget, args.pool_timeout)], args)
+    half = max(1, args.budget // 2)
+    await run(
+        "split",
+        [_engine("core", half, args.pool_timeout), _engine("server", args.budget - half, args.pool_timeout)],
+        args,
+        args.split_traffic,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for response serialization: stdlib JSONResponse vs FastJSONResponse.
+
+Usage:
+  python /app/backend/scripts/bench_json_response.py
+  python /app/backend/scripts/bench_json_response.py --rounds 500 --scale 2
+
+Payloads mimic the ten largest response shapes served by the API. The
+`*_us` columns include jsonable_encoder, which FastAPI runs before render()
+for plain return values; `direct_us` is a route returning FastJSONResponse
+itself, which skips the encoder.
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.json_response import FastJSONResponse
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def _hit(index: int) -> dict:
+    return {
+        "listing_id": str(uuid.uuid4()),
+        "title": f"BMW 320d Touring M Sport {index}",
+        "description": "Scheckheftgepflegt, unfallfrei, 8-fach bereift. " * 4,
+        "price": 18500.0 + index,
+        "currency": "EUR",
+        "city": "Berlin",
+        "image": f"https://cdn.example.com/listings/{index}/0.jpg",
+        "category_path_ids": [str(uuid.uuid4()) for _ in range(3)],
+        "premium_score": 900,
+        "is_featured": index % 3 == 0,
+        "published_at": (NOW - timedelta(hours=index)).isoformat(),
+        "attribute_flat_map": {"fuel": "diesel", "km": 90000 + index, "gear": "automatic", "color": "black"},
+        "_geo": {"lat": 52.5, "lng": 13.4},
+    }
+
+
+def _category(depth: int, width: int) -> dict:
+    node = {
+        "id": uuid.uuid4(),
+        "slug": {"tr": "vasita", "de": "fahrzeuge", "fr": "vehicules"},
+        "name": {"tr": "Vasıta", "de": "Fahrzeuge", "fr": "Véhicules"},
+        "sort_order": width,
+        "is_enabled": True,
+        "listing_count": 1234,
+        "updated_at": NOW,
+    }
+    if depth > 0:
+        node["children"] = [_category(depth - 1, width) for _ in range(width)]
+    return node
+
+
+def build_shapes(scale: int) -> dict:
+    return {
+        "search_v2": {
+            "items": [_hit(i) for i in range(24 * scale)],
+            "facets": {f"attribute_{name}": {str(v): v * 3 for v in range(40)} for name in ("fuel", "gear", "color", "body")},
+            "facet_stats": {"attribute_km": {"min": 10.0, "max": 350000.0}},
+            "pagination": {"total": 18234, "page": 1, "limit": 24, "next_cursor": "eyJrIjpbMV19"},
+        },
+        "admin_dashboard_summary": {
+            "kpis": {f"kpi_{i}": {"value": Decimal("1234.56") * i, "delta": 0.12, "series": list(range(30))} for i in range(40 * scale)},
+            "generated_at": NOW,
+        },
+        "admin_country_compare": {
+            "items": [
+                {
+                    "country": code,
+                    "revenue": Decimal("98765.43"),
+                    "listings": 12000,
+                    "daily": [{"date": (NOW - timedelta(days=d)).date(), "revenue": Decimal("321.10"), "orders": d} for d in range(30)],
+                }
+                for code in ("DE", "TR", "FR", "AT", "CH", "NL", "BE", "PL") * scale
+            ]
+        },
+        "categories_tree": {"items": [_category(3, 4) for _ in range(3 * scale)]},
+        "ui_config": {
+            "config": {
+                f"section_{i}": {"widgets": [{"id": uuid.uuid4(), "type": "banner", "props": {"title": "x" * 40, "order": j}} for j in range(20)]}
+                for i in range(15 * scale)
+            },
+            "version": 42,
+            "published_at": NOW,
+        },
+        "listing_detail": {
+            "listing": {**_hit(0), "images": [f"https://cdn.example.com/{i}.jpg" for i in range(30)], "attributes": {f"a{i}": i for i in range(80)}},
+            "seller": {"id": uuid.uuid4(), "name": "Autohaus", "since": NOW},
+            "similar": [_hit(i) for i in range(12 * scale)],
+        },
+        "admin_listings_page": {
+            "items": [
+                {"id": uuid.uuid4(), "title": f"Listing {i}", "status": "published", "price": Decimal("999.00"), "created_at": NOW, "user": {"id": uuid.uuid4(), "email": f"u{i}@example.com"}}
+                for i in range(100 * scale)
+            ],
+            "total": 51234,
+        },
+        "admin_audit_logs": {
+            "items": [
+                {"id": uuid.uuid4(), "action": "UPDATE", "resource_type": "listing", "created_at": NOW, "metadata": {"before": {"status": "draft"}, "after": {"status": "published"}}}
+                for _ in range(200 * scale)
+            ]
+        },
+        "search_suggest": {"items": [{"label": f"bmw 3 series {i}", "count": i, "category_id": uuid.uuid4()} for i in range(20 * scale)]},
+        "meili_sync_jobs": {
+            "items": [
+                {"id": str(uuid.uuid4()), "listing_id": str(uuid.uuid4()), "status": "done", "attempts": 1, "created_at": NOW.isoformat(), "last_error": None}
+                for _ in range(500 * scale)
+            ],
+            "metrics": {"done": 10_000, "retry": 3},
+        },
+    }
+
+
+def _measure(response_class, payload, rounds: int, encode: bool = True) -> tuple[float, int]:
+    started = time.perf_counter()
+    body = b""
+    for _ in range(rounds):
+        body = response_class(jsonable_encoder(payload) if encode else payload).body
+    return (time.perf_counter() - started) / rounds, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare response serialization cost")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+
+    rounds = max(1, args.rounds)
+    print(f"{'shape':<26}{'bytes':>10}{'stdlib_us':>12}{'fast_us':>12}{'direct_us':>12}{'speedup':>10}")
+    for name, payload in build_shapes(max(1, args.scale)).items():
+        before, size = _measure(JSONResponse, payload, rounds)
+        after, _ = _measure(FastJSONResponse, payload, rounds)
+        direct, _ = _measure(FastJSONResponse, payload, rounds, encode=False)
+        print(
+            f"{name:<26}{size:>10}{before * 1e6:>12.1f}{after * 1e6:>12.1f}{direct * 1e6:>12.1f}"
+            f"{before / direct:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
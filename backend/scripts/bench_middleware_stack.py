@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Per-request overhead of the HTTP middleware stack, before and after the move
+from @app.middleware("http") functions to pure ASGI classes.
+
+Usage:
+  python /app/backend/scripts/bench_middleware_stack.py
+  python /app/backend/scripts/bench_middleware_stack.py --requests 20000
+
+Each variant serves a trivial endpoint through httpx's in-process ASGI
+transport; `overhead_us` is the mean cost on top of the bare app.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.middleware.rbac_middleware import RbacHardLockMiddleware, is_admin_path
+from app.middleware.request_guards import (
+    CONTENT_SECURITY_POLICY,
+    FailSafeResponseGuardMiddleware,
+    RequestMetricsMiddleware,
+)
+from app.utils.monitoring import classify_endpoint, record_request_latency
+
+
+def _bare_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def build_legacy_app() -> FastAPI:
+    """The previous stack: three BaseHTTPMiddleware-backed functions."""
+    app = _bare_app()
+
+    @app.middleware("http")
+    async def fail_safe_response_guard(request: Request, call_next):
+        try:
+            response = await call_next(request)
+            if response is None:
+                return JSONResponse(status_code=500, content={"error_code": "MIDDLEWARE_RESPONSE_NONE"})
+            return response
+        except Exception:
+            return JSONResponse(status_code=500, content={"error_code": "MIDDLEWARE_GUARD_ERROR"})
+
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        start_ts = time.perf_counter()
+        response = await call_next(request)
+        duration_ms = (time.perf_counter() - start_ts) * 1000
+        endpoint_group = classify_endpoint(request.url.path)
+        if endpoint_group:
+            record_request_latency(endpoint_group, duration_ms)
+        response.headers["X-Response-Time-ms"] = f"{duration_ms:.2f}"
+        response.headers["Content-Security-Policy"] = CONTENT_SECURITY_POLICY
+        return response
+
+    @app.middleware("http")
+    async def rbac_hard_lock(request: Request, call_next):
+        if not is_admin_path(request.url.path):
+            return await call_next(request)
+        return JSONResponse(status_code=404, content={"detail": "Not found"})
+
+    return app
+
+
+def build_asgi_app() -> FastAPI:
+    app = _bare_app()
+
+    async def _no_user(request):
+        return None
+
+    async def _no_audit(request, actor, action, metadata):
+        return None
+
+    app.add_middleware(FailSafeResponseGuardMiddleware)
+    app.add_middleware(RequestMetricsMiddleware)
+    app.add_middleware(
+        RbacHardLockMiddleware,
+        match_route=lambda request, path: None,
+        resolve_user=_no_user,
+        write_audit_log=_no_audit,
+    )
+    return app
+
+
+async def _measure(app: FastAPI, requests: int) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(200):
+            await client.get("/api/ping")
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/api/ping")
+        return (time.perf_counter() - started) / requests
+
+
+async def run(requests: int) -> None:
+    bare = await _measure(_bare_app(), requests)
+    print(f"{'stack':<14}{'us_per_req':>12}{'overhead_us':>14}")
+    print(f"{'bare':<14}{bare * 1e6:>12.1f}{0.0:>14.1f}")
+    for name, factory in (("legacy_http", build_legacy_app), ("pure_asgi", build_asgi_app)):
+        per_request = await _measure(factory(), requests)
+        print(f"{name:<14}{per_request * 1e6:>12.1f}{(per_request - bare) * 1e6:>14.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark middleware stack overhead")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(max(1, args.requests)))
+
+
+if __name__ == "__main__":
+    main()
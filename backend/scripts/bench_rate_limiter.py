@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for rate limit decisions per second.
+
+Usage:
+  python /app/backend/scripts/bench_rate_limiter.py
+  python /app/backend/scripts/bench_rate_limiter.py --hits 200000 --keys 20000
+  REDIS_URL=redis://localhost:6379/0 python /app/backend/scripts/bench_rate_limiter.py --redis
+
+`legacy` replays the previous per-key timestamp list limiter, `local` is the
+GCRA pre-check alone and `redis` is the full decision path (local + Lua).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app.core import rate_limit
+from app.core.redis_cache import cache_service
+
+
+def _legacy_hit(store: dict, key: str, limit: int, window_seconds: int) -> bool:
+    now = time.time()
+    valid_history = [t for t in store.get(key, []) if t > now - window_seconds]
+    if len(valid_history) >= limit:
+        return False
+    valid_history.append(now)
+    store[key] = valid_history
+    if len(store) > 10000:
+        store.clear()
+    return True
+
+
+def _keys(count: int, hits: int) -> list:
+    rng = random.Random(7)
+    return [f"user:{rng.randrange(count)}" for _ in range(hits)]
+
+
+def bench_legacy(keys: list, limit: int, window_seconds: int) -> float:
+    store: dict = {}
+    started = time.perf_counter()
+    for key in keys:
+        _legacy_hit(store, key, limit, window_seconds)
+    return len(keys) / (time.perf_counter() - started)
+
+
+async def bench_limiter(keys: list, limit: int, window_seconds: int) -> float:
+    rate_limit._rate_limit_store.clear()
+    limiter = rate_limit.RateLimiter(limit, window_seconds, scope="bench")
+    started = time.perf_counter()
+    for key in keys:
+        await limiter.hit(key)
+    return len(keys) / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hits", type=int, default=100000)
+    parser.add_argument("--keys", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=60)
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--redis", action="store_true", help="also measure the Redis path (needs REDIS_URL)")
+    args = parser.parse_args()
+
+    keys = _keys(args.keys, args.hits)
+    print(f"hits={args.hits} keys={args.keys} limit={args.limit}/{args.window}s")
+    print(f"legacy  {bench_legacy(keys, args.limit, args.window):>12,.0f} decisions/s")
+
+    redis_client = cache_service.client
+    cache_service.client = None
+    try:
+        print(f"local   {await bench_limiter(keys, args.limit, args.window):>12,.0f} decisions/s")
+    finally:
+        cache_service.client = redis_client
+
+    if args.redis:
+        if not os.environ.get("REDIS_URL"):
+            print("redis   skipped (REDIS_URL not set)")
+            return
+        await cache_service.connect()
+        if not cache_service.client:
+            print("redis   skipped (connection failed)")
+            return
+        redis_keys = keys[: min(len(keys), 20000)]
+        print(f"redis   {await bench_limiter(redis_keys, args.limit, args.window):>12,.0f} decisions/s")
+        await cache_service.clear_by_pattern(f"{rate_limit.RATE_LIMIT_KEY_PREFIX}:bench:*")
+        await cache_service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
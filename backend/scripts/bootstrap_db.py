@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+One-shot database bootstrap: Alembic head, missing tables/columns and default seeds.
+
+Usage:
+  python /app/backend/scripts/bootstrap_db.py
+  python /app/backend/scripts/bootstrap_db.py --verify-only
+
+Runs under a Postgres advisory lock, so concurrent deploys bootstrap one at a
+time and the later ones find nothing to do. Workers no longer run any of this;
+they only check the schema version on startup.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from app.core.bootstrap import verify_schema_version
+from app.core.database import dispose_engines, engine
+
+
+async def run(verify_only: bool) -> int:
+    started = time.perf_counter()
+    try:
+        if not verify_only:
+            from server import bootstrap_database
+
+            await bootstrap_database()
+        state = await verify_schema_version(engine, mode="strict")
+    finally:
+        await dispose_engines()
+    print(f"[DB_BOOTSTRAP] schema={state} elapsed_seconds={time.perf_counter() - started:.2f}")
+    return 0 if state == "ok" else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verify-only", action="store_true", help="only compare the database with the Alembic head")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.verify_only)))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Worker cold start: time from process spawn until /api/health answers.
+
+Usage:
+  python /app/backend/scripts/measure_cold_start.py
+  python /app/backend/scripts/measure_cold_start.py --workers 4 --rounds 3
+
+`before` starts the workers with DB_BOOTSTRAP_ON_STARTUP=true, i.e. every
+worker runs the schema DDL and seeds like the old lifespan did; `after` is
+the default, where workers only verify the schema version. `--workers`
+processes start at once to reproduce a rolling restart. Needs a reachable
+DATABASE_URL that is already bootstrapped.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _ready(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+def measure(bootstrap_on_startup: bool, workers: int, timeout: float) -> list:
+    env = {**os.environ, "DB_BOOTSTRAP_ON_STARTUP": "true" if bootstrap_on_startup else "false"}
+    ports = [_free_port() for _ in range(workers)]
+    started = time.perf_counter()
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=ROOT_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for port in ports
+    ]
+    ready_at = {}
+    try:
+        while len(ready_at) < workers and time.perf_counter() - started < timeout:
+            for port in ports:
+                if port not in ready_at and _ready(port):
+                    ready_at[port] = time.perf_counter() - started
+            time.sleep(0.05)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+    return [ready_at.get(port) for port in ports]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"workers={args.workers} rounds={args.rounds}")
+    for label, bootstrap_on_startup in (("before", True), ("after", False)):
+        samples = []
+        failed = 0
+        for _ in range(args.rounds):
+            for seconds in measure(bootstrap_on_startup, args.workers, args.timeout):
+                if seconds is None:
+                    failed += 1
+                else:
+                    samples.append(seconds)
+        if samples:
+            print(
+                f"{label:<7} median={statistics.median(samples):.2f}s max={max(samples):.2f}s "
+                f"ready={len(samples)} not_ready={failed}"
+            )
+        else:
+            print(f"{label:<7} no worker became ready within {args.timeout:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
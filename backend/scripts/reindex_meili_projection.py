@@ -5,6 +5,9 @@ Bulk reindex script for Meilisearch projection.
 Usage:
   python /app/backend/scripts/reindex_meili_projection.py --chunk-size 250 --reset-index
   python /app/backend/scripts/reindex_meili_projection.py --chunk-size 200 --max-docs 1000
+
+--reset-index builds a shadow index and swaps it in, so the live index is
+never empty while the rebuild runs.
 """
 
 import argparse
@@ -18,31 +21,33 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 from app.core.database import AsyncSessionLocal
-from app.services.meilisearch_index import (
-    bulk_reindex_search_projection,
-    get_active_meili_runtime,
-    meili_clear_documents,
-)
+from app.services.meilisearch_index import close_meili_clients, get_active_meili_runtime
+from app.services.meilisearch_reindex import blue_green_reindex, reindex_search_projection
 
 
-async def run(chunk_size: int, max_docs: int | None, reset_index: bool) -> None:
+async def run(chunk_size: int, max_docs: int | None, reset_index: bool, in_flight: int) -> None:
     started = datetime.now(timezone.utc)
-    async with AsyncSessionLocal() as session:
-        runtime = await get_active_meili_runtime(session)
-        if reset_index:
-            await meili_clear_documents(runtime)
-
-        count, elapsed = await bulk_reindex_search_projection(
-            session=session,
-            chunk_size=chunk_size,
-            max_docs=max_docs,
-        )
+    options = {
+        "chunk_size": chunk_size,
+        "max_docs": max_docs,
+        "in_flight": in_flight,
+    }
+    try:
+        async with AsyncSessionLocal() as session:
+            runtime = await get_active_meili_runtime(session)
+            if reset_index:
+                report = await blue_green_reindex(session, runtime, **options)
+            else:
+                report = await reindex_search_projection(session, runtime, **options)
+    finally:
+        await close_meili_clients()
 
     ended = datetime.now(timezone.utc)
-    print("[MEILI_REINDEX] status=done")
-    print(f"[MEILI_REINDEX] index_name={runtime['index_name']} url={runtime['url']}")
-    print(f"[MEILI_REINDEX] docs_indexed={count} chunk_size={chunk_size} max_docs={max_docs}")
-    print(f"[MEILI_REINDEX] elapsed_seconds={elapsed:.3f}")
+    print(f"[MEILI_REINDEX] status={'done' if not report['failed_tasks'] else 'failed_tasks'}")
+    print(f"[MEILI_REINDEX] index_name={runtime['index_name']} url={runtime['url']} swapped={bool(report.get('swapped'))}")
+    print(f"[MEILI_REINDEX] docs_indexed={report['docs_indexed']} batches={report['batches']} chunk_size={chunk_size} max_docs={max_docs}")
+    print(f"[MEILI_REINDEX] in_flight={in_flight} failed_tasks={len(report['failed_tasks'])}")
+    print(f"[MEILI_REINDEX] elapsed_seconds={report['elapsed_seconds']:.3f} docs_per_second={report['docs_per_second']}")
     print(f"[MEILI_REINDEX] started_at={started.isoformat()} ended_at={ended.isoformat()}")
 
 
@@ -51,11 +56,19 @@ def main() -> None:
     parser.add_argument("--chunk-size", type=int, default=200)
     parser.add_argument("--max-docs", type=int, default=None)
     parser.add_argument("--reset-index", action="store_true")
+    parser.add_argument("--in-flight", type=int, default=4)
     args = parser.parse_args()
 
     chunk_size = min(1000, max(25, args.chunk_size))
     max_docs = args.max_docs if args.max_docs and args.max_docs > 0 else None
-    asyncio.run(run(chunk_size=chunk_size, max_docs=max_docs, reset_index=args.reset_index))
+    asyncio.run(
+        run(
+            chunk_size=chunk_size,
+            max_docs=max_docs,
+            reset_index=args.reset_index,
+            in_flight=max(1, args.in_flight),
+        )
+    )
 
 
 if __name__ == "__main__":
@@ -5,6 +5,7 @@ import re
 import io
 import csv
 import base64
+import hmac
 from copy import deepcopy
 import urllib.request
 import urllib.parse
@@ -14,7 +15,6 @@ import xml.etree.ElementTree as ET
 import hashlib
 import secrets
 import logging
-import ssl
 from collections import defaultdict, deque
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
@@ -40,7 +40,6 @@ from PIL import Image
 from fastapi import FastAPI, APIRouter, Depends, HTTPException, Request, Body, Response, Query, WebSocket, WebSocketDisconnect, Header
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
-from starlette.routing import Match
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
 from alembic.config import Config as AlembicConfig
@@ -52,8 +51,8 @@ from emergentintegrations.payments.stripe.checkout import (
     CheckoutStatusResponse,
 )
 from sqlalchemy.exc import IntegrityError, DBAPIError, OperationalError, TimeoutError as SATimeoutError
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy import select, func, case, distinct, String, Text, DateTime, ForeignKey, desc, asc, and_, or_, update, text, cast, event, delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, func, case, distinct, String, Text, DateTime, ForeignKey, desc, asc, and_, or_, update, text, cast, delete
 from sqlalchemy.orm import Mapped, mapped_column, selectinload
 from sqlalchemy.dialects.postgresql import UUID as PGUUID, JSONB
 from sqlalchemy.dialects.postgresql.asyncpg import AsyncAdapt_asyncpg_dbapi
@@ -79,7 +78,7 @@ from app.core.security import (
 from app.repositories.auth_repository import SqlAuthRepository
 from app.repositories.applications_repository import SqlApplicationsRepository
 from app.admin_country_context import resolve_admin_country_context
-from app.core.rate_limit import RateLimiter
+from app.core.rate_limit import RateLimitDecision, RateLimiter, client_ip, ip_identity, rate_limit_stats
 
 from app.dependencies import (
     get_current_user,
@@ -121,10 +120,16 @@ from app.models.consumer_profile import ConsumerProfile
 from app.models.auth import UserCredential, EmailVerificationToken
 from app.utils.slug import slugify
 from app.utils.monitoring import (
-    classify_endpoint,
     get_endpoint_stats,
+    get_route_latency_stats,
     get_slow_query_summary,
-    record_request_latency,
+)
+from app.utils.metrics_export import (
+    latency_snapshot_publisher_loop,
+    merged_route_latency,
+    render_pool_metrics,
+    render_prometheus,
+    render_scheduler_metrics,
 )
 from app.models.dealer_listing import DealerListing
 from app.models.moderation import Listing, ModerationAction, ModerationItem
@@ -204,16 +209,108 @@ from app.services.meilisearch_config import (
     test_and_prepare_meili_index,
 )
 from app.services.meilisearch_index import (
-    bulk_reindex_search_projection,
+    close_meili_clients,
     get_active_meili_runtime,
-    meili_clear_documents,
+    invalidate_meili_runtime,
+    meili_runtime_invalidation_listener,
+    meili_client_pool_stats,
     meili_index_stats,
     meili_search_documents,
-    meili_update_filterable_attributes,
-    meili_update_sortable_attributes,
-    stable_numeric_id,
-    sync_listing_to_meili,
 )
+from app.services.doping_expiry_projection import (
+    DOPING_EXPIRY_BUCKET_SECONDS,
+    doping_expiry_stats,
+    run_doping_expiry_projection,
+)
+from app.services.listings_search_projection import (
+    LISTINGS_SEARCH_LAG_CHECK_SECONDS,
+    backfill_listings_search,
+    listings_search_projection_stats,
+    run_listings_search_lag_check,
+)
+from app.services.meilisearch_reindex import blue_green_reindex, reindex_search_projection
+from app.services.search_sync_pipeline import (
+    enqueue_search_sync_jobs,
+    process_search_sync_batch,
+    search_sync_pipeline_stats,
+    search_sync_worker_loop,
+)
+from app.services.meilisearch_settings_reconciler import (
+    MEILI_SETTINGS_RECONCILE_INTERVAL_SECONDS,
+    load_meili_settings_reconciler_state,
+    meili_settings_reconcile_wake_event,
+    meili_settings_wake_listener,
+    reconcile_meili_settings,
+    request_meili_settings_reconcile,
+    run_meili_settings_reconcile,
+)
+from app.services.search_geo import parse_bbox_param, parse_geo_radius_params
+from app.services.search_facet_cache import facet_cache_stats, search_with_cached_facets
+from app.services.search_suggest_cache import (
+    SUGGEST_CANDIDATE_POOL,
+    candidates_from_hits,
+    lookup_suggest_candidates,
+    rank_suggest_items,
+    store_suggest_candidates,
+    suggest_cache_stats,
+)
+from app.services.search_taxonomy import get_taxonomy_snapshot, taxonomy_invalidation_listener, taxonomy_snapshot_stats
+from app.services.sql_search_engine import (
+    SEARCH_SQL_FALLBACK_ENABLED,
+    is_meili_search_bad_request,
+    meili_search_breaker_open,
+    record_meili_search_failure,
+    record_meili_search_success,
+    sql_search_documents,
+    sql_search_engine_stats,
+)
+from app.core.compression import get_precompressed, precompressed_cache_stats, precompressed_response, store_precompressed
+from app.core.json_response import FastJSONResponse, dumps_json
+from app.middleware.compression_middleware import CompressionMiddleware
+from app.middleware.rbac_middleware import RbacHardLockMiddleware, get_admin_route_table, is_admin_path, match_admin_route
+from app.middleware.request_guards import FailSafeResponseGuardMiddleware, RequestMetricsMiddleware
+from app.middleware.query_accounting_middleware import QueryAccountingMiddleware
+from app.core.query_accounting import QUERY_DEBUG_HEADERS
+from app.jobs.expiry_worker import EXPIRY_JOB_INTERVAL_SECONDS, run_expiry_job
+from app.services.pricing_catalog import (
+    CatalogCampaignItem,
+    CatalogPackage,
+    CatalogPolicy,
+    get_pricing_catalog,
+    pricing_catalog_invalidation_listener,
+    pricing_catalog_stats,
+)
+from app.services.batch_publish import (
+    BATCH_PUBLISH_LIMIT_PER_RUN,
+    recent_batch_publish_runs,
+    record_batch_publish_run,
+    run_batch_publish,
+)
+from app.services.pricing_quote import (
+    build_pricing_snapshot,
+    campaign_item_quote,
+    listing_type_values,
+    no_campaign_quote,
+    pick_campaign_item,
+    quota_quote,
+    snapshot_duration_days,
+)
+from app.core.scheduler import SCHEDULER_MODE, ScheduledJob, Scheduler
+from app.core.bootstrap import DB_BOOTSTRAP_ON_STARTUP, bootstrap_lock, upgrade_schema_to_head, verify_schema_version
+from app.core.database import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    dispose_engines,
+    engine as sql_engine,
+    engines,
+    health_engine as health_sql_engine,
+    pool_stats,
+    session_class,
+    use_read_replica,
+)
+from app.core.redis_cache import cache_service
+from app.core.principal_cache import principal_invalidation_listener, resolve_principal
+from app.services.audit_writer import audit_log_writer, build_audit_row
 from app.routers.ui_designer_routes import router as ui_designer_router
 from app.routers.system import health_routes as system_health_routes
 from app.routers.system import ops_routes as system_ops_routes
@@ -230,7 +327,7 @@ from app.routers import layout_builder_routes
 
 
 from fastapi import UploadFile, File, BackgroundTasks, Form
-from fastapi.responses import FileResponse, StreamingResponse, JSONResponse, RedirectResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse, PlainTextResponse, RedirectResponse
 
 from app.vehicle_publish_guard import validate_publish, validate_listing_schema
 from app.vehicle_media_storage import store_image, resolve_public_media_path
@@ -264,8 +361,6 @@ CATEGORY_BULK_JOB_CLAIM_TTL_SECONDS = 120
 CATEGORY_BULK_JOB_RETRY_BASE_SECONDS = 30
 CATEGORY_BULK_JOB_WORKER_INTERVAL_SECONDS = 3
 BATCH_PUBLISH_INTERVAL_SECONDS = 300
-BATCH_PUBLISH_LIMIT_PER_RUN = 25
-BATCH_PUBLISH_RUN_EVENTS = deque(maxlen=50)
 ATTRIBUTE_KEY_PATTERN = re.compile(r"^[a-z0-9_]+$")
 VAT_ID_PATTERN = re.compile(r"^[A-Z]{2}[A-Z0-9]{6,12}$")
 
@@ -289,26 +384,11 @@ BILLING_AUDIT_ACTIONS = {
 
 _failed_login_attempts: Dict[str, List[float]] = {}
 _failed_login_blocked_until: Dict[str, float] = {}
-_meili_settings_last_sync_ts: float = 0.0
-_meili_settings_sync_inflight: bool = False
-_meili_settings_sync_queue: Optional[asyncio.Queue] = None
-_meili_settings_sync_consecutive_failures: int = 0
-_meili_settings_last_error: Optional[str] = None
-_meili_settings_last_error_ts: Optional[str] = None
-_meili_settings_last_success_ts: Optional[str] = None
-_meili_circuit_open_until_ts: float = 0.0
 _audit_perf_indexes_ready: bool = False
 _permissions_query_indexes_ready: bool = False
 _audit_list_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
 _audit_list_cache_ttl_seconds: int = 600
 
-MEILI_SETTINGS_SYNC_INTERVAL_SECONDS = 300
-MEILI_SETTINGS_RETRY_ATTEMPTS = 3
-MEILI_SETTINGS_RETRY_BASE_SECONDS = 1.0
-MEILI_SETTINGS_RETRY_MAX_SECONDS = 8.0
-MEILI_SETTINGS_CALL_TIMEOUT_SECONDS = 6.0
-MEILI_SETTINGS_CIRCUIT_THRESHOLD = 3
-MEILI_SETTINGS_CIRCUIT_OPEN_SECONDS = 60
 
 # Dealer Application reasons (v1)
 DEALER_APP_REJECT_REASONS_V1 = {
@@ -343,7 +423,7 @@ SITE_HEADER_VARIANTS_SETTING_KEY = "site.header.variants.v1"
 EMERGENT_GOOGLE_SESSION_DATA_URL = "https://demobackend.emergentagent.com/auth/v1/session-data"
 PLACES_RATE_LIMIT_WINDOW_SECONDS = 60
 PLACES_RATE_LIMIT_MAX_REQUESTS = 45
-_places_rate_limit_tracker: Dict[str, deque] = defaultdict(deque)
+_places_rate_limiter = RateLimiter(PLACES_RATE_LIMIT_MAX_REQUESTS, PLACES_RATE_LIMIT_WINDOW_SECONDS, scope="places", key="ip")
 
 
 
@@ -1765,7 +1845,30 @@ async def _ensure_dealer_portal_config_seed(session: AsyncSession) -> None:
     await session.commit()
 
 
+async def bootstrap_database() -> None:
+    """Schema DDL and default seeds, run once per deploy by scripts/bootstrap_db.py."""
+    async with bootstrap_lock(sql_engine):
+        await upgrade_schema_to_head()
+        async with sql_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await _ensure_wizard_progress_column(conn)
+            await _ensure_listing_doping_columns(conn)
+            await _ensure_pricing_campaign_item_columns(conn)
+            await _ensure_finance_v2_columns(conn)
+            await _ensure_i18n_jsonb_columns(conn)
+        async with AsyncSessionLocal() as session:
+            if (APP_ENV or "").strip().lower() != "prod":
+                await _ensure_admin_user(session)
+                await _ensure_country_admin_user(session)
+                await _ensure_dealer_user(session)
+                await _ensure_test_user(session)
+                await _ensure_test_user_two(session)
+            await _ensure_dealer_portal_config_seed(session)
+            await _seed_finance_defaults(session)
+
+
 async def lifespan(app: FastAPI):
+    startup_started = time.perf_counter()
     if SENTRY_DSN:
         sentry_sdk.init(
             dsn=SENTRY_DSN,
@@ -1807,19 +1910,12 @@ async def lifespan(app: FastAPI):
         "true" if PAYMENTS_RUNTIME_ENABLED else "false",
     )
 
-    try:
-        async def _bootstrap_sql_init() -> None:
-            async with sql_engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
-                await _ensure_wizard_progress_column(conn)
-                await _ensure_listing_doping_columns(conn)
-                await _ensure_pricing_campaign_item_columns(conn)
-                await _ensure_finance_v2_columns(conn)
-                await _ensure_i18n_jsonb_columns(conn)
-
-        await asyncio.wait_for(_bootstrap_sql_init(), timeout=45)
-    except Exception as exc:
-        logging.getLogger("sql_config").warning("SQL init skipped: %s", exc)
+    if DB_BOOTSTRAP_ON_STARTUP:
+        try:
+            await bootstrap_database()
+        except Exception as exc:
+            logging.getLogger("db_bootstrap").warning("Startup bootstrap failed: %s", exc)
+    await verify_schema_version(sql_engine)
 
     try:
         async def _bootstrap_health_warmup() -> None:
@@ -1840,122 +1936,119 @@ async def lifespan(app: FastAPI):
         logging.getLogger("sql_config").warning("Migration cache warmup skipped: %s", exc)
 
     try:
-        async with AsyncSessionLocal() as session:
-            if (APP_ENV or "").strip().lower() != "prod":
-                await _ensure_admin_user(session)
-                await _ensure_country_admin_user(session)
-                await _ensure_dealer_user(session)
-                await _ensure_test_user(session)
-                await _ensure_test_user_two(session)
-            await _ensure_dealer_portal_config_seed(session)
-            await _seed_finance_defaults(session)
+        async def _bootstrap_taxonomy_warmup() -> None:
+            async with AsyncSessionLocal() as session:
+                await get_taxonomy_snapshot(session)
+
+        await asyncio.wait_for(_bootstrap_taxonomy_warmup(), timeout=10)
     except Exception as exc:
-        logging.getLogger("runtime").warning("Startup seed skipped: %s", exc)
+        logging.getLogger("search_taxonomy").warning("Taxonomy snapshot warmup skipped: %s", exc)
+
+    try:
+        await asyncio.wait_for(cache_service.connect(), timeout=5)
+    except Exception as exc:
+        logging.getLogger("runtime").warning("Redis cache connect skipped: %s", exc)
 
     app.state.db = None
-    global _meili_settings_sync_queue
-    _meili_settings_sync_queue = asyncio.Queue(maxsize=1)
-    app.state.meili_settings_sync_task = asyncio.create_task(_meili_settings_sync_worker_loop())
-    app.state.category_bulk_worker_task = asyncio.create_task(_category_bulk_job_worker_loop())
-    app.state.batch_publish_scheduler_task = asyncio.create_task(_batch_publish_scheduler_loop())
+    if SCHEDULER_MODE == "api":
+        app.state.scheduler_task = asyncio.create_task(background_scheduler.run())
+        app.state.meili_settings_wake_task = asyncio.create_task(meili_settings_wake_listener())
+    app.state.search_sync_worker_task = asyncio.create_task(search_sync_worker_loop(AsyncSessionLocal))
+    app.state.principal_invalidation_task = asyncio.create_task(principal_invalidation_listener())
+    app.state.pricing_catalog_invalidation_task = asyncio.create_task(pricing_catalog_invalidation_listener())
+    app.state.meili_runtime_invalidation_task = asyncio.create_task(meili_runtime_invalidation_listener())
+    app.state.taxonomy_invalidation_task = asyncio.create_task(taxonomy_invalidation_listener())
+    app.state.audit_writer_task = asyncio.create_task(audit_log_writer.run(AsyncSessionLocal))
+    app.state.latency_snapshot_task = asyncio.create_task(latency_snapshot_publisher_loop())
+    logging.getLogger("runtime").warning("worker_ready startup_seconds=%.2f", time.perf_counter() - startup_started)
 
     yield
 
-    worker_task = getattr(app.state, "category_bulk_worker_task", None)
-    if worker_task:
-        worker_task.cancel()
+    try:
+        await asyncio.wait_for(audit_log_writer.close(getattr(app.state, "audit_writer_task", None)), timeout=10)
+    except Exception as exc:
+        logging.getLogger("audit_writer").warning("audit_writer_shutdown_flush_failed error=%s", exc)
+    scheduler_task = getattr(app.state, "scheduler_task", None)
+    if scheduler_task:
+        scheduler_task.cancel()
+        try:
+            await scheduler_task
+        except asyncio.CancelledError:
+            pass
+    meili_settings_wake_task = getattr(app.state, "meili_settings_wake_task", None)
+    if meili_settings_wake_task:
+        meili_settings_wake_task.cancel()
+        try:
+            await meili_settings_wake_task
+        except asyncio.CancelledError:
+            pass
+    latency_snapshot_task = getattr(app.state, "latency_snapshot_task", None)
+    if latency_snapshot_task:
+        latency_snapshot_task.cancel()
+        try:
+            await latency_snapshot_task
+        except asyncio.CancelledError:
+            pass
+    principal_invalidation_task = getattr(app.state, "principal_invalidation_task", None)
+    if principal_invalidation_task:
+        principal_invalidation_task.cancel()
+        try:
+            await principal_invalidation_task
+        except asyncio.CancelledError:
+            pass
+    meili_runtime_task = getattr(app.state, "meili_runtime_invalidation_task", None)
+    if meili_runtime_task:
+        meili_runtime_task.cancel()
         try:
-            await worker_task
+            await meili_runtime_task
         except asyncio.CancelledError:
             pass
-    batch_publish_task = getattr(app.state, "batch_publish_scheduler_task", None)
-    if batch_publish_task:
-        batch_publish_task.cancel()
+    pricing_catalog_task = getattr(app.state, "pricing_catalog_invalidation_task", None)
+    if pricing_catalog_task:
+        pricing_catalog_task.cancel()
         try:
-            await batch_publish_task
+            await pricing_catalog_task
         except asyncio.CancelledError:
             pass
-    meili_sync_task = getattr(app.state, "meili_settings_sync_task", None)
-    if meili_sync_task:
-        meili_sync_task.cancel()
+    taxonomy_task = getattr(app.state, "taxonomy_invalidation_task", None)
+    if taxonomy_task:
+        taxonomy_task.cancel()
         try:
-            await meili_sync_task
+            await taxonomy_task
         except asyncio.CancelledError:
             pass
-    _meili_settings_sync_queue = None
-    await health_sql_engine.dispose()
-    await sql_engine.dispose()
+    search_sync_task = getattr(app.state, "search_sync_worker_task", None)
+    if search_sync_task:
+        search_sync_task.cancel()
+        try:
+            await search_sync_task
+        except asyncio.CancelledError:
+            pass
+    await close_meili_clients()
+    await cache_service.close()
+    await dispose_engines()
 
 
 app = FastAPI(
     title="Admin Panel API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 if CorrelationIdMiddleware:
     app.add_middleware(CorrelationIdMiddleware)
 
 
-@app.middleware("http")
-async def fail_safe_response_guard(request: Request, call_next):
-    try:
-        response = await call_next(request)
-        if response is None:
-            logging.getLogger("middleware_guard").error(
-                "response_none_guard path=%s method=%s",
-                request.url.path,
-                request.method,
-            )
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "error_code": "MIDDLEWARE_RESPONSE_NONE",
-                    "message": "Internal middleware contract violation",
-                },
-            )
-        return response
-    except Exception as exc:
-        logger = logging.getLogger("middleware_guard")
-        logger.exception("middleware_guard_unhandled_exception")
-        if SENTRY_DSN:
-            sentry_sdk.capture_exception(exc)
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error_code": "MIDDLEWARE_GUARD_ERROR",
-                "message": "Internal server error",
-            },
-        )
+def _capture_middleware_exception(exc: BaseException) -> None:
+    if SENTRY_DSN:
+        sentry_sdk.capture_exception(exc)
 
 
-@app.middleware("http")
-async def record_request_metrics(request: Request, call_next):
-    start_ts = time.perf_counter()
-    response = await call_next(request)
-    if response is None:
-        logging.getLogger("request_metrics").error("request_metrics_response_none path=%s", request.url.path)
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error_code": "REQUEST_METRICS_RESPONSE_NONE",
-                "message": "Response not generated",
-            },
-        )
-    duration_ms = (time.perf_counter() - start_ts) * 1000
-    endpoint_group = classify_endpoint(request.url.path)
-    if endpoint_group:
-        record_request_latency(endpoint_group, duration_ms)
-    response.headers["X-Response-Time-ms"] = f"{duration_ms:.2f}"
-    response.headers["Content-Security-Policy"] = (
-        "default-src 'self'; "
-        "img-src 'self' data:; "
-        "script-src 'self'; "
-        "style-src 'self' 'unsafe-inline'; "
-        "connect-src 'self'; "
-        "frame-ancestors 'none'"
-    )
-    return response
+# Registration order is significant: each add_middleware wraps the previous
+# one, so the RBAC lock (added last below) runs outermost of the three.
+app.add_middleware(FailSafeResponseGuardMiddleware, capture_exception=_capture_middleware_exception)
+app.add_middleware(RequestMetricsMiddleware)
 
 
 RBAC_ALLOWLIST: Dict[str, list[str]] = {}
@@ -1966,18 +2059,6 @@ RBAC_PUBLIC_ADMIN_ROUTES: Dict[str, list[str]] = {
 }
 
 
-def _normalize_admin_path(path: str) -> str:
-    if path.startswith("/api/"):
-        return path
-    if path.startswith("/admin") or path.startswith("/v1/admin"):
-        return f"/api{path}"
-    return path
-
-
-def _is_admin_path(path: str) -> bool:
-    return path.startswith("/api/admin") or path.startswith("/admin") or path.startswith("/api/v1/admin") or path.startswith("/v1/admin")
-
-
 def _extract_route_roles(route: APIRoute) -> Optional[list[str]]:
     for dependency in route.dependant.dependencies:
         call = getattr(dependency, "call", None)
@@ -1994,7 +2075,7 @@ def _build_rbac_allowlist(target_app: FastAPI) -> tuple[Dict[str, list[str]], li
     for route in target_app.routes:
         if not isinstance(route, APIRoute):
             continue
-        if not _is_admin_path(route.path):
+        if not is_admin_path(route.path):
             continue
         roles = _extract_route_roles(route)
         if not roles:
@@ -2012,20 +2093,6 @@ def _build_rbac_allowlist(target_app: FastAPI) -> tuple[Dict[str, list[str]], li
     return allowlist, sorted(set(missing))
 
 
-def _match_admin_route(request: Request, normalized_path: str) -> Optional[APIRoute]:
-    scope = dict(request.scope)
-    scope["path"] = normalized_path
-    for route in request.app.router.routes:
-        if not isinstance(route, APIRoute):
-            continue
-        if request.method not in route.methods:
-            continue
-        match, _ = route.matches(scope)
-        if match == Match.FULL:
-            return route
-    return None
-
-
 async def _resolve_rbac_user(request: Request) -> Optional[dict]:
     cached_user = getattr(request.state, "current_user", None)
     if cached_user:
@@ -2048,8 +2115,11 @@ async def _resolve_rbac_user(request: Request) -> Optional[dict]:
     if not user_id:
         return None
 
-    async with AsyncSessionLocal() as session:
-        user = await _get_sql_user(user_id, session)
+    async def _load_user():
+        async with AsyncSessionLocal() as session:
+            return await _get_sql_user(user_id, session)
+
+    user = await resolve_principal(user_id, payload.get("token_version"), _load_user)
     if not user or not user.is_active:
         return None
 
@@ -2071,84 +2141,34 @@ async def _write_rbac_audit_log(
     action: str,
     metadata: Optional[dict],
 ):
+    row = build_audit_row(
+        action=action,
+        resource_type="rbac_guard",
+        resource_id=request.url.path,
+        actor=actor,
+        metadata=metadata,
+        request=request,
+    )
+    if audit_log_writer.running:
+        audit_log_writer.submit(row)
+        return
     try:
         async with AsyncSessionLocal() as session:
-            await _write_audit_log_sql(
-                session=session,
-                action=action,
-                actor=actor or {"id": None, "email": None, "country_scope": []},
-                resource_type="rbac_guard",
-                resource_id=request.url.path,
-                metadata=metadata or {},
-                request=request,
-                country_code=None,
-            )
+            session.add(AuditLog(**row))
             await session.commit()
     except Exception:
         logger = logging.getLogger("rbac_guard")
         logger.exception("rbac_audit_log_failed")
 
 
-@app.middleware("http")
-async def rbac_hard_lock(request: Request, call_next):
-    try:
-        if not _is_admin_path(request.url.path):
-            response = await call_next(request)
-            if response is None:
-                return JSONResponse(status_code=500, content={"error_code": "RBAC_RESPONSE_NONE", "message": "No response returned"})
-            return response
-
-        normalized_path = _normalize_admin_path(request.url.path)
-        route = _match_admin_route(request, normalized_path)
-        if not route:
-            return JSONResponse(status_code=404, content={"detail": "Not found"})
-
-        allowlist = request.app.state.rbac_allowlist or {}
-        policy_key = f"{request.method} {route.path}"
-        required_roles = allowlist.get(policy_key)
-        if not required_roles:
-            await _write_rbac_audit_log(
-                request,
-                actor=None,
-                action="RBAC_POLICY_MISSING",
-                metadata={"path": route.path, "method": request.method},
-            )
-            return JSONResponse(status_code=403, content={"detail": "RBAC policy missing"})
-
-        if "public" in required_roles:
-            response = await call_next(request)
-            if response is None:
-                return JSONResponse(status_code=500, content={"error_code": "RBAC_RESPONSE_NONE", "message": "No response returned"})
-            return response
-
-        user = await _resolve_rbac_user(request)
-        if not user:
-            return JSONResponse(status_code=401, content={"detail": "Not authenticated"})
-
-        if user.get("role") not in required_roles:
-            await _write_rbac_audit_log(
-                request,
-                actor=user,
-                action="RBAC_DENY",
-                metadata={"path": route.path, "method": request.method, "required_roles": required_roles},
-            )
-            return JSONResponse(status_code=403, content={"detail": "Insufficient permissions"})
-
-        response = await call_next(request)
-        if response is None:
-            return JSONResponse(status_code=500, content={"error_code": "RBAC_RESPONSE_NONE", "message": "No response returned"})
-        return response
-    except Exception as exc:
-        logging.getLogger("rbac_guard").exception("rbac_hard_lock_exception")
-        if SENTRY_DSN:
-            sentry_sdk.capture_exception(exc)
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error_code": "RBAC_GUARD_ERROR",
-                "message": "RBAC middleware failure",
-            },
-        )
+app.add_middleware(
+    RbacHardLockMiddleware,
+    match_route=match_admin_route,
+    resolve_user=_resolve_rbac_user,
+    write_audit_log=_write_rbac_audit_log,
+    capture_exception=_capture_middleware_exception,
+)
+app.add_middleware(QueryAccountingMiddleware, debug_headers=QUERY_DEBUG_HEADERS)
 
 
 DB_ERROR_CODES = {
@@ -2313,15 +2333,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
 
 
 def _get_client_ip(request: Request) -> str | None:
-    xff = request.headers.get("x-forwarded-for")
-    if xff:
-        # first IP in list is the original client
-        return xff.split(",")[0].strip() or None
-    return request.client.host if request.client else None
+    if not request.client and not request.headers.get("x-forwarded-for"):
+        return None
+    return client_ip(request)
 
 async def _ensure_wizard_progress_column(conn) -> None:
     try:
@@ -3488,19 +3507,17 @@ async def _invoice_totals_by_currency(
     return totals
 
 
-def _check_application_rate_limit(request: Request, user_id: str) -> None:
-    key = user_id or _get_client_ip(request) or "unknown"
-    now = time.time()
-    attempts = _application_submit_attempts.get(key, [])
-    attempts = [ts for ts in attempts if (now - ts) <= APPLICATION_RATE_LIMIT_WINDOW_SECONDS]
-    if len(attempts) >= APPLICATION_RATE_LIMIT_MAX_ATTEMPTS:
-        retry_after_seconds = int(APPLICATION_RATE_LIMIT_WINDOW_SECONDS - (now - attempts[0]))
+def _raise_rate_limited(decision: RateLimitDecision) -> None:
+    if not decision.allowed:
         raise HTTPException(
             status_code=429,
-            detail={"code": "RATE_LIMITED", "retry_after_seconds": max(retry_after_seconds, 1)},
+            detail={"code": "RATE_LIMITED", "retry_after_seconds": max(decision.retry_after, 1)},
         )
-    attempts.append(now)
-    _application_submit_attempts[key] = attempts
+
+
+async def _check_application_rate_limit(request: Request, user_id: str) -> None:
+    identity = f"user:{user_id}" if user_id else f"ip:{_get_client_ip(request) or 'unknown'}"
+    _raise_rate_limited(await _application_submit_limiter.hit(identity))
 
 
 async def _ensure_sql_user(session: AsyncSession, user_doc: dict) -> uuid.UUID:
@@ -3535,34 +3552,12 @@ async def _ensure_sql_user(session: AsyncSession, user_doc: dict) -> uuid.UUID:
     return user_uuid
 
 
-def _enforce_export_rate_limit(request: Request, user_id: str) -> None:
-    now = time.time()
-    key = f"{user_id}:{_get_client_ip(request)}"
-    attempts = _export_attempts.get(key, [])
-    attempts = [ts for ts in attempts if (now - ts) <= EXPORT_RATE_LIMIT_WINDOW_SECONDS]
-    if len(attempts) >= EXPORT_RATE_LIMIT_MAX_ATTEMPTS:
-        retry_after_seconds = int(EXPORT_RATE_LIMIT_WINDOW_SECONDS - (now - attempts[0]))
-        raise HTTPException(
-            status_code=429,
-            detail={"code": "RATE_LIMITED", "retry_after_seconds": max(retry_after_seconds, 1)},
-        )
-    attempts.append(now)
-    _export_attempts[key] = attempts
+async def _enforce_export_rate_limit(request: Request, user_id: str) -> None:
+    _raise_rate_limited(await _export_limiter.hit(f"user:{user_id}"))
 
 
-def _enforce_admin_invite_rate_limit(request: Request, user_id: str) -> None:
-    now = time.time()
-    key = f"invite:{user_id}:{_get_client_ip(request)}"
-    attempts = _admin_invite_attempts.get(key, [])
-    attempts = [ts for ts in attempts if (now - ts) <= ADMIN_INVITE_RATE_LIMIT_WINDOW_SECONDS]
-    if len(attempts) >= ADMIN_INVITE_RATE_LIMIT_MAX_ATTEMPTS:
-        retry_after_seconds = int(ADMIN_INVITE_RATE_LIMIT_WINDOW_SECONDS - (now - attempts[0]))
-        raise HTTPException(
-            status_code=429,
-            detail={"code": "RATE_LIMITED", "retry_after_seconds": max(retry_after_seconds, 1)},
-        )
-    attempts.append(now)
-    _admin_invite_attempts[key] = attempts
+async def _enforce_admin_invite_rate_limit(request: Request, user_id: str) -> None:
+    _raise_rate_limited(await _admin_invite_limiter.hit(f"user:{user_id}"))
 
 
 def _hash_invite_token(token: str) -> str:
@@ -4136,13 +4131,13 @@ REPORT_STATUS_TRANSITIONS = {
 
 REPORT_RATE_LIMIT_WINDOW_SECONDS = 10 * 60
 REPORT_RATE_LIMIT_MAX_ATTEMPTS = 5
-_report_submit_attempts: Dict[str, List[float]] = {}
+_report_submit_limiter = RateLimiter(REPORT_RATE_LIMIT_MAX_ATTEMPTS, REPORT_RATE_LIMIT_WINDOW_SECONDS, scope="listing_report")
 
 EXPORT_RATE_LIMIT_WINDOW_SECONDS = 60
 EXPORT_RATE_LIMIT_MAX_ATTEMPTS = 10
 GDPR_EXPORT_RETENTION_DAYS = 30
 GDPR_EXPORT_DIR = os.path.join(os.path.dirname(__file__), "static", "exports")
-_export_attempts: Dict[str, List[float]] = {}
+_export_limiter = RateLimiter(EXPORT_RATE_LIMIT_MAX_ATTEMPTS, EXPORT_RATE_LIMIT_WINDOW_SECONDS, scope="export")
 
 VAPID_PUBLIC_KEY = os.environ.get("VAPID_PUBLIC_KEY")
 VAPID_PRIVATE_KEY = os.environ.get("VAPID_PRIVATE_KEY")
@@ -4259,7 +4254,9 @@ APPLICATION_STATUS_TRANSITIONS = {
 
 APPLICATION_RATE_LIMIT_WINDOW_SECONDS = 10 * 60
 APPLICATION_RATE_LIMIT_MAX_ATTEMPTS = 5
-_application_submit_attempts: Dict[str, List[float]] = {}
+_application_submit_limiter = RateLimiter(
+    APPLICATION_RATE_LIMIT_MAX_ATTEMPTS, APPLICATION_RATE_LIMIT_WINDOW_SECONDS, scope="application_submit"
+)
 
 VEHICLE_TYPE_SET = {"car", "suv", "offroad", "pickup", "truck", "bus"}
 
@@ -4296,11 +4293,6 @@ PERMISSION_FALLBACK_MATRIX: Dict[str, Dict[str, List[str]]] = {
 RAW_DATABASE_URL = os.environ.get("DATABASE_URL")
 TOKEN_VERSION = os.environ.get("TOKEN_VERSION", "v2")
 
-DB_POOL_SIZE_RAW = os.environ.get("DB_POOL_SIZE")
-DB_MAX_OVERFLOW_RAW = os.environ.get("DB_MAX_OVERFLOW")
-DB_POOL_TIMEOUT_RAW = os.environ.get("DB_POOL_TIMEOUT")
-DB_POOL_RECYCLE_RAW = os.environ.get("DB_POOL_RECYCLE")
-DB_POOL_DEBUG = os.environ.get("DB_POOL_DEBUG", "").lower() in {"1", "true", "yes"}
 DB_SSL_MODE = (os.environ.get("DB_SSL_MODE") or ("require" if APP_ENV in {"prod", "preview"} else "disable")).lower()
 
 
@@ -4349,10 +4341,8 @@ CATEGORY_IMPORT_EXPORT_XLSX_ENABLED = (os.environ.get("CATEGORY_IMPORT_EXPORT_XL
 WATERMARK_PIPELINE_SETTING_KEY = "media.watermark.pipeline"
 MESSAGE_REPORT_REASONS = {"spam", "scam", "abuse", "other"}
 MESSAGE_REPORT_STATUS_SET = {"open", "in_review", "resolved", "dismissed"}
-SUGGEST_CACHE_TTL_SECONDS = max(5, int((os.environ.get("SEARCH_SUGGEST_CACHE_TTL_SECONDS") or "45").strip() or "45"))
 SUGGEST_MAX_ITEMS = min(20, max(3, int((os.environ.get("SEARCH_SUGGEST_MAX_ITEMS") or "8").strip() or "8")))
 MEDIA_PIPELINE_METRICS = deque(maxlen=500)
-_search_suggest_cache: Dict[str, dict] = {}
 DEALER_DASHBOARD_CACHE_TTL_SECONDS = max(10, int((os.environ.get("DEALER_DASHBOARD_CACHE_TTL_SECONDS") or "45").strip() or "45"))
 DEALER_PORTAL_FLAG_SETTING_PREFIX = "feature."
 _dealer_dashboard_summary_cache: Dict[str, dict] = {}
@@ -4369,19 +4359,6 @@ def _db_url_is_localhost(value: Optional[str]) -> bool:
     return host in {"localhost", "127.0.0.1"}
 
 
-def _sanitize_database_url(value: str) -> str:
-    try:
-        parsed = urllib.parse.urlparse(value)
-        if not parsed.query:
-            return value
-        params = urllib.parse.parse_qs(parsed.query)
-        params.pop("sslmode", None)
-        new_query = urllib.parse.urlencode(params, doseq=True)
-        return parsed._replace(query=new_query).geturl()
-    except Exception:
-        return value
-
-
 def _ensure_logger(name: str, level: int) -> logging.Logger:
     logger = logging.getLogger(name)
     if not logger.handlers:
@@ -4395,9 +4372,7 @@ def _ensure_logger(name: str, level: int) -> logging.Logger:
     return logger
 
 
-sql_logger = _ensure_logger("sql_config", logging.INFO)
 db_error_logger = _ensure_logger("database.error", logging.INFO)
-pool_logger = _ensure_logger("database.pool", logging.DEBUG if DB_POOL_DEBUG else logging.INFO)
 
 
 if APP_ENV in {"preview", "prod"}:
@@ -4422,111 +4397,13 @@ if RAW_DATABASE_URL:
 else:
     raise RuntimeError("DATABASE_URL must be set")
 
-try:
-    DB_POOL_SIZE = int(DB_POOL_SIZE_RAW) if DB_POOL_SIZE_RAW else 10
-    DB_MAX_OVERFLOW = int(DB_MAX_OVERFLOW_RAW) if DB_MAX_OVERFLOW_RAW else 20
-    DB_POOL_TIMEOUT = int(DB_POOL_TIMEOUT_RAW) if DB_POOL_TIMEOUT_RAW else 60
-    DB_POOL_RECYCLE = int(DB_POOL_RECYCLE_RAW) if DB_POOL_RECYCLE_RAW else 1800
-except ValueError:
-    logging.getLogger("sql_config").warning("Invalid DB pool values, defaulting to 5/10/30/1800")
-    DB_POOL_SIZE = 10
-    DB_MAX_OVERFLOW = 20
-    DB_POOL_TIMEOUT = 60
-    DB_POOL_RECYCLE = 1800
-
-ssl_context = None
-connect_args: Dict[str, Any] = {
-    "server_settings": {
-        "client_encoding": "UTF8",
-    }
-}
-if DB_SSL_MODE == "require":
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-    connect_args["ssl"] = ssl_context
-
-SAFE_DATABASE_URL = _sanitize_database_url(DATABASE_URL)
-ASYNC_DATABASE_URL = SAFE_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 HEALTH_DB_TIMEOUT_MS = 500
 HEALTH_DB_TIMEOUT_SECONDS = HEALTH_DB_TIMEOUT_MS / 1000
 
-sql_engine = create_async_engine(
-    ASYNC_DATABASE_URL,
-    echo=False,
-    future=True,
-    pool_size=DB_POOL_SIZE,
-    max_overflow=DB_MAX_OVERFLOW,
-    pool_timeout=DB_POOL_TIMEOUT,
-    pool_recycle=DB_POOL_RECYCLE,
-    pool_pre_ping=True,
-    connect_args=connect_args,
-)
-
-health_sql_engine = create_async_engine(
-    ASYNC_DATABASE_URL,
-    echo=False,
-    future=True,
-    pool_size=1,
-    max_overflow=0,
-    pool_timeout=1,
-    pool_recycle=DB_POOL_RECYCLE,
-    pool_pre_ping=True,
-    connect_args=connect_args,
-)
-sql_logger.info(
-    "Effective DB pool config: pool_size=%s max_overflow=%s pool_timeout=%s pool_recycle=%s pool_pre_ping=%s",
-    DB_POOL_SIZE,
-    DB_MAX_OVERFLOW,
-    DB_POOL_TIMEOUT,
-    DB_POOL_RECYCLE,
-    True,
-)
-sql_logger.info(
-    "Health DB pool config: pool_size=%s max_overflow=%s pool_timeout=%s timeout_ms=%s",
-    1,
-    0,
-    1,
-    HEALTH_DB_TIMEOUT_MS,
-)
-
-
-if DB_POOL_DEBUG:
-    pool_logger.setLevel(logging.DEBUG)
-
-
-@event.listens_for(sql_engine.sync_engine, "connect")
-def _log_pool_connect(dbapi_connection, connection_record):
-    if DB_POOL_DEBUG:
-        pool_logger.debug("db_pool_connect")
-
-
-@event.listens_for(sql_engine.sync_engine, "checkout")
-def _log_pool_checkout(dbapi_connection, connection_record, connection_proxy):
-    if DB_POOL_DEBUG:
-        pool_logger.debug("db_pool_checkout")
-
-
-@event.listens_for(sql_engine.sync_engine, "checkin")
-def _log_pool_checkin(dbapi_connection, connection_record):
-    if DB_POOL_DEBUG:
-        pool_logger.debug("db_pool_checkin")
-
-
-@event.listens_for(sql_engine.sync_engine, "close")
-def _log_pool_close(dbapi_connection, connection_record):
-    if DB_POOL_DEBUG:
-        pool_logger.debug("db_pool_close")
-
-
-@event.listens_for(sql_engine.sync_engine, "invalidate")
-def _log_pool_invalidate(dbapi_connection, connection_record, exception):
-    pool_logger.info("db_pool_invalidate", extra={"error": str(exception) if exception else None})
-
-
 AsyncSessionLocal = async_sessionmaker(
     sql_engine,
     class_=AsyncSession,
+    sync_session_class=session_class,
     expire_on_commit=False,
 )
 
@@ -4549,7 +4426,9 @@ def _get_auth_repository(session: AsyncSession):
 def _get_applications_repository(session: AsyncSession):
     return SqlApplicationsRepository(session)
 
-_admin_invite_attempts: Dict[str, List[float]] = {}
+_admin_invite_limiter = RateLimiter(
+    ADMIN_INVITE_RATE_LIMIT_MAX_ATTEMPTS, ADMIN_INVITE_RATE_LIMIT_WINDOW_SECONDS, scope="admin_invite", fail_open=False
+)
 _admin_invite_logger = logging.getLogger("admin_invites")
 
 APP_START_TIME = datetime.now(timezone.utc)
@@ -4912,15 +4791,20 @@ async def sitemap_index_endpoint(request: Request):
     if not base_url:
         return _misconfigured_sitemap_response("public_base_url_missing", "PUBLIC_BASE_URL veya request host algılanamadı")
 
-    locations = [
-        _build_canonical_url(base_url, "/sitemaps/core.xml"),
-        _build_canonical_url(base_url, "/sitemaps/categories.xml"),
-        _build_canonical_url(base_url, "/sitemaps/listings.xml"),
-        _build_canonical_url(base_url, "/sitemaps/info.xml"),
-    ]
-    xml = _render_sitemap_index_xml(locations)
-    return Response(
-        content=xml,
+    cache_key = ("sitemap", "index", base_url)
+    payload = get_precompressed(cache_key)
+    if payload is None:
+        locations = [
+            _build_canonical_url(base_url, "/sitemaps/core.xml"),
+            _build_canonical_url(base_url, "/sitemaps/categories.xml"),
+            _build_canonical_url(base_url, "/sitemaps/listings.xml"),
+            _build_canonical_url(base_url, "/sitemaps/info.xml"),
+        ]
+        xml = _render_sitemap_index_xml(locations)
+        payload = store_precompressed(cache_key, xml.encode("utf-8"))
+    return precompressed_response(
+        request,
+        payload,
         media_type="application/xml",
         headers={
             "X-Sitemap-Base-Source": source,
@@ -4942,10 +4826,17 @@ async def sitemap_section_endpoint(
     if not base_url:
         return _misconfigured_sitemap_response("public_base_url_missing", "PUBLIC_BASE_URL veya request host algılanamadı")
 
-    items = await _build_sitemap_section_items(normalized_section, base_url, session)
-    xml = _render_urlset_xml(items)
-    return Response(
-        content=xml,
+    # Sections are stored compressed; a crawler pass over all of them costs
+    # one DB scan and one compression per section per TTL window.
+    cache_key = ("sitemap", normalized_section, base_url)
+    payload = get_precompressed(cache_key)
+    if payload is None:
+        items = await _build_sitemap_section_items(normalized_section, base_url, session)
+        xml = _render_urlset_xml(items)
+        payload = store_precompressed(cache_key, xml.encode("utf-8"))
+    return precompressed_response(
+        request,
+        payload,
         media_type="application/xml",
         headers={
             "X-Sitemap-Section": normalized_section,
@@ -5036,6 +4927,10 @@ async def admin_system_health_detail(
         moderation_sla_pending = 0
 
     endpoint_stats = get_endpoint_stats()
+    try:
+        route_latency = get_route_latency_stats(await merged_route_latency())[:25]
+    except Exception:
+        route_latency = get_route_latency_stats()[:25]
     account_id = None
     zone_id = None
     cf_ids_source = None
@@ -5145,6 +5040,12 @@ async def admin_system_health_detail(
         "moderation_sla_avg_seconds": round(float(moderation_sla_avg), 2) if moderation_sla_avg is not None else None,
         "moderation_sla_pending_count": int(moderation_sla_pending or 0),
         "endpoint_stats": endpoint_stats,
+        "route_latency": route_latency,
+        "audit_writer": audit_log_writer.stats(),
+        "rate_limiter": rate_limit_stats(),
+        "db_pools": pool_stats(),
+        "scheduler": background_scheduler.stats(),
+        "pricing_catalog": pricing_catalog_stats(),
         "last_db_error": _last_db_error,
         "last_etl_at": etl_state.get("last_etl_at"),
         "last_etl_inserted": etl_state.get("inserted"),
@@ -6169,7 +6070,7 @@ async def create_admin_user(
 ):
     await resolve_admin_country_context(request, current_user=current_user, session=session)
 
-    _enforce_admin_invite_rate_limit(request, current_user.get("id"))
+    await _enforce_admin_invite_rate_limit(request, current_user.get("id"))
 
     sendgrid_key = os.environ.get("SENDGRID_API_KEY")
     sender_email = os.environ.get("SENDER_EMAIL")
@@ -7247,7 +7148,7 @@ async def export_user_data_v1(
     current_user=Depends(get_current_user),
     session: AsyncSession = Depends(get_sql_session),
 ):
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
 
     user_row = await _get_user_row_from_current(session, current_user)
     role = current_user.get("role")
@@ -7885,7 +7786,7 @@ async def export_user_data(
     current_user=Depends(require_portal_scope("account")),
     session: AsyncSession = Depends(get_sql_session),
 ):
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
 
     try:
         user_uuid = uuid.UUID(str(current_user.get("id")))
@@ -8059,7 +7960,7 @@ async def create_support_application(
 ):
     applications_repo = _get_applications_repository(session)
 
-    _check_application_rate_limit(request, current_user.get("id"))
+    await _check_application_rate_limit(request, current_user.get("id"))
 
     category = (payload.category or "").lower().strip()
     if category not in APPLICATION_REQUEST_TYPES:
@@ -8812,36 +8713,42 @@ async def list_message_threads(
         ).scalars().all()
         listing_map = {listing.id: listing for listing in listings}
 
-    items = []
-    for conv in conversations:
-        last_message = (
+    conversation_ids = [conv.id for conv in conversations]
+    last_message_map = {}
+    unread_map = {}
+    if conversation_ids:
+        last_messages = (
             await session.execute(
                 select(Message)
-                .where(Message.conversation_id == conv.id)
-                .order_by(desc(Message.created_at))
+                .where(Message.conversation_id.in_(conversation_ids))
+                .order_by(Message.conversation_id, desc(Message.created_at))
+                .distinct(Message.conversation_id)
             )
-        ).scalars().first()
-        unread_count = (
+        ).scalars().all()
+        last_message_map = {message.conversation_id: message for message in last_messages}
+        unread_rows = (
             await session.execute(
-                select(func.count())
-                .select_from(Message)
+                select(Message.conversation_id, func.count())
                 .where(
-                    Message.conversation_id == conv.id,
+                    Message.conversation_id.in_(conversation_ids),
                     Message.is_read.is_(False),
                     Message.sender_id != user_id,
                 )
+                .group_by(Message.conversation_id)
             )
-        ).scalar_one()
+        ).all()
+        unread_map = {conversation_id: count for conversation_id, count in unread_rows}
 
-        items.append(
-            _build_thread_summary_sql(
-                conv,
-                str(user_id),
-                listing_map.get(conv.listing_id),
-                last_message,
-                int(unread_count or 0),
-            )
-        )
+    items = [
+        _build_thread_summary_sql(
+            conv,
+            str(user_id),
+            listing_map.get(conv.listing_id),
+            last_message_map.get(conv.id),
+            int(unread_map.get(conv.id) or 0),
+        )
+        for conv in conversations
+    ]
 
     return {"items": items, "pagination": {"total": int(total or 0), "page": safe_page, "limit": safe_limit}}
 
@@ -10086,7 +9993,7 @@ async def list_individual_users(
     }
 
 
-@api_router.get("/admin/individual-users/export/csv")
+@api_router.get("/admin/individual-users/export/csv", dependencies=[Depends(use_read_replica)])
 async def admin_individual_users_export_csv(
     request: Request,
     search: Optional[str] = None,
@@ -10098,7 +10005,7 @@ async def admin_individual_users_export_csv(
     session: AsyncSession = Depends(get_sql_session),
 ):
     ctx = await resolve_admin_country_context(request, current_user=current_user, session=session, )
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
 
     country_code = ctx.country if ctx and getattr(ctx, "country", None) else None
     if country:
@@ -10286,7 +10193,9 @@ async def list_categories(
         filtered.append(category)
 
     filtered.sort(key=lambda c: (c.sort_order or 0, _pick_category_name(list(c.translations or []), _pick_category_slug(c.slug), preferred_lang)))
-    return [_serialize_category_sql(cat, include_schema=False, include_translations=True, preferred_lang=preferred_lang) for cat in filtered]
+    return FastJSONResponse(
+        [_serialize_category_sql(cat, include_schema=False, include_translations=True, preferred_lang=preferred_lang) for cat in filtered]
+    )
 
 
 def _filter_categories_for_country(categories: list[Category], code: str, preferred_lang: str = "tr") -> list[Category]:
@@ -10351,7 +10260,9 @@ async def list_category_children(
     categories = result.scalars().all()
     preferred_lang = _resolve_public_request_locale(request)
     filtered = _filter_categories_for_country(categories, code, preferred_lang=preferred_lang)
-    return [_serialize_category_sql(cat, include_schema=False, include_translations=True, preferred_lang=preferred_lang) for cat in filtered]
+    return FastJSONResponse(
+        [_serialize_category_sql(cat, include_schema=False, include_translations=True, preferred_lang=preferred_lang) for cat in filtered]
+    )
 
 
 @api_router.get("/categories/search")
@@ -10602,7 +10513,7 @@ async def places_autocomplete(
     x_google_maps_key: Optional[str] = Header(default=None),
     session: AsyncSession = Depends(get_sql_session),
 ):
-    allowed, remaining, retry_after = _check_places_rate_limit(request)
+    allowed, remaining, retry_after = await _check_places_rate_limit(request)
     if not allowed:
         return JSONResponse(
             status_code=429,
@@ -10695,7 +10606,7 @@ async def places_postal_lookup(
     x_google_maps_key: Optional[str] = Header(default=None),
     session: AsyncSession = Depends(get_sql_session),
 ):
-    allowed, remaining, retry_after = _check_places_rate_limit(request)
+    allowed, remaining, retry_after = await _check_places_rate_limit(request)
     if not allowed:
         return JSONResponse(
             status_code=429,
@@ -10822,7 +10733,7 @@ async def places_details(
     x_google_maps_key: Optional[str] = Header(default=None),
     session: AsyncSession = Depends(get_sql_session),
 ):
-    allowed, remaining, retry_after = _check_places_rate_limit(request)
+    allowed, remaining, retry_after = await _check_places_rate_limit(request)
     if not allowed:
         return JSONResponse(
             status_code=429,
@@ -11177,10 +11088,17 @@ async def get_catalog_schema(
     raw_schema = category.form_schema
     if not raw_schema:
         raise HTTPException(status_code=409, detail="Kategori şeması oluşturulmadı")
-    schema = _normalize_category_schema(raw_schema)
-    if schema.get("status") == "draft":
-        schema = {**schema, "status": "draft"}
-    return {"category": _serialize_category_sql(category, include_schema=False), "schema": schema}
+
+    # Keyed on updated_at so a schema edit is never served stale.
+    cache_key = ("catalog_schema", category.id, category.updated_at.isoformat() if category.updated_at else None)
+    payload = get_precompressed(cache_key)
+    if payload is None:
+        schema = _normalize_category_schema(raw_schema)
+        if schema.get("status") == "draft":
+            schema = {**schema, "status": "draft"}
+        body = dumps_json({"category": _serialize_category_sql(category, include_schema=False), "schema": schema})
+        payload = store_precompressed(cache_key, body)
+    return precompressed_response(request, payload, media_type="application/json")
 
 
 @api_router.get("/catalog/schema")
@@ -13631,7 +13549,7 @@ async def admin_audit_resources(
     return {"resource_types": resources}
 
 
-@api_router.get("/admin/audit-logs/export")
+@api_router.get("/admin/audit-logs/export", dependencies=[Depends(use_read_replica)])
 async def admin_export_audit_logs(
     request: Request,
     actor: Optional[str] = None,
@@ -14150,25 +14068,9 @@ async def _next_listing_site_design_version(session: AsyncSession) -> int:
     return int(current_max) + 1
 
 
-def _check_places_rate_limit(request: Request) -> tuple[bool, int, int]:
-    if request.client and request.client.host:
-        client_key = request.client.host
-    else:
-        client_key = "unknown"
-
-    now_ts = time.time()
-    queue = _places_rate_limit_tracker[client_key]
-    window_start = now_ts - PLACES_RATE_LIMIT_WINDOW_SECONDS
-    while queue and queue[0] < window_start:
-        queue.popleft()
-
-    if len(queue) >= PLACES_RATE_LIMIT_MAX_REQUESTS:
-        retry_after = max(1, int(queue[0] + PLACES_RATE_LIMIT_WINDOW_SECONDS - now_ts)) if queue else 1
-        return False, 0, retry_after
-
-    queue.append(now_ts)
-    remaining = max(0, PLACES_RATE_LIMIT_MAX_REQUESTS - len(queue))
-    return True, remaining, 0
+async def _check_places_rate_limit(request: Request) -> tuple[bool, int, int]:
+    decision = await _places_rate_limiter.hit(ip_identity(request))
+    return decision.allowed, decision.remaining, decision.retry_after
 
 
 async def _fetch_google_places_json(url: str) -> dict:
@@ -14317,27 +14219,6 @@ def _extract_listing_id_from_payment_row(payment: Payment, invoice: Optional[Adm
     return None
 
 
-def _suggest_cache_key(country: str, query: str, limit: int) -> str:
-    return f"{country}|{query.strip().lower()}|{limit}"
-
-
-def _get_cached_suggest_payload(cache_key: str) -> Optional[Dict[str, Any]]:
-    row = _search_suggest_cache.get(cache_key)
-    if not row:
-        return None
-    if row.get("expires_at", 0) < time.time():
-        _search_suggest_cache.pop(cache_key, None)
-        return None
-    return row.get("payload")
-
-
-def _set_cached_suggest_payload(cache_key: str, payload: Dict[str, Any]) -> None:
-    _search_suggest_cache[cache_key] = {
-        "payload": payload,
-        "expires_at": time.time() + SUGGEST_CACHE_TTL_SECONDS,
-    }
-
-
 async def _is_moderation_freeze_active(
     session: AsyncSession, country_code: Optional[str]
 ) -> bool:
@@ -15266,20 +15147,9 @@ async def _admin_listing_action(
     return {"id": str(listing.id), "status": listing.status}
 
 
-def _check_report_rate_limit(request: Request, listing_id: str, reporter_user_id: Optional[str]) -> None:
-    ip_address = _get_client_ip(request) or "unknown"
-    key = f"{ip_address}:{reporter_user_id or 'anon'}:{listing_id}"
-    now = time.time()
-    attempts = _report_submit_attempts.get(key, [])
-    attempts = [ts for ts in attempts if (now - ts) <= REPORT_RATE_LIMIT_WINDOW_SECONDS]
-    if len(attempts) >= REPORT_RATE_LIMIT_MAX_ATTEMPTS:
-        retry_after_seconds = int(REPORT_RATE_LIMIT_WINDOW_SECONDS - (now - attempts[0]))
-        raise HTTPException(
-            status_code=429,
-            detail={"code": "RATE_LIMITED", "retry_after_seconds": max(retry_after_seconds, 1)},
-        )
-    attempts.append(now)
-    _report_submit_attempts[key] = attempts
+async def _check_report_rate_limit(request: Request, listing_id: str, reporter_user_id: Optional[str]) -> None:
+    reporter = f"user:{reporter_user_id}" if reporter_user_id else f"ip:{_get_client_ip(request) or 'unknown'}"
+    _raise_rate_limited(await _report_submit_limiter.hit(f"{reporter}:{listing_id}"))
 
 
 def _validate_report_reason(reason: str, reason_note: Optional[str]) -> tuple[str, Optional[str]]:
@@ -17413,6 +17283,12 @@ async def admin_bulk_approve_listings(
                 request=request,
                 commit=False,
             )
+    await _schedule_listing_sync_jobs(
+        session,
+        listing_ids=unique_ids,
+        operation="upsert",
+        trigger="moderation_bulk_approve",
+    )
 
     return {"ok": True, "processed": len(unique_ids)}
 
@@ -17455,6 +17331,12 @@ async def admin_bulk_reject_listings(
                 request=request,
                 commit=False,
             )
+    await _schedule_listing_sync_jobs(
+        session,
+        listing_ids=unique_ids,
+        operation="upsert",
+        trigger="moderation_bulk_reject",
+    )
 
     return {"ok": True, "processed": len(unique_ids)}
 
@@ -17818,7 +17700,7 @@ async def create_report(
 
     reason, reason_note = _validate_report_reason(payload.reason, payload.reason_note)
     reporter_user_id = current_user.get("id") if current_user else None
-    _check_report_rate_limit(request, listing_id, reporter_user_id)
+    await _check_report_rate_limit(request, listing_id, reporter_user_id)
 
     report = Report(
         listing_id=listing.id,
@@ -21035,7 +20917,7 @@ async def dealer_bulk_action_listings(
     return {"updated": updated, "deleted": deleted, "failed": failed}
 
 
-@api_router.get("/dealer/dashboard/metrics")
+@api_router.get("/dealer/dashboard/metrics", dependencies=[Depends(use_read_replica)])
 async def dealer_dashboard_metrics(
     request: Request,
     current_user=Depends(check_permissions(["dealer"])),
@@ -21143,7 +21025,7 @@ async def dealer_dashboard_metrics(
     }
 
 
-@api_router.get("/dealer/dashboard/summary")
+@api_router.get("/dealer/dashboard/summary", dependencies=[Depends(use_read_replica)])
 async def dealer_dashboard_summary(
     request: Request,
     current_user=Depends(check_permissions(["dealer"])),
@@ -22535,7 +22417,7 @@ async def dealer_favorites(
     }
 
 
-@api_router.get("/dealer/reports")
+@api_router.get("/dealer/reports", dependencies=[Depends(use_read_replica)])
 async def dealer_reports(
     request: Request,
     window_days: int = Query(default=30, ge=7, le=90),
@@ -25072,7 +24954,7 @@ async def admin_list_payments(
     return {"items": items, "pagination": {"total": total, "skip": skip, "limit": limit}}
 
 
-@api_router.get("/admin/payments/export/csv")
+@api_router.get("/admin/payments/export/csv", dependencies=[Depends(use_read_replica)])
 async def admin_export_payments_csv(
     request: Request,
     status: Optional[str] = None,
@@ -25091,7 +24973,7 @@ async def admin_export_payments_csv(
         domain="finance",
         action="export",
     )
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
     ctx = await resolve_admin_country_context(request, current_user=current_user, session=session)
 
     conditions = []
@@ -25184,7 +25066,7 @@ async def admin_export_payments_csv(
     )
 
 
-@api_router.get("/admin/invoices/export/csv")
+@api_router.get("/admin/invoices/export/csv", dependencies=[Depends(use_read_replica)])
 async def admin_export_invoices_csv(
     request: Request,
     status: Optional[str] = None,
@@ -25199,7 +25081,7 @@ async def admin_export_invoices_csv(
         domain="finance",
         action="export",
     )
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
     ctx = await resolve_admin_country_context(request, current_user=current_user, session=session)
     conditions: List[Any] = []
     if status:
@@ -25269,7 +25151,7 @@ async def admin_export_invoices_csv(
     return Response(content=output.getvalue(), media_type="text/csv", headers={"Content-Disposition": f"attachment; filename={filename}"})
 
 
-@api_router.get("/admin/ledger/export/csv")
+@api_router.get("/admin/ledger/export/csv", dependencies=[Depends(use_read_replica)])
 async def admin_export_ledger_csv(
     request: Request,
     currency: Optional[str] = None,
@@ -25282,7 +25164,7 @@ async def admin_export_ledger_csv(
         domain="finance",
         action="export",
     )
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
     ctx = await resolve_admin_country_context(request, current_user=current_user, session=session)
     query = select(LedgerEntry)
     if currency:
@@ -25336,7 +25218,7 @@ async def admin_export_ledger_csv(
     return Response(content=output.getvalue(), media_type="text/csv", headers={"Content-Disposition": f"attachment; filename={filename}"})
 
 
-@api_router.get("/admin/finance/export")
+@api_router.get("/admin/finance/export", dependencies=[Depends(use_read_replica)])
 async def admin_finance_export(
     request: Request,
     type: str,
@@ -25355,7 +25237,7 @@ async def admin_finance_export(
         action="export",
         country_code=country,
     )
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
     ctx = await resolve_admin_country_context(request, current_user=current_user, session=session)
     export_type = (type or "").strip().lower()
     if export_type not in {"payments", "invoices", "ledger"}:
@@ -27245,6 +27127,8 @@ async def admin_activate_meilisearch_config(
         country_code=None,
     )
     await session.commit()
+    await invalidate_meili_runtime()
+    request_meili_settings_reconcile()
 
     logging.getLogger("meilisearch_config").info(
         "meili_config_activate config_id=%s activated=%s reason=%s",
@@ -27283,6 +27167,7 @@ async def admin_revoke_meilisearch_config(
         country_code=None,
     )
     await session.commit()
+    await invalidate_meili_runtime()
 
     logging.getLogger("meilisearch_config").info(
         "meili_config_revoked config_id=%s",
@@ -27306,11 +27191,9 @@ class SearchReindexPayload(BaseModel):
     reset_index: bool = True
 
 
-def _search_sync_backoff_seconds(attempt: int) -> int:
-    base = max(5, int(os.environ.get("SEARCH_SYNC_BACKOFF_BASE_SECONDS") or "20"))
-    max_delay = max(base, int(os.environ.get("SEARCH_SYNC_BACKOFF_MAX_SECONDS") or "900"))
-    delay = base * (2 ** max(0, attempt - 1))
-    return min(delay, max_delay)
+class ListingsSearchBackfillPayload(BaseModel):
+    chunk_size: int = 500
+    max_rows: Optional[int] = None
 
 
 def _serialize_search_sync_job(job: SearchSyncJob) -> dict:
@@ -27329,144 +27212,63 @@ def _serialize_search_sync_job(job: SearchSyncJob) -> dict:
     }
 
 
-async def _attempt_search_sync_job(session: AsyncSession, job: SearchSyncJob) -> tuple[bool, str]:
-    now_ts = datetime.now(timezone.utc)
-    if not job.listing_id:
-        job.status = "dead_letter"
-        job.last_error = "missing_listing_id"
-        job.updated_at = now_ts
-        return False, "missing_listing_id"
-
-    job.status = "processing"
-    job.attempts = int(job.attempts or 0) + 1
-    job.updated_at = now_ts
-    await session.flush()
-
-    try:
-        await sync_listing_to_meili(session, job.listing_id, job.operation)
-    except Exception as exc:
-        reason = str(exc)[:500]
-        job.last_error = reason
-        if job.attempts >= job.max_attempts:
-            job.status = "dead_letter"
-            job.next_retry_at = None
-        else:
-            backoff = _search_sync_backoff_seconds(job.attempts)
-            job.status = "retry"
-            job.next_retry_at = now_ts + timedelta(seconds=backoff)
-        job.updated_at = datetime.now(timezone.utc)
-        await session.flush()
-        return False, reason
-
-    job.status = "done"
-    job.next_retry_at = None
-    job.last_error = None
-    job.updated_at = datetime.now(timezone.utc)
-    await session.flush()
-    return True, "ok"
-
-
 async def _process_search_sync_jobs(
     session: AsyncSession,
     *,
     limit: int = 50,
-    include_ids: Optional[list[uuid.UUID]] = None,
 ) -> dict:
     safe_limit = min(500, max(1, int(limit or 50)))
-    now_ts = datetime.now(timezone.utc)
-
-    query = select(SearchSyncJob)
-    if include_ids:
-        query = query.where(SearchSyncJob.id.in_(include_ids))
-    else:
-        query = query.where(
-            or_(
-                SearchSyncJob.status == "pending",
-                and_(
-                    SearchSyncJob.status == "retry",
-                    or_(SearchSyncJob.next_retry_at.is_(None), SearchSyncJob.next_retry_at <= now_ts),
-                ),
-            )
-        )
-
-    jobs = (
-        (
-            await session.execute(
-                query.order_by(asc(SearchSyncJob.created_at)).limit(safe_limit)
-            )
-        )
-        .scalars()
-        .all()
-    )
-
-    success = 0
-    failed = 0
-    dead_letter = 0
-    results = []
-    for job in jobs:
-        ok, reason = await _attempt_search_sync_job(session, job)
-        if ok:
-            success += 1
-        else:
-            failed += 1
-            if job.status == "dead_letter":
-                dead_letter += 1
-        results.append({"id": str(job.id), "ok": ok, "reason": reason, "status": job.status})
-
-    await session.commit()
-    return {
-        "processed": len(jobs),
-        "success": success,
-        "failed": failed,
-        "dead_letter": dead_letter,
-        "items": results,
-    }
+    return await process_search_sync_batch(session, limit=safe_limit)
 
 
-async def _schedule_listing_sync_job(
+async def _schedule_listing_sync_jobs(
     session: AsyncSession,
     *,
-    listing_id: str | uuid.UUID,
+    listing_ids: list[str | uuid.UUID],
     operation: str,
     trigger: str,
 ) -> None:
-    try:
-        listing_uuid = listing_id if isinstance(listing_id, uuid.UUID) else uuid.UUID(str(listing_id))
-    except ValueError:
+    listing_uuids: list[uuid.UUID] = []
+    for listing_id in listing_ids:
+        try:
+            listing_uuids.append(listing_id if isinstance(listing_id, uuid.UUID) else uuid.UUID(str(listing_id)))
+        except ValueError:
+            continue
+    if not listing_uuids:
         return
 
-    max_attempts = max(1, int(os.environ.get("SEARCH_SYNC_MAX_RETRIES") or "6"))
-    now_ts = datetime.now(timezone.utc)
-    job = SearchSyncJob(
-        id=uuid.uuid4(),
-        listing_id=listing_uuid,
-        operation=operation,
-        trigger=trigger,
-        payload=None,
-        status="pending",
-        attempts=0,
-        max_attempts=max_attempts,
-        next_retry_at=now_ts,
-        last_error=None,
-        created_at=now_ts,
-        updated_at=now_ts,
-    )
-
     try:
-        session.add(job)
-        await session.commit()
-        await session.refresh(job)
-        await _process_search_sync_jobs(session, limit=1, include_ids=[job.id])
+        await enqueue_search_sync_jobs(
+            session,
+            listing_ids=listing_uuids,
+            operation=operation,
+            trigger=trigger,
+        )
     except Exception:
         await session.rollback()
         logging.getLogger("search_sync").exception(
-            "search_sync_schedule_failed listing_id=%s operation=%s trigger=%s",
-            str(listing_uuid),
+            "search_sync_schedule_failed listing_count=%s operation=%s trigger=%s",
+            len(listing_uuids),
             operation,
             trigger,
         )
 
 
+async def _schedule_listing_sync_job(
+    session: AsyncSession,
+    *,
+    listing_id: str | uuid.UUID,
+    operation: str,
+    trigger: str,
+) -> None:
+    await _schedule_listing_sync_jobs(
+        session,
+        listing_ids=[listing_id],
+        operation=operation,
+        trigger=trigger,
+    )
+
+
 @api_router.get("/admin/search/meili/health")
 async def admin_search_meili_health(
     current_user=Depends(check_permissions(["super_admin"])),
@@ -27495,6 +27297,7 @@ async def admin_search_meili_health(
         "active_index": runtime["index_name"],
         "active_url": runtime["url"],
         "index_document_count": (stats_payload or {}).get("numberOfDocuments"),
+        "client_pool": meili_client_pool_stats(),
     }
 
 
@@ -27517,6 +27320,7 @@ async def admin_search_meili_contract(
             "premium_score",
             "published_at",
             "searchable_text",
+            "_geo",
         ],
         "sync_hooks": {
             "create": "index add/upsert",
@@ -27603,6 +27407,9 @@ async def admin_list_search_sync_jobs(
 
     return {
         "metrics": metrics,
+        "pipeline": search_sync_pipeline_stats(),
+        "doping_expiry": doping_expiry_stats(),
+        "listings_search": listings_search_projection_stats(),
         "items": [_serialize_search_sync_job(item) for item in rows],
     }
 
@@ -27673,54 +27480,62 @@ async def admin_reindex_search_projection(
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"ACTIVE_CONFIG_REQUIRED: {exc}") from exc
 
-    base_filterable = [
-        "category_path_ids",
-        "make_id",
-        "model_id",
-        "trim_id",
-        "city_id",
-        "attribute_flat_map",
-        "price",
-        "premium_score",
-        "is_featured",
-        "is_urgent",
-        "featured_until_ts",
-        "urgent_until_ts",
-    ]
-    dynamic_attribute_fields = await _load_all_filterable_attribute_fields(session)
     try:
-        await meili_update_filterable_attributes(runtime, list(dict.fromkeys(base_filterable + dynamic_attribute_fields)))
+        await reconcile_meili_settings(session)
     except Exception:
-        logging.getLogger("search_sync").warning("meili_filterable_update_failed_before_reindex", exc_info=True)
-
-    if payload.reset_index:
-        await meili_clear_documents(runtime)
+        logging.getLogger("search_sync").warning("meili_settings_reconcile_failed_before_reindex", exc_info=True)
 
-    count, elapsed_seconds = await bulk_reindex_search_projection(
-        session=session,
-        chunk_size=safe_chunk,
-        max_docs=max_docs,
-    )
+    try:
+        if payload.reset_index:
+            report = await blue_green_reindex(session, runtime, chunk_size=safe_chunk, max_docs=max_docs)
+        else:
+            report = await reindex_search_projection(session, runtime, chunk_size=safe_chunk, max_docs=max_docs)
+    except Exception as exc:
+        logging.getLogger("search_sync").exception("meili_bulk_reindex_failed reset_index=%s", payload.reset_index)
+        raise HTTPException(status_code=502, detail=f"MEILI_REINDEX_FAILED: {exc}") from exc
     stats_payload = await meili_index_stats(runtime)
 
     logging.getLogger("search_sync").info(
-        "meili_bulk_reindex_done docs=%s elapsed_seconds=%.3f chunk=%s",
-        count,
-        elapsed_seconds,
+        "meili_bulk_reindex_done docs=%s elapsed_seconds=%.3f chunk=%s docs_per_second=%s",
+        report["docs_indexed"],
+        report["elapsed_seconds"],
         safe_chunk,
+        report["docs_per_second"],
     )
     return {
-        "ok": True,
-        "indexed_docs": count,
-        "elapsed_seconds": elapsed_seconds,
+        "ok": not report["failed_tasks"],
+        "indexed_docs": report["docs_indexed"],
+        "elapsed_seconds": report["elapsed_seconds"],
+        "docs_per_second": report["docs_per_second"],
+        "batches": report["batches"],
+        "failed_tasks": report["failed_tasks"],
         "chunk_size": safe_chunk,
         "reset_index": bool(payload.reset_index),
+        "swapped": bool(report.get("swapped")),
+        "requeued_changes": report.get("requeued_changes", 0),
         "index_name": runtime["index_name"],
         "url": runtime["url"],
         "index_document_count": stats_payload.get("numberOfDocuments"),
     }
 
 
+@api_router.post("/admin/search/sql/backfill")
+async def admin_backfill_listings_search(
+    payload: ListingsSearchBackfillPayload,
+    current_user=Depends(check_permissions(["super_admin"])),
+    session: AsyncSession = Depends(get_sql_session),
+):
+    del current_user
+    safe_chunk = min(1000, max(25, payload.chunk_size))
+    max_rows = payload.max_rows if payload.max_rows and payload.max_rows > 0 else None
+    try:
+        report = await backfill_listings_search(session, chunk_size=safe_chunk, max_rows=max_rows)
+    except Exception as exc:
+        logging.getLogger("search_sync").exception("listings_search_backfill_failed")
+        raise HTTPException(status_code=500, detail=f"LISTINGS_SEARCH_BACKFILL_FAILED: {exc}") from exc
+    return {"ok": True, "chunk_size": safe_chunk, "max_rows": max_rows, **report}
+
+
 @api_router.get("/search/meili")
 async def public_search_meili(
     q: str,
@@ -27728,7 +27543,7 @@ async def public_search_meili(
     offset: int = 0,
     session: AsyncSession = Depends(get_sql_session),
 ):
-    degraded_response = _search_degraded_response_if_needed()
+    degraded_response = await _search_degraded_response_if_needed()
     if degraded_response:
         return degraded_response
 
@@ -29337,26 +29152,22 @@ async def _process_category_bulk_job(job_id: str, worker_id: str) -> None:
             await session.commit()
 
 
-async def _category_bulk_job_worker_loop() -> None:
-    worker_id = f"worker-{uuid.uuid4()}"
-    while True:
-        try:
-            claimed_job_id: Optional[str] = None
-            async with AsyncSessionLocal() as session:
-                job = await _claim_next_category_bulk_job(session, worker_id)
-                if job:
-                    claimed_job_id = str(job.id)
-                await session.commit()
+_CATEGORY_BULK_WORKER_ID = f"worker-{uuid.uuid4()}"
 
-            if claimed_job_id:
-                await _process_category_bulk_job(claimed_job_id, worker_id)
-            else:
-                await asyncio.sleep(CATEGORY_BULK_JOB_WORKER_INTERVAL_SECONDS)
-        except asyncio.CancelledError:
-            raise
-        except Exception:
-            logging.getLogger("category_bulk_job_worker").exception("category_bulk_job_worker_loop_failed")
-            await asyncio.sleep(CATEGORY_BULK_JOB_WORKER_INTERVAL_SECONDS)
+
+async def _run_category_bulk_job_tick() -> Optional[float]:
+    claimed_job_id: Optional[str] = None
+    async with AsyncSessionLocal() as session:
+        job = await _claim_next_category_bulk_job(session, _CATEGORY_BULK_WORKER_ID)
+        if job:
+            claimed_job_id = str(job.id)
+        await session.commit()
+
+    if not claimed_job_id:
+        return None
+    await _process_category_bulk_job(claimed_job_id, _CATEGORY_BULK_WORKER_ID)
+    # Look for the next queued job right away.
+    return 0.0
 
 
 def _build_pricing_user_context_from_user(user: SqlUser) -> dict:
@@ -29376,107 +29187,82 @@ async def _run_batch_publish_scheduler_once(
     *,
     limit: int = BATCH_PUBLISH_LIMIT_PER_RUN,
 ) -> dict:
-    result = await session.execute(
-        select(Listing)
-        .where(Listing.status == "pending_moderation")
-        .order_by(Listing.created_at.asc())
-        .limit(limit)
-    )
-    listings = result.scalars().all()
-
-    processed = 0
-    published = 0
-    skipped = 0
-    errors = 0
-
-    for listing in listings:
-        processed += 1
-        try:
-            async with session.begin_nested():
-                if not listing.user_id:
-                    skipped += 1
-                    continue
-
-                owner = await session.get(SqlUser, listing.user_id)
-                if not owner:
-                    skipped += 1
-                    continue
-
-                owner_ctx = _build_pricing_user_context_from_user(owner)
-                pricing_response, quote, policy, override_active = await _compute_pricing_quote(session, owner_ctx, None)
-                if not pricing_response or not quote:
-                    skipped += 1
-                    continue
-
-                if quote.get("requires_payment"):
-                    skipped += 1
-                    continue
-
-                snapshot_result = await session.execute(
-                    select(PricingPriceSnapshot).where(PricingPriceSnapshot.listing_id == listing.id)
-                )
-                snapshot = snapshot_result.scalar_one_or_none()
-                if not snapshot:
-                    snapshot = await _create_pricing_snapshot(session, listing, owner_ctx, quote, policy, override_active)
-
-                _apply_snapshot_listing_type_to_listing(listing, snapshot)
-                await _consume_campaign_item_slot_if_needed(session, snapshot)
-
-                now_dt = datetime.now(timezone.utc)
-                listing.status = "published"
-                listing.published_at = now_dt
-                listing.updated_at = now_dt
-                published += 1
-        except HTTPException:
-            skipped += 1
-        except Exception:
-            errors += 1
-            logging.getLogger("batch_publish_scheduler").exception(
-                "batch_publish_scheduler_listing_failed listing_id=%s",
-                str(listing.id),
-            )
-
-    await session.commit()
-    return {
-        "processed": processed,
-        "published": published,
-        "skipped": skipped,
-        "errors": errors,
+    # Expired rows are filtered by their validity windows; the expiry job flips them.
+    policy = await _get_latest_pricing_campaign(session)
+    override_active = {
+        user_type: bool(policy and _is_pricing_campaign_active(policy, user_type))
+        for user_type in ("individual", "corporate")
     }
-
-
-def _record_batch_publish_run(result: dict, *, source: str, triggered_by: Optional[str] = None) -> None:
-    BATCH_PUBLISH_RUN_EVENTS.appendleft(
-        {
-            "run_at": datetime.now(timezone.utc).isoformat(),
-            "source": source,
-            "triggered_by": triggered_by,
-            "processed": int(result.get("processed", 0) or 0),
-            "published": int(result.get("published", 0) or 0),
-            "skipped": int(result.get("skipped", 0) or 0),
-            "errors": int(result.get("errors", 0) or 0),
-        }
+    return await run_batch_publish(
+        session,
+        user_type_of=lambda owner: _resolve_pricing_user_type(_build_pricing_user_context_from_user(owner)),
+        policy=policy,
+        override_active=override_active,
+        limit=limit,
     )
 
 
-async def _batch_publish_scheduler_loop() -> None:
-    while True:
-        try:
-            async with AsyncSessionLocal() as session:
-                result = await _run_batch_publish_scheduler_once(session)
-                _record_batch_publish_run(result, source="scheduler")
-                logging.getLogger("batch_publish_scheduler").info(
-                    "batch_publish_scheduler_run processed=%s published=%s skipped=%s errors=%s",
-                    result.get("processed"),
-                    result.get("published"),
-                    result.get("skipped"),
-                    result.get("errors"),
-                )
-        except asyncio.CancelledError:
-            raise
-        except Exception:
-            logging.getLogger("batch_publish_scheduler").exception("batch_publish_scheduler_loop_failed")
-        await asyncio.sleep(BATCH_PUBLISH_INTERVAL_SECONDS)
+async def _run_batch_publish_tick() -> None:
+    async with AsyncSessionLocal() as session:
+        result = await _run_batch_publish_scheduler_once(session)
+        await record_batch_publish_run(result, source="scheduler")
+        logging.getLogger("batch_publish_scheduler").info(
+            "batch_publish_scheduler_run processed=%s published=%s skipped=%s errors=%s duration_ms=%s listings_per_s=%s",
+            result.get("processed"),
+            result.get("published"),
+            result.get("skipped"),
+            result.get("errors"),
+            result.get("duration_ms"),
+            result.get("listings_per_second"),
+        )
+
+
+background_scheduler = Scheduler(
+    [
+        ScheduledJob(
+            "meili_settings_reconcile",
+            lambda: run_meili_settings_reconcile(AsyncSessionLocal),
+            MEILI_SETTINGS_RECONCILE_INTERVAL_SECONDS,
+            jitter=MEILI_SETTINGS_RECONCILE_INTERVAL_SECONDS * 0.1,
+            wake_event=meili_settings_reconcile_wake_event,
+        ),
+        ScheduledJob(
+            "category_bulk_jobs",
+            _run_category_bulk_job_tick,
+            CATEGORY_BULK_JOB_WORKER_INTERVAL_SECONDS,
+            jitter=1.0,
+        ),
+        # No timeout: a tick is one transaction ending in a commit, and
+        # cancelling it there could leave the outcome unknown. The claim
+        # limit bounds how long a tick runs.
+        ScheduledJob(
+            "batch_publish",
+            _run_batch_publish_tick,
+            BATCH_PUBLISH_INTERVAL_SECONDS,
+            jitter=BATCH_PUBLISH_INTERVAL_SECONDS * 0.1,
+        ),
+        # No jitter: the tick returns the exact time of the next bucket boundary.
+        ScheduledJob(
+            "doping_expiry",
+            lambda: run_doping_expiry_projection(AsyncSessionLocal),
+            DOPING_EXPIRY_BUCKET_SECONDS,
+        ),
+        ScheduledJob(
+            "expiry",
+            run_expiry_job,
+            EXPIRY_JOB_INTERVAL_SECONDS,
+            jitter=EXPIRY_JOB_INTERVAL_SECONDS * 0.1,
+        ),
+        ScheduledJob(
+            "listings_search_lag",
+            lambda: run_listings_search_lag_check(AsyncSessionLocal),
+            LISTINGS_SEARCH_LAG_CHECK_SECONDS,
+            jitter=LISTINGS_SEARCH_LAG_CHECK_SECONDS * 0.1,
+            run_at_start=False,
+        ),
+    ],
+    engine=sql_engine,
+)
 
 
 @api_router.post("/admin/listings/batch-publish/run")
@@ -29485,7 +29271,7 @@ async def admin_run_batch_publish_scheduler_once(
     session: AsyncSession = Depends(get_sql_session),
 ):
     result = await _run_batch_publish_scheduler_once(session)
-    _record_batch_publish_run(result, source="manual", triggered_by=current_user.get("id"))
+    await record_batch_publish_run(result, source="manual", triggered_by=current_user.get("id"))
     result["triggered_by"] = current_user.get("id")
     result["interval_seconds"] = BATCH_PUBLISH_INTERVAL_SECONDS
     return result
@@ -29495,11 +29281,11 @@ async def admin_run_batch_publish_scheduler_once(
 async def admin_get_batch_publish_stats(
     current_user=Depends(check_permissions(["super_admin", "country_admin", "moderator"])),
 ):
-    latest = BATCH_PUBLISH_RUN_EVENTS[0] if BATCH_PUBLISH_RUN_EVENTS else None
+    recent_runs = await recent_batch_publish_runs()
     return {
         "interval_seconds": BATCH_PUBLISH_INTERVAL_SECONDS,
-        "latest": latest,
-        "recent_runs": list(BATCH_PUBLISH_RUN_EVENTS),
+        "latest": recent_runs[0] if recent_runs else None,
+        "recent_runs": recent_runs,
         "requested_by": current_user.get("id"),
     }
 
@@ -30686,7 +30472,7 @@ async def admin_export_category_pdf(
     current_user=Depends(check_permissions(["super_admin", "country_admin", "moderator"])),
     session: AsyncSession = Depends(get_sql_session),
 ):
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
 
     try:
         category_uuid = uuid.UUID(category_id)
@@ -30745,7 +30531,7 @@ async def admin_export_category_csv(
     current_user=Depends(check_permissions(["super_admin", "country_admin", "moderator"])),
     session: AsyncSession = Depends(get_sql_session),
 ):
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
 
     try:
         category_uuid = uuid.UUID(category_id)
@@ -31843,7 +31629,7 @@ async def admin_create_attribute(
     )
     await session.commit()
 
-    await _sync_meili_filterable_attributes_from_db(session)
+    request_meili_settings_reconcile()
 
     await session.refresh(attribute)
     return {"attribute": _serialize_attribute_sql(attribute, payload.category_id)}
@@ -31953,7 +31739,7 @@ async def admin_update_attribute(
     )
     await session.commit()
 
-    await _sync_meili_filterable_attributes_from_db(session)
+    request_meili_settings_reconcile()
 
     await session.refresh(attribute)
     if not target_category_id:
@@ -32006,7 +31792,7 @@ async def admin_delete_attribute(
     )
     await session.commit()
 
-    await _sync_meili_filterable_attributes_from_db(session)
+    request_meili_settings_reconcile()
 
     return {"attribute": _serialize_attribute_sql(attribute, None)}
 
@@ -32936,7 +32722,7 @@ def _empty_dashboard_summary(start_perf: float, can_view_finance: bool, trend_wi
     }
 
 
-@api_router.get("/admin/dashboard/summary")
+@api_router.get("/admin/dashboard/summary", dependencies=[Depends(use_read_replica)])
 async def admin_dashboard_summary(
     request: Request,
     country: Optional[str] = None,
@@ -33438,7 +33224,7 @@ async def admin_dashboard_summary(
         return _empty_dashboard_summary(start_perf, can_view_finance, trend_window)
 
 
-@api_router.get("/admin/dashboard/export/pdf")
+@api_router.get("/admin/dashboard/export/pdf", dependencies=[Depends(use_read_replica)])
 async def admin_dashboard_export_pdf(
     request: Request,
     country: Optional[str] = None,
@@ -33446,7 +33232,7 @@ async def admin_dashboard_export_pdf(
     current_user=Depends(check_permissions(["super_admin"])),
     session: AsyncSession = Depends(get_sql_session),
 ):
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
 
     summary = await admin_dashboard_summary(
         request=request,
@@ -33480,7 +33266,7 @@ async def admin_dashboard_export_pdf(
     )
 
 
-@api_router.get("/admin/dashboard/country-compare")
+@api_router.get("/admin/dashboard/country-compare", dependencies=[Depends(use_read_replica)])
 async def admin_dashboard_country_compare(
     request: Request,
     period: str = "30d",
@@ -33506,7 +33292,7 @@ async def admin_dashboard_country_compare(
     )
 
 
-@api_router.get("/admin/dashboard/country-compare/export/csv")
+@api_router.get("/admin/dashboard/country-compare/export/csv", dependencies=[Depends(use_read_replica)])
 async def admin_dashboard_country_compare_export_csv(
     request: Request,
     period: str = "30d",
@@ -33519,7 +33305,7 @@ async def admin_dashboard_country_compare_export_csv(
     session: AsyncSession = Depends(get_sql_session),
 ):
     await resolve_admin_country_context(request, current_user=current_user, session=None)
-    _enforce_export_rate_limit(request, current_user.get("id"))
+    await _enforce_export_rate_limit(request, current_user.get("id"))
 
     selected_codes = _parse_country_codes(countries)
     payload = await _build_country_compare_payload_sql(
@@ -33693,143 +33479,26 @@ def _meili_quote(value: str) -> str:
 
 
 async def _resolve_category_uuid_for_search(session: AsyncSession, category: Optional[str]) -> Optional[uuid.UUID]:
-    if not category:
-        return None
-    category_value = category.strip()
-    if not category_value:
-        return None
-    try:
-        return uuid.UUID(category_value)
-    except ValueError:
-        result = await session.execute(
-            select(Category.id)
-            .where(
-                or_(
-                    Category.slug["tr"].as_string() == category_value,
-                    Category.slug["de"].as_string() == category_value,
-                    Category.slug["fr"].as_string() == category_value,
-                    Category.slug["en"].as_string() == category_value,
-                ),
-                Category.is_deleted.is_(False),
-            )
-            .order_by(Category.updated_at.desc())
-            .limit(1)
-        )
-        return result.scalars().first()
+    snapshot = await get_taxonomy_snapshot(session)
+    return snapshot.resolve_category(category)
 
 
 async def _resolve_vehicle_numeric_filter(session: AsyncSession, value: Optional[str], model: str) -> Optional[int]:
-    if not value:
-        return None
-    raw = value.strip()
-    if not raw:
-        return None
+    snapshot = await get_taxonomy_snapshot(session)
+    return snapshot.resolve_vehicle(value, model)
 
-    try:
-        return stable_numeric_id(uuid.UUID(raw))
-    except ValueError:
-        pass
 
-    if model == "make":
-        result = await session.execute(select(VehicleMake.id).where(VehicleMake.slug == raw))
-    else:
-        result = await session.execute(select(VehicleModel.id).where(VehicleModel.slug == raw))
-    found = result.scalar_one_or_none()
-    return stable_numeric_id(found) if found else None
+async def _resolve_vehicle_uuid_for_search(session: AsyncSession, value: Optional[str], model: str) -> Optional[uuid.UUID]:
+    snapshot = await get_taxonomy_snapshot(session)
+    return snapshot.resolve_vehicle_uuid(value, model)
 
 
 async def _load_filterable_attribute_map(
     session: AsyncSession,
     category_uuid: Optional[uuid.UUID],
 ) -> tuple[dict[str, dict[str, Any]], list[str]]:
-    if not category_uuid:
-        return {}, []
-
-    result = await session.execute(
-        select(Attribute)
-        .join(CategoryAttributeMap, CategoryAttributeMap.attribute_id == Attribute.id)
-        .options(selectinload(Attribute.options))
-        .where(
-            CategoryAttributeMap.category_id == category_uuid,
-            CategoryAttributeMap.is_active.is_(True),
-            Attribute.is_active.is_(True),
-            Attribute.is_filterable.is_(True),
-        )
-        .order_by(Attribute.key.asc())
-    )
-
-    attr_map: dict[str, dict[str, Any]] = {}
-    facet_fields: list[str] = []
-    for attr in result.scalars().all():
-        key = (attr.key or "").strip().lower()
-        if not key:
-            continue
-        field = f"attribute_{key}"
-        label = key
-        if isinstance(attr.name, dict):
-            label = attr.name.get("tr") or next(iter(attr.name.values()), key)
-        elif isinstance(attr.name, str):
-            label = attr.name
-
-        options = []
-        for opt in attr.options or []:
-            option_label = None
-            if isinstance(opt.label, dict):
-                option_label = opt.label.get("tr") or next(iter(opt.label.values()), None)
-            options.append({"value": opt.value, "label": option_label or opt.value})
-
-        attr_map[key] = {
-            "field": field,
-            "key": key,
-            "label": label,
-            "type": attr.attribute_type,
-            "options": options,
-        }
-        facet_fields.append(field)
-
-    return attr_map, facet_fields
-
-
-async def _load_all_filterable_attribute_fields(session: AsyncSession) -> list[str]:
-    result = await session.execute(
-        select(Attribute.key).where(
-            Attribute.is_active.is_(True),
-            Attribute.is_filterable.is_(True),
-        )
-    )
-    keys = []
-    for raw_key in result.scalars().all():
-        key = (raw_key or "").strip().lower()
-        if not key:
-            continue
-        keys.append(f"attribute_{key}")
-    return list(dict.fromkeys(keys))
-
-
-async def _sync_meili_filterable_attributes_from_db(session: AsyncSession) -> None:
-    try:
-        runtime = await get_active_meili_runtime(session)
-    except Exception:
-        return
-
-    base_filterable = [
-        "category_path_ids",
-        "make_id",
-        "model_id",
-        "trim_id",
-        "city_id",
-        "attribute_flat_map",
-        "price",
-        "premium_score",
-        "is_featured",
-        "is_urgent",
-    ]
-    dynamic_fields = await _load_all_filterable_attribute_fields(session)
-    merged = list(dict.fromkeys(base_filterable + dynamic_fields))
-    try:
-        await meili_update_filterable_attributes(runtime, merged)
-    except Exception:
-        logging.getLogger("attribute_sync").warning("meili_filterable_sync_failed", exc_info=True)
+    snapshot = await get_taxonomy_snapshot(session)
+    return snapshot.filterable_attributes(category_uuid)
 
 
 def _build_meili_filter_expression(
@@ -33842,8 +33511,17 @@ def _build_meili_filter_expression(
     price_max: Optional[int],
     attr_filters: dict[str, Any],
     attr_map: dict[str, dict[str, Any]],
+    bbox_tuple: Optional[tuple[float, float, float, float]] = None,
+    geo_radius: Optional[tuple[float, float, float]] = None,
 ) -> Optional[str]:
     filters: list[str] = []
+    if bbox_tuple is not None:
+        min_lng, min_lat, max_lng, max_lat = bbox_tuple
+        # Meili expects [top-right], [bottom-left] as [lat, lng] pairs.
+        filters.append(f"_geoBoundingBox([{max_lat}, {max_lng}], [{min_lat}, {min_lng}])")
+    if geo_radius is not None:
+        center_lat, center_lng, radius_m = geo_radius
+        filters.append(f"_geoRadius({center_lat}, {center_lng}, {int(radius_m)})")
     if category_uuid:
         filters.append(f"category_path_ids = {_meili_quote(str(category_uuid))}")
     if make_id_num is not None:
@@ -33913,8 +33591,10 @@ def _safe_float(value: Any) -> Optional[float]:
 
 def _extract_hit_lat_lng(hit: dict) -> tuple[Optional[float], Optional[float]]:
     attr_map = hit.get("attribute_flat_map") if isinstance(hit.get("attribute_flat_map"), dict) else {}
+    geo = hit.get("_geo") if isinstance(hit.get("_geo"), dict) else {}
 
     candidate_lat = [
+        geo.get("lat"),
         hit.get("latitude"),
         hit.get("lat"),
         attr_map.get("location_latitude"),
@@ -33922,6 +33602,7 @@ def _extract_hit_lat_lng(hit: dict) -> tuple[Optional[float], Optional[float]]:
         attr_map.get("latitude"),
     ]
     candidate_lng = [
+        geo.get("lng"),
         hit.get("longitude"),
         hit.get("lng"),
         attr_map.get("location_longitude"),
@@ -33939,160 +33620,30 @@ def _extract_hit_lat_lng(hit: dict) -> tuple[Optional[float], Optional[float]]:
     return lat, lng
 
 
-def _parse_bbox_param(bbox: Optional[str]) -> Optional[tuple[float, float, float, float]]:
-    if not bbox:
-        return None
-    parts = [part.strip() for part in str(bbox).split(",")]
-    if len(parts) != 4:
-        return None
-    min_lng = _safe_float(parts[0])
-    min_lat = _safe_float(parts[1])
-    max_lng = _safe_float(parts[2])
-    max_lat = _safe_float(parts[3])
-    if None in (min_lng, min_lat, max_lng, max_lat):
-        return None
-    if min_lng > max_lng or min_lat > max_lat:
-        return None
-    return float(min_lng), float(min_lat), float(max_lng), float(max_lat)
-
-
-def _hit_inside_bbox(hit: dict, bbox_tuple: tuple[float, float, float, float]) -> bool:
-    lat, lng = _extract_hit_lat_lng(hit)
-    if lat is None or lng is None:
-        return False
-    min_lng, min_lat, max_lng, max_lat = bbox_tuple
-    return min_lat <= lat <= max_lat and min_lng <= lng <= max_lng
-
-
-def _extract_attrs_lat_lng(attributes: Any) -> tuple[Optional[float], Optional[float]]:
-    if not isinstance(attributes, dict):
-        return None, None
-    location = attributes.get("location") if isinstance(attributes.get("location"), dict) else {}
-
-    lat = (
-        _safe_float(location.get("latitude"))
-        if location
-        else None
-    )
-    if lat is None and location:
-        lat = _safe_float(location.get("lat"))
-
-    lng = (
-        _safe_float(location.get("longitude"))
-        if location
-        else None
-    )
-    if lng is None and location:
-        lng = _safe_float(location.get("lng"))
-
-    if lat is None or lng is None:
-        return None, None
-    if lat < -90 or lat > 90 or lng < -180 or lng > 180:
-        return None, None
-    return lat, lng
-
-
-def _search_degraded_payload() -> Dict[str, Any]:
+def _search_degraded_payload(state: Dict[str, Any]) -> Dict[str, Any]:
     now_ts = time.time()
-    retry_after = max(1, int(_meili_circuit_open_until_ts - now_ts)) if _meili_circuit_open_until_ts > now_ts else 1
+    open_until = state["circuit_open_until_ts"]
+    retry_after = max(1, int(open_until - now_ts)) if open_until > now_ts else 1
     payload: Dict[str, Any] = {
         "error_code": "SEARCH_DEGRADED",
         "degraded": True,
         "retry_after_seconds": retry_after,
     }
-    if _meili_settings_last_error:
-        payload["reason"] = _meili_settings_last_error
-    if _meili_settings_last_error_ts:
-        payload["last_error_at"] = _meili_settings_last_error_ts
+    if state["last_error"]:
+        payload["reason"] = state["last_error"]
+    if state["last_error_at"]:
+        payload["last_error_at"] = state["last_error_at"]
     return payload
 
 
-def _search_degraded_response_if_needed() -> Optional[JSONResponse]:
-    if time.time() >= _meili_circuit_open_until_ts:
+async def _search_degraded_response_if_needed() -> Optional[JSONResponse]:
+    state = await load_meili_settings_reconciler_state()
+    if time.time() >= state["circuit_open_until_ts"]:
         return None
-    payload = _search_degraded_payload()
+    payload = _search_degraded_payload(state)
     return JSONResponse(status_code=503, content=payload, headers={"Retry-After": str(payload["retry_after_seconds"])})
 
 
-async def _meili_settings_sync_job(runtime: Dict[str, str], filterable_attributes: List[str]) -> None:
-    sortable = ["price", "premium_score", "published_at", "featured_until_ts", "urgent_until_ts"]
-    for attempt in range(1, MEILI_SETTINGS_RETRY_ATTEMPTS + 1):
-        try:
-            await asyncio.wait_for(
-                meili_update_filterable_attributes(runtime, filterable_attributes),
-                timeout=MEILI_SETTINGS_CALL_TIMEOUT_SECONDS,
-            )
-            await asyncio.wait_for(
-                meili_update_sortable_attributes(runtime, sortable),
-                timeout=MEILI_SETTINGS_CALL_TIMEOUT_SECONDS,
-            )
-            return
-        except Exception:
-            if attempt >= MEILI_SETTINGS_RETRY_ATTEMPTS:
-                raise
-            backoff = min(MEILI_SETTINGS_RETRY_BASE_SECONDS * (2 ** (attempt - 1)), MEILI_SETTINGS_RETRY_MAX_SECONDS)
-            await asyncio.sleep(backoff)
-
-
-def _enqueue_meili_settings_sync(runtime: Dict[str, str], filterable_attributes: List[str]) -> None:
-    global _meili_settings_sync_inflight
-    queue = _meili_settings_sync_queue
-    if queue is None:
-        return
-    if _meili_settings_sync_inflight:
-        return
-    if not filterable_attributes:
-        return
-    try:
-        queue.put_nowait({"runtime": runtime, "filterable_attributes": filterable_attributes})
-        _meili_settings_sync_inflight = True
-    except asyncio.QueueFull:
-        logging.getLogger("search_v2").warning("meili_settings_sync_queue_full")
-
-
-async def _meili_settings_sync_worker_loop() -> None:
-    global _meili_settings_last_sync_ts
-    global _meili_settings_sync_consecutive_failures
-    global _meili_settings_last_error
-    global _meili_settings_last_error_ts
-    global _meili_settings_last_success_ts
-    global _meili_circuit_open_until_ts
-    global _meili_settings_sync_inflight
-
-    logger = logging.getLogger("search_v2")
-    while True:
-        queue = _meili_settings_sync_queue
-        if queue is None:
-            await asyncio.sleep(0.5)
-            continue
-        payload = await queue.get()
-        try:
-            runtime = payload["runtime"]
-            filterable_attributes = payload["filterable_attributes"]
-            await _meili_settings_sync_job(runtime, filterable_attributes)
-            _meili_settings_last_sync_ts = time.time()
-            _meili_settings_sync_consecutive_failures = 0
-            _meili_settings_last_error = None
-            _meili_settings_last_error_ts = None
-            _meili_settings_last_success_ts = datetime.now(timezone.utc).isoformat()
-            _meili_circuit_open_until_ts = 0.0
-        except Exception as exc:
-            _meili_settings_sync_consecutive_failures += 1
-            _meili_settings_last_error = str(exc)
-            _meili_settings_last_error_ts = datetime.now(timezone.utc).isoformat()
-            logger.warning("meili_settings_update_failed", exc_info=True)
-            if _meili_settings_sync_consecutive_failures >= MEILI_SETTINGS_CIRCUIT_THRESHOLD:
-                _meili_circuit_open_until_ts = time.time() + MEILI_SETTINGS_CIRCUIT_OPEN_SECONDS
-                logger.error(
-                    "meili_circuit_opened failures=%s open_for=%s",
-                    _meili_settings_sync_consecutive_failures,
-                    MEILI_SETTINGS_CIRCUIT_OPEN_SECONDS,
-                )
-        finally:
-            _meili_settings_sync_inflight = False
-            queue.task_done()
-
-
 async def _meili_ping_runtime(runtime: Dict[str, str]) -> bool:
     host = (runtime.get("url") or runtime.get("host") or "").rstrip("/")
     if not host:
@@ -34109,6 +33660,25 @@ async def _meili_ping_runtime(runtime: Dict[str, str]) -> bool:
         return False
 
 
+METRICS_SCRAPE_TOKEN = os.environ.get("METRICS_SCRAPE_TOKEN")
+
+
+@api_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    if not METRICS_SCRAPE_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    auth_header = request.headers.get("authorization") or ""
+    if not hmac.compare_digest(auth_header.encode(), f"Bearer {METRICS_SCRAPE_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return PlainTextResponse(
+        render_prometheus(await merged_route_latency())
+        + render_pool_metrics(engines())
+        + render_scheduler_metrics(background_scheduler),
+        media_type="text/plain; version=0.0.4",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
 @api_router.get("/health/search")
 async def health_search(
     country: Optional[str] = None,
@@ -34120,20 +33690,21 @@ async def health_search(
         "url": runtime.get("url") or runtime.get("host"),
         "index_name": runtime.get("index_name"),
     }
-    degraded_response = _search_degraded_response_if_needed()
+    settings_state = await load_meili_settings_reconciler_state()
+    degraded_response = await _search_degraded_response_if_needed()
     if degraded_response:
         payload = degraded_response.body.decode("utf-8") if degraded_response.body else ""
         try:
             parsed = json.loads(payload) if payload else {}
         except json.JSONDecodeError:
-            parsed = _search_degraded_payload()
+            parsed = _search_degraded_payload(settings_state)
         parsed.update(
             {
                 "healthy": False,
                 "runtime": runtime_public,
                 "country": selected_country,
-                "sync_consecutive_failures": _meili_settings_sync_consecutive_failures,
-                "last_success_at": _meili_settings_last_success_ts,
+                "sync_consecutive_failures": settings_state["consecutive_failures"],
+                "last_success_at": settings_state["last_success_at"],
             }
         )
         return JSONResponse(status_code=503, content=parsed, headers=degraded_response.headers)
@@ -34150,7 +33721,7 @@ async def health_search(
                 "runtime": runtime_public,
                 "country": selected_country,
                 "reason": "Meilisearch ping failed",
-                "sync_consecutive_failures": _meili_settings_sync_consecutive_failures,
+                "sync_consecutive_failures": settings_state["consecutive_failures"],
             },
             headers={"Retry-After": "5"},
         )
@@ -34160,11 +33731,18 @@ async def health_search(
         "degraded": False,
         "runtime": runtime_public,
         "country": selected_country,
-        "last_settings_sync_at": datetime.fromtimestamp(_meili_settings_last_sync_ts, timezone.utc).isoformat()
-        if _meili_settings_last_sync_ts
+        "last_settings_sync_at": datetime.fromtimestamp(settings_state["last_sync_ts"], timezone.utc).isoformat()
+        if settings_state["last_sync_ts"]
         else None,
-        "last_success_at": _meili_settings_last_success_ts,
-        "sync_consecutive_failures": _meili_settings_sync_consecutive_failures,
+        "last_success_at": settings_state["last_success_at"],
+        "sync_consecutive_failures": settings_state["consecutive_failures"],
+        "last_settings_applied": settings_state["last_applied"],
+        "taxonomy": taxonomy_snapshot_stats(),
+        "suggest_cache": suggest_cache_stats(),
+        "facet_cache": facet_cache_stats(),
+        "sql_engine": sql_search_engine_stats(),
+        "listings_search": listings_search_projection_stats(),
+        "precompressed_cache": precompressed_cache_stats(),
     }
 
 
@@ -34175,7 +33753,7 @@ async def public_search_suggest(
     country: Optional[str] = None,
     limit: int = 8,
 ):
-    degraded_response = _search_degraded_response_if_needed()
+    degraded_response = await _search_degraded_response_if_needed()
     if degraded_response:
         return degraded_response
 
@@ -34185,13 +33763,17 @@ async def public_search_suggest(
         return {"items": [], "query": query, "cached": False, "latency_ms": 0}
 
     country_code = (country or "GLOBAL").strip().upper()
-    cache_key = _suggest_cache_key(country_code, query, safe_limit)
-    cache_started = time.perf_counter()
-    cached = _get_cached_suggest_payload(cache_key)
-    if cached:
-        return {**cached, "cached": True, "latency_ms": int((time.perf_counter() - cache_started) * 1000)}
-
     started = time.perf_counter()
+    entry, source = await lookup_suggest_candidates(country_code, query)
+    if entry is not None:
+        return {
+            "items": rank_suggest_items(entry, query, safe_limit),
+            "query": query,
+            "cached": True,
+            "cache_source": source,
+            "latency_ms": int((time.perf_counter() - started) * 1000),
+        }
+
     try:
         runtime = await get_active_meili_runtime(session)
     except Exception as exc:
@@ -34201,51 +33783,30 @@ async def public_search_suggest(
         result = await meili_search_documents(
             runtime,
             query=query,
-            limit=max(safe_limit * 3, 10),
+            limit=SUGGEST_CANDIDATE_POOL,
             offset=0,
             sort=["premium_score:desc", "published_at:desc"],
             filter_query=None,
             facets=None,
+            attributes_to_retrieve=["listing_id", "title", "city"],
         )
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"MEILI_SUGGEST_FAILED: {exc}") from exc
 
-    seen = set()
-    prefix_items = []
-    fuzzy_items = []
-    query_lower = query.lower()
-    for hit in result.get("hits", []):
-        title = (hit.get("title") or "").strip()
-        if not title:
-            continue
-        key = title.lower()
-        if key in seen:
-            continue
-        seen.add(key)
-        item = {
-            "label": title,
-            "listing_id": hit.get("listing_id"),
-            "city": hit.get("city") or "",
-        }
-        if key.startswith(query_lower):
-            prefix_items.append(item)
-        else:
-            fuzzy_items.append(item)
-        if len(prefix_items) + len(fuzzy_items) >= safe_limit:
-            break
-
-    items = (prefix_items + fuzzy_items)[:safe_limit]
-    latency_ms = int((time.perf_counter() - started) * 1000)
-    payload = {
-        "items": items,
+    raw_hits = result.get("hits", [])
+    total_hits = result.get("estimatedTotalHits", result.get("totalHits"))
+    complete = total_hits is not None and int(total_hits) <= len(raw_hits)
+    entry = await store_suggest_candidates(country_code, query, candidates_from_hits(raw_hits), complete=complete)
+    return {
+        "items": rank_suggest_items(entry, query, safe_limit),
         "query": query,
-        "latency_ms": latency_ms,
+        "cached": False,
+        "cache_source": "meili",
+        "latency_ms": int((time.perf_counter() - started) * 1000),
     }
-    _set_cached_suggest_payload(cache_key, payload)
-    return {**payload, "cached": False}
 
 
-@api_router.get("/v2/search")
+@api_router.get("/v2/search", dependencies=[Depends(use_read_replica)])
 async def public_search_v2(
     request: Request,
     response: Response,
@@ -34259,15 +33820,27 @@ async def public_search_v2(
     page: int = 1,
     limit: int = 20,
     bbox: Optional[str] = None,
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    radius_km: Optional[float] = None,
     price_min: Optional[int] = None,
     price_max: Optional[int] = None,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_sql_session),
 ):
-    """Meilisearch-backed search endpoint (no DB fallback for facets)."""
+    """Meilisearch-backed search with `listings_search` as the fallback engine.
 
-    degraded_response = _search_degraded_response_if_needed()
-    if degraded_response:
-        return degraded_response
+    When Meili is unreachable, its breaker is open or the settings circuit
+    is degraded, the same response is served from Postgres full-text search.
+    `cursor` only applies to SQL-served pages (see `pagination.next_cursor`).
+    """
+
+    degraded_response = await _search_degraded_response_if_needed()
+    meili_allowed = degraded_response is None and not meili_search_breaker_open()
+    if not meili_allowed and not SEARCH_SQL_FALLBACK_ENABLED:
+        if degraded_response:
+            return degraded_response
+        raise HTTPException(status_code=503, detail="MEILI_SEARCH_UNAVAILABLE: breaker_open")
 
     country_norm = (country or "").strip().upper()
     if not country_norm:
@@ -34276,18 +33849,16 @@ async def public_search_v2(
     page = max(1, int(page))
     limit = min(300, max(1, int(limit)))
     offset = (page - 1) * limit
-    bbox_tuple = _parse_bbox_param(bbox)
+    bbox_tuple = parse_bbox_param(bbox)
+    geo_radius = parse_geo_radius_params(lat, lng, radius_km)
 
-    query_limit = limit
-    query_offset = offset
-    if bbox_tuple is not None:
-        query_limit = min(300, max(limit, 300))
-        query_offset = 0
-
-    try:
-        runtime = await get_active_meili_runtime(session)
-    except Exception as exc:
-        raise HTTPException(status_code=503, detail=f"MEILI_SEARCH_UNAVAILABLE: {exc}") from exc
+    runtime: Optional[Dict[str, str]] = None
+    if meili_allowed:
+        try:
+            runtime = await get_active_meili_runtime(session)
+        except Exception as exc:
+            if not SEARCH_SQL_FALLBACK_ENABLED:
+                raise HTTPException(status_code=503, detail=f"MEILI_SEARCH_UNAVAILABLE: {exc}") from exc
 
     category_uuid = await _resolve_category_uuid_for_search(session, category)
     if category and not category_uuid:
@@ -34305,34 +33876,6 @@ async def public_search_v2(
     attr_filters = _parse_attr_query_filters(request.query_params)
     attr_map, attribute_facet_fields = await _load_filterable_attribute_map(session, category_uuid)
 
-    base_filterable = [
-        "category_path_ids",
-        "make_id",
-        "model_id",
-        "trim_id",
-        "city_id",
-        "attribute_flat_map",
-        "price",
-        "premium_score",
-        "is_featured",
-        "is_urgent",
-    ]
-    all_filterable = list(dict.fromkeys(base_filterable + attribute_facet_fields))
-    global _meili_settings_last_sync_ts
-    now_ts = time.time()
-    if (now_ts - _meili_settings_last_sync_ts) > MEILI_SETTINGS_SYNC_INTERVAL_SECONDS:
-        _enqueue_meili_settings_sync(runtime, all_filterable)
-
-    base_filter_expr = _build_meili_filter_expression(
-        category_uuid=category_uuid,
-        make_id_num=make_id_num,
-        model_id_num=model_id_num,
-        doping_type=doping_type,
-        price_min=price_min,
-        price_max=price_max,
-        attr_filters={},
-        attr_map=attr_map,
-    )
     filter_expr = _build_meili_filter_expression(
         category_uuid=category_uuid,
         make_id_num=make_id_num,
@@ -34342,6 +33885,8 @@ async def public_search_v2(
         price_max=price_max,
         attr_filters=attr_filters,
         attr_map=attr_map,
+        bbox_tuple=bbox_tuple,
+        geo_radius=geo_radius,
     )
 
     sort_map = {
@@ -34352,78 +33897,81 @@ async def public_search_v2(
     }
     sort_fields = sort_map.get(sort, sort_map["date_desc"])
 
-    facets_requested = list(dict.fromkeys(attribute_facet_fields + ["make_id", "model_id", "city_id"]))
-    try:
-        result = await meili_search_documents(
-            runtime,
-            query=(q or "").strip(),
-            limit=query_limit,
-            offset=query_offset,
-            sort=sort_fields,
-            filter_query=filter_expr,
-            facets=facets_requested,
-        )
-    except Exception as exc:
-        if "meili_search_failed_400" in str(exc):
-            result = await meili_search_documents(
-                runtime,
-                query=(q or "").strip(),
-                limit=query_limit,
-                offset=query_offset,
-                sort=sort_fields,
-                filter_query=base_filter_expr,
-                facets=None,
-            )
-        else:
-            raise HTTPException(status_code=502, detail=f"MEILI_SEARCH_FAILED: {exc}") from exc
-
-    raw_hits = result.get("hits", [])
-
-    listing_coords: dict[str, tuple[Optional[float], Optional[float]]] = {}
-    listing_uuid_map: dict[str, uuid.UUID] = {}
-    for hit in raw_hits:
-        listing_id = str(hit.get("listing_id") or "").strip()
-        if not listing_id:
-            continue
+    base_facets = ["make_id", "model_id", "city_id"]
+    facets_requested = list(dict.fromkeys(attribute_facet_fields + base_facets))
+    result: Optional[Dict[str, Any]] = None
+    if runtime is not None:
+        search_args = {"query": (q or "").strip(), "limit": limit, "offset": offset, "sort": sort_fields}
         try:
-            listing_uuid_map[listing_id] = uuid.UUID(listing_id)
-        except ValueError:
-            continue
-
-    if listing_uuid_map:
-        listing_rows = (
-            (
-                await session.execute(
-                    select(Listing.id, Listing.attributes).where(Listing.id.in_(list(listing_uuid_map.values())))
+            try:
+                result = await search_with_cached_facets(
+                    runtime, **search_args, filter_query=filter_expr, facets=facets_requested
                 )
-            )
-            .all()
+            except Exception as exc:
+                if not is_meili_search_bad_request(exc):
+                    raise
+                # An attribute made filterable since the last settings
+                # reconcile is rejected until the index catches up; serve the
+                # page without attribute filters and facets meanwhile.
+                logging.getLogger("search_v2").warning(
+                    "meili_search_rejected_retrying_without_attributes category=%s attr_filters=%s error=%s",
+                    category_uuid,
+                    sorted(attr_filters),
+                    exc,
+                )
+                base_filter_expr = _build_meili_filter_expression(
+                    category_uuid=category_uuid,
+                    make_id_num=make_id_num,
+                    model_id_num=model_id_num,
+                    doping_type=doping_type,
+                    price_min=price_min,
+                    price_max=price_max,
+                    attr_filters={},
+                    attr_map=attr_map,
+                    bbox_tuple=bbox_tuple,
+                    geo_radius=geo_radius,
+                )
+                result = await search_with_cached_facets(
+                    runtime, **search_args, filter_query=base_filter_expr, facets=base_facets
+                )
+            record_meili_search_success()
+        except Exception as exc:
+            # Rejections are not counted by the breaker; the SQL engine
+            # still answers them.
+            record_meili_search_failure(exc)
+            if not SEARCH_SQL_FALLBACK_ENABLED:
+                raise HTTPException(status_code=502, detail=f"MEILI_SEARCH_FAILED: {exc}") from exc
+            logging.getLogger("search_v2").warning("meili_search_failed_falling_back_to_sql error=%s", exc)
+
+    search_backend = "meili"
+    if result is None:
+        search_backend = "sql"
+        result = await sql_search_documents(
+            session,
+            country=country_norm,
+            query=q,
+            category_uuid=category_uuid,
+            make_uuid=await _resolve_vehicle_uuid_for_search(session, make, "make"),
+            model_uuid=await _resolve_vehicle_uuid_for_search(session, model, "model"),
+            doping_type=doping_type,
+            price_min=price_min,
+            price_max=price_max,
+            attr_filters=attr_filters,
+            attr_map=attr_map,
+            sort=sort,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            facets=facets_requested,
+            bbox_tuple=bbox_tuple,
+            geo_radius=geo_radius,
         )
-        for row in listing_rows:
-            lat, lng = _extract_attrs_lat_lng(row.attributes)
-            listing_coords[str(row.id)] = (lat, lng)
 
-    if bbox_tuple is not None:
-        filtered_hits = []
-        for hit in raw_hits:
-            listing_id = str(hit.get("listing_id") or "")
-            lat, lng = listing_coords.get(listing_id, (None, None))
-            if lat is None or lng is None:
-                lat, lng = _extract_hit_lat_lng(hit)
-            if lat is None or lng is None:
-                filtered_hits.append(hit)
-                continue
-            min_lng, min_lat, max_lng, max_lat = bbox_tuple
-            if min_lat <= lat <= max_lat and min_lng <= lng <= max_lng:
-                filtered_hits.append(hit)
-        raw_hits = filtered_hits[offset: offset + limit]
+    raw_hits = result.get("hits", [])
 
     items = []
     for hit in raw_hits:
-        listing_id = str(hit.get("listing_id") or "")
-        lat, lng = listing_coords.get(listing_id, (None, None))
-        if lat is None or lng is None:
-            lat, lng = _extract_hit_lat_lng(hit)
+        hit_lat, hit_lng = _extract_hit_lat_lng(hit)
         items.append(
             {
                 "id": hit.get("listing_id"),
@@ -34442,8 +33990,8 @@ async def public_search_v2(
                 "featured_until": hit.get("featured_until"),
                 "urgent_until": hit.get("urgent_until"),
                 "premium_score": hit.get("premium_score") or 0,
-                "lat": lat,
-                "lng": lng,
+                "lat": hit_lat,
+                "lng": hit_lng,
             }
         )
 
@@ -34502,18 +34050,22 @@ async def public_search_v2(
             facets_payload[key] = {"min": float(min_val), "max": float(max_val), "step": 1}
             continue
 
-    if bbox_tuple is not None:
-        total = len(filtered_hits)
-    else:
-        total = int(result.get("estimatedTotalHits") or 0)
+    total = int(result.get("estimatedTotalHits") or 0)
     pages = (total + limit - 1) // limit if total else 0
-    response.headers["Cache-Control"] = "no-store"
-    return {
-        "items": items,
-        "facets": facets_payload,
-        "facet_meta": facet_meta,
-        "pagination": {"total": total, "page": page, "pages": pages},
-    }
+    pagination: Dict[str, Any] = {"total": total, "page": page, "pages": pages}
+    if result.get("nextCursor"):
+        pagination["next_cursor"] = result["nextCursor"]
+    # Hits are already JSON-native; returning the response directly skips
+    # jsonable_encoder, which dominates serialization cost for this payload.
+    return FastJSONResponse(
+        {
+            "items": items,
+            "facets": facets_payload,
+            "facet_meta": facet_meta,
+            "pagination": pagination,
+        },
+        headers={"Cache-Control": "no-store", "X-Search-Backend": search_backend},
+    )
 
 
 # =====================
@@ -37863,12 +37415,6 @@ CAMPAIGN_STATUSES = {"draft", "active", "paused", "expired"}
 PRICING_CAMPAIGN_SCOPES = {"individual", "corporate", "all"}
 PRICING_CAMPAIGN_ITEM_SCOPES = {"individual", "corporate"}
 PRICING_CAMPAIGN_ITEM_LISTING_TYPES = {"free", "paid", "urgent", "showcase"}
-PRICING_LISTING_TYPE_PRIORITY = {
-    "showcase": 0,
-    "urgent": 1,
-    "paid": 2,
-    "free": 3,
-}
 
 DOPING_STATUSES = {"requested", "paid", "approved", "published", "expired"}
 
@@ -39853,36 +39399,6 @@ async def _expire_tier_rules(session: AsyncSession) -> None:
     await session.commit()
 
 
-async def _expire_package_subscriptions(session: AsyncSession, actor: Optional[dict] = None) -> None:
-    now = datetime.now(timezone.utc)
-    result = await session.execute(
-        select(UserPackageSubscription).where(
-            UserPackageSubscription.status == "active",
-            UserPackageSubscription.ends_at.isnot(None),
-            UserPackageSubscription.ends_at < now,
-        )
-    )
-    expired = result.scalars().all()
-    if not expired:
-        return
-    system_actor = actor or {"id": None, "email": "system@internal"}
-    for sub in expired:
-        sub.status = "expired"
-        sub.remaining_quota = 0
-        sub.updated_at = now
-        await _write_audit_log_sql(
-            session=session,
-            action="PRICING_PACKAGE_EXPIRED",
-            actor=system_actor,
-            resource_type="pricing_package",
-            resource_id=str(sub.package_id),
-            metadata={"subscription_id": str(sub.id)},
-            request=None,
-            country_code=None,
-        )
-    await session.commit()
-
-
 def _pricing_year_bounds(now: datetime) -> tuple[datetime, datetime]:
     start = datetime(now.year, 1, 1, tzinfo=timezone.utc)
     end = datetime(now.year + 1, 1, 1, tzinfo=timezone.utc)
@@ -39930,25 +39446,27 @@ def _pick_tier_rule(rules: list[PricingTierRule], listing_no: int) -> Optional[P
 
 async def _get_active_subscription(
     session: AsyncSession, user_id: uuid.UUID
-) -> tuple[Optional[UserPackageSubscription], Optional[PricingPackage]]:
+) -> tuple[Optional[UserPackageSubscription], Optional[CatalogPackage]]:
+    packages = (await get_pricing_catalog(session)).packages
+    if not packages:
+        return None, None
     now = datetime.now(timezone.utc)
     result = await session.execute(
-        select(UserPackageSubscription, PricingPackage)
-        .join(PricingPackage, PricingPackage.id == UserPackageSubscription.package_id)
+        select(UserPackageSubscription)
         .where(
             UserPackageSubscription.user_id == user_id,
             UserPackageSubscription.status == "active",
             UserPackageSubscription.remaining_quota > 0,
             or_(UserPackageSubscription.ends_at.is_(None), UserPackageSubscription.ends_at > now),
-            PricingPackage.is_active.is_(True),
+            UserPackageSubscription.package_id.in_(list(packages)),
         )
         .order_by(desc(UserPackageSubscription.starts_at))
         .limit(1)
     )
-    row = result.first()
-    if not row:
+    subscription = result.scalar_one_or_none()
+    if not subscription:
         return None, None
-    return row[0], row[1]
+    return subscription, packages[subscription.package_id]
 
 
 def _resolve_pricing_user_type(current_user: dict) -> str:
@@ -39973,10 +39491,6 @@ def _campaign_item_is_available(item: PricingCampaignItem, now: datetime) -> boo
     return True
 
 
-def _campaign_item_priority(item: PricingCampaignItem) -> int:
-    return PRICING_LISTING_TYPE_PRIORITY.get((item.listing_type or "free").strip().lower(), 99)
-
-
 async def _count_consumed_campaign_item_slots(
     session: AsyncSession,
     user_id: uuid.UUID,
@@ -39997,15 +39511,33 @@ async def _count_consumed_campaign_item_slots(
     return consumed
 
 
+async def _count_consumed_slots_by_campaign_item(session: AsyncSession, user_id: uuid.UUID) -> Dict[uuid.UUID, int]:
+    result = await session.execute(
+        select(PricingPriceSnapshot.campaign_item_id, PricingPriceSnapshot.meta).where(
+            PricingPriceSnapshot.user_id == user_id,
+            PricingPriceSnapshot.campaign_item_id.isnot(None),
+        )
+    )
+    consumed: Dict[uuid.UUID, int] = {}
+    for campaign_item_id, metadata in result.all():
+        if isinstance(metadata, dict) and metadata.get("slot_consumed"):
+            consumed[campaign_item_id] = consumed.get(campaign_item_id, 0) + 1
+    return consumed
+
+
 async def _campaign_item_remaining_slots(
     session: AsyncSession,
     user_id: uuid.UUID,
-    item: PricingCampaignItem,
+    item: PricingCampaignItem | CatalogCampaignItem,
+    consumed: Optional[Dict[uuid.UUID, int]] = None,
 ) -> Optional[int]:
     quota = int(item.listing_quota or 0)
     if quota <= 0:
         return None
-    used = await _count_consumed_campaign_item_slots(session, user_id, item.id)
+    if consumed is not None:
+        used = consumed.get(item.id, 0)
+    else:
+        used = await _count_consumed_campaign_item_slots(session, user_id, item.id)
     return max(0, quota - used)
 
 
@@ -40044,36 +39576,9 @@ def _apply_snapshot_listing_type_to_listing(
         return
 
     metadata = snapshot.meta if isinstance(snapshot.meta, dict) else {}
-    listing_type = str(metadata.get("listing_type") or "").strip().lower()
-    if listing_type not in {"showcase", "urgent", "paid"}:
-        return
-
-    ref_now = now or datetime.now(timezone.utc)
-    duration_days = int(snapshot.publish_days or snapshot.duration_days or 30)
-    duration_days = max(1, min(365, duration_days))
-    until_at = ref_now + timedelta(days=duration_days)
-
-    if listing_type == "showcase":
-        listing.featured_until = until_at
-        listing.urgent_until = None
-        listing.paid_until = None
-        listing.is_showcase = True
-        listing.showcase_expires_at = until_at
-        return
-
-    if listing_type == "urgent":
-        listing.urgent_until = until_at
-        listing.featured_until = None
-        listing.paid_until = None
-        listing.is_showcase = False
-        listing.showcase_expires_at = None
-        return
-
-    listing.paid_until = until_at
-    listing.featured_until = None
-    listing.urgent_until = None
-    listing.is_showcase = False
-    listing.showcase_expires_at = None
+    values = listing_type_values(metadata.get("listing_type"), snapshot_duration_days(snapshot), now or datetime.now(timezone.utc))
+    for column, value in values.items():
+        setattr(listing, column, value)
 
 
 def _serialize_campaign_item_for_quote(item: PricingCampaignItem) -> Dict[str, Any]:
@@ -40117,17 +39622,21 @@ async def _resolve_campaign_item_from_payload(
     payload: Optional[PricingQuotePayload],
     listing_type: Optional[str] = None,
     user_id: Optional[uuid.UUID] = None,
-) -> Optional[PricingCampaignItem]:
+    consumed: Optional[Dict[uuid.UUID, int]] = None,
+) -> Optional[PricingCampaignItem | CatalogCampaignItem]:
     if not payload:
         return None
 
     now = datetime.now(timezone.utc)
+    catalog = await get_pricing_catalog(session)
     if payload.campaign_item_id:
         try:
             item_uuid = uuid.UUID(payload.campaign_item_id)
         except ValueError as exc:
             raise HTTPException(status_code=400, detail="campaign_item_id invalid") from exc
-        item = await session.get(PricingCampaignItem, item_uuid)
+        # Items missing from the catalog are inactive, ended or deleted; the
+        # row is only read to tell those apart.
+        item = catalog.campaign_item(item_uuid) or await session.get(PricingCampaignItem, item_uuid)
         if not item or item.scope != scope or item.is_deleted:
             raise HTTPException(status_code=404, detail="Campaign item not found")
         if listing_type and item.listing_type != listing_type:
@@ -40135,52 +39644,28 @@ async def _resolve_campaign_item_from_payload(
         if not _campaign_item_is_available(item, now):
             raise HTTPException(status_code=409, detail="Campaign item is not active")
         if user_id:
-            remaining = await _campaign_item_remaining_slots(session, user_id, item)
+            remaining = await _campaign_item_remaining_slots(session, user_id, item, consumed)
             if remaining is not None and remaining <= 0:
                 raise HTTPException(status_code=409, detail="Campaign slot quota exhausted")
         return item
 
     if payload.listing_quota:
-        query = select(PricingCampaignItem).where(
-            PricingCampaignItem.scope == scope,
-            PricingCampaignItem.listing_quota == payload.listing_quota,
-            PricingCampaignItem.is_deleted.is_(False),
-        )
-        if listing_type:
-            query = query.where(PricingCampaignItem.listing_type == listing_type)
-        result = await session.execute(query)
-        for item in result.scalars().all():
-            if _campaign_item_is_available(item, now):
-                if user_id:
-                    remaining = await _campaign_item_remaining_slots(session, user_id, item)
-                    if remaining is not None and remaining <= 0:
-                        continue
-                return item
+        for item in catalog.active_campaign_items(scope, listing_type, now=now):
+            if item.listing_quota != payload.listing_quota:
+                continue
+            if user_id:
+                remaining = await _campaign_item_remaining_slots(session, user_id, item, consumed)
+                if remaining is not None and remaining <= 0:
+                    continue
+            return item
 
     return None
 
 
 async def _get_active_pricing_campaign_items(
     session: AsyncSession, scope: str, listing_type: Optional[str] = None
-) -> list[PricingCampaignItem]:
-    now = datetime.now(timezone.utc)
-    query = (
-        select(PricingCampaignItem)
-        .where(
-            PricingCampaignItem.scope == scope,
-            PricingCampaignItem.is_deleted.is_(False),
-            PricingCampaignItem.is_active.is_(True),
-            PricingCampaignItem.start_at.isnot(None),
-            PricingCampaignItem.end_at.isnot(None),
-            PricingCampaignItem.start_at <= now,
-            PricingCampaignItem.end_at >= now,
-        )
-        .order_by(PricingCampaignItem.listing_quota)
-    )
-    if listing_type:
-        query = query.where(PricingCampaignItem.listing_type == listing_type)
-    result = await session.execute(query)
-    return result.scalars().all()
+) -> list[CatalogCampaignItem]:
+    return (await get_pricing_catalog(session)).active_campaign_items(scope, listing_type)
 
 
 async def _build_campaign_item_quote(
@@ -40193,53 +39678,22 @@ async def _build_campaign_item_quote(
     if payload and payload.listing_type:
         requested_listing_type = _normalize_campaign_item_listing_type(payload.listing_type)
     items = await _get_active_pricing_campaign_items(session, scope, requested_listing_type)
+    consumed = await _count_consumed_slots_by_campaign_item(session, user_id) if user_id else None
     if user_id:
-        filtered_items: list[PricingCampaignItem] = []
+        filtered_items: list[CatalogCampaignItem] = []
         for item in items:
-            remaining = await _campaign_item_remaining_slots(session, user_id, item)
+            remaining = await _campaign_item_remaining_slots(session, user_id, item, consumed)
             if remaining is None or remaining > 0:
                 filtered_items.append(item)
         items = filtered_items
 
-    selected = await _resolve_campaign_item_from_payload(session, scope, payload, requested_listing_type, user_id)
-
+    selected = await _resolve_campaign_item_from_payload(
+        session, scope, payload, requested_listing_type, user_id, consumed
+    ) or pick_campaign_item(items)
     if not selected:
-        if len(items) == 1:
-            selected = items[0]
-        elif len(items) == 0:
-            return {
-                "type": "campaign_none",
-                "reason": "no_active_campaign",
-                "requires_payment": False,
-                "amount": 0,
-                "currency": "EUR",
-                "publish_days": 90,
-                "listing_quota": 1,
-                "scope": scope,
-                "listing_type": requested_listing_type,
-            }
-        else:
-            selected = sorted(
-                items,
-                key=lambda item: (_campaign_item_priority(item), float(item.price_amount or 0), int(item.listing_quota or 0)),
-            )[0]
-
-    amount = float(selected.price_amount or 0)
-    return {
-        "type": "campaign_item",
-        "reason": "campaign_item",
-        "campaign_item_id": str(selected.id),
-        "name": selected.name,
-        "listing_quota": selected.listing_quota,
-        "amount": amount,
-        "currency": selected.currency,
-        "publish_days": selected.publish_days,
-        "requires_payment": amount > 0,
-        "quota_used": False,
-        "scope": scope,
-        "listing_type": selected.listing_type,
-        "remaining_slots": await _campaign_item_remaining_slots(session, user_id, selected) if user_id else None,
-    }
+        return no_campaign_quote(scope, requested_listing_type)
+    remaining = await _campaign_item_remaining_slots(session, user_id, selected, consumed) if user_id else None
+    return campaign_item_quote(selected, scope, remaining)
 
 
 async def _build_individual_quote(session: AsyncSession, user_id: uuid.UUID, payload: Optional[PricingQuotePayload]) -> Dict[str, Any]:
@@ -40249,19 +39703,7 @@ async def _build_individual_quote(session: AsyncSession, user_id: uuid.UUID, pay
 async def _build_corporate_quote(session: AsyncSession, user_id: uuid.UUID, payload: Optional[PricingQuotePayload]) -> Dict[str, Any]:
     subscription, package = await _get_active_subscription(session, user_id)
     if subscription and package:
-        return {
-            "type": "quota",
-            "reason": "quota_subscription",
-            "subscription_id": str(subscription.id),
-            "package_id": str(package.id),
-            "listing_quota": package.listing_quota,
-            "amount": 0,
-            "currency": package.currency,
-            "publish_days": package.publish_days,
-            "requires_payment": False,
-            "quota_used": True,
-            "remaining_quota": subscription.remaining_quota,
-        }
+        return quota_quote(subscription, package)
 
     return await _build_campaign_item_quote(session, "corporate", payload, user_id)
 
@@ -40286,14 +39728,11 @@ def _build_pricing_quote_response(
 
 async def _compute_pricing_quote(
     session: AsyncSession, current_user: dict, payload: Optional[PricingQuotePayload] = None
-) -> tuple[Dict[str, Any], Dict[str, Any], Optional[PricingCampaign], str]:
-    await _ensure_pricing_defaults(session)
-    await _expire_pricing_campaigns(session, actor=current_user)
-    await _expire_pricing_campaign_items(session, actor=current_user)
-    await _expire_package_subscriptions(session, actor=current_user)
-
+) -> tuple[Dict[str, Any], Dict[str, Any], Optional[CatalogPolicy], str]:
+    # Read-only: expired rows are filtered by their validity windows here and
+    # flipped by the scheduled expiry job, never by a quote.
     user_type = _resolve_pricing_user_type(current_user)
-    policy = await _get_latest_pricing_campaign(session)
+    policy = (await get_pricing_catalog(session)).policy
     override_active = False
     if policy:
         override_active = _is_pricing_campaign_active(policy, user_type)
@@ -40325,31 +39764,12 @@ async def _create_pricing_snapshot(
     if snapshot:
         return snapshot
 
-    publish_days = quote.get("publish_days") or quote.get("duration_days") or 90
-
-    snapshot = PricingPriceSnapshot(
+    snapshot = build_pricing_snapshot(
         listing_id=listing.id,
         user_id=listing.user_id,
-        rule_id=_safe_uuid(quote.get("rule_id")),
-        package_id=_safe_uuid(quote.get("package_id")),
-        campaign_id=policy.id if policy and override_active else None,
-        campaign_item_id=_safe_uuid(quote.get("campaign_item_id")),
-        listing_quota=quote.get("listing_quota"),
-        currency=quote.get("currency") or "EUR",
-        amount=quote.get("amount") or 0,
-        duration_days=publish_days,
-        publish_days=publish_days,
-        campaign_override_active=bool(override_active),
-        snapshot_type=quote.get("type") or "campaign_item",
-        metadata={
-            "listing_no": quote.get("listing_no"),
-            "listing_count_year": quote.get("listing_count_year"),
-            "quota_used": quote.get("quota_used"),
-            "requires_payment": quote.get("requires_payment"),
-            "campaign_item_id": quote.get("campaign_item_id"),
-            "listing_quota": quote.get("listing_quota"),
-            "listing_type": quote.get("listing_type"),
-        },
+        quote=quote,
+        campaign_id=policy.id if policy else None,
+        override_active=override_active,
     )
     session.add(snapshot)
     return snapshot
@@ -43002,6 +42422,8 @@ if _c3_finance_duplicates:
 RBAC_ALLOWLIST, RBAC_MISSING_POLICIES = _build_rbac_allowlist(app)
 app.state.rbac_allowlist = RBAC_ALLOWLIST
 app.state.rbac_missing_policies = RBAC_MISSING_POLICIES
+# Compile the route index now rather than on the first admin request.
+get_admin_route_table(app)
 if RBAC_MISSING_POLICIES:
     logging.getLogger("rbac_guard").warning(
         "rbac_policy_missing",
@@ -0,0 +1,107 @@
+import re
+import uuid
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+
+from app.middleware.rbac_middleware import AdminRouteTable, get_admin_route_table
+
+
+METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+_SAMPLES = {"int": "42", "float": "1.5", "uuid": str(uuid.UUID(int=5)), "path": "a/b/c", "str": "item-1"}
+
+
+def _linear_match(app, method, path):
+    """The matcher the table replaces: first APIRoute in registration order."""
+    scope = {"type": "http", "path": path, "method": method, "root_path": ""}
+    for route in app.router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        if method not in route.methods:
+            continue
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+    return None
+
+
+def _sample_paths(route):
+    def fill(match):
+        name, _, kind = match.group(1).partition(":")
+        return _SAMPLES.get(kind or "str", "item-1")
+
+    concrete = re.sub(r"{([^}]+)}", fill, route.path)
+    return {concrete, concrete + "/", concrete + "/extra", route.path}
+
+
+def _build_app():
+    app = FastAPI()
+    admin = APIRouter(prefix="/api/admin")
+
+    async def handler():
+        return {}
+
+    admin.add_api_route("/users", handler, methods=["GET", "POST"])
+    # Registered before the static route it shadows.
+    admin.add_api_route("/users/{user_id}", handler, methods=["GET", "DELETE"])
+    admin.add_api_route("/users/export", handler, methods=["GET"])
+    admin.add_api_route("/users/{user_id:int}/roles", handler, methods=["PUT"])
+    admin.add_api_route("/{section}/settings", handler, methods=["GET"])
+    admin.add_api_route("/listings/{listing_id:uuid}", handler, methods=["PATCH"])
+    admin.add_api_route("/files/{file_path:path}", handler, methods=["GET"])
+    admin.add_api_route("/invite/preview", handler, methods=["GET"])
+    for index in range(50):
+        admin.add_api_route(f"/bulk{index}/{{item_id}}", handler, methods=["GET", "POST"])
+    app.include_router(admin)
+    app.add_api_route("/api/{catch_all:path}", handler, methods=["GET"])
+    app.add_api_route("/api/v1/admin/reports/{report_id}", handler, methods=["GET"])
+    return app
+
+
+def _assert_same_decisions(app):
+    table = get_admin_route_table(app)
+    checked = 0
+    for route in app.router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for path in _sample_paths(route) | {"/api/admin/unknown", "/api/admin/users/1/2/3"}:
+            for method in METHODS:
+                entry = table.match(method, path)
+                expected = _linear_match(app, method, path)
+                assert (entry.route if entry else None) is expected, (method, path)
+                checked += 1
+    assert checked
+
+
+def test_table_matches_linear_scan_for_every_route():
+    app = _build_app()
+    _assert_same_decisions(app)
+
+    table = get_admin_route_table(app)
+    assert table.match("GET", "/api/admin/users/export").path == "/api/admin/users/{user_id}"
+    assert table.match("GET", "/api/admin/nothing/here").path == "/api/{catch_all:path}"
+    assert table.match("POST", "/api/admin/nothing") is None
+
+
+def test_table_carries_policy_and_rebuilds_on_route_change():
+    app = _build_app()
+    app.state.rbac_allowlist = {"GET /api/admin/users": ["super_admin"]}
+    table = get_admin_route_table(app)
+    assert table.match("GET", "/api/admin/users").required_roles == ["super_admin"]
+    assert get_admin_route_table(app) is table
+
+    async def handler():
+        return {}
+
+    app.add_api_route("/api/admin/late", handler, methods=["POST"])
+    rebuilt = get_admin_route_table(app)
+    assert rebuilt is not table
+    assert rebuilt.match("POST", "/api/admin/late").path == "/api/admin/late"
+
+
+def test_table_matches_linear_scan_for_the_real_app():
+    server = pytest.importorskip("server")
+    _assert_same_decisions(server.app)
+    assert isinstance(server.app.state.admin_route_table, AdminRouteTable)
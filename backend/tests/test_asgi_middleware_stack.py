@@ -0,0 +1,102 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.middleware.rbac_middleware import RbacHardLockMiddleware
+from app.middleware.request_guards import (
+    CONTENT_SECURITY_POLICY,
+    FailSafeResponseGuardMiddleware,
+    RequestMetricsMiddleware,
+)
+
+
+class _Route:
+    def __init__(self, path):
+        self.path = path
+
+
+def _build_app(user=None):
+    app = FastAPI()
+    app.state.rbac_allowlist = {
+        "GET /api/admin/users": ["super_admin"],
+        "GET /api/admin/invite/preview": ["public"],
+    }
+    audit = []
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    @app.get("/api/admin/users")
+    async def admin_users():
+        return {"items": []}
+
+    @app.get("/api/admin/invite/preview")
+    async def invite_preview():
+        return {"ok": True}
+
+    def match_route(request, path):
+        known = {"/api/admin/users", "/api/admin/invite/preview", "/api/admin/unmapped"}
+        return _Route(path) if path in known else None
+
+    async def resolve_user(request):
+        return user
+
+    async def write_audit_log(request, actor, action, metadata):
+        audit.append(action)
+
+    app.add_middleware(FailSafeResponseGuardMiddleware)
+    app.add_middleware(RequestMetricsMiddleware)
+    app.add_middleware(
+        RbacHardLockMiddleware,
+        match_route=match_route,
+        resolve_user=resolve_user,
+        write_audit_log=write_audit_log,
+    )
+    return app, audit
+
+
+async def _get(app, path):
+    async with AsyncClient(transport=ASGITransport(app=app, raise_app_exceptions=False), base_url="http://test") as client:
+        return await client.get(path)
+
+
+@pytest.mark.asyncio
+async def test_metrics_headers_and_error_guard():
+    app, _ = _build_app()
+    res = await _get(app, "/api/ping")
+    assert res.status_code == 200
+    assert res.headers["content-security-policy"] == CONTENT_SECURITY_POLICY
+    assert float(res.headers["x-response-time-ms"]) >= 0
+
+    res = await _get(app, "/api/boom")
+    assert res.status_code == 500
+    assert res.json()["error_code"] == "MIDDLEWARE_GUARD_ERROR"
+    assert "content-security-policy" in res.headers
+
+
+@pytest.mark.asyncio
+async def test_rbac_lock_decisions():
+    app, audit = _build_app()
+    assert (await _get(app, "/api/admin/missing")).status_code == 404
+    assert (await _get(app, "/api/admin/users")).status_code == 401
+    assert (await _get(app, "/api/admin/invite/preview")).status_code == 200
+
+    res = await _get(app, "/api/admin/unmapped")
+    assert res.status_code == 403 and res.json() == {"detail": "RBAC policy missing"}
+    assert audit == ["RBAC_POLICY_MISSING"]
+
+
+@pytest.mark.asyncio
+async def test_rbac_lock_checks_role():
+    app, audit = _build_app(user={"role": "moderator"})
+    res = await _get(app, "/api/admin/users")
+    assert res.status_code == 403 and res.json() == {"detail": "Insufficient permissions"}
+    assert audit == ["RBAC_DENY"]
+
+    app, _ = _build_app(user={"role": "super_admin"})
+    assert (await _get(app, "/api/admin/users")).json() == {"items": []}
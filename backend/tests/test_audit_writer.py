@@ -0,0 +1,211 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+
+from app.services.audit_writer import AuditLogWriter, build_audit_row
+
+
+class _Session:
+    def __init__(self, sink, fail, error=None):
+        self.sink = sink
+        self.fail = fail
+        self.error = error or DataError("INSERT INTO audit_logs", {}, Exception("value too long"))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, rows):
+        if self.fail is True or (callable(self.fail) and any(self.fail(row) for row in rows)):
+            raise self.error
+        self.sink.append(list(rows))
+
+    async def commit(self):
+        return None
+
+
+def _factory(sink, fail=False, error=None):
+    return lambda: _Session(sink, fail, error)
+
+
+def _outage():
+    return OperationalError("INSERT INTO audit_logs", {}, ConnectionRefusedError("db down"))
+
+
+def _row(index):
+    return build_audit_row(action="RBAC_DENY", resource_type="rbac_guard", resource_id=f"/api/admin/{index}")
+
+
+@pytest.mark.asyncio
+async def test_rows_are_written_in_batches_on_size_and_shutdown():
+    batches = []
+    writer = AuditLogWriter(batch_size=3, flush_interval=60)
+    task = asyncio.create_task(writer.run(_factory(batches)))
+    await asyncio.sleep(0)
+
+    for index in range(3):
+        assert writer.submit(_row(index))
+    await asyncio.sleep(0.01)
+    # A full batch wakes the loop long before the interval.
+    assert [len(batch) for batch in batches] == [3]
+
+    writer.submit(_row(3))
+    await asyncio.sleep(0.01)
+    assert [len(batch) for batch in batches] == [3]
+
+    assert await writer.close(task) == 1
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert batches[0][0]["metadata_info"] == {} and batches[0][0]["action"] == "RBAC_DENY"
+    stats = writer.stats()
+    assert stats["written"] == 4 and stats["batches"] == 2 and stats["queue_depth"] == 0
+    assert stats["running"] is False
+
+
+@pytest.mark.asyncio
+async def test_interval_flush_and_backpressure():
+    batches = []
+    writer = AuditLogWriter(max_queue_size=100, batch_size=500, flush_interval=0.05)
+    task = asyncio.create_task(writer.run(_factory(batches)))
+    for index in range(120):
+        writer.submit(_row(index))
+    stats = writer.stats()
+    assert stats["dropped"] == 20 and stats["high_watermark"] == 100
+
+    await asyncio.sleep(0.15)
+    assert sum(len(batch) for batch in batches) == 100
+    await writer.close(task)
+
+
+@pytest.mark.asyncio
+async def test_rejected_rows_are_counted_not_raised():
+    writer = AuditLogWriter(batch_size=10, flush_interval=60, flush_retries=0)
+    writer._session_factory = _factory([], fail=True)
+    writer.submit(_row(1))
+    assert await writer.flush() == 0
+    stats = writer.stats()
+    assert stats["failed"] == 1 and stats["written"] == 0 and stats["queue_depth"] == 0
+    assert "value too long" in stats["last_error"]
+
+
+@pytest.mark.asyncio
+async def test_database_outage_keeps_the_batch_queued():
+    batches = []
+    writer = AuditLogWriter(batch_size=2, flush_interval=60, flush_retries=0)
+    writer._session_factory = _factory(batches, fail=True, error=_outage())
+    for index in range(3):
+        writer.submit(_row(index))
+
+    assert await writer.flush() == 0
+    stats = writer.stats()
+    # Nothing is bisected or dropped; the batch goes back to the front of the queue.
+    assert stats["failed"] == 0 and stats["deferred"] == 2 and stats["queue_depth"] == 3
+    assert "db down" in stats["last_error"]
+    # Backing off: a regular flush does not hammer the database again.
+    assert await writer.flush() == 0 and writer.stats()["deferred"] == 2
+
+    writer._session_factory = _factory(batches)
+    assert await writer.flush(force=True) == 3
+    assert [row["resource_id"] for batch in batches for row in batch] == [f"/api/admin/{index}" for index in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_outage_part_way_through_a_split_keeps_the_rest():
+    batches = []
+    calls = {"count": 0}
+
+    class _FlakySession(_Session):
+        async def execute(self, statement, rows):
+            calls["count"] += 1
+            if calls["count"] == 1:
+                raise DataError("INSERT INTO audit_logs", {}, Exception("value too long"))
+            if calls["count"] == 2:
+                raise _outage()
+            self.sink.append(list(rows))
+
+    writer = AuditLogWriter(batch_size=4, flush_interval=60, flush_retries=0)
+    writer._session_factory = lambda: _FlakySession(batches, False)
+    for index in range(4):
+        writer.submit(_row(index))
+
+    assert await writer.flush() == 0
+    stats = writer.stats()
+    assert stats["failed"] == 0 and stats["queue_depth"] == 4
+    assert await writer.flush(force=True) == 4
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_the_in_flight_batch():
+    batches = []
+    release = asyncio.Event()
+
+    class _SlowSession(_Session):
+        async def execute(self, statement, rows):
+            await release.wait()
+            self.sink.append(list(rows))
+
+    writer = AuditLogWriter(batch_size=2, flush_interval=60)
+    task = asyncio.create_task(writer.run(lambda: _SlowSession(batches, False)))
+    await asyncio.sleep(0)
+    writer.submit(_row(0))
+    writer.submit(_row(1))
+    writer.submit(_row(2))
+    await asyncio.sleep(0.01)
+
+    closing = asyncio.create_task(writer.close(task))
+    await asyncio.sleep(0.01)
+    release.set()
+    await closing
+    # The loop finishes the flush it was in the middle of instead of being cancelled.
+    assert sorted(len(batch) for batch in batches) == [1, 2]
+    assert writer.stats()["written"] == 3 and writer.stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_flush_requeues_its_batch():
+    started = asyncio.Event()
+
+    class _HangingSession(_Session):
+        async def execute(self, statement, rows):
+            started.set()
+            await asyncio.Event().wait()
+
+    writer = AuditLogWriter(batch_size=5, flush_interval=60)
+    writer._session_factory = lambda: _HangingSession([], False)
+    for index in range(3):
+        writer.submit(_row(index))
+    flushing = asyncio.create_task(writer.flush())
+    await started.wait()
+    flushing.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await flushing
+    assert writer.stats()["queue_depth"] == 3
+
+
+def test_rows_are_clipped_to_column_sizes():
+    row = build_audit_row(
+        action="A" * 300,
+        resource_type="rbac_guard",
+        resource_id="/api/admin/" + "x" * 500,
+        actor={"email": "e" * 400 + "@example.com"},
+    )
+    assert len(row["action"]) == 100
+    assert len(row["resource_id"]) == 100 and row["resource_id"].startswith("/api/admin/")
+    assert len(row["user_email"]) == 255
+
+
+@pytest.mark.asyncio
+async def test_one_bad_row_does_not_drop_its_batch():
+    batches = []
+    writer = AuditLogWriter(batch_size=10, flush_interval=60, flush_retries=1)
+    writer._session_factory = _factory(batches, fail=lambda row: row["resource_id"] == "/api/admin/6")
+    for index in range(10):
+        writer.submit(_row(index))
+
+    assert await writer.flush() == 9
+    written = sorted(row["resource_id"] for batch in batches for row in batch)
+    assert written == sorted(f"/api/admin/{index}" for index in range(10) if index != 6)
+    stats = writer.stats()
+    assert stats["failed"] == 1 and stats["written"] == 9
@@ -0,0 +1,225 @@
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import batch_publish
+from app.services.batch_publish import (
+    PricingContext,
+    apply_batch_publish,
+    plan_batch_publish,
+    quote_for,
+)
+from app.services.pricing_quote import build_pricing_snapshot, campaign_item_quote, listing_type_values
+
+NOW = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _item(scope="individual", listing_type="free", quota=1, price=0):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        scope=scope,
+        listing_type=listing_type,
+        name=f"{listing_type} x{quota}",
+        listing_quota=quota,
+        price_amount=price,
+        currency="EUR",
+        publish_days=30,
+        is_deleted=False,
+    )
+
+
+def _context(user_types, items=(), subscriptions=None, snapshots=None):
+    campaign_items = {}
+    for item in items:
+        campaign_items.setdefault(item.scope, []).append(item)
+    return PricingContext(
+        user_types=user_types,
+        subscriptions=subscriptions or {},
+        campaign_items=campaign_items,
+        items_by_id={item.id: item for item in items},
+        consumed_slots={},
+        snapshots=snapshots or {},
+    )
+
+
+def test_campaign_slots_are_consumed_across_the_batch():
+    user = uuid.uuid4()
+    showcase = _item(listing_type="showcase", quota=2)
+    listings = [(uuid.uuid4(), user) for _ in range(3)]
+
+    plan = plan_batch_publish(listings, _context({user: "individual"}, [showcase]), now=NOW)
+
+    # Two slots: the third listing falls back to "no active campaign" and is published plain.
+    assert plan.published == 3 and plan.skipped == 0
+    assert plan.groups[("showcase", 30)] == [listings[0][0], listings[1][0]]
+    assert plan.groups[(None, 0)] == [listings[2][0]]
+    assert all(snapshot.meta["slot_consumed"] for snapshot in plan.new_snapshots)
+    assert plan.new_snapshots[0].campaign_item_id == showcase.id
+    assert plan.new_snapshots[0].meta["campaign_item_id"] == str(showcase.id)
+
+
+def test_paid_quotes_and_missing_owners_are_skipped():
+    paying, dealer = uuid.uuid4(), uuid.uuid4()
+    package = SimpleNamespace(id=uuid.uuid4(), listing_quota=10, currency="EUR", publish_days=60)
+    context = _context(
+        {paying: "individual", dealer: "corporate"},
+        [_item(price=9.9, listing_type="paid")],
+        subscriptions={dealer: (SimpleNamespace(id=uuid.uuid4(), remaining_quota=5), package)},
+    )
+    listings = [(uuid.uuid4(), paying), (uuid.uuid4(), uuid.uuid4()), (uuid.uuid4(), None), (uuid.uuid4(), dealer)]
+
+    plan = plan_batch_publish(listings, context, now=NOW)
+
+    assert plan.processed == 4 and plan.skipped == 3 and plan.published == 1
+    assert plan.new_snapshots[0].snapshot_type == "quota" and plan.new_snapshots[0].package_id == package.id
+
+
+def test_existing_snapshot_without_slots_left_is_skipped():
+    user, listing_id = uuid.uuid4(), uuid.uuid4()
+    item = _item(listing_type="urgent", quota=1)
+    snapshot = SimpleNamespace(
+        user_id=user,
+        campaign_item_id=item.id,
+        snapshot_type="campaign_item",
+        meta={"listing_type": "urgent"},
+        publish_days=7,
+        duration_days=7,
+    )
+    context = _context({user: "individual"}, [item], snapshots={listing_id: snapshot})
+    context.consumed_slots[(user, item.id)] = 1
+
+    plan = plan_batch_publish([(listing_id, user)], context, now=NOW)
+
+    assert plan.published == 0 and plan.skipped == 1
+
+
+def test_listing_type_values():
+    values = listing_type_values("urgent", 400, NOW)
+
+    assert values["urgent_until"] == datetime(2027, 3, 1, tzinfo=timezone.utc)
+    assert values["featured_until"] is None and values["is_showcase"] is False
+    assert listing_type_values("free", 30, NOW) == {}
+
+
+class _Session:
+    def __init__(self):
+        self.statements = []
+        self.added = []
+
+    def add_all(self, rows):
+        self.added.extend(rows)
+
+    async def flush(self):
+        pass
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+@pytest.mark.asyncio
+async def test_apply_issues_one_update_per_chunk_and_group():
+    users = {uuid.uuid4(): "individual" for _ in range(5)}
+    listings = [(uuid.uuid4(), user) for user in users for _ in range(5)]
+    plan = plan_batch_publish(listings, _context(users), now=NOW)
+    session = _Session()
+
+    statements = await apply_batch_publish(session, plan, now=NOW, chunk_size=10)
+
+    assert plan.published == 25
+    assert statements == len(session.statements) == 3
+    assert "UPDATE listings SET" in str(session.statements[0])
+
+
+class _RunSession(_Session):
+    def __init__(self, listings):
+        super().__init__()
+        self.listings = listings
+        self.events = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        self.events.append(("execute", str(statement).split(" ", 2)[:2]))
+        return SimpleNamespace(all=lambda: list(self.listings))
+
+    async def commit(self):
+        self.events.append(("commit", None))
+
+
+@pytest.mark.asyncio
+async def test_sync_jobs_are_queued_in_the_publish_transaction(monkeypatch):
+    users = {uuid.uuid4(): "individual" for _ in range(3)}
+    listings = [(uuid.uuid4(), user) for user in users]
+
+    async def fake_context(session, rows, **kwargs):
+        return _context(users)
+
+    notified = []
+    monkeypatch.setattr(batch_publish, "load_pricing_context", fake_context)
+    monkeypatch.setattr(batch_publish, "notify_search_sync_pending", lambda: notified.append(1))
+    session = _RunSession(listings)
+
+    result = await batch_publish.run_batch_publish(session, user_type_of=lambda owner: "individual")
+
+    assert result["published"] == 3 and result["sync_jobs_queued"] == 3
+    insert_at = session.events.index(("execute", ["INSERT", "INTO"]))
+    assert insert_at < session.events.index(("commit", None))
+    assert "search_sync_jobs" in str(session.statements[insert_at])
+    assert notified == [1]
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def lpush(self, key, value):
+        self.ops.append(lambda: self.redis.lists.setdefault(key, []).insert(0, value))
+
+    def ltrim(self, key, start, stop):
+        self.ops.append(lambda: self.redis.lists.__setitem__(key, self.redis.lists.get(key, [])[start:stop + 1]))
+
+    async def execute(self):
+        for op in self.ops:
+            op()
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.lists = {}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def lrange(self, key, start, stop):
+        return self.lists.get(key, [])[start:stop + 1]
+
+
+@pytest.mark.asyncio
+async def test_run_history_is_shared_and_bounded(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(batch_publish.cache_service, "client", redis)
+    monkeypatch.setattr(batch_publish, "_local_runs", deque(maxlen=batch_publish.BATCH_PUBLISH_RUNS_KEPT))
+    for index in range(batch_publish.BATCH_PUBLISH_RUNS_KEPT + 5):
+        await batch_publish.record_batch_publish_run({"processed": index, "published": index}, source="scheduler")
+
+    # Another worker has nothing locally but reads the same list.
+    monkeypatch.setattr(batch_publish, "_local_runs", deque())
+    runs = await batch_publish.recent_batch_publish_runs()
+    assert len(runs) == batch_publish.BATCH_PUBLISH_RUNS_KEPT
+    assert runs[0]["processed"] == batch_publish.BATCH_PUBLISH_RUNS_KEPT + 4
+    assert runs[0]["source"] == "scheduler"
+
+
+def test_server_and_batch_quotes_build_the_same_snapshot():
+    user, listing_id = uuid.uuid4(), uuid.uuid4()
+    item = _item(listing_type="urgent", quota=3)
+    quote = quote_for(_context({user: "individual"}, [item]), user)
+    assert quote == campaign_item_quote(item, "individual", 3)
+
+    # The server path passes the same JSON-shaped quote (string ids).
+    snapshot = build_pricing_snapshot(listing_id=listing_id, user_id=user, quote=quote)
+    assert snapshot.campaign_item_id == item.id and snapshot.campaign_id is None
+    assert snapshot.meta["listing_type"] == "urgent" and snapshot.publish_days == 30
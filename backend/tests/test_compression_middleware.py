@@ -0,0 +1,96 @@
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core import compression
+from app.middleware.compression_middleware import CompressionMiddleware
+
+
+BIG_JSON = b'{"items":[' + b",".join(b'{"title":"BMW 320d","price":18500}' for _ in range(200)) + b"]}"
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return Response(content=BIG_JSON, media_type="application/json")
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/photo.webp")
+    async def photo():
+        return Response(content=b"\x00" * 4096, media_type="image/webp")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield BIG_JSON
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/schema")
+    async def schema(request: Request):
+        payload = compression.get_precompressed(("test", "schema"))
+        if payload is None:
+            payload = compression.store_precompressed(("test", "schema"), BIG_JSON)
+        return compression.precompressed_response(request, payload, media_type="application/json")
+
+    app.add_middleware(CompressionMiddleware)
+    return app
+
+
+async def _get(path: str, accept_encoding: str | None, **headers):
+    if accept_encoding is not None:
+        headers["Accept-Encoding"] = accept_encoding
+    async with AsyncClient(transport=ASGITransport(app=_build_app()), base_url="http://test") as client:
+        async with client.stream("GET", path, headers=headers) as res:
+            # Raw bytes: httpx would otherwise decode Content-Encoding itself.
+            return res, b"".join([chunk async for chunk in res.aiter_raw()])
+
+
+def test_negotiation_prefers_brotli_and_respects_q_zero():
+    assert compression.negotiate_encoding("gzip, deflate, br") == "br"
+    assert compression.negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert compression.negotiate_encoding("identity") is None
+
+
+@pytest.mark.asyncio
+async def test_large_json_is_compressed_and_small_or_binary_is_not():
+    res, raw = await _get("/big", "gzip")
+    assert res.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in res.headers["vary"].lower()
+    assert gzip.decompress(raw) == BIG_JSON
+    assert int(res.headers["content-length"]) == len(raw) < len(BIG_JSON)
+
+    res, raw = await _get("/small", "gzip, br")
+    assert "content-encoding" not in res.headers
+
+    res, raw = await _get("/photo.webp", "gzip, br")
+    assert "content-encoding" not in res.headers and len(raw) == 4096
+
+
+@pytest.mark.asyncio
+async def test_streaming_body_is_compressed_incrementally():
+    res, raw = await _get("/stream", "br")
+    assert res.headers["content-encoding"] == "br"
+    assert "content-length" not in res.headers
+    assert brotli.decompress(raw) == BIG_JSON * 3
+
+
+@pytest.mark.asyncio
+async def test_precompressed_payload_is_served_without_recompression():
+    compression.invalidate_precompressed("test")
+    res, raw = await _get("/schema", "br")
+    assert res.headers["content-encoding"] == "br"
+    assert brotli.decompress(raw) == BIG_JSON
+
+    res, raw = await _get("/schema", None, **{"If-None-Match": res.headers["etag"]})
+    assert res.status_code == 304
@@ -0,0 +1,67 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core import bootstrap
+from app.core.bootstrap import SchemaVersionMismatch, alembic_head_revisions, verify_schema_version
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalar(self):
+        return self.rows[0][0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+class _Engine:
+    """Just enough of an AsyncEngine to answer the alembic_version queries."""
+
+    def __init__(self, revisions=None, error=None):
+        self.revisions = revisions
+        self.error = error
+
+    @asynccontextmanager
+    async def connect(self):
+        if self.error:
+            raise self.error
+        yield self
+
+    async def execute(self, statement, params=None):
+        if "to_regclass" in str(statement):
+            return _Result([("alembic_version",)] if self.revisions is not None else [(None,)])
+        return _Result([(revision,) for revision in self.revisions])
+
+
+@pytest.fixture
+def heads(monkeypatch):
+    monkeypatch.setattr(bootstrap, "alembic_head_revisions", lambda: ["b2", "a1"])
+    monkeypatch.setattr(bootstrap, "known_revisions", lambda: {"a0", "a1", "b2"})
+
+
+def test_repo_migrations_resolve_to_heads():
+    assert alembic_head_revisions()
+
+
+@pytest.mark.asyncio
+async def test_matching_heads_pass(heads):
+    assert await verify_schema_version(_Engine(["a1", "b2"]), mode="strict") == "ok"
+
+
+@pytest.mark.asyncio
+async def test_database_behind_fails_fast_in_strict_mode(heads):
+    with pytest.raises(SchemaVersionMismatch, match="current=a0,b2 head=a1,b2"):
+        await verify_schema_version(_Engine(["a0", "b2"]), mode="strict")
+    with pytest.raises(SchemaVersionMismatch, match="current=none"):
+        await verify_schema_version(_Engine(None), mode="strict")
+    assert await verify_schema_version(_Engine(["a0"]), mode="warn") == "migration_required"
+
+
+@pytest.mark.asyncio
+async def test_database_ahead_or_unreachable_is_tolerated(heads):
+    assert await verify_schema_version(_Engine(["c3", "b2"]), mode="strict") == "ahead"
+    assert await verify_schema_version(_Engine(error=OSError("refused")), mode="strict") == "unknown"
+    assert await verify_schema_version(_Engine(["a0"]), mode="off") == "skipped"
@@ -0,0 +1,96 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import column, create_engine, insert, select, table, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from app.core import database
+from app.core.db_pool import InstrumentedAsyncQueuePool, PoolTelemetry, pool_status
+from app.utils.metrics_export import render_pool_metrics
+
+
+def _pool(timeout: float) -> InstrumentedAsyncQueuePool:
+    pool = InstrumentedAsyncQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=timeout)
+    pool.telemetry = PoolTelemetry("test")
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_checkouts_record_latency_waits_and_timeouts():
+    pool = _pool(timeout=0.1)
+    held = await greenlet_spawn(pool.connect)
+
+    with pytest.raises(PoolTimeoutError):
+        await greenlet_spawn(pool.connect)
+
+    async def release_soon():
+        await asyncio.sleep(0.02)
+        await greenlet_spawn(held.close)
+
+    waiter, _ = await asyncio.gather(greenlet_spawn(pool.connect), release_soon())
+    await greenlet_spawn(waiter.close)
+
+    telemetry = pool.telemetry
+    assert telemetry.checkout.count == 3
+    assert telemetry.waits == 2 and telemetry.timeouts == 1
+    assert telemetry.waiting == 0 and telemetry.max_waiting == 1
+    assert telemetry.checkout.max_ms >= 15
+    assert pool.recreate().telemetry is telemetry
+
+
+def test_pool_status_and_prometheus_output():
+    pool = _pool(timeout=1)
+    engine = SimpleNamespace(sync_engine=SimpleNamespace(pool=pool))
+    pool.telemetry.checkout.record(2.5)
+
+    status = pool_status(engine)
+    output = render_pool_metrics({"primary": engine})
+
+    assert status["pool"] == "test" and status["size"] == 1 and status["checkouts"] == 1
+    assert 'db_pool_checkout_seconds_count{pool="primary"' in output
+    assert "# TYPE db_pool_timeouts_total counter" in output
+
+
+def _sqlite(label: str):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE source (name TEXT)"))
+        conn.execute(text("INSERT INTO source VALUES (:name)"), {"name": label})
+    return SimpleNamespace(sync_engine=engine)
+
+
+def test_routing_session_reads_from_replica_until_first_write(monkeypatch):
+    monkeypatch.setattr(database, "engine", _sqlite("primary"))
+    monkeypatch.setattr(database, "replica_engine", _sqlite("replica"))
+    source = table("source", column("name"))
+    read = select(source.c.name).limit(1)
+
+    with database.RoutingSession() as session:
+        assert session.execute(read).scalar() == "primary"
+
+    with database.read_replica():
+        with database.RoutingSession() as session:
+            assert session.execute(read).scalar() == "replica"
+            assert session.execute(text("SELECT name FROM source")).scalar() == "primary"
+            session.execute(insert(source).values(name="written"))
+            assert session.execute(read.order_by(source.c.name.desc())).scalar() == "written"
+
+
+@pytest.mark.asyncio
+async def test_read_replica_dependency_scopes_the_request():
+    app = FastAPI()
+
+    @app.get("/report", dependencies=[Depends(database.use_read_replica)])
+    async def report():
+        return {"replica": database._read_replica_requested.get()}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        res = await client.get("/report")
+
+    assert res.json() == {"replica": True}
+    assert database._read_replica_requested.get() is False
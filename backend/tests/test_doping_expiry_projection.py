@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services import doping_expiry_projection as projection
+
+
+@pytest.fixture(autouse=True)
+def restore_state():
+    saved = dict(projection._state)
+    yield
+    projection._state.clear()
+    projection._state.update(saved)
+
+
+def test_sleep_ends_on_bucket_boundaries_and_is_capped(monkeypatch):
+    monkeypatch.setattr(projection, "DOPING_EXPIRY_BUCKET_SECONDS", 30)
+    now = datetime(2026, 5, 1, 12, 0, 5, tzinfo=timezone.utc)
+
+    assert projection._seconds_until(None, now) == projection.DOPING_EXPIRY_MAX_SLEEP_SECONDS
+    # Boundaries at :06 and :29 share the bucket ending at :30; :30 itself belongs to the next one.
+    assert projection._seconds_until(now + timedelta(seconds=1), now) == 25
+    assert projection._seconds_until(now + timedelta(seconds=24), now) == 25
+    assert projection._seconds_until(now + timedelta(seconds=25), now) == 55
+    assert projection._seconds_until(now + timedelta(days=1), now) == projection.DOPING_EXPIRY_MAX_SLEEP_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_tick_covers_contiguous_windows(monkeypatch):
+    windows = []
+
+    async def fake_requeue(session, *, since, until):
+        windows.append((since, until))
+        return 2
+
+    async def fake_next(session, *, after):
+        return None
+
+    monkeypatch.setattr(projection, "requeue_crossed_doping_boundaries", fake_requeue)
+    monkeypatch.setattr(projection, "next_doping_boundary", fake_next)
+    projection._state["watermark"] = None
+
+    await projection.run_doping_expiry_tick(None)
+    await projection.run_doping_expiry_tick(None)
+
+    first, second = windows
+    assert first[1] - first[0] >= timedelta(seconds=projection.DOPING_EXPIRY_STARTUP_LOOKBACK_SECONDS)
+    assert second[0] == first[1]
+    assert projection.doping_expiry_stats()["last_requeued"] == 2
@@ -1,7 +1,7 @@
 
 import pytest
 from httpx import AsyncClient, ASGITransport
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 from server import app
 from app.dependencies import get_current_user
 import uuid
@@ -9,16 +9,8 @@ import json
 
 @pytest.mark.asyncio
 async def test_admin_tier_change_invalidation():
-    # Mocks
-    mock_redis = MagicMock()
-    # Async mock for delete
-    async def async_delete(key):
-        return 1
-    mock_redis.delete = async_delete
-    
-    # We need to mock the RedisRateLimiter inside admin_routes
-    # Since it's instantiated at module level, we patch it
-    with patch("app.routers.admin_routes.redis_limiter.redis", mock_redis):
+    # We need to mock the rate limit reset inside admin_routes
+    with patch("app.routers.admin_routes.reset_rate_limits", AsyncMock(return_value=1)):
         # Admin User
         admin_user = MagicMock()
         admin_user.id = uuid.uuid4()
@@ -34,7 +26,7 @@ async def test_admin_tier_change_invalidation():
             
             # Since full DB setup is complex here, we rely on the Code Implementation correctness
             # and the UAT Execution Log in staging.
-            # The code clearly calls `invalidate_context`.
+            # The code clearly calls `reset_rate_limits`.
             
             # Let's verify the endpoint exists and accepts params
             res = await client.patch(
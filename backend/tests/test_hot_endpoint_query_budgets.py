@@ -0,0 +1,66 @@
+"""
+Query budgets for hot endpoints.
+Needs REACT_APP_BACKEND_URL pointing at a server started with
+QUERY_DEBUG_HEADERS=true; skipped otherwise. Budgets are the statement
+count of a cold (uncached) request plus the principal lookup.
+"""
+import os
+
+import pytest
+import requests
+
+from app.core.query_accounting import QUERY_COUNT_HEADER, QUERY_REPEAT_WARN_THRESHOLD, assert_query_budget
+
+BASE_URL = os.environ.get("REACT_APP_BACKEND_URL", "").rstrip("/")
+
+pytestmark = pytest.mark.skipif(not BASE_URL, reason="REACT_APP_BACKEND_URL is not set")
+
+CREDENTIALS = {
+    "admin": ("admin@platform.com", os.environ.get("ADMIN_PASSWORD", "Admin123!")),
+    "dealer": ("dealer@platform.com", "Dealer123!"),
+    "user": ("user@platform.com", "User123!"),
+}
+
+# Below the N+1 detector's threshold, i.e. no warning in the logs.
+NO_FANOUT = QUERY_REPEAT_WARN_THRESHOLD - 1
+
+
+def _get(role, path):
+    email, password = CREDENTIALS[role]
+    login = requests.post(f"{BASE_URL}/api/auth/login", json={"email": email, "password": password})
+    if login.status_code != 200:
+        pytest.skip(f"Failed to authenticate {role}: {login.text}")
+    response = requests.get(
+        f"{BASE_URL}/api{path}",
+        headers={"Authorization": f"Bearer {login.json().get('access_token')}"},
+    )
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+    if QUERY_COUNT_HEADER not in response.headers:
+        pytest.skip("Server is not running with QUERY_DEBUG_HEADERS=true")
+    return response
+
+
+def test_message_threads_do_not_scale_with_page_size():
+    # count, page, listings, last messages, unread counts (+ principal lookup)
+    assert_query_budget(_get("user", "/v1/messages/threads?limit=100"), 8, max_repeat=2)
+
+
+def test_gdpr_export_list_budget():
+    # user row, exports, expiry update (+ principal lookup)
+    assert_query_budget(_get("user", "/v1/users/me/gdpr-exports"), 4, max_repeat=2)
+
+
+def test_admin_dashboard_summary_budget():
+    # 7 listing/user counts, 7 role counts, 21 panel/trend queries (+ principal lookup).
+    # One count per role is the known fan-out (7 roles).
+    assert_query_budget(_get("admin", "/admin/dashboard/summary"), 36, max_repeat=8)
+
+
+def test_admin_revenue_budget():
+    # readiness probe, totals by currency (+ principal lookup)
+    assert_query_budget(_get("admin", "/admin/finance/revenue"), 3, max_repeat=NO_FANOUT)
+
+
+def test_dealer_reports_budget():
+    # 2 weekly counts, 5 metrics x (current, previous, series), 5 billing/doping queries (+ principal lookup)
+    assert_query_budget(_get("dealer", "/dealer/reports"), 23, max_repeat=NO_FANOUT)
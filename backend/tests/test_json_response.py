@@ -0,0 +1,54 @@
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core.json_response import FastJSONResponse, dumps_json
+
+
+def test_dumps_handles_api_scalar_types():
+    listing_id = uuid.UUID(int=7)
+    body = dumps_json(
+        {
+            "id": listing_id,
+            "price": Decimal("18500.00"),
+            "count": Decimal("3"),
+            "rate": Decimal("12.5"),
+            "published_at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            "tags": {"diesel"},
+            1: "non-str key",
+        }
+    )
+    assert body == (
+        b'{"id":"00000000-0000-0000-0000-000000000007","price":18500.0,"count":3,"rate":12.5,'
+        b'"published_at":"2026-01-02T03:04:05+00:00","tags":["diesel"],"1":"non-str key"}'
+    )
+
+
+@pytest.mark.asyncio
+async def test_app_default_applies_to_included_routers_with_opt_out():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    router = APIRouter()
+
+    @router.get("/fast")
+    async def fast():
+        return {"price": Decimal("1.5")}
+
+    @router.get("/stdlib", response_class=JSONResponse)
+    async def stdlib():
+        return {"price": 1.5}
+
+    app.include_router(router, prefix="/api")
+    fast_route = next(route for route in app.routes if getattr(route, "path", "") == "/api/fast")
+    stdlib_route = next(route for route in app.routes if getattr(route, "path", "") == "/api/stdlib")
+    assert fast_route.response_class is FastJSONResponse
+    assert stdlib_route.response_class is JSONResponse
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        res = await client.get("/api/fast")
+    assert res.content == b'{"price":1.5}'
+    assert res.headers["content-type"] == "application/json"
@@ -0,0 +1,145 @@
+import math
+import random
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.middleware.request_guards import RequestMetricsMiddleware
+from app.utils import metrics_export, monitoring
+from app.utils.metrics_export import render_prometheus
+from app.utils.monitoring import (
+    LatencyHistogram,
+    WindowedLatencyHistogram,
+    get_route_latency_stats,
+    latency_snapshot,
+    merge_latency_snapshots,
+)
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(q * len(ordered))) - 1]
+
+
+def test_quantiles_stay_within_one_bucket_of_exact():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 1.2) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = _exact(values, q)
+        estimate = histogram.quantile(q)
+        assert exact <= estimate <= exact * 1.13, (q, exact, estimate)
+    assert histogram.quantile(1.0) == max(values)
+    assert LatencyHistogram().quantile(0.5) is None
+
+
+def test_merge_and_snapshot_round_trip():
+    left, right = LatencyHistogram(), LatencyHistogram()
+    for value in (1, 2, 3):
+        left.record(value)
+    for value in (400, 5000, 0.01, 10 ** 7):
+        right.record(value)
+    merged = LatencyHistogram().merge(left).merge(right)
+    assert merged.count == 7 and merged.max_ms == 10 ** 7
+    assert LatencyHistogram.from_dict(merged.to_dict()).counts == merged.counts
+
+
+def test_window_drops_expired_slots():
+    windowed = WindowedLatencyHistogram(slot_seconds=60, slots=3)
+    windowed.record(10, now_ts=0)
+    windowed.record(20, now_ts=61)
+    windowed.record(30, now_ts=125)
+    assert windowed.merged(180, now_ts=125).count == 3
+    assert windowed.merged(60, now_ts=125).count == 1
+    windowed.record(40, now_ts=190)  # reuses the first slot
+    assert windowed.merged(180, now_ts=190).count == 3
+
+
+def test_prometheus_exposition_is_cumulative():
+    snapshots = []
+    for values in ((5, 50), (500,)):
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        snapshots.append({"series": [["/api/items/{item_id}", "GET", "2xx", histogram.to_dict()]]})
+    text = render_prometheus(merge_latency_snapshots(snapshots))
+
+    buckets = [line for line in text.splitlines() if line.startswith("http_request_duration_seconds_bucket")]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts) and counts[-1] == 3
+    assert 'le="+Inf"} 3' in buckets[-1]
+    assert 'route="/api/items/{item_id}",method="GET",status_class="2xx"' in buckets[0]
+    assert "http_request_duration_seconds_count{" in text and "# TYPE http_request_duration_seconds histogram" in text
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_route_templates(monkeypatch):
+    monkeypatch.setattr(monitoring, "_latency_by_route", {})
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(RequestMetricsMiddleware)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        for item_id in range(5):
+            await client.get(f"/api/items/{item_id}")
+        await client.get("/api/items/not-a-number")
+        await client.get("/api/nothing")
+
+    keys = set(monitoring.route_latency_histograms())
+    assert keys == {
+        ("/api/items/{item_id}", "GET", "2xx"),
+        ("/api/items/{item_id}", "GET", "4xx"),
+        ("<unmatched>", "GET", "4xx"),
+    }
+    stats = {(row["route"], row["status_class"]): row for row in get_route_latency_stats()}
+    assert stats[("/api/items/{item_id}", "2xx")]["count"] == 5
+    assert latency_snapshot()["series"]
+
+
+class _SnapshotRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.values):
+            yield key
+
+
+class _SnapshotCache:
+    def __init__(self):
+        self.client = _SnapshotRedis()
+
+    async def set(self, key, value, ttl=60):
+        self.client.values[key] = value
+
+    async def get_many(self, keys):
+        return {key: self.client.values[key] for key in keys if key in self.client.values}
+
+
+@pytest.mark.asyncio
+async def test_export_merges_only_published_snapshots(monkeypatch):
+    monkeypatch.setattr(monitoring, "_latency_by_route", {})
+    monkeypatch.setattr(metrics_export, "_last_published", {})
+    cache = _SnapshotCache()
+    monkeypatch.setattr(metrics_export, "cache_service", cache)
+    other = LatencyHistogram()
+    other.record(10)
+    cache.client.values["metrics:latency:worker:other"] = {"series": [["/api/items", "GET", "2xx", other.to_dict()]]}
+
+    monitoring.record_route_latency("/api/items", "GET", 200, 5)
+    await metrics_export.publish_latency_snapshot()
+    # Requests served after the publish show up on the next publish, not in between.
+    monitoring.record_route_latency("/api/items", "GET", 200, 5)
+    merged = await metrics_export.merged_route_latency()
+    assert merged[("/api/items", "GET", "2xx")].count == 2
+
+    await metrics_export.publish_latency_snapshot()
+    merged = await metrics_export.merged_route_latency()
+    assert merged[("/api/items", "GET", "2xx")].count == 3
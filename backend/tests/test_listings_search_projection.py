@@ -0,0 +1,66 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import listings_search_projection as projection
+
+
+def _listing(**overrides):
+    now = datetime.now(timezone.utc)
+    values = dict(
+        id=uuid.uuid4(),
+        title="BMW 320d",
+        description="Temiz",
+        module="vehicle",
+        category_id=uuid.uuid4(),
+        country="DE",
+        city="Berlin",
+        latitude=52.5,
+        longitude=13.4,
+        price_type="FIXED",
+        price=18500,
+        hourly_rate=None,
+        currency="EUR",
+        images=["a.jpg"],
+        attributes={"vehicle": {"year": "2019"}, "attributes": {"Fuel": "diesel", "km": 90000}},
+        make_id=uuid.uuid4(),
+        model_id=uuid.uuid4(),
+        status="published",
+        user_type_snapshot="dealer",
+        deleted_at=None,
+        is_premium=False,
+        premium_until=None,
+        is_showcase=False,
+        showcase_expires_at=None,
+        featured_until=now + timedelta(days=1),
+        urgent_until=None,
+        created_at=now - timedelta(days=2),
+        updated_at=now - timedelta(minutes=1),
+        published_at=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_projected_row_matches_search_filters():
+    listing = _listing()
+    row = projection.project_listing_row(listing)
+    assert row["country_code"] == "DE"
+    assert row["category_path_ids"] == [listing.category_id]
+    assert row["attributes"] == {"fuel": "diesel", "km": 90000}
+    assert row["is_featured"] is True and row["premium_score"] == 900
+    assert row["year"] == 2019
+    assert (row["latitude"], row["longitude"]) == (52.5, 13.4)
+    assert row["published_at"] == listing.created_at
+    assert row["updated_at"] == listing.updated_at
+
+
+def test_upsert_refreshes_row_only_when_newer():
+    stmt = projection.build_projection_upsert([projection.project_listing_row(_listing())])
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (listing_id) DO UPDATE" in sql
+    assert "listings_search.updated_at <= excluded.updated_at" in sql
+    assert "tsv_tr" not in sql and "tsv_de" not in sql
+    assert "created_at = excluded.created_at" not in sql
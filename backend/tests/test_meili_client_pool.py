@@ -0,0 +1,83 @@
+import pytest
+
+from app.services import meilisearch_index
+
+
+RUNTIME = {"url": "http://meili.local:7700", "index_name": "listings_index", "master_key": "key-a"}
+
+
+@pytest.fixture(autouse=True)
+def reset_meili_state():
+    meilisearch_index.invalidate_meili_runtime_cache()
+    meilisearch_index._meili_clients.clear()
+    yield
+    meilisearch_index.invalidate_meili_runtime_cache()
+    meilisearch_index._meili_clients.clear()
+
+
+@pytest.mark.asyncio
+async def test_runtime_snapshot_cached_until_invalidated(monkeypatch):
+    calls = []
+
+    async def fake_load(session):
+        calls.append(session)
+        return dict(RUNTIME)
+
+    monkeypatch.setattr(meilisearch_index, "_load_active_meili_runtime", fake_load)
+
+    first = await meilisearch_index.get_active_meili_runtime(None)
+    second = await meilisearch_index.get_active_meili_runtime(None)
+    assert first == second == RUNTIME
+    assert len(calls) == 1
+
+    meilisearch_index.invalidate_meili_runtime_cache()
+    await meilisearch_index.get_active_meili_runtime(None)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_runtime_snapshot_not_stored_when_invalidated_mid_load(monkeypatch):
+    async def racing_load(session):
+        meilisearch_index.invalidate_meili_runtime_cache()
+        return dict(RUNTIME)
+
+    monkeypatch.setattr(meilisearch_index, "_load_active_meili_runtime", racing_load)
+
+    await meilisearch_index.get_active_meili_runtime(None)
+    assert meilisearch_index.meili_client_pool_stats()["runtime_cached"] is False
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_reused_and_replaced_on_key_rotation():
+    async with meilisearch_index._meili_client(RUNTIME) as first:
+        pass
+    async with meilisearch_index._meili_client(RUNTIME) as second:
+        pass
+    assert first is second
+    assert not first.is_closed
+
+    rotated = {**RUNTIME, "master_key": "key-b"}
+    async with meilisearch_index._meili_client(rotated) as third:
+        pass
+    assert third is not first
+    assert meilisearch_index.meili_client_pool_stats()["clients"] == 1
+
+    await meilisearch_index.close_meili_clients()
+    assert third.is_closed
+
+
+@pytest.mark.asyncio
+async def test_runtime_invalidation_is_published_to_other_workers(monkeypatch):
+    published = []
+
+    class _Client:
+        async def publish(self, channel, message):
+            published.append(channel)
+
+    monkeypatch.setattr(meilisearch_index.cache_service, "client", _Client())
+    version = meilisearch_index._meili_runtime_version
+
+    await meilisearch_index.invalidate_meili_runtime()
+
+    assert meilisearch_index._meili_runtime_version == version + 1
+    assert published == [meilisearch_index.MEILI_RUNTIME_INVALIDATION_CHANNEL]
@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+
+from app.services.meilisearch_index import listing_geo_point
+
+
+def _listing(latitude=None, longitude=None, attributes=None):
+    return SimpleNamespace(latitude=latitude, longitude=longitude, attributes=attributes or {})
+
+
+def test_geo_point_prefers_listing_columns():
+    listing = _listing(41.0082, 28.9784, {"location": {"lat": 1, "lng": 2}})
+    assert listing_geo_point(listing) == {"lat": 41.0082, "lng": 28.9784}
+
+
+def test_geo_point_falls_back_to_attribute_location():
+    listing = _listing(attributes={"location": {"latitude": "52.52", "longitude": "13.405"}})
+    assert listing_geo_point(listing) == {"lat": 52.52, "lng": 13.405}
+
+
+def test_geo_point_rejects_missing_or_out_of_range_coordinates():
+    assert listing_geo_point(_listing()) is None
+    assert listing_geo_point(_listing(91.0, 10.0)) is None
+    assert listing_geo_point(_listing(attributes={"location": {"lat": "x", "lng": 1}})) is None
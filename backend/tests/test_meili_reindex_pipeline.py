@@ -0,0 +1,184 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import meilisearch_reindex
+
+
+RUNTIME = {"url": "http://meili.local:7700", "index_name": "listings_index", "master_key": "key"}
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class PagedSession:
+    """Serves pre-built pages in order, like keyset pagination would."""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._position = 0
+        self.expunged = 0
+
+    async def execute(self, query):
+        limit = query._limit_clause.value
+        page = self._rows[self._position:self._position + limit]
+        self._position += len(page)
+        return FakeResult(page)
+
+    def expunge(self, row):
+        self.expunged += 1
+
+
+def _rows(count):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [SimpleNamespace(id=uuid.uuid4(), created_at=base + timedelta(seconds=i)) for i in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def fake_documents(monkeypatch):
+    monkeypatch.setattr(
+        meilisearch_reindex,
+        "_build_documents",
+        lambda rows: [{"listing_id": str(row.id)} for row in rows],
+    )
+
+
+@pytest.mark.asyncio
+async def test_reindex_streams_all_rows_with_bounded_parallel_uploads(monkeypatch):
+    uploaded = []
+    active = {"now": 0, "peak": 0}
+
+    async def fake_upsert(runtime, docs):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        uploaded.extend(docs)
+        active["now"] -= 1
+        return {"ok": True, "count": len(docs), "task_uid": len(uploaded)}
+
+    async def fake_wait(runtime, uids, **kwargs):
+        return {"ok": True, "failed": []}
+
+    monkeypatch.setattr(meilisearch_reindex, "meili_upsert_documents", fake_upsert)
+    monkeypatch.setattr(meilisearch_reindex, "meili_wait_for_tasks", fake_wait)
+
+    rows = _rows(1050)
+    session = PagedSession(rows)
+    report = await meilisearch_reindex.reindex_search_projection(
+        session, RUNTIME, chunk_size=100, in_flight=3, queue_depth=2
+    )
+
+    assert report["docs_indexed"] == 1050
+    assert report["batches"] == 11
+    assert len(report["task_uids"]) == 11
+    assert {doc["listing_id"] for doc in uploaded} == {str(row.id) for row in rows}
+    assert 1 < active["peak"] <= 3
+    assert session.expunged == 1050
+
+
+@pytest.mark.asyncio
+async def test_reindex_respects_max_docs(monkeypatch):
+    async def fake_upsert(runtime, docs):
+        return {"ok": True, "count": len(docs), "task_uid": None}
+
+    monkeypatch.setattr(meilisearch_reindex, "meili_upsert_documents", fake_upsert)
+
+    report = await meilisearch_reindex.reindex_search_projection(
+        PagedSession(_rows(500)), RUNTIME, chunk_size=100, max_docs=250, wait_for_tasks=False
+    )
+    assert report["docs_indexed"] == 250
+    assert report["batches"] == 3
+
+
+@pytest.mark.asyncio
+async def test_reindex_upload_failure_propagates(monkeypatch):
+    async def failing_upsert(runtime, docs):
+        raise RuntimeError("meili_upsert_failed_503")
+
+    monkeypatch.setattr(meilisearch_reindex, "meili_upsert_documents", failing_upsert)
+
+    with pytest.raises(RuntimeError, match="meili_upsert_failed_503"):
+        await meilisearch_reindex.reindex_search_projection(
+            PagedSession(_rows(2000)), RUNTIME, chunk_size=50, in_flight=2, queue_depth=1
+        )
+
+
+class BlueGreenSession(PagedSession):
+    """Pages listings for the build; answers the removal/catch-up lookups from `removed`."""
+
+    def __init__(self, rows, removed):
+        super().__init__(rows)
+        self.removed = list(removed)
+
+    async def execute(self, query):
+        if query._limit_clause is not None:
+            return await super().execute(query)
+        if "search_sync_jobs" in str(query):
+            removed, self.removed = self.removed, []
+            return FakeResult(removed)
+        return FakeResult([])
+
+
+@pytest.mark.asyncio
+async def test_blue_green_replays_removals_before_the_swap(monkeypatch):
+    calls = []
+
+    async def fake_upsert(runtime, docs):
+        calls.append(("upsert", runtime["index_name"], len(docs)))
+        return {"ok": True, "count": len(docs), "task_uid": None}
+
+    async def fake_delete_documents(runtime, ids):
+        calls.append(("delete", runtime["index_name"], list(ids)))
+        return {"ok": True, "count": len(ids), "task_uid": 7}
+
+    async def fake_swap(runtime, live, build):
+        calls.append(("swap", live, build))
+        return 8
+
+    async def fake_wait(runtime, uids, **kwargs):
+        return {"ok": True, "failed": []}
+
+    async def fake_task(*args, **kwargs):
+        return None
+
+    async def fake_enqueue(session, **kwargs):
+        calls.append(("enqueue", kwargs["operation"], list(kwargs["listing_ids"])))
+        return len(kwargs["listing_ids"])
+
+    async def fake_settings(runtime):
+        return {}
+
+    async def fake_exists(runtime):
+        return True
+
+    monkeypatch.setattr(meilisearch_reindex, "meili_upsert_documents", fake_upsert)
+    monkeypatch.setattr(meilisearch_reindex, "meili_delete_documents", fake_delete_documents)
+    monkeypatch.setattr(meilisearch_reindex, "meili_swap_indexes", fake_swap)
+    monkeypatch.setattr(meilisearch_reindex, "meili_wait_for_tasks", fake_wait)
+    monkeypatch.setattr(meilisearch_reindex, "meili_create_index", fake_task)
+    monkeypatch.setattr(meilisearch_reindex, "meili_delete_index", fake_task)
+    monkeypatch.setattr(meilisearch_reindex, "meili_get_settings", fake_settings)
+    monkeypatch.setattr(meilisearch_reindex, "meili_index_exists", fake_exists)
+    monkeypatch.setattr(meilisearch_reindex, "enqueue_search_sync_jobs", fake_enqueue)
+
+    rows = _rows(30)
+    deleted_id = rows[4].id
+    report = await meilisearch_reindex.blue_green_reindex(BlueGreenSession(rows, [deleted_id]), RUNTIME, chunk_size=10)
+
+    kinds = [call[0] for call in calls]
+    assert kinds.index("delete") < kinds.index("swap")
+    delete_call = calls[kinds.index("delete")]
+    assert delete_call[1].startswith("listings_index__build_") and delete_call[2] == [str(deleted_id)]
+    assert report["swapped"] is True and report["removed_during_build"] == 1
+    assert "enqueue" not in kinds
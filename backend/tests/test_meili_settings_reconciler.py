@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from app.services import meilisearch_settings_reconciler as reconciler
+from app.services.search_taxonomy import TaxonomySnapshot
+
+
+RUNTIME = {"url": "http://meili.local:7700", "index_name": "listings_index", "master_key": "key"}
+
+
+@pytest.fixture
+def fake_meili(monkeypatch):
+    calls = {"updates": []}
+    live = {
+        "filterableAttributes": list(reconciler.BASE_FILTERABLE_ATTRIBUTES),
+        "sortableAttributes": list(reversed(reconciler.BASE_SORTABLE_ATTRIBUTES)),
+    }
+
+    async def fake_runtime(session):
+        return dict(RUNTIME)
+
+    async def fake_snapshot(session):
+        return TaxonomySnapshot(version=3, loaded_at=0.0, all_filterable_fields=calls.get("fields", ()))
+
+    async def fake_get_settings(runtime):
+        return live
+
+    async def fake_update_settings(runtime, settings):
+        calls["updates"].append(settings)
+        live.update(settings)
+        return None
+
+    monkeypatch.setattr(reconciler, "get_active_meili_runtime", fake_runtime)
+    monkeypatch.setattr(reconciler, "get_taxonomy_snapshot", fake_snapshot)
+    monkeypatch.setattr(reconciler, "meili_get_settings", fake_get_settings)
+    monkeypatch.setattr(reconciler, "meili_update_settings", fake_update_settings)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_matching_settings_are_not_rewritten(fake_meili):
+    report = await reconciler.reconcile_meili_settings(None)
+    assert report["changed"] == []
+    assert fake_meili["updates"] == []
+
+
+@pytest.mark.asyncio
+async def test_new_attribute_patches_only_filterable(fake_meili):
+    fake_meili["fields"] = ("attribute_fuel_type",)
+    report = await reconciler.reconcile_meili_settings(None)
+    assert report["changed"] == ["filterableAttributes"]
+    assert list(fake_meili["updates"][0]) == ["filterableAttributes"]
+    assert "attribute_fuel_type" in fake_meili["updates"][0]["filterableAttributes"]
+
+    await reconciler.reconcile_meili_settings(None)
+    assert len(fake_meili["updates"]) == 1
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def get(self, key):
+        return self.values.get(key)
+
+
+@pytest.mark.asyncio
+async def test_circuit_state_is_shared_through_redis(fake_meili, monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(reconciler.cache_service, "client", redis)
+    monkeypatch.setattr(reconciler, "_state", dict(reconciler._state, consecutive_failures=0, circuit_open_until_ts=0.0))
+    monkeypatch.setattr(reconciler, "_shared_state", {"state": None, "fetched_at": 0.0})
+
+    async def failing_settings(runtime):
+        raise RuntimeError("meili down")
+
+    monkeypatch.setattr(reconciler, "meili_get_settings", failing_settings)
+    for _ in range(reconciler.MEILI_SETTINGS_CIRCUIT_THRESHOLD):
+        await reconciler.run_meili_settings_reconcile(lambda: _NullSession())
+
+    # A worker that never ran the reconciler sees the open circuit.
+    monkeypatch.setattr(reconciler, "_state", dict(reconciler._state, consecutive_failures=0, circuit_open_until_ts=0.0))
+    monkeypatch.setattr(reconciler, "_shared_state", {"state": None, "fetched_at": 0.0})
+    state = await reconciler.load_meili_settings_reconciler_state()
+    assert state["consecutive_failures"] == reconciler.MEILI_SETTINGS_CIRCUIT_THRESHOLD
+    assert state["circuit_open_until_ts"] > 0
+    assert state["last_error"] == "meili down"
+
+
+class _NullSession:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_reconcile_requests_reach_the_scheduler_process(monkeypatch):
+    published = []
+
+    class _PubSub:
+        async def subscribe(self, channel):
+            return None
+
+        async def listen(self):
+            yield {"type": "message", "data": "1"}
+            await asyncio.Event().wait()
+
+        async def close(self):
+            return None
+
+    class _Client:
+        async def publish(self, channel, message):
+            published.append(channel)
+
+        def pubsub(self):
+            return _PubSub()
+
+    monkeypatch.setattr(reconciler.cache_service, "client", _Client())
+    monkeypatch.setattr(reconciler, "_reconcile_event", None)
+
+    # The admin request lands on a worker without the scheduler lease.
+    reconciler.request_meili_settings_reconcile()
+    await asyncio.sleep(0)
+    assert published == [reconciler.MEILI_SETTINGS_WAKE_CHANNEL]
+
+    # The leader only hears about it through the channel.
+    monkeypatch.setattr(reconciler, "_reconcile_event", None)
+    event = reconciler.meili_settings_reconcile_wake_event()
+    task = asyncio.create_task(reconciler.meili_settings_wake_listener())
+    await asyncio.wait_for(event.wait(), timeout=1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
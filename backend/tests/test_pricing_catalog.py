@@ -0,0 +1,86 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.models.pricing_package import PricingPackage
+from app.services import pricing_catalog
+from app.services.pricing_catalog import CatalogCampaignItem, PricingCatalog, get_pricing_catalog
+
+NOW = datetime(2026, 5, 1, 12, tzinfo=timezone.utc)
+
+
+def _item(scope="individual", listing_type="free", starts_in=-1, ends_in=1):
+    return CatalogCampaignItem(
+        id=uuid.uuid4(),
+        scope=scope,
+        listing_type=listing_type,
+        name=None,
+        listing_quota=1,
+        price_amount=0.0,
+        currency="EUR",
+        publish_days=30,
+        start_at=NOW + timedelta(days=starts_in),
+        end_at=NOW + timedelta(days=ends_in),
+    )
+
+
+def test_campaign_windows_are_checked_per_read():
+    current, upcoming, corporate = _item(), _item(starts_in=1, ends_in=2), _item(scope="corporate", listing_type="paid")
+    catalog = PricingCatalog(version=0, loaded_at=0, campaign_items=(current, upcoming, corporate))
+
+    assert catalog.active_campaign_items("individual", now=NOW) == [current]
+    assert catalog.active_campaign_items("individual", now=NOW + timedelta(days=1, hours=1)) == [upcoming]
+    assert catalog.active_campaign_items("corporate", "free", now=NOW) == []
+    assert catalog.campaign_item(corporate.id) is corporate
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+
+    async def fake_load(session, version):
+        calls.append(version)
+        return PricingCatalog(version=version, loaded_at=pricing_catalog.time.monotonic())
+
+    monkeypatch.setattr(pricing_catalog, "_load", fake_load)
+    monkeypatch.setattr(pricing_catalog, "_catalog", None)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_reused_until_invalidated_or_expired(loads, monkeypatch):
+    first = await get_pricing_catalog(None)
+    assert await get_pricing_catalog(None) is first
+    assert len(loads) == 1
+
+    pricing_catalog.invalidate_pricing_catalog_local()
+    assert await get_pricing_catalog(None) is not first
+    assert len(loads) == 2
+
+    monkeypatch.setattr(pricing_catalog, "PRICING_CATALOG_TTL_SECONDS", 0)
+    await get_pricing_catalog(None)
+    assert len(loads) == 3
+
+
+def test_committed_pricing_writes_invalidate_the_catalog():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(CreateTable(PricingPackage.__table__))
+    version = pricing_catalog._catalog_version
+
+    with Session(engine) as session:
+        session.add(PricingPackage(id=uuid.uuid4(), name="Pro", listing_quota=10))
+        session.rollback()
+    assert pricing_catalog._catalog_version == version
+
+    with Session(engine) as session:
+        session.add(PricingPackage(id=uuid.uuid4(), name="Pro", listing_quota=10))
+        session.commit()
+        assert pricing_catalog._catalog_version == version + 1
+        session.execute(update(PricingPackage).values(is_active=False))
+        session.commit()
+    assert pricing_catalog._catalog_version == version + 2
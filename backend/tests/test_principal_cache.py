@@ -0,0 +1,128 @@
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core import principal_cache
+from app.core.principal_cache import (
+    clear_principal_cache,
+    invalidate_principal,
+    principal_cache_stats,
+    resolve_principal,
+    restore_principal,
+    snapshot_principal,
+)
+from app.models.user import User as SqlUser
+
+
+def _user(**overrides):
+    values = {
+        "id": uuid.uuid4(),
+        "email": "user@example.com",
+        "hashed_password": "x",
+        "full_name": "Test User",
+        "role": "admin",
+        "is_active": True,
+        "country_scope": ["TR"],
+    }
+    values.update(overrides)
+    return SqlUser(**values)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_principal_cache()
+    yield
+    clear_principal_cache()
+
+
+def _loader(user, calls):
+    async def load():
+        calls.append(1)
+        return user
+
+    return load
+
+
+@pytest.mark.asyncio
+async def test_second_resolution_is_served_from_memory():
+    user = _user()
+    calls = []
+    first = await resolve_principal(str(user.id), "v2", _loader(user, calls))
+    second = await resolve_principal(str(user.id), "v2", _loader(user, calls))
+
+    assert first is user
+    assert calls == [1]
+    assert second is not user
+    assert second.id == user.id and second.role == "admin"
+    assert second.get("id") == str(user.id)
+
+    # Another token version is another principal.
+    await resolve_principal(str(user.id), "v3", _loader(user, calls))
+    assert calls == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_cached_copy_is_isolated_and_mergeable():
+    user = _user()
+    await resolve_principal(str(user.id), "v2", _loader(user, []))
+
+    session = Session()
+    cached = await resolve_principal(str(user.id), "v2", _loader(user, []), session)
+    assert cached in session
+    assert not session.dirty
+
+    cached.full_name = "Renamed"
+    cached.country_scope.append("DE")
+    assert cached in session.dirty
+    again = restore_principal(principal_cache._lookup((str(user.id), "v2")))
+    assert again.full_name == "Test User"
+    assert again.country_scope == ["TR"]
+
+
+@pytest.mark.asyncio
+async def test_invalidation_evicts_and_blocks_racing_store():
+    user = _user()
+    calls = []
+    await resolve_principal(str(user.id), "v2", _loader(user, calls))
+    await invalidate_principal(user.id)
+    await resolve_principal(str(user.id), "v2", _loader(user, calls))
+    assert calls == [1, 1]
+
+    clear_principal_cache()
+
+    async def load_then_invalidate():
+        await invalidate_principal(user.id)
+        return user
+
+    await resolve_principal(str(user.id), "v2", load_then_invalidate)
+    assert principal_cache._lookup((str(user.id), "v2")) is None
+
+
+def test_committed_user_changes_are_invalidated():
+    user = _user()
+    principal_cache._store((str(user.id), "v2"), user)
+    session = Session()
+    merged = restore_principal(snapshot_principal(user), session)
+    merged.role = "moderator"
+    before = principal_cache_stats()["invalidations"]
+
+    principal_cache._collect_user_changes(session, None)
+    principal_cache._invalidate_committed_users(session)
+    assert principal_cache._lookup((str(user.id), "v2")) is None
+    assert principal_cache_stats()["invalidations"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_request_defaults_do_not_dirty_the_cached_principal():
+    from app.dependencies import _apply_principal_defaults
+
+    user = _user(country_scope=None)
+    await resolve_principal(str(user.id), "v2", _loader(user, []))
+
+    session = Session()
+    cached = await resolve_principal(str(user.id), "v2", _loader(user, []), session)
+    _apply_principal_defaults(cached, "admin")
+
+    assert cached.country_scope == [] and cached.portal_scope == "admin"
+    assert not session.dirty
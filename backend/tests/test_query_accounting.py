@@ -0,0 +1,91 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+
+from app.core.query_accounting import (
+    QUERY_COUNT_HEADER,
+    QUERY_MAX_REPEAT_HEADER,
+    assert_max_queries,
+    current_query_stats,
+    instrument_engine,
+    statement_shape,
+    track_queries,
+)
+from app.middleware.query_accounting_middleware import QueryAccountingMiddleware
+
+
+def _engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    instrument_engine(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    return engine
+
+
+def test_statement_shapes_fold_parameters():
+    assert statement_shape("SELECT * FROM t WHERE id IN ($1, $2, $3) AND n = 5") == statement_shape(
+        "SELECT *  FROM t\nWHERE id IN ($1) AND n = 7"
+    )
+    assert statement_shape("SELECT 'x' FROM t WHERE a = %(a_1)s") == "SELECT ? FROM t WHERE a = ?"
+
+
+def test_statements_are_counted_only_inside_a_tracking_block():
+    engine = _engine()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            for item_id in (1, 2, 3):
+                conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+            conn.execute(text("SELECT count(*) FROM items"))
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing_table"))
+        assert current_query_stats() is None
+
+    assert stats.count == 5
+    assert stats.max_repeat() == 3
+    assert stats.repeated(3)[0][1] == 3
+    assert stats.total_ms > 0
+
+
+def test_assert_max_queries_enforces_the_budget():
+    engine = _engine()
+    with engine.connect() as conn:
+        with assert_max_queries(2):
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        with pytest.raises(AssertionError, match="query budget exceeded"):
+            with assert_max_queries(1):
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        with pytest.raises(AssertionError, match="repeated statement"):
+            with assert_max_queries(10, max_repeat=1):
+                for item_id in (1, 2):
+                    conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+
+
+@pytest.mark.asyncio
+async def test_middleware_reports_per_request_totals(caplog):
+    engine = _engine()
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        with engine.connect() as conn:
+            ids = [row[0] for row in conn.execute(text("SELECT id FROM items"))]
+            names = [conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id}).scalar() for item_id in ids * 4]
+        return {"names": names}
+
+    app.add_middleware(QueryAccountingMiddleware, debug_headers=True)
+    caplog.set_level("WARNING", logger="query_accounting")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        res = await client.get("/api/items")
+        again = await client.get("/api/items")
+
+    assert res.headers[QUERY_COUNT_HEADER] == "13"
+    assert res.headers[QUERY_MAX_REPEAT_HEADER] == "12"
+    assert res.headers["server-timing"].startswith("db;dur=") and '13 queries' in res.headers["server-timing"]
+    assert again.headers[QUERY_COUNT_HEADER] == "13"
+    assert any("n_plus_one_suspected" in record.message and "/api/items" in record.message for record in caplog.records)
@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from httpx import ASGITransport, AsyncClient
+
+from app.core import rate_limit
+from app.core.rate_limit import RateLimiter, principal_identity, reset_rate_limits
+from app.core.redis_cache import cache_service
+from app.core.security import create_access_token
+
+
+class _FailingScript:
+    async def __call__(self, keys, args):
+        raise ConnectionError("redis down")
+
+
+class _FailingRedis:
+    def register_script(self, source):
+        return _FailingScript()
+
+
+@pytest.fixture(autouse=True)
+def local_only(monkeypatch):
+    monkeypatch.setattr(cache_service, "client", None)
+    rate_limit._rate_limit_store.clear()
+    yield
+    rate_limit._rate_limit_store.clear()
+
+
+@pytest.mark.asyncio
+async def test_burst_then_deny_with_retry_after():
+    limiter = RateLimiter(limit=60, window_seconds=60, scope="t_burst", burst=3)
+    decisions = [await limiter.hit("user:1") for _ in range(4)]
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert decisions[0].remaining == 2
+    assert decisions[3].retry_after == 1
+    assert (await limiter.hit("user:2")).allowed
+
+
+@pytest.mark.asyncio
+async def test_store_evicts_oldest_key_instead_of_resetting(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_LOCAL_MAX_KEYS", 3)
+    limiter = RateLimiter(limit=1, window_seconds=60, scope="t_lru")
+    for identity in ("a", "b", "c"):
+        assert (await limiter.hit(identity)).allowed
+    assert not (await limiter.hit("a")).allowed
+    assert (await limiter.hit("d")).allowed
+
+    assert list(rate_limit._rate_limit_store) == ["rl:t_lru:c", "rl:t_lru:a", "rl:t_lru:d"]
+    assert not (await limiter.hit("c")).allowed
+
+
+@pytest.mark.asyncio
+async def test_backend_errors_follow_the_policy(monkeypatch):
+    monkeypatch.setattr(cache_service, "client", _FailingRedis())
+    lenient = RateLimiter(limit=5, window_seconds=60, scope="t_open")
+    strict = RateLimiter(limit=5, window_seconds=60, scope="t_closed", fail_open=False)
+
+    open_decision = await lenient.hit("user:1")
+    closed_decision = await strict.hit("user:1")
+
+    assert open_decision.allowed and open_decision.source == "local"
+    assert not closed_decision.allowed and closed_decision.source == "fail_closed"
+    assert "rl:t_closed:user:1" not in rate_limit._rate_limit_store
+
+
+@pytest.mark.asyncio
+async def test_dependency_keys_on_principal_not_token_text():
+    limiter = RateLimiter(limit=2, window_seconds=60, scope="t_dep")
+    app = FastAPI()
+
+    @app.get("/limited")
+    async def limited(request: Request):
+        await limiter(request)
+        return {"identity": principal_identity(request)}
+
+    first = create_access_token({"sub": "user-1"})
+    second = create_access_token({"sub": "user-1", "token_version": 2})
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        res = await client.get("/limited", headers={"Authorization": f"Bearer {first}"})
+        assert res.json() == {"identity": "user:user-1"}
+        await client.get("/limited", headers={"Authorization": f"Bearer {second}"})
+        blocked = await client.get("/limited", headers={"Authorization": f"Bearer {first}"})
+        anonymous = await client.get("/limited", headers={"Authorization": "Bearer not-a-jwt"})
+
+    assert blocked.status_code == 429
+    assert blocked.json()["detail"]["code"] == "rate_limit_exceeded"
+    assert blocked.headers["Retry-After"] == "30"
+    assert anonymous.status_code == 200 and anonymous.json()["identity"].startswith("ip:")
+
+
+@pytest.mark.asyncio
+async def test_reset_clears_every_scope_for_an_identity():
+    search = RateLimiter(limit=1, window_seconds=60, scope="t_search")
+    listing = RateLimiter(limit=1, window_seconds=60, scope="t_listing")
+    await search.hit("user:9")
+    await listing.hit("user:9")
+    await listing.hit("user:10")
+
+    assert await reset_rate_limits("user:9") == 2
+    assert (await search.hit("user:9")).allowed
+    assert not (await listing.hit("user:10")).allowed
+    with pytest.raises(HTTPException):
+        await listing(None, user_id="10")
+
+
+def _request(peer, headers=None):
+    scope = {
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": (peer, 1234),
+    }
+    return Request(scope)
+
+
+def test_forwarded_headers_only_count_from_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_trusted_proxies", rate_limit._parse_networks("10.0.0.0/8"))
+
+    spoofed = _request("203.0.113.9", {"X-Forwarded-For": "1.2.3.4", "X-Real-IP": "1.2.3.4"})
+    assert rate_limit.client_ip(spoofed) == "203.0.113.9"
+
+    # The client-supplied leftmost hop is ignored; the proxy's own entry wins.
+    proxied = _request("10.0.0.5", {"X-Forwarded-For": "1.2.3.4, 198.51.100.7, 10.0.0.6"})
+    assert rate_limit.client_ip(proxied) == "198.51.100.7"
+    assert rate_limit.client_ip(_request("10.0.0.5", {"X-Real-IP": "198.51.100.8"})) == "198.51.100.8"
+    assert rate_limit.client_ip(_request("10.0.0.5")) == "10.0.0.5"
+
+
+def test_render_deployment_resolves_the_caller_behind_its_proxy(monkeypatch):
+    yaml = pytest.importorskip("yaml")
+    render_yaml = Path(__file__).resolve().parents[2] / "render.yaml"
+    if not render_yaml.exists():
+        pytest.skip("render.yaml is not part of this checkout")
+    api = next(service for service in yaml.safe_load(render_yaml.read_text())["services"] if service["type"] == "web")
+    trusted = next(var["value"] for var in api["envVars"] if var["key"] == "TRUSTED_PROXY_IPS")
+    monkeypatch.setattr(rate_limit, "_trusted_proxies", rate_limit._parse_networks(trusted))
+
+    # Render's edge appends the caller it saw; anything left of it is client-supplied.
+    behind_render = _request("10.214.3.7", {"X-Forwarded-For": "6.6.6.6, 203.0.113.50"})
+    assert rate_limit.client_ip(behind_render) == "203.0.113.50"
+    assert rate_limit.client_ip(_request("203.0.113.51", {"X-Forwarded-For": "6.6.6.6"})) == "203.0.113.51"
@@ -0,0 +1,142 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core import scheduler as scheduler_module
+from app.core.scheduler import ScheduledJob, Scheduler
+
+
+def test_next_delay_adds_jitter_but_keeps_immediate_reruns():
+    job = ScheduledJob("j", None, 10, jitter=2)
+
+    delays = [job.next_delay(None) for _ in range(200)]
+
+    assert all(10 <= delay <= 12 for delay in delays)
+    assert job.next_delay(0) == 0
+    assert 3 <= job.next_delay(3) <= 5
+
+
+@pytest.mark.asyncio
+async def test_overlapping_ticks_are_skipped():
+    release = asyncio.Event()
+
+    async def tick():
+        await release.wait()
+
+    job = ScheduledJob("slow", tick, 1)
+    first = asyncio.create_task(job.run_once())
+    await asyncio.sleep(0)
+
+    assert await job.run_once() is None
+    release.set()
+    await first
+    assert job.runs == 1 and job.overlaps_skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_and_timeouts_are_recorded():
+    async def boom():
+        raise RuntimeError("boom")
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    failing = ScheduledJob("failing", boom, 1)
+    slow = ScheduledJob("slow", hang, 1, timeout=0.01)
+
+    assert await failing.run_once() is None
+    assert await slow.run_once() is None
+
+    assert failing.failures == 1 and failing.last_error == "boom"
+    assert slow.failures == 1 and slow.runtime.count == 1
+    assert failing.stats()["runs"] == 1
+
+
+@pytest.mark.asyncio
+async def test_wake_event_cuts_the_interval_short():
+    event = asyncio.Event()
+    ran = []
+
+    async def tick():
+        ran.append(True)
+
+    job = ScheduledJob("woken", tick, 60, run_at_start=False, wake_event=lambda: event)
+    task = asyncio.create_task(job.run_forever())
+    await asyncio.sleep(0)
+    event.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    task.cancel()
+
+    assert ran == [True]
+    assert not event.is_set()
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class _Engine:
+    """Answers the advisory lock queries like Postgres would for one session."""
+
+    def __init__(self, lock_available):
+        self.lock_available = lock_available
+        self.statements = []
+
+    @asynccontextmanager
+    async def connect(self):
+        yield self
+
+    async def execution_options(self, **options):
+        return self
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return _Result(self.lock_available)
+
+    async def invalidate(self):
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("lock_available", [True, False])
+async def test_only_the_lock_holder_runs_jobs(monkeypatch, lock_available):
+    monkeypatch.setattr(scheduler_module, "SCHEDULER_LEADER_RETRY_SECONDS", 0.01)
+    ran = asyncio.Event()
+
+    async def tick():
+        ran.set()
+
+    engine = _Engine(lock_available)
+    scheduler = Scheduler([ScheduledJob("job", tick, 60)], engine=engine, lock_key=7)
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.05)
+
+    assert ran.is_set() is lock_available
+    assert scheduler.stats()["leader"] is lock_available
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert any("pg_advisory_unlock" in sql for sql in engine.statements) is lock_available
+    assert scheduler.is_leader is False
+
+
+def test_scheduler_metrics_export_job_histograms():
+    from app.utils.metrics_export import render_scheduler_metrics
+
+    job = ScheduledJob("batch_publish", None, 300)
+    job.runtime.record(120.0)
+    job.failures = 2
+
+    output = render_scheduler_metrics(Scheduler([job]))
+
+    assert 'scheduler_job_duration_seconds_count{job="batch_publish"' in output
+    assert 'scheduler_job_failures_total{job="batch_publish"' in output
+    assert [line for line in output.splitlines() if line.startswith("scheduler_job_failures_total")][0].endswith(" 2")
+    assert "scheduler_leader{" in output
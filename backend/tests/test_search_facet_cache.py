@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.services import meilisearch_index, search_facet_cache
+
+
+RUNTIME = {"url": "http://meili.local:7700", "index_name": "listings_index", "master_key": "key"}
+SEARCH_ARGS = dict(query="", limit=20, offset=0, sort=["premium_score:desc"], filter_query="price >= 1", facets=["make_id"])
+
+
+@pytest.fixture(autouse=True)
+def reset_facet_cache():
+    search_facet_cache.invalidate_facet_cache()
+    yield
+    search_facet_cache.invalidate_facet_cache()
+
+
+@pytest.fixture
+def meili_calls(monkeypatch):
+    calls = []
+
+    async def fake_search(runtime, **kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.01)
+        result = {"hits": [{"listing_id": "a"}], "estimatedTotalHits": 1}
+        if kwargs.get("facets"):
+            result["facetDistribution"] = {"make_id": {"1": 1}}
+        return result
+
+    monkeypatch.setattr(search_facet_cache, "meili_search_documents", fake_search)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_share_one_call(meili_calls):
+    results = await asyncio.gather(
+        *[search_facet_cache.search_with_cached_facets(RUNTIME, **SEARCH_ARGS) for _ in range(5)]
+    )
+    assert len(meili_calls) == 1
+    assert all(result["facetDistribution"] == {"make_id": {"1": 1}} for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cached_facets_skip_facet_computation_until_generation_changes(meili_calls):
+    await search_facet_cache.search_with_cached_facets(RUNTIME, **SEARCH_ARGS)
+    second = await search_facet_cache.search_with_cached_facets(RUNTIME, **{**SEARCH_ARGS, "offset": 20})
+    assert meili_calls[1]["facets"] is None
+    assert second["facetDistribution"] == {"make_id": {"1": 1}}
+
+    meilisearch_index.bump_meili_index_generation()
+    await search_facet_cache.search_with_cached_facets(RUNTIME, **SEARCH_ARGS)
+    assert meili_calls[2]["facets"] == ["make_id"]
+
+
+@pytest.mark.asyncio
+async def test_document_writes_do_not_evict_cached_facets(meili_calls, monkeypatch):
+    class _Response:
+        status_code = 202
+
+        def json(self):
+            return {"taskUid": 1}
+
+    class _Client:
+        async def post(self, *args, **kwargs):
+            return _Response()
+
+    monkeypatch.setattr(meilisearch_index, "_get_pooled_meili_client", lambda runtime: _Client())
+    await search_facet_cache.search_with_cached_facets(RUNTIME, **SEARCH_ARGS)
+
+    await meilisearch_index.meili_upsert_documents(RUNTIME, [{"listing_id": "a"}])
+    await search_facet_cache.search_with_cached_facets(RUNTIME, **SEARCH_ARGS)
+
+    assert meili_calls[1]["facets"] is None
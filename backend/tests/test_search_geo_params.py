@@ -0,0 +1,35 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.search_geo import GEO_RADIUS_MAX_KM, parse_bbox_param, parse_geo_radius_params
+
+
+def test_bbox_parses_lng_lat_order():
+    assert parse_bbox_param("28.5, 40.8, 29.4, 41.3") == (28.5, 40.8, 29.4, 41.3)
+    assert parse_bbox_param(None) is None
+    assert parse_bbox_param("1,2,3") is None
+    assert parse_bbox_param("29,41,28,40") is None
+
+
+@pytest.mark.parametrize("bbox", ["nan,40,29,41", "28,40,inf,41", "28,-inf,29,41"])
+def test_bbox_rejects_non_finite_values(bbox):
+    with pytest.raises(HTTPException) as exc:
+        parse_bbox_param(bbox)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("bbox", ["-181,40,29,41", "28,40,181,41", "28,-91,29,41", "28,40,29,90.5"])
+def test_bbox_rejects_out_of_range_coordinates(bbox):
+    with pytest.raises(HTTPException) as exc:
+        parse_bbox_param(bbox)
+    assert exc.value.status_code == 400
+
+
+def test_geo_radius_is_capped_and_validated():
+    assert parse_geo_radius_params(41.0, 29.0, 10) == (41.0, 29.0, 10000.0)
+    assert parse_geo_radius_params(41.0, 29.0, 10 ** 6)[2] == GEO_RADIUS_MAX_KM * 1000.0
+    assert parse_geo_radius_params(95.0, 29.0, 10) is None
+    assert parse_geo_radius_params(41.0, 29.0, 0) is None
+    with pytest.raises(HTTPException) as exc:
+        parse_geo_radius_params(float("nan"), 29.0, 10)
+    assert exc.value.status_code == 400
@@ -0,0 +1,57 @@
+import pytest
+
+from app.core.redis_cache import cache_service
+from app.services import search_suggest_cache as suggest_cache
+
+
+@pytest.fixture(autouse=True)
+def reset_suggest_cache(monkeypatch):
+    monkeypatch.setattr(cache_service, "client", None)
+    suggest_cache.invalidate_suggest_cache()
+    yield
+    suggest_cache.invalidate_suggest_cache()
+
+
+def _hits(*titles):
+    return [{"label": title, "listing_id": str(index), "city": ""} for index, title in enumerate(titles)]
+
+
+@pytest.mark.asyncio
+async def test_longer_query_derived_from_complete_prefix():
+    await suggest_cache.store_suggest_candidates(
+        "DE", "bm", _hits("BMW 320d", "BMW X5", "Audi A4 bmw-look", "Bmx bike"), complete=True
+    )
+
+    entry, source = await suggest_cache.lookup_suggest_candidates("DE", "BMW 3")
+    assert source == "prefix"
+    assert [hit["label"] for hit in entry["hits"]] == ["BMW 320d"]
+
+    # The derived entry is now cached under its own key.
+    entry, source = await suggest_cache.lookup_suggest_candidates("DE", "bmw 3")
+    assert source == "local"
+
+
+@pytest.mark.asyncio
+async def test_truncated_prefix_is_not_reused():
+    await suggest_cache.store_suggest_candidates("DE", "bm", _hits("BMW 320d"), complete=False)
+
+    entry, source = await suggest_cache.lookup_suggest_candidates("DE", "bmw")
+    assert entry is None
+    assert source == "miss"
+
+
+@pytest.mark.asyncio
+async def test_local_tier_is_bounded(monkeypatch):
+    monkeypatch.setattr(suggest_cache, "SUGGEST_LOCAL_MAX_ENTRIES", 2)
+    for query in ("aa", "bb", "cc"):
+        await suggest_cache.store_suggest_candidates("DE", query, [], complete=False)
+
+    assert suggest_cache.suggest_cache_stats()["local_entries"] == 2
+    entry, _ = await suggest_cache.lookup_suggest_candidates("DE", "aa")
+    assert entry is None
+
+
+def test_prefix_matches_ranked_first():
+    entry = {"hits": _hits("Sedan BMW", "BMW 320d", "BMW X5")}
+    items = suggest_cache.rank_suggest_items(entry, "bmw", 2)
+    assert [item["label"] for item in items] == ["BMW 320d", "BMW X5"]
@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.search_sync_pipeline import (
+    _mark_failed,
+    claim_search_sync_jobs,
+    coalesce_search_sync_jobs,
+    search_sync_backoff_seconds,
+)
+
+
+def _job(listing_id, operation, created_at, attempts=1, max_attempts=6):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        listing_id=listing_id,
+        operation=operation,
+        created_at=created_at,
+        attempts=attempts,
+        max_attempts=max_attempts,
+        status="processing",
+        next_retry_at=None,
+        last_error=None,
+        updated_at=created_at,
+        payload=None,
+    )
+
+
+def test_coalesce_keeps_latest_operation_per_listing():
+    now = datetime.now(timezone.utc)
+    listing_a = uuid.uuid4()
+    listing_b = uuid.uuid4()
+    first = _job(listing_a, "upsert", now)
+    second = _job(listing_a, "upsert", now + timedelta(seconds=1))
+    final = _job(listing_a, "delete", now + timedelta(seconds=2))
+    other = _job(listing_b, "upsert", now)
+
+    latest, superseded = coalesce_search_sync_jobs([final, other, first, second])
+
+    assert latest[listing_a] is final
+    assert latest[listing_b] is other
+    assert {job.id for job in superseded} == {first.id, second.id}
+
+
+def test_failed_job_retries_with_backoff_then_dead_letters():
+    now = datetime.now(timezone.utc)
+    job = _job(uuid.uuid4(), "upsert", now, attempts=2)
+    _mark_failed(job, "meili_upsert_failed_503", now)
+    assert job.status == "retry"
+    assert job.next_retry_at == now + timedelta(seconds=search_sync_backoff_seconds(2))
+
+    exhausted = _job(uuid.uuid4(), "upsert", now, attempts=6)
+    _mark_failed(exhausted, "meili_upsert_failed_503", now)
+    assert exhausted.status == "dead_letter"
+    assert exhausted.next_retry_at is None
+
+
+class _ClaimResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self._rows)
+
+
+class _ClaimSession:
+    def __init__(self, *pages):
+        self.pages = list(pages)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return _ClaimResult(self.pages.pop(0))
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_claim_sweeps_in_pending_jobs_for_the_same_listing():
+    now = datetime.now(timezone.utc)
+    listing = uuid.uuid4()
+    claimed = _job(listing, "upsert", now, attempts=0)
+    later = _job(listing, "delete", now + timedelta(minutes=5), attempts=0)
+    claimed.status = later.status = "pending"
+    session = _ClaimSession([claimed], [later])
+
+    jobs = await claim_search_sync_jobs(session, limit=1)
+
+    assert jobs == [claimed, later]
+    assert all(job.status == "processing" for job in jobs)
+    assert "FOR UPDATE SKIP LOCKED" in session.statements[1]
+    assert "search_sync_jobs.listing_id IN" in session.statements[1]
+    assert session.commits == 1
+    # The batch then keeps only the newest operation for the listing.
+    latest, superseded = coalesce_search_sync_jobs(jobs)
+    assert latest[listing] is later and superseded == [claimed]
@@ -0,0 +1,129 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.services import search_taxonomy
+from app.services.meilisearch_index import stable_numeric_id
+
+
+CATEGORY_ID = uuid.uuid4()
+MAKE_ID = uuid.uuid4()
+
+
+def _snapshot(version: int) -> search_taxonomy.TaxonomySnapshot:
+    attr_map = {"color": {"field": "attribute_color", "key": "color", "label": "Renk", "type": "select", "options": []}}
+    return search_taxonomy.TaxonomySnapshot(
+        version=version,
+        loaded_at=search_taxonomy.time.monotonic(),
+        category_slug_to_id={"otomobil": CATEGORY_ID, "autos": CATEGORY_ID},
+        make_slug_to_num={"bmw": stable_numeric_id(MAKE_ID)},
+        category_attribute_maps={CATEGORY_ID: (attr_map, ["attribute_color"])},
+        all_filterable_fields=("attribute_color",),
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_snapshot(monkeypatch):
+    monkeypatch.setattr(search_taxonomy, "_snapshot", None)
+    monkeypatch.setattr(search_taxonomy, "_snapshot_lock", None)
+    monkeypatch.setattr(search_taxonomy, "_refresh_task", None)
+    yield
+
+
+def test_snapshot_resolves_slugs_and_uuids():
+    snapshot = _snapshot(0)
+    assert snapshot.resolve_category("autos") == CATEGORY_ID
+    assert snapshot.resolve_category(str(CATEGORY_ID)) == CATEGORY_ID
+    assert snapshot.resolve_category("missing") is None
+    assert snapshot.resolve_category("  ") is None
+    assert snapshot.resolve_vehicle("bmw", "make") == stable_numeric_id(MAKE_ID)
+    assert snapshot.resolve_vehicle(str(MAKE_ID), "model") == stable_numeric_id(MAKE_ID)
+    assert snapshot.resolve_vehicle("bmw", "model") is None
+
+
+def test_filterable_attributes_returns_copies():
+    snapshot = _snapshot(0)
+    attr_map, fields = snapshot.filterable_attributes(CATEGORY_ID)
+    attr_map.pop("color")
+    fields.clear()
+    assert snapshot.filterable_attributes(CATEGORY_ID)[1] == ["attribute_color"]
+    assert snapshot.filterable_attributes(None) == ({}, [])
+
+
+@pytest.mark.asyncio
+async def test_snapshot_loaded_once_and_rebuilt_after_invalidation(monkeypatch):
+    builds = []
+
+    async def fake_build(session, version):
+        builds.append(version)
+        return _snapshot(version)
+
+    monkeypatch.setattr(search_taxonomy, "_build_snapshot", fake_build)
+
+    first = await search_taxonomy.get_taxonomy_snapshot(None)
+    second = await search_taxonomy.get_taxonomy_snapshot(None)
+    assert first is second
+    assert len(builds) == 1
+
+    search_taxonomy.invalidate_taxonomy_snapshot()
+    third = await search_taxonomy.get_taxonomy_snapshot(None)
+    assert third is not first
+    assert len(builds) == 2
+
+
+def test_commit_hook_invalidates_only_when_taxonomy_touched():
+    class FakeSession:
+        def __init__(self):
+            self.info = {}
+
+    before = search_taxonomy._snapshot_version
+    session = FakeSession()
+    search_taxonomy._invalidate_taxonomy_on_commit(session)
+    assert search_taxonomy._snapshot_version == before
+
+    session.info[search_taxonomy._SESSION_DIRTY_FLAG] = True
+    search_taxonomy._invalidate_taxonomy_on_commit(session)
+    assert search_taxonomy._snapshot_version == before + 1
+    assert search_taxonomy._SESSION_DIRTY_FLAG not in session.info
+
+
+@pytest.mark.asyncio
+async def test_invalidations_from_other_workers_reach_snapshot_and_listeners(monkeypatch):
+    published = []
+    woken = []
+
+    class _PubSub:
+        async def subscribe(self, channel):
+            self.channel = channel
+
+        async def listen(self):
+            yield {"type": "subscribe"}
+            yield {"type": "message", "data": "1"}
+            await asyncio.Event().wait()
+
+        async def close(self):
+            return None
+
+    class _Client:
+        async def publish(self, channel, message):
+            published.append(channel)
+
+        def pubsub(self):
+            return _PubSub()
+
+    monkeypatch.setattr(search_taxonomy.cache_service, "client", _Client())
+    monkeypatch.setattr(search_taxonomy, "_invalidation_listeners", [lambda: woken.append(True)])
+    version = search_taxonomy._snapshot_version
+
+    search_taxonomy.invalidate_taxonomy_snapshot()
+    await asyncio.sleep(0)
+    assert published == [search_taxonomy.TAXONOMY_INVALIDATION_CHANNEL]
+
+    task = asyncio.create_task(search_taxonomy.taxonomy_invalidation_listener())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert search_taxonomy._snapshot_version == version + 2
+    assert woken == [True, True]
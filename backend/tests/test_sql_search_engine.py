@@ -0,0 +1,112 @@
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import sql_search_engine as engine
+from app.services.meilisearch_index import MeiliSearchError, stable_numeric_id
+
+
+ATTR_MAP = {
+    "fuel": {"field": "attribute_fuel", "key": "fuel", "type": "select", "options": []},
+    "km": {"field": "attribute_km", "key": "km", "type": "number", "options": []},
+}
+
+
+def test_prefix_tsquery_strips_operators():
+    assert engine.build_prefix_tsquery("BMW 3er & !(x)") == "bmw:* & 3er:* & x:*"
+    assert engine.build_prefix_tsquery("  &|! ") is None
+
+
+def test_cursor_round_trip():
+    values = [Decimal("0.123456"), 1900, datetime(2026, 1, 2, tzinfo=timezone.utc), uuid.uuid4()]
+    assert engine.decode_cursor(engine.encode_cursor(values)) == values
+    assert engine.decode_cursor("not-a-cursor") is None
+
+
+def test_facets_use_one_grouping_sets_scan():
+    clauses = engine.build_sql_search_filters(
+        country="DE",
+        tsquery=None,
+        category_uuid=None,
+        make_uuid=None,
+        model_uuid=None,
+        doping_type=None,
+        price_min=None,
+        price_max=None,
+        attr_filters={"fuel": ["diesel"]},
+        attr_map=ATTR_MAP,
+    )
+    stmt, grouped, numeric = engine.build_facet_statement(
+        clauses, ["attribute_fuel", "attribute_km", "make_id", "city_id"], ATTR_MAP
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "GROUPING SETS" in sql
+    assert sql.count("FROM listings_search") == 1
+    assert [entry[0] for entry in grouped] == ["attribute_fuel", "make_id"]
+    assert [entry[0] for entry in numeric] == ["attribute_km"]
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self._rows
+
+
+class _FacetSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, stmt):
+        return _Result(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_facet_rows_map_to_meili_shape():
+    make_id = uuid.uuid4()
+    rows = [
+        {"f0": "diesel", "g0": 0, "f2": None, "g2": 1, "min1": None, "max1": None, "doc_count": 4},
+        {"f0": None, "g0": 1, "f2": make_id, "g2": 0, "min1": None, "max1": None, "doc_count": 3},
+        {"f0": None, "g0": 1, "f2": None, "g2": 1, "min1": 10.0, "max1": 90000.0, "doc_count": 7},
+    ]
+    distribution, stats, total = await engine._facet_counts(
+        _FacetSession(rows), [], ["attribute_fuel", "attribute_km", "make_id"], ATTR_MAP
+    )
+    assert total == 7
+    assert distribution["attribute_fuel"] == {"diesel": 4}
+    assert distribution["make_id"] == {str(stable_numeric_id(make_id)): 3}
+    assert stats["attribute_km"] == {"min": 10.0, "max": 90000.0}
+
+
+def test_breaker_opens_after_consecutive_failures(monkeypatch):
+    monkeypatch.setitem(engine._breaker, "failures", 0)
+    monkeypatch.setitem(engine._breaker, "open_until", 0.0)
+    for _ in range(engine.MEILI_SEARCH_BREAKER_THRESHOLD):
+        assert not engine.meili_search_breaker_open()
+        engine.record_meili_search_failure(httpx.ConnectError("down"))
+    assert engine.meili_search_breaker_open()
+    engine.record_meili_search_success()
+    assert not engine.meili_search_breaker_open()
+
+
+def test_breaker_ignores_rejected_queries(monkeypatch):
+    monkeypatch.setitem(engine._breaker, "failures", 0)
+    monkeypatch.setitem(engine._breaker, "open_until", 0.0)
+    bad_filter = MeiliSearchError(400, '{"code":"invalid_search_filter"}')
+    assert engine.is_meili_search_bad_request(bad_filter)
+    for _ in range(engine.MEILI_SEARCH_BREAKER_THRESHOLD):
+        engine.record_meili_search_failure(bad_filter)
+        engine.record_meili_search_failure(KeyError("hits"))
+    assert engine._breaker["failures"] == 0
+    assert not engine.meili_search_breaker_open()
+
+    engine.record_meili_search_failure(MeiliSearchError(503, "unavailable"))
+    engine.record_meili_search_failure(httpx.ConnectError("refused"))
+    engine.record_meili_search_failure(httpx.ReadTimeout("slow"))
+    assert engine._breaker["failures"] == 3
+    assert not engine.is_meili_search_bad_request(MeiliSearchError(503, "unavailable"))
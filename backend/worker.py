@@ -0,0 +1,59 @@
+"""
+Background job process: runs the leader-elected scheduler without serving HTTP.
+
+Usage:
+  SCHEDULER_MODE=worker python worker.py
+
+Start the API workers with SCHEDULER_MODE=worker as well so they leave the
+jobs to this process. Several copies may run; only the advisory-lock holder
+executes jobs, the others stand by to take over.
+"""
+
+import asyncio
+import logging
+import signal
+
+from server import background_scheduler, cache_service, close_meili_clients, dispose_engines, sql_engine
+from app.core.bootstrap import verify_schema_version
+from app.services.meilisearch_settings_reconciler import meili_settings_wake_listener
+from app.services.search_taxonomy import taxonomy_invalidation_listener
+
+logger = logging.getLogger("worker")
+
+
+async def main() -> None:
+    await verify_schema_version(sql_engine)
+    try:
+        await asyncio.wait_for(cache_service.connect(), timeout=5)
+    except Exception as exc:
+        logger.warning("worker_redis_unavailable error=%s", exc)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    scheduler_task = asyncio.create_task(background_scheduler.run())
+    # Taxonomy changes and reconcile requests made by the API workers wake
+    # the settings reconcile here.
+    taxonomy_task = asyncio.create_task(taxonomy_invalidation_listener())
+    wake_task = asyncio.create_task(meili_settings_wake_listener())
+    logger.info("worker_started jobs=%s", ",".join(job.name for job in background_scheduler.jobs))
+    try:
+        await asyncio.wait({scheduler_task, asyncio.create_task(stop.wait())}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (scheduler_task, taxonomy_task, wake_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await close_meili_clients()
+        await cache_service.close()
+        await dispose_engines()
+        logger.info("worker_stopped")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())